@@ -0,0 +1,12 @@
+import sys
+import os
+
+# Ensure src is in python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.services.batch_report_service import main
+
+# e.g. python batch_reports.py --status confirmed --workers 4 --output-dir reports/batch
+# Guarded: pool workers re-import this module
+if __name__ == '__main__':
+    sys.exit(main())
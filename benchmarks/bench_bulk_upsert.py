@@ -0,0 +1,89 @@
+"""
+Benchmark: per-row saves vs the bulk upsert paths.
+
+Reports rows/sec for campaign saves, the global vehicle replacement and
+the traffic location CSV import, each done row by row (previous code
+path) and through the executemany upserts.
+
+Usage:
+    python benchmarks/bench_bulk_upsert.py [n_rows]
+"""
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import temp_database, measure
+
+
+def _campaigns(n, prefix):
+    start = datetime.date(2025, 1, 1)
+    return [{
+        'id': f"{prefix}{i}",
+        'campaign_name': f"Campaign {i}",
+        'client_name': "Bench Client",
+        'status': 'confirmed',
+        'start_date': start.isoformat(),
+        'end_date': (start + datetime.timedelta(days=30)).isoformat(),
+        'vehicle_id': 'v1',
+        'additional_vehicles': [{'vehicle_id': 'v2'}],
+        'cities': ["Bucuresti"]
+    } for i in range(n)]
+
+
+def _locations(n):
+    return [{'name': f"Intersectie {i}", 'latitude': 44.4 + i * 1e-4, 'longitude': 26.1,
+             'daily_traffic': 40000 + i, 'pedestrian_traffic': 9000} for i in range(n)]
+
+
+def _report(label, n, result):
+    print(f"{'':<45} {n / result['seconds']:10.0f} rows/s  ({label})")
+
+
+def run(n):
+    from src.data.campaign_storage import CampaignStorage
+    from src.data.city_data_manager import CityDataManager
+    from src.data.db_config import SessionLocal
+    from src.data.models import TrafficLocation
+    from src.services.resource_service import ResourceService
+
+    storage = CampaignStorage()
+    service = ResourceService()
+    effective = datetime.date(2025, 1, 15)
+
+    with temp_database() as (_engine, counter):
+        with measure(counter, f"save_campaign x{n} (per row)") as result:
+            for data in _campaigns(n, 'a'):
+                storage.save_campaign(data, data['id'])
+        _report("before", n, result)
+        with measure(counter, f"bulk_save_campaigns ({n} rows)") as result:
+            storage.bulk_save_campaigns(_campaigns(n, 'b'))
+        _report("after", n, result)
+
+    with temp_database() as (_engine, counter):
+        storage.bulk_save_campaigns(_campaigns(n, 'a'))
+        eff_dt = datetime.datetime.combine(effective, datetime.time.min)
+        with measure(counter, f"replace_vehicle_in_campaign x{n} (per row)") as result:
+            for i in range(n):
+                service.replace_vehicle_in_campaign(f"a{i}", 'v3', eff_dt)
+        _report("before", n, result)
+        with measure(counter, f"replace_vehicle_globally ({n} campaigns)") as result:
+            assert service.replace_vehicle_globally('v3', 'v4', effective) == n
+        _report("after", n, result)
+
+    with temp_database() as (_engine, counter):
+        with measure(counter, f"traffic locations, ORM add x{n} (per row)") as result:
+            session = SessionLocal()
+            for data in _locations(n):
+                session.add(TrafficLocation(city_name="Bucuresti", **data))
+            session.commit()
+            session.close()
+        _report("before", n, result)
+        with measure(counter, f"bulk_upsert_traffic_locations ({n} rows)") as result:
+            CityDataManager().bulk_upsert_traffic_locations("Cluj-Napoca", _locations(n))
+        _report("after", n, result)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,66 @@
+"""
+Benchmark: CampaignStorage.get_all_campaigns hydration cost.
+
+Seeds 1k and 10k campaigns (each with a main vehicle, one additional
+vehicle and a route) and reports latency and SQL query count.
+
+Usage:
+    python benchmarks/bench_campaign_listing.py [sizes...]
+"""
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import temp_database, measure
+
+N_VEHICLES = 20
+
+
+def seed(n_campaigns):
+    from src.data.db_config import SessionLocal
+    from src.data.models import Campaign, CampaignRoute, Driver, Vehicle
+
+    session = SessionLocal()
+    try:
+        for i in range(N_VEHICLES):
+            session.add(Driver(id=f"d{i}", name=f"Driver {i}"))
+            session.add(Vehicle(id=f"v{i}", name=f"Vehicle {i}", registration=f"B-{i:02d}-DOH",
+                                driver_id=f"d{i}"))
+        session.flush()
+
+        start = datetime.date(2025, 1, 1)
+        for i in range(n_campaigns):
+            session.add(Campaign(
+                id=f"c{i}",
+                campaign_name=f"Campaign {i}",
+                client_name="Bench Client",
+                start_date=start,
+                end_date=start + datetime.timedelta(days=30),
+                vehicle_id=f"v{i % N_VEHICLES}",
+                driver_id=f"d{i % N_VEHICLES}",
+                additional_vehicles=[{'vehicle_id': f"v{(i + 1) % N_VEHICLES}"}],
+                cities=["Bucuresti"]
+            ))
+            session.add(CampaignRoute(campaign_id=f"c{i}", name=f"Route {i}"))
+        session.commit()
+    finally:
+        session.close()
+
+
+def run(sizes):
+    from src.data.campaign_storage import CampaignStorage
+
+    for n in sizes:
+        with temp_database() as (_engine, counter):
+            seed(n)
+            storage = CampaignStorage()
+            with measure(counter, f"get_all_campaigns ({n} campaigns)"):
+                campaigns = storage.get_all_campaigns()
+            assert len(campaigns) == n
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 10000]
+    run(sizes)
@@ -0,0 +1,75 @@
+"""
+Benchmark: fleet utilization from the interval index vs per-vehicle filtering.
+
+Builds a synthetic fleet (vehicles x campaigns per vehicle) and asks for the
+utilization of every vehicle over many date windows, the way the fleet PDF
+and the Streamlit utilization tab do. The legacy path filters the whole
+campaign list per vehicle and counts days one by one.
+
+Usage:
+    python benchmarks/bench_fleet_analytics.py [vehicles] [campaigns_per_vehicle] [windows]
+"""
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def legacy_days_used(campaigns, vehicle_id, start_date, end_date):
+    """Previous FleetUtilizationReportGenerator per-vehicle filter + _calculate_days_used"""
+    used_days = set()
+    for c in campaigns:
+        if c.get('vehicle_id') != vehicle_id:
+            continue
+        c_start = datetime.date.fromisoformat(str(c['start_date']))
+        c_end = datetime.date.fromisoformat(str(c['end_date']))
+        if not (c_start <= end_date and c_end >= start_date):
+            continue
+        current = max(c_start, start_date)
+        while current <= min(c_end, end_date):
+            used_days.add(current)
+            current += datetime.timedelta(days=1)
+    return len(used_days)
+
+
+def run(vehicles, per_vehicle, windows):
+    from src.reporting.fleet_analytics import FleetAnalytics
+
+    rng = random.Random(7)
+    base = datetime.date(2024, 1, 1)
+    campaigns = []
+    for v in range(vehicles):
+        for i in range(per_vehicle):
+            start = base + datetime.timedelta(days=rng.randint(0, 730))
+            campaigns.append({'id': f'c{v}_{i}', 'vehicle_id': f'v{v}', 'status': 'confirmed',
+                              'start_date': start.isoformat(),
+                              'end_date': (start + datetime.timedelta(days=rng.randint(1, 30))).isoformat()})
+    queries = []
+    for _ in range(windows):
+        start = base + datetime.timedelta(days=rng.randint(0, 700))
+        queries.append((start, start + datetime.timedelta(days=rng.choice([7, 30, 90, 365]))))
+    print(f"{vehicles} vehicles x {per_vehicle} campaigns = {len(campaigns)} campaigns, {windows} windows")
+
+    def timed(label, fn):
+        t0 = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - t0
+        print(f"{label:<45} {seconds * 1000:10.1f} ms")
+        return seconds, result
+
+    vehicle_ids = [f'v{v}' for v in range(vehicles)]
+    t_old, old = timed("legacy: filter + count days", lambda: [
+        legacy_days_used(campaigns, vid, s, e) for s, e in queries for vid in vehicle_ids])
+    t_build, analytics = timed("index: build", lambda: FleetAnalytics.build(campaigns))
+    t_new, new = timed("index: utilization queries", lambda: [
+        analytics.utilization('vehicle', vid, s, e)['days_used'] for s, e in queries for vid in vehicle_ids])
+    assert old == new
+    print(f"{'speedup (build + queries)':<45} {t_old / (t_build + t_new):10.1f}x")
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    run(*(args + [40, 50, 50][len(args):]))
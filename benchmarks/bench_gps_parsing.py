@@ -0,0 +1,136 @@
+"""
+Benchmark: vectorized GPS log parsing vs the row-by-row parser.
+
+Parses the logs in samples/ (EasyTrackMap .xls export, simple CSV), then
+multi-day versions of them: the trips of the .xls pasted as EasyTrackMap
+text and the CSV pings, each repeated `days` times. The row-by-row
+columns are the previous iterrows / per-cell regex / .apply parsing.
+
+Usage:
+    python benchmarks/bench_gps_parsing.py [days]
+"""
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+SAMPLES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'samples'))
+XLS_SAMPLE = 'FoaieDeParcursDetaliata-7ABB-BC_59-20260304-20260304_5b95c648.xls'
+CSV_SAMPLE = 'sample_gps.csv'
+
+
+def legacy_clean_val(v):
+    """Per-cell distance cleanup previously applied with Series.apply"""
+    v_str = str(v).strip()
+    if not v_str or v_str in ('-', '~'):
+        return 0.0
+    v_str = v_str.split()[0].replace(',', '.')
+    try:
+        return float(re.sub(r'[^\d.]', '', v_str))
+    except Exception:
+        return 0.0
+
+
+def legacy_points(df, coord_col, ts_col=None, addr_col=None, end_col=None):
+    """iterrows + per-row _parse_coord_string, as the parsers did before"""
+    from src.utils.gps_parser import _parse_coord_string, _ts_to_str
+
+    points = []
+    for _, row in df.iterrows():
+        lat, lon = _parse_coord_string(str(row[coord_col]))
+        if lat is not None:
+            points.append({'lat': lat, 'lon': lon,
+                           'timestamp': _ts_to_str(row.get(ts_col)) if ts_col else None,
+                           'address': str(row[addr_col]) if addr_col else ''})
+        if end_col:
+            lat, lon = _parse_coord_string(str(row[end_col]))
+            if lat is not None:
+                points.append({'lat': lat, 'lon': lon, 'timestamp': None, 'address': ''})
+    return points
+
+
+def legacy_csv_points(df):
+    points = []
+    for _, row in df.iterrows():
+        try:
+            points.append({'lat': float(row['latitude']), 'lon': float(row['longitude']),
+                           'timestamp': str(row['timestamp']), 'address': ''})
+        except Exception:
+            pass
+    return points
+
+
+def legacy_parse_text(content):
+    import pandas as pd
+    from src.utils.i18n import remove_diacritics
+
+    df = pd.read_csv(io.StringIO(content), sep=None, engine='python', skipinitialspace=True)
+    df.columns = [remove_diacritics(str(c)).strip() for c in df.columns]
+    total = df['Distanta parcursa'].astype(str).apply(legacy_clean_val).sum()
+    return float(total), legacy_points(df, 'Coordonata pornire', 'Timpul plecarii')
+
+
+def legacy_parse_csv(content):
+    import pandas as pd
+
+    df = pd.read_csv(io.StringIO(content))
+    return float(df['distance'].sum()), legacy_csv_points(df)
+
+
+def multi_day_inputs(days):
+    """(EasyTrackMap text, CSV) with the sample trips / pings repeated `days` times"""
+    import pandas as pd
+
+    raw = pd.read_excel(os.path.join(SAMPLES_DIR, XLS_SAMPLE), header=None)
+    header_row = 5  # 'Timpul plecării' header; row 6 is a sub-header of the speed columns
+    trips = raw.iloc[header_row + 2:].fillna('-')
+    trips = trips[trips[4].astype(str).str.strip() != '-']
+    header = "\t".join(str(c) for c in raw.iloc[header_row].fillna('Viteza varf'))
+    body = trips.to_csv(sep='\t', header=False, index=False)
+    text = header + "\n" + body * days
+
+    with open(os.path.join(SAMPLES_DIR, CSV_SAMPLE), encoding='utf-8') as f:
+        csv_header, csv_body = f.read().strip().split('\n', 1)
+    csv_text = csv_header + "\n" + "\n".join([csv_body] * (days * 10))
+    return text, csv_text
+
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def run(days):
+    from src.utils.gps_parser import parse_gps_log
+
+    print("samples/")
+    for name in (XLS_SAMPLE, CSV_SAMPLE):
+        with open(os.path.join(SAMPLES_DIR, name), 'rb') as f:
+            content = f.read()
+        seconds, result = _time(parse_gps_log, content, name)
+        print(f"  {name[:40]:<40} {result['format']:<18} {result['pings']:>6} rows "
+              f"{len(result['gps_points']):>6} points {seconds * 1000:8.1f} ms")
+
+    text, csv_text = multi_day_inputs(days)
+    for label, content, filename, legacy in (
+            ("EasyTrackMap text", text, 'paste.txt', legacy_parse_text),
+            ("points CSV", csv_text, 'log.csv', legacy_parse_csv)):
+        legacy_seconds, (legacy_distance, legacy_pts) = _time(legacy, content)
+        dicts_seconds, result = _time(parse_gps_log, content, filename)
+        columnar_seconds, columnar = _time(parse_gps_log, content, filename, True)
+        assert result['gps_points'] == legacy_pts
+        assert result['total_distance'] == legacy_distance
+        print(f"{label} x {days} days: {result['pings']} rows, {len(legacy_pts)} points")
+        print(f"  {'row by row':<43} {legacy_seconds * 1000:10.1f} ms")
+        print(f"  {'vectorized (dict points)':<43} {dicts_seconds * 1000:10.1f} ms")
+        print(f"  {'vectorized (columnar points)':<43} {columnar_seconds * 1000:10.1f} ms")
+        print(f"  {'speedup (columnar)':<43} {legacy_seconds / columnar_seconds:10.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(*(args + [1200][len(args):]))
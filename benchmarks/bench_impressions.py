@@ -0,0 +1,127 @@
+"""
+Benchmark: audience-cube impressions engine vs the day-by-day loop.
+
+Simulates the per-(vehicle, city period) calls of a year-long campaign
+with several vehicles and cities, each city having audited traffic
+locations and date-bounded routes.
+
+Usage:
+    python benchmarks/bench_impressions.py [days] [vehicles] [cities]
+"""
+import datetime
+import os
+import random
+import sys
+import time
+from functools import partial
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+N_LOCATIONS = 60
+N_ROUTES = 8
+POINTS_PER_ROUTE = 40
+MODAL_SPLIT = {'auto': 35, 'walking': 27, 'cycling': 4, 'public_transport': 34}
+
+
+def legacy_impressions_by_mode(generator, modal_split, campaign_hours_per_day, total_days, start_date, city_name, spot_duration=10,
+                               loop_duration=60, is_exclusive=False, city_schedule=None, active_routes=None, city_locations=None):
+    """Previous CampaignReportGenerator._calculate_impressions_by_mode: the day-by-day loop"""
+    share_of_voice = 1.0 if is_exclusive else (spot_duration / loop_duration if loop_duration > 0 else 0.16)
+
+    total_campaign_traffic, total_campaign_pedestrian = 0, 0
+    current_date, events_encountered = start_date, []
+
+    for _ in range(total_days):
+        date_str = current_date.strftime('%Y-%m-%d')
+        hours_today = campaign_hours_per_day
+        if city_schedule and city_schedule.get(date_str):
+            day_data = city_schedule[date_str]
+            if not day_data.get('active', True): hours_today = 0
+            elif day_data.get('hours'): hours_today = generator._parse_daily_hours(day_data['hours'])['hours']
+
+        if hours_today > 0:
+            # Base hourly estimate from the city profile of the day's quarter
+            profile = generator.city_manager.get_city_data_for_period(city_name, current_date)
+            hourly_traffic_city_avg = profile.get('daily_traffic_total', 50000) / 24 if profile else 0
+            hourly_pedestrian_city_avg = profile.get('daily_pedestrian_total', 50000) / 24 if profile else 0
+
+            # ROUTE & TRAFFIC LOCATION BLENDING
+            # If we have routes for today, check intersection with BRAT locations
+            h_traffic, h_pedestrian = hourly_traffic_city_avg, hourly_pedestrian_city_avg
+
+            if active_routes and city_locations:
+                # Filter routes for today
+                routes_today = [r for r in active_routes if generator._is_route_active(r, current_date)]
+                if routes_today:
+                    # Find intersections with audited locations
+                    intersected_locs = generator._find_intersected_locations(routes_today, city_locations)
+                    if intersected_locs:
+                        # BLENDING LOGIC: (City Average + Audited Locations Average) / 2
+                        audited_traffic_avg = sum(l.daily_traffic for l in intersected_locs) / len(intersected_locs) / 24
+                        audited_pedestrian_avg = sum(l.pedestrian_traffic for l in intersected_locs) / len(intersected_locs) / 24
+
+                        h_traffic = (hourly_traffic_city_avg + audited_traffic_avg) / 2
+                        h_pedestrian = (hourly_pedestrian_city_avg + audited_pedestrian_avg) / 2
+
+            t_mult, p_mult, event_name = generator.city_manager.get_event_multipliers(city_name, current_date)
+            if event_name and event_name not in events_encountered: events_encountered.append(event_name)
+
+            total_campaign_traffic += h_traffic * hours_today * t_mult
+            total_campaign_pedestrian += h_pedestrian * hours_today * p_mult
+
+        current_date += datetime.timedelta(days=1)
+
+    return generator._impressions_from_traffic(modal_split, total_campaign_traffic, total_campaign_pedestrian,
+                                               events_encountered, is_exclusive, share_of_voice)
+
+
+def build_inputs(days, rng):
+    start = datetime.date(2025, 1, 1)
+    locations = [SimpleNamespace(latitude=44.43 + rng.uniform(-0.03, 0.03), longitude=26.10 + rng.uniform(-0.03, 0.03),
+                                 daily_traffic=rng.randint(5000, 80000), pedestrian_traffic=rng.randint(500, 20000))
+                 for _ in range(N_LOCATIONS)]
+    routes = []
+    for _ in range(N_ROUTES):
+        r_start = start + datetime.timedelta(days=rng.randint(0, days // 2))
+        routes.append({
+            'date_start': r_start.isoformat(),
+            'date_end': (r_start + datetime.timedelta(days=rng.randint(30, days))).isoformat(),
+            'geojson_data': {'geometry': {'type': 'LineString', 'coordinates': [
+                [26.10 + rng.uniform(-0.03, 0.03), 44.43 + rng.uniform(-0.03, 0.03)] for _ in range(POINTS_PER_ROUTE)
+            ]}},
+        })
+    schedule = {(start + datetime.timedelta(days=d)).isoformat(): {'hours': '08:00-20:00'} for d in range(0, days, 7)}
+    return start, locations, routes, schedule
+
+
+def run(days, vehicles, cities):
+    from src.reporting.campaign_report_generator import CampaignReportGenerator
+
+    generator = CampaignReportGenerator(None)
+    rng = random.Random(42)
+    calls = []
+    for _ in range(vehicles * cities):
+        start, locations, routes, schedule = build_inputs(days, rng)
+        calls.append(((MODAL_SPLIT, 10, days, start, 'Bucuresti'),
+                      {'city_schedule': schedule, 'active_routes': routes, 'city_locations': locations}))
+
+    print(f"{days} days x {vehicles} vehicles x {cities} cities "
+          f"({N_LOCATIONS} locations, {N_ROUTES} routes of {POINTS_PER_ROUTE} points per city)")
+    timings = {}
+    for label, method in (("day loop", partial(legacy_impressions_by_mode, generator)),
+                          ("cube range sums", generator._calculate_impressions_by_mode)):
+        start = time.perf_counter()
+        results = [method(*args, **kwargs) for args, kwargs in calls]
+        timings[label] = time.perf_counter() - start
+        print(f"{label:<45} {timings[label] * 1000:10.1f} ms")
+        timings[label + ' results'] = results
+    # Range sums round differently from the loop's running sum: at most 1 impression apart
+    for loop_result, result in zip(timings['day loop results'], timings['cube range sums results']):
+        assert all(abs(loop_result[k] - result[k]) <= 1 for k in ('auto', 'pedestrian', 'total'))
+    print(f"{'speedup':<45} {timings['day loop'] / timings['cube range sums']:10.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(*(args + [365, 3, 4][len(args):]))
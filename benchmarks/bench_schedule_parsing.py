@@ -0,0 +1,96 @@
+"""
+Benchmark: compiled schedule strings vs re-parsing them on every call.
+
+Replays the hours lookups of a year-long multi-city campaign: one
+_parse_daily_hours call per scheduled day per vehicle and city, with the
+handful of distinct hour strings real schedules use. Also times the Gantt
+interval expansion of the same schedules.
+
+Usage:
+    python benchmarks/bench_schedule_parsing.py [days] [vehicles] [cities]
+"""
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+HOUR_STRINGS = ["09:00-17:00", "08:00-20:00", "08:00-12:00, 14:00-18:00", "10:00-22:00", "07:00-09:30, 16:30-19:00"]
+
+
+def legacy_parse(hours_str):
+    """Per-call parser previously inlined in CampaignReportGenerator._parse_daily_hours"""
+    if not hours_str or not isinstance(hours_str, str): return {'hours': 8, 'peak_hours': 0}
+    total_hours, total_peak = 0, 0
+    for interval in [i.strip() for i in hours_str.split(',')]:
+        try:
+            if '-' not in interval: continue
+            start_time, end_time = interval.split('-')
+            start_h, start_m = int(start_time.split(':')[0]), int(start_time.split(':')[1]) if ':' in start_time else 0
+            end_h, end_m = int(end_time.split(':')[0]), int(end_time.split(':')[1]) if ':' in end_time else 0
+            hours = (end_h - start_h) + (end_m - start_m) / 60
+            if hours < 0: hours += 24
+            total_hours += hours
+            peak_morning, peak_evening = (7, 9), (17, 19)
+            c_start_h, c_end_h = start_h + start_m / 60, end_h + end_m / 60
+            if c_start_h < peak_morning[1] and c_end_h > peak_morning[0]: total_peak += max(0, min(c_end_h, peak_morning[1]) - max(c_start_h, peak_morning[0]))
+            if c_start_h < peak_evening[1] and c_end_h > peak_evening[0]: total_peak += max(0, min(c_end_h, peak_evening[1]) - max(c_start_h, peak_evening[0]))
+        except: continue
+    return {'hours': total_hours if total_hours > 0 else 8, 'peak_hours': total_peak}
+
+
+def legacy_day_segments(day, h_ranges_str):
+    """Per-day parsing previously inlined in web_app.utils.get_granular_intervals"""
+    out = []
+    for interval in [i.strip() for i in h_ranges_str.split(',') if '-' in i]:
+        try:
+            t1, t2 = interval.split('-')
+            H, M = map(int, t1.split(':'))
+            seg_start = datetime.datetime.combine(day, datetime.time(H, M))
+            if t2.strip() in ["00:00", "24:00"]:
+                seg_end = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time(0, 0))
+            else:
+                H, M = map(int, t2.split(':'))
+                seg_end = datetime.datetime.combine(day, datetime.time(H, M))
+            if seg_end > seg_start:
+                out.append((seg_start, seg_end))
+        except:
+            continue
+    return out
+
+
+def run(days, vehicles, cities):
+    from src.reporting.campaign_report_generator import CampaignReportGenerator
+    from src.utils.schedule import compile_hours
+
+    generator = CampaignReportGenerator(None)
+    rng = random.Random(7)
+    start = datetime.date(2025, 1, 1)
+    schedule = [(start + datetime.timedelta(days=d % 365), rng.choice(HOUR_STRINGS))
+                for d in range(days * vehicles * cities)]
+    print(f"{days} days x {vehicles} vehicles x {cities} cities = {len(schedule)} scheduled days, "
+          f"{len(HOUR_STRINGS)} distinct hour strings")
+
+    def timed(label, fn):
+        t0 = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - t0
+        print(f"{label:<45} {seconds * 1000:10.1f} ms")
+        return seconds, result
+
+    t_old, old = timed("hours: re-parse every day", lambda: [legacy_parse(h) for _, h in schedule])
+    t_new, new = timed("hours: compiled (_parse_daily_hours)", lambda: [generator._parse_daily_hours(h) for _, h in schedule])
+    assert old == new
+    print(f"{'speedup':<45} {t_old / t_new:10.1f}x")
+
+    g_old, old = timed("gantt: re-parse every day", lambda: [legacy_day_segments(d, h) for d, h in schedule])
+    g_new, new = timed("gantt: compiled day_segments", lambda: [compile_hours(h).day_segments(d) for d, h in schedule])
+    assert old == new
+    print(f"{'speedup':<45} {g_old / g_new:10.1f}x")
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    run(*(args + [365, 5, 4][len(args):]))
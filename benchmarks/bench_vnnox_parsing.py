@@ -0,0 +1,105 @@
+"""
+Benchmark: streaming VnNox play-log parser vs reading the whole export.
+
+Builds a Play Logs(Details) export of `rows` plays by repeating the rows of
+samples/Play Logs(Details).csv, then parses it with parse_vnnox_csv and
+with the previous approach (whole file decoded, every row materialized
+and kept as a dict). Wall time and peak traced memory are measured in
+separate runs, tracing slows the parsers down considerably.
+
+Usage:
+    python benchmarks/bench_vnnox_parsing.py [rows]
+"""
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+SAMPLE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'samples', 'Play Logs(Details).csv'))
+
+
+def legacy_parse(file_obj):
+    """Whole-file parse as parse_vnnox_csv did before streaming (Details format only)"""
+    from src.utils.vnnox_parser import _clean, _normalize_header
+
+    text = file_obj.read().decode('utf-8-sig')
+    all_rows = list(csv.reader(io.StringIO(text)))
+    headers = [_normalize_header(c) for c in all_rows[0]]
+    dur_col = next(i for i, h in enumerate(headers) if 'duration' in h)
+    rows, total_seconds = [], 0.0
+    for row in all_rows[1:]:
+        if not row or dur_col >= len(row):
+            continue
+        total_seconds += float(_clean(row[dur_col]))
+        rows.append({c: _clean(row[j]) for j, c in enumerate(headers) if j < len(row)})
+    spot_map = defaultdict(lambda: {'plays': 0, 'total_seconds': 0.0})
+    for row in rows:
+        entry = spot_map[row.get('media name') or 'Unknown']
+        entry['plays'] += 1
+        entry['total_seconds'] += float(row.get('duration s', 0) or 0)
+    return total_seconds, len(rows), dict(spot_map)
+
+
+def build_export(path, rows):
+    with open(SAMPLE, 'rb') as f:
+        header, body = f.read().split(b'\n', 1)
+    body = body.rstrip(b'\n') + b'\n'
+    sample_rows = body.count(b'\n')
+    written = 0
+    with open(path, 'wb') as out:
+        out.write(header + b'\n')
+        while written < rows:
+            out.write(body)
+            written += sample_rows
+    return written
+
+
+def measure(fn, path):
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        result = fn(f)
+    seconds = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    with open(path, 'rb') as f:
+        result = fn(f)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def run(rows):
+    from src.utils.vnnox_parser import parse_vnnox_csv
+
+    tmp_dir = tempfile.mkdtemp(prefix="vnnox_bench_")
+    path = os.path.join(tmp_dir, 'details.csv')
+    rows = build_export(path, rows)
+    print(f"Details export: {rows} plays, {os.path.getsize(path) / 1e6:.1f} MB")
+
+    cases = (
+        ("whole file + row dicts (previous)", legacy_parse),
+        ("streaming, totals only", parse_vnnox_csv),
+        ("streaming, rows spilled to gzip", lambda f: parse_vnnox_csv(f, rows_path=os.path.join(tmp_dir, 'rows.csv.gz'))),
+    )
+    results = {}
+    for label, fn in cases:
+        seconds, peak, result = measure(fn, path)
+        results[label] = result
+        print(f"{label:<40} {seconds * 1000:10.1f} ms {peak / 1e6:10.1f} MB peak")
+
+    legacy_seconds, legacy_rows, _ = results["whole file + row dicts (previous)"]
+    streamed = results["streaming, totals only"]
+    assert streamed['total_seconds'] == legacy_seconds and streamed['row_count'] == legacy_rows
+    spill = os.path.join(tmp_dir, 'rows.csv.gz')
+    print(f"spill file: {os.path.getsize(spill) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(*(args + [200000][len(args):]))
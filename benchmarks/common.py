@@ -0,0 +1,65 @@
+"""
+Shared helpers for the benchmark scripts.
+Each benchmark runs against a throwaway SQLite file so the real
+src/data/rapoartedooh.db is never touched.
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+# Add project root to path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine, event
+
+from src.data.db_config import Base, SessionLocal, engine as default_engine
+
+
+@contextmanager
+def temp_database():
+    """Bind SessionLocal to a temporary SQLite file and yield (engine, counter)"""
+    import src.data.models  # Register models with Base
+
+    tmp_dir = tempfile.mkdtemp(prefix="dooh_bench_")
+    db_path = os.path.join(tmp_dir, "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+
+    counter = {'count': 0}
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter['count'] += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    SessionLocal.remove()
+    SessionLocal.configure(bind=engine)
+    try:
+        yield engine, counter
+    finally:
+        SessionLocal.remove()
+        SessionLocal.configure(bind=default_engine)
+        engine.dispose()
+        try:
+            os.remove(db_path)
+            os.rmdir(tmp_dir)
+        except OSError:
+            pass
+
+
+@contextmanager
+def measure(counter, label):
+    """Print wall time and query count of the wrapped block"""
+    start_count = counter['count'] if counter is not None else 0
+    start = time.perf_counter()
+    result = {}
+    yield result
+    result['seconds'] = time.perf_counter() - start
+    result['queries'] = (counter['count'] - start_count) if counter is not None else 0
+    if counter is not None:
+        print(f"{label:<45} {result['seconds'] * 1000:10.1f} ms  {result['queries']:8d} queries")
+    else:
+        print(f"{label:<45} {result['seconds'] * 1000:10.1f} ms")
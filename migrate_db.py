@@ -4,8 +4,10 @@ import os
 # Ensure src is in python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.data.db_config import init_db
+from src.data.migrations import MIGRATIONS, current_state, run_migrations
 
-print("Running init_db() to create new tables if they don't exist...")
-init_db()
-print("Done!")
+print("Applying pending schema migrations...")
+applied = run_migrations()
+version, _ = current_state()
+print(f"Applied: {', '.join(applied) if applied else 'nothing, schema is current'}")
+print(f"Schema version {version} (latest {MIGRATIONS[-1][0]})")
@@ -0,0 +1,160 @@
+"""
+Audience Cube
+Daily audience of each city, precomputed per (city, date): the hourly traffic
+and pedestrian flow of the quarter's profile (city_data_history.json), its
+modal split, and the special-event multipliers of the day
+(special_events.json). Days are built a calendar year at a time with numpy,
+so a report period is an array slice and its audience total is a
+difference of prefix sums instead of a walk over the days.
+
+Years are built on first use and kept until invalidate(): CityDataManager
+invalidates the cube when it saves profiles or events, and code editing
+manager.profiles / special_events in place must call it too.
+"""
+import datetime
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Report defaults for a profile without traffic figures
+DEFAULT_DAILY_TRAFFIC = 50000
+DEFAULT_DAILY_PEDESTRIAN = 50000
+
+
+class CityYear(NamedTuple):
+    """One city's audience for the days of one calendar year"""
+    start: np.datetime64           # Jan 1 (datetime64[D])
+    hourly_traffic: np.ndarray     # Quarter profile daily_traffic_total / 24
+    hourly_pedestrian: np.ndarray
+    quarter: np.ndarray            # Index into modal_splits (0-3)
+    modal_splits: Tuple[Optional[Dict[str, Any]], ...]
+    traffic_mult: np.ndarray
+    pedestrian_mult: np.ndarray
+    event_index: np.ndarray        # Into event_names, -1 for none
+    event_names: Tuple[Optional[str], ...]
+    # Running totals of hourly audience x multiplier, with a leading 0
+    traffic_prefix: np.ndarray
+    pedestrian_prefix: np.ndarray
+
+
+def _year_days(year: int) -> int:
+    return (datetime.date(year + 1, 1, 1) - datetime.date(year, 1, 1)).days
+
+
+class AudienceCube:
+    """Per-city, per-day audience arrays of a CityDataManager"""
+
+    def __init__(self, city_manager) -> None:
+        self.city_manager = city_manager
+        self._blocks: Dict[Tuple[str, int], CityYear] = {}
+        self._lock = threading.Lock()
+
+    # --- Sources ---
+
+    @staticmethod
+    def city_key(city_name: str) -> str:
+        return (city_name or '').lower().strip()
+
+    def _build_year(self, city_name: str, year: int) -> CityYear:
+        start = np.datetime64(datetime.date(year, 1, 1), 'D')
+        dates = start + np.arange(_year_days(year))
+        months = (dates.astype('datetime64[M]').astype(np.int64) % 12)
+        quarter = (months // 3).astype(np.int8)
+
+        hourly_traffic = np.zeros(len(dates))
+        hourly_pedestrian = np.zeros(len(dates))
+        modal_splits = []
+        for q in range(4):
+            profile = self.city_manager.get_city_data_for_period(city_name, datetime.date(year, q * 3 + 1, 1))
+            in_quarter = quarter == q
+            if profile:
+                hourly_traffic[in_quarter] = profile.get('daily_traffic_total', DEFAULT_DAILY_TRAFFIC) / 24
+                hourly_pedestrian[in_quarter] = profile.get('daily_pedestrian_total', DEFAULT_DAILY_PEDESTRIAN) / 24
+            modal_splits.append(profile.get('modal_split') if profile else None)
+
+        traffic_mult, pedestrian_mult, event_index, event_names = \
+            self.city_manager.get_event_multiplier_series(city_name, dates)
+        traffic_prefix = np.concatenate(([0.0], np.cumsum(hourly_traffic * traffic_mult)))
+        pedestrian_prefix = np.concatenate(([0.0], np.cumsum(hourly_pedestrian * pedestrian_mult)))
+        return CityYear(start, hourly_traffic, hourly_pedestrian, quarter, tuple(modal_splits),
+                        traffic_mult, pedestrian_mult, event_index, tuple(event_names),
+                        traffic_prefix, pedestrian_prefix)
+
+    def year(self, city_name: str, year: int) -> CityYear:
+        """The city's CityYear, built on first use"""
+        key = (self.city_key(city_name), year)
+        block = self._blocks.get(key)
+        if block is None:
+            block = self._build_year(city_name, year)
+            with self._lock:
+                self._blocks[key] = block
+        return block
+
+    def invalidate(self, city_name: Optional[str] = None) -> None:
+        """Drop the cached years of a city (every city when None)"""
+        with self._lock:
+            if city_name is None:
+                self._blocks.clear()
+            else:
+                city_key = self.city_key(city_name)
+                for key in [k for k in self._blocks if k[0] == city_key]:
+                    del self._blocks[key]
+
+    # --- Lookups ---
+
+    def _slices(self, city_name: str, start: datetime.date, total_days: int):
+        """(block, first index, last index + 1) per year covered by the range"""
+        end = start + datetime.timedelta(days=total_days - 1)
+        for year in range(start.year, end.year + 1):
+            block = self.year(city_name, year)
+            lo = (max(start, datetime.date(year, 1, 1)) - datetime.date(year, 1, 1)).days
+            hi = (min(end, datetime.date(year, 12, 31)) - datetime.date(year, 1, 1)).days + 1
+            yield block, lo, hi
+
+    def modal_split(self, city_name: str, day: datetime.date) -> Optional[Dict[str, Any]]:
+        """Modal split of the profile of day's quarter (None without one)"""
+        block = self.year(city_name, day.year)
+        return block.modal_splits[block.quarter[(day - datetime.date(day.year, 1, 1)).days]]
+
+    def event_multiplier_series(self, city_name: str, start: datetime.date, total_days: int):
+        """
+        get_event_multiplier_series for the total_days days from start, sliced
+        from the cube: (traffic_mult, pedestrian_mult, event_index, event_names).
+        """
+        if not city_name or total_days <= 0:
+            return np.ones(max(total_days, 0)), np.ones(max(total_days, 0)), np.full(max(total_days, 0), -1), []
+        traffic, pedestrian, index, names = [], [], [], []
+        for block, lo, hi in self._slices(city_name, start, total_days):
+            traffic.append(block.traffic_mult[lo:hi])
+            pedestrian.append(block.pedestrian_mult[lo:hi])
+            # Years share the city's event list; the offset keeps indexes valid regardless
+            block_index = block.event_index[lo:hi]
+            index.append(np.where(block_index >= 0, block_index + len(names), -1))
+            names.extend(block.event_names)
+        return np.concatenate(traffic), np.concatenate(pedestrian), np.concatenate(index), names
+
+    def daily_audience(self, city_name: str, start: datetime.date, total_days: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Hourly traffic and pedestrians x event multiplier of each of the total_days days from start"""
+        if not city_name or total_days <= 0:
+            return np.zeros(max(total_days, 0)), np.zeros(max(total_days, 0))
+        traffic, pedestrian = [], []
+        for block, lo, hi in self._slices(city_name, start, total_days):
+            traffic.append(block.hourly_traffic[lo:hi] * block.traffic_mult[lo:hi])
+            pedestrian.append(block.hourly_pedestrian[lo:hi] * block.pedestrian_mult[lo:hi])
+        return np.concatenate(traffic), np.concatenate(pedestrian)
+
+    def range_totals(self, city_name: str, start: datetime.date, end: datetime.date) -> Dict[str, float]:
+        """
+        Hourly audience x event multiplier summed over start..end (inclusive),
+        from the prefix sums: multiply by hours per day for the exposure of a
+        screen running the same hours every day.
+        """
+        total_days = (end - start).days + 1
+        totals = {'days': max(total_days, 0), 'traffic': 0.0, 'pedestrian': 0.0}
+        if not city_name or total_days <= 0:
+            return totals
+        for block, lo, hi in self._slices(city_name, start, total_days):
+            totals['traffic'] += float(block.traffic_prefix[hi] - block.traffic_prefix[lo])
+            totals['pedestrian'] += float(block.pedestrian_prefix[hi] - block.pedestrian_prefix[lo])
+        return totals
@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import datetime
@@ -5,10 +6,13 @@ import uuid
 import csv
 import logging
 import shutil
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Tuple
 
 from src.data.db_config import SessionLocal
-from src.data.models import Campaign, Driver, CampaignSpot
+from src.data.models import Campaign, Driver, CampaignSpot, GpsTrack, PlayHour, ImportJob, CampaignVehicleAssignment
+from src.data.gps_track_storage import GpsTrackStorage
+from src.data.play_log_storage import PlayLogStorage
+from src.utils.profiling import span
 
 logger = logging.getLogger(__name__)
 
@@ -19,53 +23,117 @@ class CampaignStorage:
     def __init__(self) -> None:
         pass
 
-    def _to_dict(self, campaign: Campaign) -> Dict[str, Any]:
-        """Convert SQLAlchemy object to dictionary for compatibility"""
-        from src.data.vehicle_manager import VehicleManager
-        if not campaign:
-            return {}
-            
+    # SQLite caps bound parameters per statement; keep IN-lists well below it
+    IN_CHUNK_SIZE = 500
+
+    # Columns returned by the summary projection (no heavy JSON blobs)
+    SUMMARY_COLUMNS = (
+        'id', 'campaign_name', 'client_name', 'start_date', 'end_date',
+        'vehicle_id', 'driver_id', 'status', 'is_exclusive', 'is_archived',
+        'has_spots', 'spot_count', 'total_impressions', 'last_modified'
+    )
+    # Lightweight JSON needed by timeline / conflict views
+    SCHEDULE_COLUMNS = ('cities', 'city_periods', 'city_schedules', 'transit_periods', 'additional_vehicles',
+                        'vehicle_timeline')
+
+    def _load_hydration_lookups(self, session, campaigns: List[Any], include_routes: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Load every vehicle, driver and route referenced by the given campaigns
+        with a fixed number of set-based queries (one per entity type, per chunk).
+        Accepts Campaign objects or projected rows exposing the same attributes.
+        """
+        from src.data.models import Vehicle, CampaignRoute
+        from src.data.campaign_route_manager import CampaignRouteManager
+
+        def chunks(ids):
+            ids = list(ids)
+            for i in range(0, len(ids), self.IN_CHUNK_SIZE):
+                yield ids[i:i + self.IN_CHUNK_SIZE]
+
+        vehicle_ids = set()
+        driver_ids = set()
+        for c in campaigns:
+            if c.vehicle_id:
+                vehicle_ids.add(c.vehicle_id)
+            if c.driver_id:
+                driver_ids.add(c.driver_id)
+            for veh_data in (getattr(c, 'additional_vehicles', None) or []):
+                if not isinstance(veh_data, dict):
+                    continue
+                if veh_data.get('vehicle_id'):
+                    vehicle_ids.add(veh_data['vehicle_id'])
+                if veh_data.get('driver_id'):
+                    driver_ids.add(veh_data['driver_id'])
+
+        # Vehicles: only the columns hydration needs (skips status_history lazy loads)
+        vehicles = {}
+        for chunk in chunks(vehicle_ids):
+            rows = session.query(
+                Vehicle.id, Vehicle.name, Vehicle.registration, Vehicle.driver_id, Vehicle.driver_name
+            ).filter(Vehicle.id.in_(chunk)).all()
+            for row in rows:
+                vehicles[row.id] = {
+                    'name': row.name,
+                    'registration': row.registration,
+                    'driver_id': row.driver_id,
+                    'driver_name': row.driver_name
+                }
+                if row.driver_id:
+                    driver_ids.add(row.driver_id)
+
+        drivers = {}
+        for chunk in chunks(driver_ids):
+            for row in session.query(Driver.id, Driver.name).filter(Driver.id.in_(chunk)).all():
+                drivers[row.id] = row.name
+
+        routes = {}
+        crm = CampaignRouteManager()
+        for chunk in (chunks(c.id for c in campaigns) if include_routes else []):
+            for r in session.query(CampaignRoute).filter(CampaignRoute.campaign_id.in_(chunk)).all():
+                routes.setdefault(r.campaign_id, []).append(crm._to_dict(r))
+
+        return {'vehicles': vehicles, 'drivers': drivers, 'routes': routes}
+
+    def _to_dicts(self, session, campaigns: List[Campaign]) -> List[Dict[str, Any]]:
+        """Convert many campaigns at once, sharing one set of hydration lookups"""
+        if not campaigns:
+            return []
+        lookups = self._load_hydration_lookups(session, campaigns)
+        return [self._to_dict(c, lookups) for c in campaigns]
+
+    def _resolve_resources(self, campaign: Any, lookups: Dict[str, Dict[str, Any]]):
+        """Resolve vehicle/driver display names (main + additional) from preloaded lookups"""
+        vehicles = lookups['vehicles']
+        drivers = lookups['drivers']
+
         # Hydrate vehicle/driver info
         vehicle_name = "N/A"
         driver_name = "N/A"
         
         if campaign.vehicle_id:
-            vm = VehicleManager()
-            vehicle = vm.get_vehicle(campaign.vehicle_id)
+            vehicle = vehicles.get(campaign.vehicle_id)
             if vehicle:
                 vehicle_name = vehicle.get('name', 'N/A')
                 # Hydrate driver name if vehicle has one
                 if vehicle.get('driver_name'):
                     driver_name = vehicle.get('driver_name')
                 elif campaign.driver_id or vehicle.get('driver_id'):
-                    # If vehicle missing name but has ID, or we have campaign ID, try to fetch driver
+                    # If vehicle missing name but has ID, or we have campaign ID, use driver lookup
                     d_id = campaign.driver_id or vehicle.get('driver_id')
-                    try:
-                        session = SessionLocal()
-                        driver_obj = session.query(Driver).filter(Driver.id == d_id).first()
-                        if driver_obj:
-                            driver_name = driver_obj.name
-                    except Exception:
-                        pass # Keep as N/A
-                    finally:
-                        session.close()
+                    driver_name = drivers.get(d_id, driver_name)
 
         # Hydrate additional vehicles
-        additional_vehicles = campaign.additional_vehicles or []
+        additional_vehicles = getattr(campaign, 'additional_vehicles', None) or []
         hydrated_additional = []
         if additional_vehicles:
             try:
-                vm = VehicleManager()
-                # We need a session for driver lookup if needed
-                session = SessionLocal()
-                
                 for veh_data in additional_vehicles:
                     v_item = veh_data.copy()
                     v_id = v_item.get('vehicle_id')
                     d_id = v_item.get('driver_id')
                     
                     if v_id:
-                        veh_obj = vm.get_vehicle(v_id)
+                        veh_obj = vehicles.get(v_id)
                         if veh_obj:
                             v_item['vehicle_name'] = veh_obj.get('name', 'N/A')
                             v_item['vehicle_registration'] = veh_obj.get('registration', '')
@@ -77,22 +145,30 @@ class CampaignStorage:
                     # Resolve driver name if we have ID but no name (or overridden)
                     current_d_id = v_item.get('driver_id')
                     if current_d_id and not v_item.get('driver_name'):
-                        try:
-                            driver_obj = session.query(Driver).filter(Driver.id == current_d_id).first()
-                            if driver_obj:
-                                v_item['driver_name'] = driver_obj.name
-                        except:
-                            pass
+                        if current_d_id in drivers:
+                            v_item['driver_name'] = drivers[current_d_id]
                             
                     hydrated_additional.append(v_item)
                 
             except Exception as e:
                 logger.error(f"Error hydrating additional vehicles: {e}")
                 hydrated_additional = additional_vehicles # Fallback
+
+        return vehicle_name, driver_name, hydrated_additional
+
+    def _to_dict(self, campaign: Campaign, lookups: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Convert SQLAlchemy object to dictionary for compatibility"""
+        if not campaign:
+            return {}
+
+        if lookups is None:
+            session = SessionLocal()
+            try:
+                lookups = self._load_hydration_lookups(session, [campaign])
             finally:
-                if 'session' in locals():
-                    session.close()
-        
+                session.close()
+        vehicle_name, driver_name, hydrated_additional = self._resolve_resources(campaign, lookups)
+
         return {
             'id': campaign.id,
             'campaign_name': campaign.campaign_name,
@@ -142,15 +218,171 @@ class CampaignStorage:
             'last_modified': campaign.last_modified.isoformat() if campaign.last_modified else None,
             
             # Hydrate Campaign Routes
-            'routes': self._get_hydrated_routes(campaign.id)
+            'routes': lookups['routes'].get(campaign.id, [])
         }
 
-    def _get_hydrated_routes(self, campaign_id: str) -> List[Dict[str, Any]]:
-        """Hydrate routes for a campaign using CampaignRouteManager"""
-        from src.data.campaign_route_manager import CampaignRouteManager
-        crm = CampaignRouteManager()
-        return crm.get_routes_for_campaign(campaign_id)
+    # Campaign columns the assignment rows derive from
+    ASSIGNMENT_SOURCE_COLUMNS = ('id', 'vehicle_id', 'driver_id', 'start_date', 'end_date',
+                                 'additional_vehicles', 'vehicle_timeline')
 
+    @staticmethod
+    def _assignment_rows(campaign: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """campaign_vehicle_assignments rows of a campaign, from its ASSIGNMENT_SOURCE_COLUMNS"""
+        def to_date(value, fallback):
+            if isinstance(value, datetime.datetime):
+                return value.date()
+            if isinstance(value, datetime.date):
+                return value
+            if isinstance(value, str) and value:
+                try:
+                    return datetime.date.fromisoformat(value[:10])
+                except ValueError:
+                    pass
+            return fallback
+
+        def row(vehicle_id, driver_id, role, start_date, end_date):
+            return {'campaign_id': campaign['id'], 'vehicle_id': vehicle_id, 'driver_id': driver_id,
+                    'role': role, 'start_date': start_date, 'end_date': end_date}
+
+        rows = []
+        start, end = to_date(campaign.get('start_date'), None), to_date(campaign.get('end_date'), None)
+        if campaign.get('vehicle_id') or campaign.get('driver_id'):
+            rows.append(row(campaign.get('vehicle_id'), campaign.get('driver_id'), 'primary', start, end))
+        for av in (campaign.get('additional_vehicles') or []):
+            if isinstance(av, dict) and (av.get('vehicle_id') or av.get('driver_id')):
+                rows.append(row(av.get('vehicle_id'), av.get('driver_id'), 'additional', start, end))
+        # Vehicles replaced mid-campaign keep their own (shorter) periods
+        for entry in (campaign.get('vehicle_timeline') or []):
+            if isinstance(entry, dict) and entry.get('vehicle_id') and entry.get('vehicle_id') != campaign.get('vehicle_id'):
+                rows.append(row(entry['vehicle_id'], None, 'timeline',
+                                to_date(entry.get('start_date'), start), to_date(entry.get('end_date'), end)))
+        return rows
+
+    @classmethod
+    def sync_vehicle_assignments(cls, session, campaign: Campaign) -> None:
+        """
+        Rebuild the campaign_vehicle_assignments rows of a campaign from its
+        vehicle_id/driver_id, additional_vehicles and vehicle_timeline (no commit).
+        """
+        session.query(CampaignVehicleAssignment).filter(
+            CampaignVehicleAssignment.campaign_id == campaign.id
+        ).delete(synchronize_session=False)
+        source = {name: getattr(campaign, name) for name in cls.ASSIGNMENT_SOURCE_COLUMNS}
+        for row in cls._assignment_rows(source):
+            session.add(CampaignVehicleAssignment(**row))
+
+    @classmethod
+    def _assignment_sources(cls, session, ids: List[str]) -> List[Dict[str, Any]]:
+        """ASSIGNMENT_SOURCE_COLUMNS of the given campaigns, as dicts"""
+        from sqlalchemy import select
+        columns = [getattr(Campaign, name) for name in cls.ASSIGNMENT_SOURCE_COLUMNS]
+        sources = []
+        for i in range(0, len(ids), cls.IN_CHUNK_SIZE):
+            sources.extend(dict(m) for m in session.execute(
+                select(*columns).where(Campaign.id.in_(ids[i:i + cls.IN_CHUNK_SIZE]))
+            ).mappings())
+        return sources
+
+    @classmethod
+    def sync_vehicle_assignments_bulk(cls, session, campaigns: List[Dict[str, Any]]) -> None:
+        """
+        sync_vehicle_assignments for many campaigns (dicts with the
+        ASSIGNMENT_SOURCE_COLUMNS): chunked deletes plus one executemany insert (no commit).
+        """
+        from sqlalchemy import insert
+        ids = [campaign['id'] for campaign in campaigns]
+        for i in range(0, len(ids), cls.IN_CHUNK_SIZE):
+            session.query(CampaignVehicleAssignment).filter(
+                CampaignVehicleAssignment.campaign_id.in_(ids[i:i + cls.IN_CHUNK_SIZE])
+            ).delete(synchronize_session=False)
+        rows = [row for campaign in campaigns for row in cls._assignment_rows(campaign)]
+        if rows:
+            session.execute(insert(CampaignVehicleAssignment), rows)
+
+    def rebuild_vehicle_assignments(self, only_if_empty: bool = True) -> int:
+        """
+        Backfill campaign_vehicle_assignments for every campaign.
+        With only_if_empty, does nothing once the table has rows. Returns campaigns processed.
+        """
+        from sqlalchemy.orm import load_only
+        session = SessionLocal()
+        try:
+            if only_if_empty and session.query(CampaignVehicleAssignment.id).first():
+                return 0
+            campaigns = session.query(Campaign).options(load_only(
+                Campaign.id, Campaign.vehicle_id, Campaign.driver_id, Campaign.start_date, Campaign.end_date,
+                Campaign.additional_vehicles, Campaign.vehicle_timeline
+            )).all()
+            for campaign in campaigns:
+                self.sync_vehicle_assignments(session, campaign)
+            session.commit()
+            return len(campaigns)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error rebuilding vehicle assignments: {e}")
+            return 0
+        finally:
+            session.close()
+
+    @staticmethod
+    def _campaign_columns(campaign_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Column values of a campaign dict as save_campaign stores them (audited_data excluded)"""
+        columns = {
+            'campaign_name': campaign_data.get('campaign_name'),
+            'client_name': campaign_data.get('client_name'),
+        }
+
+        # Handle dates (unparseable strings leave the stored value alone)
+        for key in ('start_date', 'end_date'):
+            value = campaign_data.get(key)
+            if isinstance(value, str):
+                try:
+                    columns[key] = datetime.date.fromisoformat(value)
+                except ValueError:
+                    pass
+            elif isinstance(value, (datetime.date, datetime.datetime)):
+                columns[key] = value
+
+        columns.update({
+            'vehicle_id': campaign_data.get('vehicle_id'),
+            'driver_id': campaign_data.get('driver_id'),
+            'status': campaign_data.get('status'),
+            'total_impressions': campaign_data.get('total_impressions', 0),
+            'unique_reach': campaign_data.get('unique_reach', 0),
+
+            'cities': campaign_data.get('cities', []),
+            'spot_duration': campaign_data.get('spot_duration'),
+            'is_exclusive': campaign_data.get('is_exclusive', False),
+            'campaign_mode': campaign_data.get('campaign_mode'),
+            'po_number': campaign_data.get('po_number'),
+            'daily_hours': campaign_data.get('daily_hours'),
+            'known_distance_total': campaign_data.get('known_distance_total', 0),
+            'route_data': campaign_data.get('route_data', {}),
+            'city_schedules': campaign_data.get('city_schedules', {}),
+            'city_periods': campaign_data.get('city_periods', {}),
+            'transit_periods': campaign_data.get('transit_periods', []),
+            'additional_vehicles': campaign_data.get('additional_vehicles', []),
+
+            # Performance & Spots
+            'vehicle_speed_kmh': campaign_data.get('vehicle_speed_kmh', 25),
+            'stationing_min_per_hour': campaign_data.get('stationing_min_per_hour', 15),
+            'has_spots': campaign_data.get('has_spots', False),
+            'spot_count': campaign_data.get('spot_count', 0),
+
+            # DOOH Details
+            'cost_per_km': float(campaign_data.get('cost_per_km', 0.0)),
+            'fixed_costs': float(campaign_data.get('fixed_costs', 0.0)),
+            'expected_revenue': float(campaign_data.get('expected_revenue', 0.0)),
+            'budget_eur': float(campaign_data.get('budget_eur', 0.0)),
+
+            # JSON fields
+            'hourly_data': campaign_data.get('hourly_data', {}),
+            'demographics': campaign_data.get('demographics', {}),
+            'locations': campaign_data.get('locations', {}),
+        })
+        return columns
+
+    @span('CampaignStorage.save_campaign')
     def save_campaign(self, campaign_data: Dict[str, Any], campaign_id: Optional[str] = None) -> str:
         """
         Save a campaign.
@@ -167,70 +399,19 @@ class CampaignStorage:
                     campaign = Campaign(id=campaign_id)
                     session.add(campaign)
             else:
-                campaign = Campaign()
+                campaign = Campaign(id=str(uuid.uuid4()))
                 session.add(campaign)
             
-            # Update fields
-            campaign.campaign_name = campaign_data.get('campaign_name')
-            campaign.client_name = campaign_data.get('client_name')
-            
-            # Handle dates
-            start = campaign_data.get('start_date')
-            if isinstance(start, str):
-                try:
-                    campaign.start_date = datetime.date.fromisoformat(start)
-                except ValueError:
-                    pass
-            elif isinstance(start, (datetime.date, datetime.datetime)):
-                campaign.start_date = start
-                
-            end = campaign_data.get('end_date')
-            if isinstance(end, str):
-                try:
-                    campaign.end_date = datetime.date.fromisoformat(end)
-                except ValueError:
-                    pass
-            elif isinstance(end, (datetime.date, datetime.datetime)):
-                campaign.end_date = end
-
-            campaign.vehicle_id = campaign_data.get('vehicle_id')
-            campaign.driver_id = campaign_data.get('driver_id')
-            campaign.status = campaign_data.get('status')
-            campaign.total_impressions = campaign_data.get('total_impressions', 0)
-            campaign.unique_reach = campaign_data.get('unique_reach', 0)
-            
-            # New fields
-            campaign.cities = campaign_data.get('cities', [])
-            campaign.spot_duration = campaign_data.get('spot_duration')
-            campaign.is_exclusive = campaign_data.get('is_exclusive', False)
-            campaign.campaign_mode = campaign_data.get('campaign_mode') # Added field
-            campaign.po_number = campaign_data.get('po_number')
-            campaign.daily_hours = campaign_data.get('daily_hours')
-            campaign.known_distance_total = campaign_data.get('known_distance_total', 0)
-            campaign.route_data = campaign_data.get('route_data', {})
-            campaign.city_schedules = campaign_data.get('city_schedules', {})
-            campaign.city_periods = campaign_data.get('city_periods', {})
-            campaign.transit_periods = campaign_data.get('transit_periods', [])
-            campaign.additional_vehicles = campaign_data.get('additional_vehicles', [])
-            
-            # Performance & Spots
-            campaign.vehicle_speed_kmh = campaign_data.get('vehicle_speed_kmh', 25)
-            campaign.stationing_min_per_hour = campaign_data.get('stationing_min_per_hour', 15)
-            campaign.has_spots = campaign_data.get('has_spots', False)
-            campaign.spot_count = campaign_data.get('spot_count', 0)
-
-            # DOOH Details
-            campaign.cost_per_km = float(campaign_data.get('cost_per_km', 0.0))
-            campaign.fixed_costs = float(campaign_data.get('fixed_costs', 0.0))
-            campaign.expected_revenue = float(campaign_data.get('expected_revenue', 0.0))
-            campaign.budget_eur = float(campaign_data.get('budget_eur', 0.0))
-            campaign.audited_data = campaign_data.get('audited_data', {})
-            
-            # JSON fields
-            campaign.hourly_data = campaign_data.get('hourly_data', {})
-            campaign.demographics = campaign_data.get('demographics', {})
-            campaign.locations = campaign_data.get('locations', {})
+            for name, value in self._campaign_columns(campaign_data).items():
+                setattr(campaign, name, value)
+            # GPS points go to the track store; audited_data keeps summaries + track_id
+            campaign.audited_data = GpsTrackStorage().externalize_imports(
+                session, campaign.id, campaign_data.get('audited_data', {})
+            )
+            # Hourly play buckets go to play_hours; vnnox_imports keep summaries
+            campaign.audited_data = PlayLogStorage().externalize_imports(session, campaign.id, campaign.audited_data)
             
+            self.sync_vehicle_assignments(session, campaign)
             session.commit()
             return campaign.id
         except Exception as e:
@@ -240,15 +421,145 @@ class CampaignStorage:
         finally:
             session.close()
         
+    def update_audited_data(self, campaign_id: str,
+                            change: Callable[[Dict[str, Any]], Dict[str, Any]]) -> bool:
+        """
+        Replace a campaign's audited_data with change(audited_data), read and
+        written in one transaction (row locked where the database supports
+        it). Only audited_data is written: columns edited meanwhile are kept.
+        Returns False when the campaign does not exist or on error.
+        """
+        session = SessionLocal()
+        try:
+            campaign = session.query(Campaign).filter(Campaign.id == campaign_id).with_for_update().first()
+            if not campaign:
+                return False
+            audited = change(copy.deepcopy(campaign.audited_data or {}))
+            audited = GpsTrackStorage().externalize_imports(session, campaign.id, audited)
+            campaign.audited_data = PlayLogStorage().externalize_imports(session, campaign.id, audited)
+            session.commit()
+            return True
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error updating audited data of campaign {campaign_id}: {e}")
+            return False
+        finally:
+            session.close()
+
+    @span('CampaignStorage.bulk_save_campaigns')
+    def bulk_save_campaigns(self, campaigns_data: List[Dict[str, Any]]) -> List[str]:
+        """
+        save_campaign for many campaigns in one transaction: one executemany
+        upsert instead of a load/commit round trip per campaign. Dicts without
+        an 'id' are created. Returns the campaign IDs ([] on error).
+        """
+        from sqlalchemy import select
+        from src.data.models import GpsTrack, PlayHour
+        from src.data.db_config import bulk_upsert
+
+        session = SessionLocal()
+        try:
+            rows = []
+            for data in campaigns_data:
+                row = self._campaign_columns(data)
+                row['id'] = data.get('id') or str(uuid.uuid4())
+                row['audited_data'] = data.get('audited_data', {})
+                rows.append(row)
+            ids = [row['id'] for row in rows]
+
+            # Only campaigns with imports or existing tracks / play rows need the stores
+            with_tracks, with_plays = set(), set()
+            for i in range(0, len(ids), self.IN_CHUNK_SIZE):
+                with_tracks.update(session.scalars(select(GpsTrack.campaign_id).where(
+                    GpsTrack.campaign_id.in_(ids[i:i + self.IN_CHUNK_SIZE])
+                ).distinct()))
+                with_plays.update(session.scalars(select(PlayHour.campaign_id).where(
+                    PlayHour.campaign_id.in_(ids[i:i + self.IN_CHUNK_SIZE])
+                ).distinct()))
+            gps_storage = GpsTrackStorage()
+            play_storage = PlayLogStorage()
+            with session.no_autoflush:
+                for row in rows:
+                    audited = row['audited_data']
+                    if row['id'] in with_tracks or (isinstance(audited, dict) and audited.get('gps_imports')):
+                        row['audited_data'] = gps_storage.externalize_imports(session, row['id'], audited)
+                    audited = row['audited_data']
+                    if row['id'] in with_plays or (isinstance(audited, dict) and audited.get('vnnox_imports')):
+                        row['audited_data'] = play_storage.externalize_imports(session, row['id'], audited)
+
+            # Rows whose dates did not parse leave them out: upsert each key set separately
+            groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for row in rows:
+                groups.setdefault(tuple(row), []).append(row)
+            for group in groups.values():
+                bulk_upsert(session, Campaign, group)
+            session.flush()  # Track rows added by externalize_imports
+
+            self.sync_vehicle_assignments_bulk(session, self._assignment_sources(session, ids))
+            session.commit()
+            return ids
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error bulk saving campaigns: {e}")
+            return []
+        finally:
+            session.close()
+
+    def bulk_update_campaigns(self, changes: List[Dict[str, Any]]) -> int:
+        """
+        Apply partial updates ({'id': ..., column: value, ...}) to many campaigns
+        with executemany UPDATEs by primary key, in one transaction. Vehicle
+        assignments are resynced for the touched campaigns. Changes of unknown
+        ids are skipped. Returns the number of campaigns updated.
+        """
+        from sqlalchemy import select, update
+
+        if not changes:
+            return 0
+        session = SessionLocal()
+        try:
+            requested = list(dict.fromkeys(change['id'] for change in changes))
+            existing = set()
+            for i in range(0, len(requested), self.IN_CHUNK_SIZE):
+                existing.update(session.scalars(
+                    select(Campaign.id).where(Campaign.id.in_(requested[i:i + self.IN_CHUNK_SIZE]))
+                ))
+            # A primary key UPDATE matching no row would fail the whole batch
+            changes = [change for change in changes if change['id'] in existing]
+            if not changes:
+                return 0
+
+            now = datetime.datetime.now()
+            groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for change in changes:
+                change = dict(change, last_modified=change.get('last_modified') or now)
+                groups.setdefault(tuple(sorted(change)), []).append(change)
+            for group in groups.values():
+                session.execute(update(Campaign), group)
+
+            ids = [campaign_id for campaign_id in requested if campaign_id in existing]
+            if any(name in self.ASSIGNMENT_SOURCE_COLUMNS for change in changes for name in change if name != 'id'):
+                self.sync_vehicle_assignments_bulk(session, self._assignment_sources(session, ids))
+            session.commit()
+            return len(ids)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error bulk updating campaigns: {e}")
+            return 0
+        finally:
+            session.close()
+
+    @span('CampaignStorage.get_campaign')
     def get_campaign(self, campaign_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific campaign by ID"""
         session = SessionLocal()
         try:
             campaign = session.query(Campaign).filter(Campaign.id == campaign_id).first()
-            return self._to_dict(campaign) if campaign else None
+            return self._to_dicts(session, [campaign])[0] if campaign else None
         finally:
             session.close()
         
+    @span('CampaignStorage.get_all_campaigns')
     def get_all_campaigns(self, include_archived: bool = False) -> List[Dict[str, Any]]:
         """Get all campaigns, sorted by last modified (newest first)"""
         session = SessionLocal()
@@ -257,10 +568,125 @@ class CampaignStorage:
             if not include_archived:
                 query = query.filter(Campaign.is_archived == False)
             campaigns = query.order_by(Campaign.last_modified.desc()).all()
-            return [self._to_dict(c) for c in campaigns]
+            return self._to_dicts(session, campaigns)
         finally:
             session.close()
         
+    @span('CampaignStorage.get_campaigns_by_ids')
+    def get_campaigns_by_ids(self, campaign_ids: List[str], include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Hydrated campaigns among campaign_ids (e.g. the ids of a change-feed delta)"""
+        session = SessionLocal()
+        try:
+            campaigns = []
+            for i in range(0, len(campaign_ids), self.IN_CHUNK_SIZE):
+                query = session.query(Campaign).filter(Campaign.id.in_(campaign_ids[i:i + self.IN_CHUNK_SIZE]))
+                if not include_archived:
+                    query = query.filter(Campaign.is_archived == False)
+                campaigns.extend(query.all())
+            return self._to_dicts(session, campaigns)
+        finally:
+            session.close()
+
+    def _summary_query(self, session, include_archived: bool = False, include_schedule: bool = False,
+                       vehicle_id: Optional[str] = None):
+        """Column-projected campaign query that never loads the heavy JSON columns"""
+        names = self.SUMMARY_COLUMNS + (self.SCHEDULE_COLUMNS if include_schedule else ())
+        query = session.query(*[getattr(Campaign, n) for n in names])
+        if not include_archived:
+            query = query.filter(Campaign.is_archived == False)
+        if vehicle_id:
+            query = query.filter(Campaign.vehicle_id == vehicle_id)
+        return query
+
+    def _summary_to_dict(self, row: Any, lookups: Dict[str, Dict[str, Any]], include_schedule: bool) -> Dict[str, Any]:
+        """Convert a projected campaign row to a summary dictionary"""
+        vehicle_name, driver_name, hydrated_additional = self._resolve_resources(row, lookups)
+        summary = {
+            'id': row.id,
+            'campaign_name': row.campaign_name,
+            'client_name': row.client_name,
+            'start_date': row.start_date.isoformat() if row.start_date else None,
+            'end_date': row.end_date.isoformat() if row.end_date else None,
+            'vehicle_id': row.vehicle_id,
+            'vehicle_name': vehicle_name,
+            'driver_id': row.driver_id,
+            'driver_name': driver_name,
+            'status': row.status,
+            'is_exclusive': row.is_exclusive,
+            'is_archived': row.is_archived,
+            'has_spots': row.has_spots,
+            'spot_count': row.spot_count,
+            'total_impressions': row.total_impressions,
+            'last_modified': row.last_modified.isoformat() if row.last_modified else None
+        }
+        if include_schedule:
+            summary.update({
+                'cities': row.cities or [],
+                'city_periods': row.city_periods or {},
+                'city_schedules': row.city_schedules or {},
+                'transit_periods': row.transit_periods or [],
+                'additional_vehicles': hydrated_additional,
+                'vehicle_timeline': row.vehicle_timeline or []
+            })
+        return summary
+
+    @span('CampaignStorage.get_campaign_summaries')
+    def get_campaign_summaries(self, include_archived: bool = False, include_schedule: bool = False,
+                               vehicle_id: Optional[str] = None, order_by: str = 'last_modified',
+                               limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get lightweight campaign summaries for list, dashboard and timeline views.
+        Only id, names, dates, resources and status are read; audited_data, hourly_data,
+        route_data and routes are never loaded. Pass include_schedule=True to also get
+        cities, city_periods, city_schedules, transit_periods, additional_vehicles
+        and vehicle_timeline.
+        Sorted newest first by `order_by` ('last_modified' or 'start_date').
+        """
+        session = SessionLocal()
+        try:
+            query = self._summary_query(session, include_archived, include_schedule, vehicle_id)
+            sort_col = Campaign.start_date if order_by == 'start_date' else Campaign.last_modified
+            query = query.order_by(sort_col.desc())
+            if offset:
+                query = query.offset(offset)
+            if limit is not None:
+                query = query.limit(limit)
+            rows = query.all()
+            lookups = self._load_hydration_lookups(session, rows, include_routes=False)
+            return [self._summary_to_dict(r, lookups, include_schedule) for r in rows]
+        finally:
+            session.close()
+
+    def count_campaigns(self, include_archived: bool = False) -> int:
+        """Count campaigns without loading them"""
+        from sqlalchemy import func
+        session = SessionLocal()
+        try:
+            query = session.query(func.count(Campaign.id))
+            if not include_archived:
+                query = query.filter(Campaign.is_archived == False)
+            return query.scalar() or 0
+        finally:
+            session.close()
+
+    def get_campaign_summaries_page(self, page: int, page_size: int, include_archived: bool = False,
+                                    include_schedule: bool = False,
+                                    order_by: str = 'last_modified') -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get one page (1-based) of campaign summaries.
+        Returns (summaries, total_count).
+        """
+        total = self.count_campaigns(include_archived)
+        page = max(1, page)
+        summaries = self.get_campaign_summaries(
+            include_archived=include_archived,
+            include_schedule=include_schedule,
+            order_by=order_by,
+            limit=page_size,
+            offset=(page - 1) * page_size
+        )
+        return summaries, total
+
     def archive_campaign(self, campaign_id: str) -> bool:
         """Archive a campaign (soft delete)"""
         session = SessionLocal()
@@ -291,9 +717,21 @@ class CampaignStorage:
             campaign_name = campaign.campaign_name
             logger.info(f"Attempting to delete campaign: {campaign_name} (ID: {campaign_id})")
             
-            # Delete campaign (CASCADE will handle spots)
+            # Delete campaign (CASCADE will handle spots); fact tables and import jobs have no ORM relationship
+            session.query(GpsTrack).filter(GpsTrack.campaign_id == campaign_id).delete(synchronize_session=False)
+            session.query(PlayHour).filter(PlayHour.campaign_id == campaign_id).delete(synchronize_session=False)
+            spooled = [path for (path,) in session.query(ImportJob.file_path)
+                       .filter(ImportJob.campaign_id == campaign_id, ImportJob.file_path.isnot(None))]
+            session.query(ImportJob).filter(ImportJob.campaign_id == campaign_id).delete(synchronize_session=False)
             session.delete(campaign)
             session.commit()
+
+            # Uploads of jobs that never ran (finished jobs already removed theirs)
+            for path in spooled:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
             
             logger.info(f"✅ Successfully deleted campaign: {campaign_name} (ID: {campaign_id})")
             return True
@@ -429,6 +867,7 @@ class CampaignStorage:
 
     # --- Spot Management ---
     
+    @span('CampaignStorage.get_campaign_spots')
     def get_campaign_spots(self, campaign_id: str, include_archived: bool = True) -> List[Dict[str, Any]]:
         """Get all spots for a campaign, sorted by order_index"""
         session = SessionLocal()
@@ -563,6 +1002,58 @@ class CampaignStorage:
         finally:
             session.close()
 
+    def bulk_save_spots(self, spots_data: List[Dict[str, Any]]) -> List[str]:
+        """
+        save_spot (without files) for many spots in one transaction. Existing
+        spots keep the fields a dict omits; new spots are appended to their
+        campaign's order. Written with one executemany upsert. Returns the spot IDs.
+        """
+        from sqlalchemy import func
+        from src.data.db_config import bulk_upsert
+
+        fields = {
+            'campaign_id': None, 'name': 'Unnamed Spot', 'duration': 10, 'is_active': True, 'notes': '',
+            'status': 'OK', 'target_cities': None, 'target_vehicles': None, 'spot_periods': {},
+            'spot_schedules': {}, 'spot_shared_mode': True, 'hourly_schedule': None,
+            'start_date': None, 'end_date': None, 'order_index': None,
+        }
+        session = SessionLocal()
+        try:
+            ids = [data['id'] for data in spots_data if data.get('id')]
+            existing = {}
+            for i in range(0, len(ids), self.IN_CHUNK_SIZE):
+                for spot in session.query(CampaignSpot).filter(CampaignSpot.id.in_(ids[i:i + self.IN_CHUNK_SIZE])):
+                    existing[spot.id] = {name: getattr(spot, name) for name in fields}
+
+            new_campaigns = {data['campaign_id'] for data in spots_data if data.get('id') not in existing}
+            next_index = dict(session.query(CampaignSpot.campaign_id, func.max(CampaignSpot.order_index))
+                              .filter(CampaignSpot.campaign_id.in_(new_campaigns))
+                              .group_by(CampaignSpot.campaign_id).all()) if new_campaigns else {}
+
+            rows = []
+            for data in spots_data:
+                current = existing.get(data.get('id'))
+                row = {'id': data.get('id') or str(uuid.uuid4())}
+                for name, default in fields.items():
+                    row[name] = data.get(name, current[name] if current else default)
+                for key in ('start_date', 'end_date'):
+                    if isinstance(row[key], str):
+                        row[key] = datetime.datetime.fromisoformat(row[key]).date() if row[key] else None
+                if current is None and row['order_index'] is None:
+                    next_index[row['campaign_id']] = (next_index.get(row['campaign_id']) or 0) + 1
+                    row['order_index'] = next_index[row['campaign_id']]
+                rows.append(row)
+
+            bulk_upsert(session, CampaignSpot, rows)
+            session.commit()
+            return [row['id'] for row in rows]
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error bulk saving spots: {e}")
+            return []
+        finally:
+            session.close()
+
     def reorder_spots(self, campaign_id: str, spot_id: str, direction: str) -> bool:
         """Move a spot up or down in the list"""
         session = SessionLocal()
@@ -0,0 +1,95 @@
+"""
+Change-data feed over last_modified.
+
+changes_since(cursor) lists the ids of campaigns, vehicles, drivers,
+schedules and documents written after `cursor`, plus the ids deleted since
+then (change_tombstones). Views keep the returned cursor and apply the
+deltas instead of reloading everything.
+
+The cursor trails the clock by CURSOR_OVERLAP so rows committed late (by a
+slower transaction with an earlier last_modified) are still picked up; rows
+changed inside that window may be reported twice, so consumers must apply
+deltas idempotently.
+"""
+import datetime
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from src.data.db_config import SessionLocal
+from src.data.models import CHANGE_FEED_MODELS, ChangeTombstone
+
+logger = logging.getLogger(__name__)
+
+CURSOR_OVERLAP = datetime.timedelta(seconds=5)
+
+# Table name -> model, e.g. 'campaigns' -> Campaign
+FEED_MODELS = {model.__tablename__: model for model in CHANGE_FEED_MODELS}
+
+
+def has_changes(changes: Dict[str, Any]) -> bool:
+    """True when a changes_since() result asks for any update"""
+    return changes['full_reload'] or any(changes['changed'].values()) or any(changes['deleted'].values())
+
+
+def changes_since(cursor: Optional[datetime.datetime], kinds: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Rows of the feed tables (`kinds`, default all of FEED_MODELS) written or
+    deleted after `cursor`:
+        {'cursor': next cursor, 'full_reload': bool,
+         'changed': {table: [ids]}, 'deleted': {table: [ids]}}
+    With cursor None (first load, or after an error) only a starting cursor is
+    returned, with full_reload set.
+    """
+    kinds = list(kinds or FEED_MODELS)
+    horizon = datetime.datetime.now() - CURSOR_OVERLAP
+    result: Dict[str, Any] = {
+        'cursor': horizon, 'full_reload': cursor is None,
+        'changed': {kind: [] for kind in kinds}, 'deleted': {kind: [] for kind in kinds}
+    }
+    if cursor is None:
+        return result
+
+    session = SessionLocal()
+    try:
+        for kind in kinds:
+            model = FEED_MODELS[kind]
+            result['changed'][kind] = list(session.scalars(
+                select(model.id).where(model.last_modified > cursor)
+            ))
+        tombstones = session.execute(
+            select(ChangeTombstone.entity_type, ChangeTombstone.entity_id)
+            .where(ChangeTombstone.deleted_at > cursor, ChangeTombstone.entity_type.in_(kinds))
+        ).all()
+        for kind, entity_id in tombstones:
+            result['deleted'][kind].append(entity_id)
+        for kind in kinds:
+            if result['deleted'][kind]:
+                gone = set(result['deleted'][kind])
+                result['changed'][kind] = [i for i in result['changed'][kind] if i not in gone]
+        # Never move the cursor backwards
+        result['cursor'] = max(cursor, horizon)
+        return result
+    except Exception as e:
+        logger.error(f"Error reading change feed: {e}")
+        result['cursor'], result['full_reload'] = None, True
+        return result
+    finally:
+        session.close()
+
+
+def apply_delta(items: List[Dict[str, Any]], changed: List[Dict[str, Any]], deleted: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Patch a list of entity dicts (with 'id'): drop the deleted ids and replace
+    or append the changed dicts. Order of untouched items is kept.
+    """
+    removed = set(deleted)
+    updates = {item['id']: item for item in changed}
+    merged = []
+    for item in items:
+        if item['id'] in removed:
+            continue
+        merged.append(updates.pop(item['id'], item))
+    merged.extend(item for item in updates.values() if item['id'] not in removed)
+    return merged
@@ -1,7 +1,11 @@
+import datetime
 import json
 import os
-from src.data.db_config import SessionLocal
+import uuid
+from src.data.audience_cube import AudienceCube
+from src.data.db_config import SessionLocal, bulk_upsert
 from src.data.models import TrafficLocation
+from src.utils.profiling import span
 
 class CityDataManager:
     def __init__(self):
@@ -9,6 +13,7 @@ class CityDataManager:
         self.events_path = os.path.join(os.path.dirname(__file__), 'special_events.json')
         self.profiles = self._load_profiles()
         self.special_events = self._load_special_events()
+        self.audience_cube = AudienceCube(self)
 
     def _load_profiles(self):
         if not os.path.exists(self.profiles_path):
@@ -80,6 +85,52 @@ class CityDataManager:
         return 1.0, 1.0, None
 
 
+    @span('CityDataManager.get_event_multiplier_series')
+    def get_event_multiplier_series(self, city_name, dates):
+        """
+        get_event_multipliers for every day of a numpy datetime64[D] array at once.
+        Returns (traffic_mult, pedestrian_mult, event_index, event_names): float
+        arrays, the index into event_names of the matching event per day (-1 for
+        none). Like get_event_multipliers, the first matching event wins.
+        """
+        import numpy as np
+
+        traffic = np.ones(len(dates))
+        pedestrian = np.ones(len(dates))
+        event_index = np.full(len(dates), -1)
+        names = []
+        if not city_name or not len(dates):
+            return traffic, pedestrian, event_index, names
+
+        city_events = self.get_city_events(city_name)
+        if not city_events:
+            return traffic, pedestrian, event_index, names
+
+        matches = []
+        for event_key, event in city_events.items():
+            if 'start_date' in event:
+                start = np.datetime64(datetime.datetime.strptime(event['start_date'], '%Y-%m-%d').date(), 'D')
+                end = np.datetime64(datetime.datetime.strptime(event['end_date'], '%Y-%m-%d').date(), 'D')
+                mask = (dates >= start) & (dates <= end)
+            else:
+                # Legacy single-date key: must equal the '%Y-%m-%d' string of the day
+                try:
+                    day = np.datetime64(event_key, 'D')
+                except ValueError:
+                    continue
+                if str(day) != event_key:
+                    continue
+                mask = dates == day
+            matches.append((mask, event))
+
+        # Apply in reverse so earlier events overwrite later ones
+        for i, (mask, event) in reversed(list(enumerate(matches))):
+            traffic[mask] = event.get('traffic_multiplier', 1.0)
+            pedestrian[mask] = event.get('pedestrian_multiplier', 1.0)
+            event_index[mask] = i
+        names = [event.get('name') for _, event in matches]
+        return traffic, pedestrian, event_index, names
+
     def get_city_profile(self, city_name):
         """Get current profile for a specific city (case insensitive search)"""
         # Normalize search
@@ -121,6 +172,28 @@ class CityDataManager:
                     
         return None
 
+    def get_city_history(self, city_name):
+        """Raw profile history of a city ({'YYYY-Qn': profile, 'current': {...}}), exact, case insensitive or partial match"""
+        if city_name in self.profiles:
+            return self.profiles[city_name]
+        search_name = city_name.lower().strip()
+        for name, profile in self.profiles.items():
+            if name.lower() == search_name:
+                return profile
+        for name, profile in self.profiles.items():
+            if search_name in name.lower():
+                return profile
+        return None
+
+    def get_city_events(self, city_name):
+        """Special events of a city (case insensitive match), or None"""
+        search_name = city_name.lower().strip()
+        for name, events in (self.special_events or {}).items():
+            if name.lower() == search_name:
+                return events
+        return None
+
+    @span('CityDataManager.get_city_data_for_period')
     def get_city_data_for_period(self, city_name, target_date):
         """
         Get city data for a specific date/period.
@@ -131,22 +204,7 @@ class CityDataManager:
         
         # Get full history for the city
         # We need to access the raw profile dictionary, not just the current one
-        search_name = city_name.lower().strip()
-        history = None
-        
-        if city_name in self.profiles:
-            history = self.profiles[city_name]
-        else:
-            for name, profile in self.profiles.items():
-                if name.lower() == search_name:
-                    history = profile
-                    break
-            if not history:
-                for name, profile in self.profiles.items():
-                    if search_name in name.lower():
-                        history = profile
-                        break
-        
+        history = self.get_city_history(city_name)
         if not history:
             return None
             
@@ -482,6 +540,7 @@ class CityDataManager:
         try:
             with open(self.profiles_path, 'w', encoding='utf-8') as f:
                 json.dump(self.profiles, f, ensure_ascii=False, indent=4)
+            self.audience_cube.invalidate()
             return True
         except Exception as e:
             print(f"Error saving city profiles: {e}")
@@ -492,12 +551,14 @@ class CityDataManager:
         try:
             with open(self.events_path, 'w', encoding='utf-8') as f:
                 json.dump(self.special_events, f, ensure_ascii=False, indent=4)
+            self.audience_cube.invalidate()
             return True
         except Exception as e:
             print(f"Error saving special events: {e}")
             return False
 
     # --- Traffic Location CRUD Operations ---
+    @span('CityDataManager.get_all_traffic_locations')
     def get_all_traffic_locations(self, city_name=None):
         """Get all fixed traffic locations, optionally filtered by city"""
         db = SessionLocal()
@@ -605,24 +666,27 @@ class CityDataManager:
         finally:
             db.close()
 
+    @staticmethod
+    def _traffic_location_row(city_name, data):
+        """traffic_locations column values of an imported location dict"""
+        return {
+            'name': data.get('name'),
+            'city_name': city_name,
+            'latitude': float(data.get('latitude', 0.0)),
+            'longitude': float(data.get('longitude', 0.0)),
+            'daily_traffic': int(data.get('daily_traffic', 0)),
+            'pedestrian_traffic': int(data.get('pedestrian_traffic', 0)),
+            'source': data.get('source', 'BRAT'),
+            'notes': data.get('notes', '')
+        }
+
     def batch_add_traffic_locations(self, city_name, locations_list):
-        """Add multiple traffic locations at once"""
+        """Add multiple traffic locations at once (one executemany insert)"""
         db = SessionLocal()
-        added_count = 0
         try:
-            for data in locations_list:
-                new_loc = TrafficLocation(
-                    name=data.get('name'),
-                    city_name=city_name,
-                    latitude=float(data.get('latitude', 0.0)),
-                    longitude=float(data.get('longitude', 0.0)),
-                    daily_traffic=int(data.get('daily_traffic', 0)),
-                    pedestrian_traffic=int(data.get('pedestrian_traffic', 0)),
-                    source=data.get('source', 'BRAT'),
-                    notes=data.get('notes', '')
-                )
-                db.add(new_loc)
-                added_count += 1
+            rows = [dict(self._traffic_location_row(city_name, data), id=str(uuid.uuid4()))
+                    for data in locations_list]
+            added_count = bulk_upsert(db, TrafficLocation, rows)
             db.commit()
             return added_count
         except Exception as e:
@@ -631,3 +695,29 @@ class CityDataManager:
             return 0
         finally:
             db.close()
+
+    def bulk_upsert_traffic_locations(self, city_name, locations_list):
+        """
+        Import traffic locations: a location whose name already exists in the
+        city is updated, the others are added. One transaction, one executemany
+        upsert. Returns the number of locations written.
+        """
+        db = SessionLocal()
+        try:
+            existing = dict(db.query(TrafficLocation.name, TrafficLocation.id).filter(
+                TrafficLocation.city_name.ilike(city_name)
+            ).all())
+            rows = {}
+            for data in locations_list:
+                row = self._traffic_location_row(city_name, data)
+                row['id'] = existing.get(row['name']) or str(uuid.uuid4())
+                rows[row['id']] = row  # Last duplicate in the file wins
+            count = bulk_upsert(db, TrafficLocation, list(rows.values()))
+            db.commit()
+            return count
+        except Exception as e:
+            print(f"Error importing traffic locations: {e}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
@@ -7,6 +7,7 @@ import datetime
 import uuid
 from typing import List, Dict, Optional
 from src.data.db_config import SessionLocal
+from src.data.entity_cache import entity_cache
 from src.data.models import Document, Vehicle, Driver
 
 class DocumentManager:
@@ -360,6 +361,7 @@ class DocumentManager:
                 if current_expiry is None or expiry_date > current_expiry:
                     setattr(vehicle, field_name, expiry_date)
                     session.commit()
+                    entity_cache.invalidate('vehicle', vehicle_id)
                     print(f"Synced {doc_type} expiry ({expiry_date}) to vehicle {vehicle.registration}")
         except Exception as e:
             print(f"Error syncing expiry: {e}")
@@ -385,6 +387,7 @@ class DocumentManager:
                 if current_expiry is None or expiry_date > current_expiry:
                     setattr(driver, field_name, expiry_date)
                     session.commit()
+                    entity_cache.invalidate('driver', driver_id)
                     print(f"Synced {doc_type} expiry ({expiry_date}) to driver {driver.name}")
         except Exception as e:
             print(f"Error syncing driver expiry: {e}")
@@ -2,7 +2,9 @@
 import logging
 import datetime
 from typing import Dict, Any, Optional, List
-from src.data.db_config import SessionLocal
+from sqlalchemy.orm import selectinload
+from src.data.db_config import SessionLocal, unit_of_work
+from src.data.entity_cache import entity_cache
 from src.data.models import Driver, DriverAssignmentHistory, DriverStatusHistory
 
 logger = logging.getLogger(__name__)
@@ -99,12 +101,39 @@ class DriverManager:
         finally:
             session.close()
     
+    # Relationships read by _to_dict, loaded in one query each instead of per driver
+    _DICT_LOAD_OPTIONS = (
+        selectinload(Driver.assignment_history),
+        selectinload(Driver.assigned_vehicle_rel),
+        selectinload(Driver.status_history),
+    )
+    
+    def _to_cached_dicts(self, drivers: List[Driver]) -> List[Dict[str, Any]]:
+        """Convert a listing and warm the entity cache with it"""
+        result = []
+        for d in drivers:
+            data = self._to_dict(d)
+            entity_cache.put('driver', d.id, data)
+            result.append(data)
+        return result
+    
+    def invalidate(self, driver_id: Optional[str] = None) -> None:
+        """Drop a driver (or all drivers) from the entity cache after an external write"""
+        entity_cache.invalidate('driver', driver_id)
+    
     def get_driver(self, driver_id: str) -> Optional[Dict[str, Any]]:
-        """Get a specific driver by ID"""
+        """Get a specific driver by ID (served from the entity cache when fresh)"""
+        cached = entity_cache.get('driver', driver_id)
+        if cached is not None:
+            return cached
         session = SessionLocal()
         try:
-            driver = session.query(Driver).filter(Driver.id == driver_id).first()
-            return self._to_dict(driver) if driver else None
+            driver = session.query(Driver).options(*self._DICT_LOAD_OPTIONS).filter(Driver.id == driver_id).first()
+            if not driver:
+                return None
+            data = self._to_dict(driver)
+            entity_cache.put('driver', driver_id, data)
+            return data
         finally:
             session.close()
     
@@ -112,11 +141,11 @@ class DriverManager:
         """Get all drivers"""
         session = SessionLocal()
         try:
-            query = session.query(Driver)
+            query = session.query(Driver).options(*self._DICT_LOAD_OPTIONS)
             if not include_archived:
                 query = query.filter(Driver.is_archived == False)
             drivers = query.all()
-            return [self._to_dict(d) for d in drivers]
+            return self._to_cached_dicts(drivers)
         finally:
             session.close()
     
@@ -124,8 +153,8 @@ class DriverManager:
         """Get only active drivers"""
         session = SessionLocal()
         try:
-            drivers = session.query(Driver).filter(Driver.status == 'active').all()
-            return [self._to_dict(d) for d in drivers]
+            drivers = session.query(Driver).options(*self._DICT_LOAD_OPTIONS).filter(Driver.status == 'active').all()
+            return self._to_cached_dicts(drivers)
         finally:
             session.close()
     
@@ -179,11 +208,13 @@ class DriverManager:
                     
                     # 1. Delete future/unclosed events of the OLD status if we are moving to active
                     if status == 'active':
-                        # Deleting overlapping future events of specific types (vacation, medical, inactive)
-                        session.query(DriverSchedule).filter(
+                        # Deleting overlapping future events of specific types (vacation, medical, inactive);
+                        # ORM deletes, so the change feed records a tombstone per schedule
+                        for schedule in session.query(DriverSchedule).filter(
                             DriverSchedule.driver_id == driver_id,
                             DriverSchedule.event_type.in_(['vacation', 'medical', 'inactive'])
-                        ).delete(synchronize_session=False)
+                        ).all():
+                            session.delete(schedule)
                     
                     # 2. Add unclosed event for the NEW status if not active
                     if status in ['vacation', 'medical', 'inactive']:
@@ -201,6 +232,7 @@ class DriverManager:
                 driver.status = status
             
             session.commit()
+            entity_cache.invalidate('driver', driver_id)
             return True
         except Exception as e:
             session.rollback()
@@ -262,6 +294,7 @@ class DriverManager:
                 driver.assigned_vehicle_id = vehicle_id
             
             session.commit()
+            entity_cache.invalidate('driver', driver_id)
             return True
         except Exception as e:
             session.rollback()
@@ -328,6 +361,7 @@ class DriverManager:
             )
             session.add(assignment)
             session.commit()
+            entity_cache.invalidate('driver', driver_id)
             return True
         except Exception as e:
             session.rollback()
@@ -350,6 +384,7 @@ class DriverManager:
                 if start_date is not None: h.start_date = start_date
                 if end_date is not None: h.end_date = end_date
                 session.commit()
+                entity_cache.invalidate('driver', h.driver_id)
                 return True
             return False
         except Exception as e:
@@ -363,8 +398,11 @@ class DriverManager:
         """Delete an assignment history record"""
         session = SessionLocal()
         try:
-            session.query(DriverAssignmentHistory).filter(DriverAssignmentHistory.id == history_id).delete()
-            session.commit()
+            h = session.query(DriverAssignmentHistory).filter(DriverAssignmentHistory.id == history_id).first()
+            if h:
+                session.delete(h)
+                session.commit()
+                entity_cache.invalidate('driver', h.driver_id)
             return True
         except Exception as e:
             session.rollback()
@@ -375,68 +413,79 @@ class DriverManager:
     
     def archive_driver(self, driver_id: str) -> bool:
         """Archive a driver (soft delete)"""
-        session = SessionLocal()
         try:
-            driver = session.query(Driver).filter(Driver.id == driver_id).first()
-            if driver:
+            # The unassignment commits in the same transaction as the archive flag
+            with unit_of_work() as session:
+                driver = session.query(Driver).filter(Driver.id == driver_id).first()
+                if not driver:
+                    return False
                 driver.is_archived = True
                 # Unassign from vehicle if currently assigned
                 if driver.assigned_vehicle_id:
                     self.assign_to_vehicle(driver_id, None)
-                session.commit()
-                return True
-            return False
+            entity_cache.invalidate('driver', driver_id)
+            return True
         except Exception as e:
-            session.rollback()
             logger.error(f"Error archiving driver: {e}")
             return False
-        finally:
-            session.close()
 
     def delete_driver(self, driver_id: str, smart: bool = True) -> bool:
         """Delete a driver with optional smart cleanup of references"""
-        session = SessionLocal()
         try:
-            driver = session.query(Driver).filter(Driver.id == driver_id).first()
-            if not driver:
-                return False
+            # The document cleanup shares this transaction: a failure part way
+            # leaves no reference cleared without the delete
+            with unit_of_work() as session:
+                driver = session.query(Driver).filter(Driver.id == driver_id).first()
+                if not driver:
+                    return False
             
-            if smart:
-                # 1. Unassign from ANY vehicle (sync both ways)
-                from src.data.models import Vehicle
-                vehicles = session.query(Vehicle).filter(Vehicle.driver_id == driver_id).all()
-                for v in vehicles:
-                    v.driver_id = None
-                    v.driver_name = None
+                if smart:
+                    # 1. Unassign from ANY vehicle (sync both ways)
+                    from src.data.models import Vehicle
+                    vehicles = session.query(Vehicle).filter(Vehicle.driver_id == driver_id).all()
+                    for v in vehicles:
+                        v.driver_id = None
+                        v.driver_name = None
                 
-                # 2. Cleanup Campaign references
-                from src.data.models import Campaign
-                campaigns = session.query(Campaign).filter(Campaign.driver_id == driver_id).all()
-                for c in campaigns:
-                    c.driver_id = None
+                    # 2. Cleanup Campaign references (primary and additional vehicles' driver)
+                    from src.data.models import Campaign, CampaignVehicleAssignment
+                    from src.data.campaign_storage import CampaignStorage
+                    assigned = session.query(CampaignVehicleAssignment.campaign_id).filter(
+                        CampaignVehicleAssignment.driver_id == driver_id
+                    )
+                    campaigns = session.query(Campaign).filter(
+                        (Campaign.driver_id == driver_id) | Campaign.id.in_(assigned)
+                    ).all()
+                    for c in campaigns:
+                        if c.driver_id == driver_id:
+                            c.driver_id = None
+                        if c.additional_vehicles:
+                            c.additional_vehicles = [
+                                {**av, 'driver_id': None} if isinstance(av, dict) and av.get('driver_id') == driver_id else av
+                                for av in c.additional_vehicles
+                            ]
+                        CampaignStorage.sync_vehicle_assignments(session, c)
                 
-                # 3. Cleanup Documents
-                from src.data.document_manager import DocumentManager
-                dm = DocumentManager()
-                dm.delete_all_entity_documents('driver', driver_id)
+                    # 3. Cleanup Documents
+                    from src.data.document_manager import DocumentManager
+                    dm = DocumentManager()
+                    dm.delete_all_entity_documents('driver', driver_id)
                 
-                # 4. Clear current assignment pointer
-                driver.assigned_vehicle_id = None
+                    # 4. Clear current assignment pointer
+                    driver.assigned_vehicle_id = None
             
-            elif driver.assigned_vehicle_id:
-                logger.error(f"Cannot delete driver: assigned to vehicle {driver.assigned_vehicle_id}")
-                return False
+                elif driver.assigned_vehicle_id:
+                    logger.error(f"Cannot delete driver: assigned to vehicle {driver.assigned_vehicle_id}")
+                    return False
             
-            session.delete(driver)
-            session.commit()
+                session.delete(driver)
+            entity_cache.invalidate('driver', driver_id)
+            entity_cache.invalidate('vehicle')
             return True
         except Exception as e:
-            session.rollback()
             logger.error(f"Error deleting driver: {e}")
             return False
-        finally:
-            session.close()
-    
+
     def get_unassigned_drivers(self) -> List[Dict[str, Any]]:
         """Get drivers not assigned to any vehicle"""
         session = SessionLocal()
@@ -484,15 +533,16 @@ class DriverManager:
         finally:
             session.close()
 
-    def get_driver_schedules(self, driver_id: str) -> List[Dict[str, Any]]:
-        """Get schedules for a driver"""
+    def get_driver_schedules(self, driver_id: str = None) -> List[Dict[str, Any]]:
+        """Get schedules for a driver or all if ID is None"""
         session = SessionLocal()
         try:
             from src.data.models import DriverSchedule
             
-            schedules = session.query(DriverSchedule).filter(
-                DriverSchedule.driver_id == driver_id
-            ).order_by(DriverSchedule.start_date.desc()).all()
+            query = session.query(DriverSchedule)
+            if driver_id:
+                query = query.filter(DriverSchedule.driver_id == driver_id)
+            schedules = query.order_by(DriverSchedule.start_date.desc()).all()
             
             return [
                 {
@@ -513,7 +563,10 @@ class DriverManager:
         session = SessionLocal()
         try:
             from src.data.models import DriverSchedule
-            session.query(DriverSchedule).filter(DriverSchedule.id == schedule_id).delete()
+            # ORM delete, so the change feed records a tombstone
+            schedule = session.get(DriverSchedule, schedule_id)
+            if schedule:
+                session.delete(schedule)
             session.commit()
             return True
         except Exception as e:
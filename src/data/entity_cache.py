@@ -0,0 +1,78 @@
+import copy
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Seconds an entity stays cached; bounds staleness for writes made by other processes
+ENTITY_CACHE_TTL = float(os.environ.get("ENTITY_CACHE_TTL", 60))
+
+
+class EntityCache:
+    """
+    In-process cache of entity dicts (vehicles, drivers) keyed by (kind, id).
+
+    Entries expire after `ttl` seconds; the managers invalidate them explicitly
+    when they write. Values are copied in and out, so callers may mutate what
+    they get. Hit/miss counters are kept per kind.
+    """
+
+    def __init__(self, ttl: float = ENTITY_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._entries: Dict[tuple, tuple] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, kind: str, field: str) -> None:
+        self._stats.setdefault(kind, {'hits': 0, 'misses': 0})[field] += 1
+
+    def get(self, kind: str, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Cached copy of the entity, or None (miss or expired)"""
+        with self._lock:
+            entry = self._entries.get((kind, entity_id))
+            if entry and entry[0] > time.monotonic():
+                self._count(kind, 'hits')
+                value = entry[1]
+            else:
+                if entry:
+                    del self._entries[(kind, entity_id)]
+                self._count(kind, 'misses')
+                return None
+        return copy.deepcopy(value)
+
+    def put(self, kind: str, entity_id: str, value: Dict[str, Any]) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[(kind, entity_id)] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, kind: str, entity_id: Optional[str] = None) -> None:
+        """Drop one entity, or every entity of `kind` when no id is given"""
+        with self._lock:
+            if entity_id is not None:
+                self._entries.pop((kind, entity_id), None)
+            else:
+                for key in [k for k in self._entries if k[0] == kind]:
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """{kind: {'hits', 'misses', 'size'}}"""
+        with self._lock:
+            result = {kind: dict(counts) for kind, counts in self._stats.items()}
+            for kind, _ in self._entries:
+                result.setdefault(kind, {'hits': 0, 'misses': 0})
+                result[kind]['size'] = result[kind].get('size', 0) + 1
+            for counts in result.values():
+                counts.setdefault('size', 0)
+            return result
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+# Shared by VehicleManager and DriverManager
+entity_cache = EntityCache()
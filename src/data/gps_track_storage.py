@@ -0,0 +1,324 @@
+import json
+import logging
+import uuid
+import zlib
+from array import array
+from typing import Dict, Any, Optional, List, Iterable
+
+import numpy as np
+
+from src.data.db_config import SessionLocal
+from src.data.models import GpsTrack
+from src.utils.profiling import span
+
+logger = logging.getLogger(__name__)
+
+
+class GpsTrackStorage:
+    """
+    Stores the GPS points of audit imports in the gps_tracks table as
+    compressed columnar arrays (lat, lon, timestamp, address).
+
+    Campaign.audited_data['gps_imports'] only keeps the summary of each import
+    plus a 'track_id' reference; points are loaded on demand (map, PoP annex).
+
+    A new import overlapping stored ones is merged point by point: points
+    whose (vehicle, timestamp) is already stored are dropped, with the km
+    the parser attributed to them, instead of replacing the older imports.
+    """
+
+    def __init__(self) -> None:
+        pass
+
+    # --- Encoding ---
+
+    @staticmethod
+    def _encode_floats(values: Iterable[float]) -> bytes:
+        if isinstance(values, np.ndarray):
+            return zlib.compress(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        return zlib.compress(array('d', values).tobytes())
+
+    @staticmethod
+    def _decode_floats(blob: Optional[bytes]) -> List[float]:
+        if not blob:
+            return []
+        arr = array('d')
+        arr.frombytes(zlib.decompress(blob))
+        return arr.tolist()
+
+    @staticmethod
+    def _encode_strings(values: List[Optional[str]]) -> bytes:
+        return zlib.compress(json.dumps(values, ensure_ascii=False).encode('utf-8'))
+
+    @staticmethod
+    def _decode_strings(blob: Optional[bytes]) -> List[Optional[str]]:
+        if not blob:
+            return []
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+    def _to_points(self, track: GpsTrack) -> List[Dict[str, Any]]:
+        """Rebuild the parser's point dicts from the stored columns"""
+        lats = self._decode_floats(track.lat_data)
+        lons = self._decode_floats(track.lon_data)
+        timestamps = self._decode_strings(track.timestamp_data) or [None] * len(lats)
+        addresses = self._decode_strings(track.address_data) or [''] * len(lats)
+        return [
+            {'lat': lat, 'lon': lon, 'timestamp': ts, 'address': addr}
+            for lat, lon, ts, addr in zip(lats, lons, timestamps, addresses)
+        ]
+
+    # --- Writes ---
+
+    def write_track(self, session, campaign_id: str, track_id: str, gps_points: List[Dict[str, Any]]) -> int:
+        """
+        Insert or replace a track inside the caller's session (no commit).
+        Points without valid coordinates are skipped. Returns the stored point count.
+        Accepts the point dicts or the parser's columnar GpsPoints.
+        """
+        if isinstance(getattr(gps_points, 'lat', None), np.ndarray):
+            # gps_parser.GpsPoints: coordinates already validated, stored as-is
+            lats, lons = gps_points.lat, gps_points.lon
+            timestamps = gps_points.timestamps.tolist() if gps_points.timestamps is not None else [None] * len(lats)
+            addresses = gps_points.addresses.tolist() if gps_points.addresses is not None else [''] * len(lats)
+            return self._store_track(session, campaign_id, track_id, lats, lons, timestamps, addresses)
+
+        lats, lons, timestamps, addresses = [], [], [], []
+        for pt in gps_points or []:
+            try:
+                lat = float(pt.get('lat'))
+                lon = float(pt.get('lon'))
+            except (TypeError, ValueError):
+                continue
+            lats.append(lat)
+            lons.append(lon)
+            ts = pt.get('timestamp')
+            timestamps.append(str(ts) if ts is not None else None)
+            addresses.append(pt.get('address') or '')
+        return self._store_track(session, campaign_id, track_id, lats, lons, timestamps, addresses)
+
+    def _store_track(self, session, campaign_id, track_id, lats, lons, timestamps, addresses) -> int:
+        track = session.query(GpsTrack).filter(GpsTrack.id == track_id).first()
+        if not track:
+            track = GpsTrack(id=track_id)
+            session.add(track)
+        track.campaign_id = campaign_id
+        track.point_count = len(lats)
+        track.lat_data = self._encode_floats(lats)
+        track.lon_data = self._encode_floats(lons)
+        track.timestamp_data = self._encode_strings(timestamps)
+        track.address_data = self._encode_strings(addresses) if any(addresses) else None
+        return len(lats)
+
+    @span('GpsTrackStorage.save_track')
+    def save_track(self, campaign_id: str, track_id: str, gps_points: List[Dict[str, Any]]) -> int:
+        """Store the points of one GPS import. Returns the stored point count (-1 on error)."""
+        session = SessionLocal()
+        try:
+            count = self.write_track(session, campaign_id, track_id, gps_points)
+            session.commit()
+            return count
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving GPS track {track_id}: {e}")
+            return -1
+        finally:
+            session.close()
+
+    # --- Merging overlapping imports ---
+
+    @staticmethod
+    def _timestamp_key(ts) -> str:
+        """'2026-03-04T08:06:47' and '2026-03-04 08:06:47' are the same point"""
+        return str(ts).replace('T', ' ')[:19]
+
+    def _stored_point_keys(self, session, new_import: Dict[str, Any], gps_imports: List[Any]) -> set:
+        """
+        In-memory set of the (vehicle, timestamp) keys of the stored imports
+        overlapping new_import's dates, decoded from their timestamp blobs
+        (gps_tracks has no per-point rows to index).
+        """
+        start, end = new_import.get('date_start'), new_import.get('date_end')
+        tracks = {}
+        for g_imp in gps_imports:
+            if not isinstance(g_imp, dict) or g_imp is new_import or 'gps_points' in g_imp or not g_imp.get('track_id'):
+                continue
+            es, ee = g_imp.get('date_start'), g_imp.get('date_end')
+            if start and end and es and ee and (end < es or start > ee):
+                continue
+            tracks[g_imp['track_id']] = g_imp.get('vehicle_id')
+        keys = set()
+        if not tracks:
+            return keys
+        for track_id, blob in session.query(GpsTrack.id, GpsTrack.timestamp_data).filter(GpsTrack.id.in_(list(tracks))):
+            vehicle = tracks[track_id]
+            keys.update((vehicle, self._timestamp_key(ts)) for ts in self._decode_strings(blob) if ts is not None)
+        return keys
+
+    def _merge_points(self, g_imp: Dict[str, Any], points, known: set):
+        """
+        Drop the points of a new import already in `known`; untimed points
+        (trip arrivals) follow the timed point before them. Adjusts the
+        import's distance by the km of the dropped points (GpsPoints.distances,
+        or the 'distance' of point dicts). Returns the points kept.
+        """
+        vehicle = g_imp.get('vehicle_id')
+        columnar = isinstance(getattr(points, 'lat', None), np.ndarray)
+        if columnar:
+            timestamps = points.timestamps if points.timestamps is not None else [None] * len(points)
+        else:
+            timestamps = [pt.get('timestamp') if isinstance(pt, dict) else None for pt in points]
+        keep = np.ones(len(timestamps), dtype=bool)
+        current = True
+        for i, ts in enumerate(timestamps):
+            if ts is not None:
+                current = (vehicle, self._timestamp_key(ts)) not in known
+            keep[i] = current
+        dropped = int((~keep).sum())
+        if not dropped:
+            return points
+        g_imp['merged_points'] = dropped
+        if columnar:
+            distances = points.distances
+        elif any(isinstance(pt, dict) and 'distance' in pt for pt in points):
+            distances = np.array([float(pt.get('distance') or 0.0) if isinstance(pt, dict) else 0.0 for pt in points])
+        else:
+            distances = None
+        if distances is not None and 'distance' in g_imp:
+            g_imp['distance'] = max(0.0, float(g_imp['distance']) - float(distances[~keep].sum()))
+        if columnar:
+            return points.select(keep)
+        return [pt for pt, k in zip(points, keep) if k]
+
+    def externalize_imports(self, session, campaign_id: str, audited_data: Dict[str, Any],
+                            merge: bool = True) -> Dict[str, Any]:
+        """
+        Move inline 'gps_points' of gps_imports entries into the track store and
+        drop tracks no longer referenced. With merge, points of a new import
+        already stored by an overlapping import of the same vehicle are dropped.
+        Returns the slimmed audited_data. Runs inside the caller's session (no commit).
+        """
+        if not isinstance(audited_data, dict):
+            return audited_data
+        gps_imports = audited_data.get('gps_imports') or []
+
+        slim_imports = []
+        for g_imp in gps_imports:
+            if not isinstance(g_imp, dict):
+                slim_imports.append(g_imp)
+                continue
+            if 'gps_points' in g_imp:
+                points = g_imp['gps_points'] if g_imp['gps_points'] is not None else []
+                known = self._stored_point_keys(session, g_imp, gps_imports) if merge and len(points) else set()
+                g_imp = dict(g_imp)
+                del g_imp['gps_points']
+                if known:
+                    points = self._merge_points(g_imp, points, known)
+                track_id = g_imp.get('track_id') or g_imp.get('id')
+                if track_id and len(points):
+                    g_imp['track_id'] = track_id
+                    g_imp['point_count'] = self.write_track(session, campaign_id, track_id, points)
+                elif known:
+                    g_imp['point_count'] = 0  # Every point was already stored
+            else:
+                g_imp = dict(g_imp)
+            slim_imports.append(g_imp)
+
+        owned = {row.id for row in session.query(GpsTrack.id).filter(GpsTrack.campaign_id == campaign_id).all()}
+
+        # Cloned campaigns reference the source campaign's tracks: give them their own copy
+        for g_imp in slim_imports:
+            if not isinstance(g_imp, dict):
+                continue
+            track_id = g_imp.get('track_id')
+            if track_id and track_id not in owned:
+                source = session.query(GpsTrack).filter(GpsTrack.id == track_id).first()
+                if source and source.campaign_id != campaign_id:
+                    copy = GpsTrack(
+                        id=str(uuid.uuid4()),
+                        campaign_id=campaign_id,
+                        point_count=source.point_count,
+                        lat_data=source.lat_data,
+                        lon_data=source.lon_data,
+                        timestamp_data=source.timestamp_data,
+                        address_data=source.address_data
+                    )
+                    session.add(copy)
+                    g_imp['track_id'] = copy.id
+
+        # Drop tracks whose import was removed from the campaign
+        referenced = {g.get('track_id') for g in slim_imports if isinstance(g, dict) and g.get('track_id')}
+        stale_ids = [track_id for track_id in owned if track_id not in referenced]
+        if stale_ids:
+            session.query(GpsTrack).filter(GpsTrack.id.in_(stale_ids)).delete(synchronize_session=False)
+
+        if 'gps_imports' in audited_data:
+            audited_data = {**audited_data, 'gps_imports': slim_imports}
+        return audited_data
+
+    def migrate_inline_points(self) -> int:
+        """
+        Move GPS points still stored inline in Campaign.audited_data into the
+        track store. Returns the number of migrated campaigns.
+        """
+        from sqlalchemy import cast, String, literal_column
+        from src.data.models import Campaign
+
+        session = SessionLocal()
+        try:
+            if session.get_bind().dialect.name == 'postgresql':
+                # JSONB path query, served by the audited_data GIN index
+                legacy_filter = Campaign.audited_data.op('@?')(literal_column("'$.gps_imports[*].gps_points'::jsonpath"))
+            else:
+                # Text match avoids deserializing audited_data of every campaign
+                legacy_filter = cast(Campaign.audited_data, String).like('%"gps_points"%')
+            legacy = session.query(Campaign).filter(legacy_filter).all()
+            for campaign in legacy:
+                # Legacy imports are kept as they were, without merging their points
+                campaign.audited_data = self.externalize_imports(session, campaign.id, campaign.audited_data or {},
+                                                                 merge=False)
+            session.commit()
+            if legacy:
+                logger.info(f"Moved inline GPS points of {len(legacy)} campaigns to gps_tracks")
+            return len(legacy)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error migrating inline GPS points: {e}")
+            return 0
+        finally:
+            session.close()
+
+    def delete_track(self, track_id: str) -> bool:
+        """Delete a stored track"""
+        session = SessionLocal()
+        try:
+            deleted = session.query(GpsTrack).filter(GpsTrack.id == track_id).delete()
+            session.commit()
+            return bool(deleted)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error deleting GPS track {track_id}: {e}")
+            return False
+        finally:
+            session.close()
+
+    # --- Reads ---
+
+    def get_track_points(self, track_id: str) -> List[Dict[str, Any]]:
+        """Load and decode the points of one track"""
+        session = SessionLocal()
+        try:
+            track = session.query(GpsTrack).filter(GpsTrack.id == track_id).first()
+            return self._to_points(track) if track else []
+        finally:
+            session.close()
+
+    @span('GpsTrackStorage.get_import_points')
+    def get_import_points(self, gps_import: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Points of a gps_imports entry: inline points for legacy entries,
+        otherwise lazily loaded from the track store.
+        """
+        if gps_import.get('gps_points'):
+            return gps_import['gps_points']
+        track_id = gps_import.get('track_id')
+        return self.get_track_points(track_id) if track_id else []
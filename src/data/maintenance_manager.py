@@ -2,6 +2,7 @@ import logging
 import datetime
 from typing import Dict, Any, Optional, List
 from src.data.db_config import SessionLocal
+from src.data.entity_cache import entity_cache
 from src.data.models import MaintenanceRecord, Vehicle
 
 logger = logging.getLogger(__name__)
@@ -44,6 +45,8 @@ class MaintenanceManager:
             
             session.add(record)
             session.commit()
+            if entity_type == 'vehicle':
+                entity_cache.invalidate('vehicle', entity_id)
             return record.id
         except Exception as e:
             session.rollback()
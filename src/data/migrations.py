@@ -0,0 +1,279 @@
+"""
+Versioned schema migrations.
+
+Each step runs once, in its own transaction, and is recorded in the
+schema_migrations table together with a fingerprint of the models. When the
+database is current, run_migrations() costs a single query: no table
+introspection happens on Streamlit reruns.
+
+Add new steps at the end of MIGRATIONS with the next version number. Plain
+model additions (new table, nullable column, index) are picked up without a
+step: a changed model fingerprint triggers a create/add-columns/index sync.
+"""
+import datetime
+import hashlib
+import json
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, literal, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateTable
+
+from src.data.db_config import (
+    Base, UnitOfWorkError, UnitOfWorkSession, engine, ensure_indexes, thread_session
+)
+
+
+# --- Helpers ---
+
+def _column_ddl(column, dialect):
+    """Column definition for ALTER TABLE ADD COLUMN, compiled for `dialect`"""
+    ddl = f"{dialect.identifier_preparer.quote(column.name)} {column.type.compile(dialect=dialect)}"
+    default = column.default
+    if default is not None and default.is_scalar:
+        value = default.arg
+        if isinstance(value, (dict, list)):
+            ddl += " DEFAULT '" + json.dumps(value).replace("'", "''") + "'"
+        else:
+            ddl += " DEFAULT " + str(literal(value).compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    return ddl
+
+def add_missing_columns(conn):
+    """
+    Add the model columns missing from existing tables (create_all skips those).
+    Columns are added nullable, with the model's scalar default. Returns the
+    added columns as 'table.column'.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {col['name'] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or column.primary_key:
+                continue
+            print(f"Auto-migrating: Adding {column.name} to {table.name} table")
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, conn.dialect)}"))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+def rebuild_table(conn, table):
+    """
+    Batch rebuild of `table` to the model definition, for changes SQLite cannot
+    ALTER (constraints, nullability): create the new table, copy the shared
+    columns, drop the old one, rename, then recreate the indexes.
+    """
+    present = [col['name'] for col in inspect(conn).get_columns(table.name)]
+    shared = ", ".join(c.name for c in table.columns if c.name in present)
+    staging = f"{table.name}_rebuild"
+    ddl = str(CreateTable(table).compile(dialect=conn.dialect))
+    conn.execute(text(ddl.replace(f"CREATE TABLE {table.name} (", f"CREATE TABLE {staging} (", 1)))
+    conn.execute(text(f"INSERT INTO {staging} ({shared}) SELECT {shared} FROM {table.name}"))
+    conn.execute(text(f"DROP TABLE {table.name}"))
+    conn.execute(text(f"ALTER TABLE {staging} RENAME TO {table.name}"))
+    for index in table.indexes:
+        index.create(bind=conn, checkfirst=True)
+
+@contextmanager
+def _managers_on(conn):
+    """Run manager code (SessionLocal) inside the migration's transaction"""
+    session = UnitOfWorkSession(bind=conn, autoflush=False)
+    try:
+        with thread_session(session):
+            yield
+            session.flush()
+            if session.info['uow_failed']:
+                raise UnitOfWorkError("A manager rolled back during the migration")
+    finally:
+        session.close()
+
+
+# --- Steps ---
+
+def _create_tables(conn):
+    """Tables of the models (migrate_db*, migrate_schedules_table, init_driver_schedules, documents)"""
+    Base.metadata.create_all(bind=conn)
+
+def _add_columns(conn):
+    """Columns added over time (migrate_spots_v2-v4, migrate_vehicle_schema, migrate_campaign_*,
+    migrate_driver_email, migrate_all_missing_columns, add_timeline_columns, migrate_db_v3)"""
+    added = add_missing_columns(conn)
+    now = datetime.datetime.now()
+    for column in ('created_at', 'last_modified'):
+        if f"campaigns.{column}" in added:
+            conn.execute(text(f"UPDATE campaigns SET {column} = :now WHERE {column} IS NULL"), {"now": now})
+
+def _nullable_route_campaign(conn):
+    """campaign_routes.campaign_id became nullable (route templates)"""
+    from src.data.models import CampaignRoute
+    columns = {col['name']: col for col in inspect(conn).get_columns('campaign_routes')}
+    if 'campaign_id' not in columns or columns['campaign_id']['nullable']:
+        return
+    if conn.dialect.name == "sqlite":
+        rebuild_table(conn, CampaignRoute.__table__)
+    else:
+        conn.execute(text("ALTER TABLE campaign_routes ALTER COLUMN campaign_id DROP NOT NULL"))
+
+def _spots_cascade_delete(conn):
+    """campaign_spots.campaign_id deletes with its campaign (migrate_cascade_delete)"""
+    from src.data.models import CampaignSpot
+    if conn.dialect.name != "sqlite":
+        return  # Created with ON DELETE CASCADE by create_all
+    fks = inspect(conn).get_foreign_keys('campaign_spots')
+    if not any((fk.get('options') or {}).get('ondelete', '').upper() == 'CASCADE' for fk in fks):
+        rebuild_table(conn, CampaignSpot.__table__)
+
+def _spots_empty_json(conn):
+    """Empty strings left in campaign_spots JSON columns break decoding (fix_json_data)"""
+    for column in ('target_cities', 'target_vehicles', 'spot_periods', 'spot_schedules'):
+        conn.execute(text(f"UPDATE campaign_spots SET {column} = NULL WHERE CAST({column} AS TEXT) = ''"))
+
+def _vehicle_expiry_documents(conn):
+    """Vehicle expiry dates become documents (migrate_documents_schema); only before any vehicle document exists"""
+    if conn.execute(text("SELECT 1 FROM documents WHERE entity_type = 'vehicle' LIMIT 1")).first():
+        return
+    rows = conn.execute(text("SELECT id, rca_expiry, itp_expiry, rovinieta_expiry, casco_expiry FROM vehicles")).all()
+    now = datetime.datetime.now()
+    documents = []
+    for vehicle_id, *expiries in rows:
+        for document_type, expiry in zip(('RCA', 'ITP', 'Rovinieta', 'CASCO'), expiries):
+            if expiry:
+                documents.append({
+                    "id": str(uuid.uuid4()), "entity_id": vehicle_id,
+                    "document_type": document_type, "expiry_date": expiry, "created_at": now
+                })
+    if documents:
+        conn.execute(text(
+            "INSERT INTO documents (id, entity_type, entity_id, document_type, expiry_date, created_at) "
+            "VALUES (:id, 'vehicle', :entity_id, :document_type, :expiry_date, :created_at)"
+        ), documents)
+
+def _model_indexes(conn):
+    """Secondary indexes declared on the models"""
+    ensure_indexes(bind=conn)
+
+def _vehicle_assignments(conn):
+    """Backfill campaign_vehicle_assignments"""
+    from src.data.campaign_storage import CampaignStorage
+    with _managers_on(conn):
+        CampaignStorage().rebuild_vehicle_assignments(only_if_empty=True)
+
+def _gps_tracks(conn):
+    """Move inline GPS points out of campaigns.audited_data into gps_tracks"""
+    from src.data.gps_track_storage import GpsTrackStorage
+    with _managers_on(conn):
+        GpsTrackStorage().migrate_inline_points()
+
+def _drop_audience_cube(conn):
+    """The audience cube is kept in memory only; drop its former table"""
+    conn.execute(text("DROP TABLE IF EXISTS audience_cube"))
+
+def _sync_models(conn):
+    """Tables, columns and indexes of models changed without a dedicated step"""
+    Base.metadata.create_all(bind=conn)
+    add_missing_columns(conn)
+    ensure_indexes(bind=conn)
+
+# (version, name, step) - append only, never renumber
+MIGRATIONS = [
+    (1, 'create_tables', _create_tables),
+    (2, 'add_columns', _add_columns),
+    (3, 'nullable_route_campaign', _nullable_route_campaign),
+    (4, 'spots_cascade_delete', _spots_cascade_delete),
+    (5, 'spots_empty_json', _spots_empty_json),
+    (6, 'vehicle_expiry_documents', _vehicle_expiry_documents),
+    (7, 'model_indexes', _model_indexes),
+    (8, 'vehicle_assignments', _vehicle_assignments),
+    (9, 'gps_tracks', _gps_tracks),
+    (10, 'drop_audience_cube', _drop_audience_cube),
+]
+
+
+# --- Runner ---
+
+_fingerprint = None
+
+def model_fingerprint():
+    """Hash of the tables, columns and indexes declared on the models"""
+    global _fingerprint
+    if _fingerprint is None:
+        import src.data.models  # Register models with Base
+        parts = []
+        for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+            parts.append(table.name)
+            parts.extend(f"{c.name}:{c.type}:{c.nullable}" for c in table.columns)
+            parts.extend(sorted(ix.name for ix in table.indexes))
+        _fingerprint = hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+    return _fingerprint
+
+def _read_state(conn):
+    """(version, model_fingerprint) of the last applied step, or None"""
+    from src.data.models import SchemaMigration
+    row = conn.execute(
+        select(SchemaMigration.version, SchemaMigration.model_fingerprint)
+        .order_by(SchemaMigration.version.desc()).limit(1)
+    ).first()
+    return tuple(row) if row else None
+
+def current_state(bind=None):
+    """(version, model_fingerprint) recorded in the database; None if never migrated"""
+    try:
+        with (bind or engine).connect() as conn:
+            return _read_state(conn)
+    except DBAPIError:
+        return None  # schema_migrations does not exist yet
+
+@contextmanager
+def _locked_transaction(bind):
+    """One transaction per step, holding the write lock so concurrent app processes serialize"""
+    with bind.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            # pysqlite does not open transactions for DDL by itself
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        elif conn.dialect.name == "postgresql":
+            conn.execute(text("LOCK TABLE schema_migrations IN EXCLUSIVE MODE"))
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def run_migrations(bind=None):
+    """
+    Apply the pending steps in order and sync changed models.
+    Returns the names of what ran ([] when the database was already current).
+    """
+    from src.data.models import SchemaMigration
+    bind = bind or engine
+    head = MIGRATIONS[-1][0]
+    fingerprint = model_fingerprint()
+    if current_state(bind) == (head, fingerprint):
+        return []
+
+    SchemaMigration.__table__.create(bind=bind, checkfirst=True)
+    applied = []
+    for version, name, step in MIGRATIONS:
+        with _locked_transaction(bind) as conn:
+            state = _read_state(conn)  # Another process may have applied it meanwhile
+            if state and state[0] >= version:
+                continue
+            step(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(
+                version=version, name=name, applied_at=datetime.datetime.now(), model_fingerprint=fingerprint
+            ))
+        print(f"Applied migration {version}: {name}")
+        applied.append(name)
+
+    with _locked_transaction(bind) as conn:
+        state = _read_state(conn)
+        if state[1] != fingerprint:
+            _sync_models(conn)
+            conn.execute(SchemaMigration.__table__.update()
+                         .where(SchemaMigration.version == state[0])
+                         .values(model_fingerprint=fingerprint))
+            applied.append('sync_models')
+    return applied
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Text, JSON, Float
+from sqlalchemy import event, Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Text, JSON, Float, LargeBinary, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 import uuid
@@ -8,6 +9,9 @@ from src.data.db_config import Base
 def generate_uuid():
     return str(uuid.uuid4())
 
+# JSONB on PostgreSQL (binary, GIN-indexable, supports @> containment), JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), 'postgresql')
+
 # --- Models ---
 
 class VehicleStatusHistory(Base):
@@ -67,7 +71,7 @@ class Driver(Base):
     is_archived = Column(Boolean, default=False)
     
     created_at = Column(DateTime, default=datetime.now)
-    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)  # Change feed cursor
 
     # Relationships
     assigned_vehicle_rel = relationship("Vehicle", back_populates="driver", foreign_keys="Vehicle.driver_id", uselist=True)
@@ -97,7 +101,7 @@ class Vehicle(Base):
     is_archived = Column(Boolean, default=False)
     
     created_at = Column(DateTime, default=datetime.now)
-    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)  # Change feed cursor
 
     # Relationships
     status_history = relationship(VehicleStatusHistory, back_populates="vehicle", cascade="all, delete-orphan")
@@ -108,36 +112,41 @@ class Vehicle(Base):
 
 class Campaign(Base):
     __tablename__ = 'campaigns'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # GIN indexes serve JSON containment/path queries; PostgreSQL only
+        Index('ix_campaigns_additional_vehicles_gin', 'additional_vehicles', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('ix_campaigns_audited_data_gin', 'audited_data', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        {'extend_existing': True}
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     campaign_name = Column(String(200), nullable=False)
     client_name = Column(String(200))
     start_date = Column(Date)
-    end_date = Column(Date)
-    vehicle_id = Column(String(36))
-    driver_id = Column(String(36))
-    status = Column(String(20), default='confirmed')
+    end_date = Column(Date, index=True)
+    vehicle_id = Column(String(36), index=True)
+    driver_id = Column(String(36), index=True)
+    status = Column(String(20), default='confirmed', index=True)
     total_impressions = Column(Integer, default=0)
     unique_reach = Column(Integer, default=0)
     
-    cities = Column(JSON)
+    cities = Column(JSONType)
     spot_duration = Column(Integer, default=10)
     is_exclusive = Column(Boolean, default=False)
     campaign_mode = Column(String(50), nullable=True) # Explicit deployment scenario
     po_number = Column(String(100))
     daily_hours = Column(String(50))
     known_distance_total = Column(Integer, default=0)
-    route_data = Column(JSON)
+    route_data = Column(JSONType)
     
-    hourly_data = Column(JSON, default={})
-    demographics = Column(JSON, default={})
-    locations = Column(JSON, default={})
-    transit_periods = Column(JSON, default=[])
+    hourly_data = Column(JSONType, default={})
+    demographics = Column(JSONType, default={})
+    locations = Column(JSONType, default={})
+    transit_periods = Column(JSONType, default=[])
 
-    city_schedules = Column(JSON)
-    city_periods = Column(JSON)
-    additional_vehicles = Column(JSON, default=[])
+    city_schedules = Column(JSONType)
+    city_periods = Column(JSONType)
+    additional_vehicles = Column(JSONType, default=[])
     
     vehicle_speed_kmh = Column(Integer, default=25)
     stationing_min_per_hour = Column(Integer, default=15)
@@ -147,38 +156,58 @@ class Campaign(Base):
     expected_revenue = Column(Float, default=0.0)
     loop_duration = Column(Integer, default=60)
     budget_eur = Column(Float, default=0.0)
-    audited_data = Column(JSON, default={})
+    audited_data = Column(JSONType, default={})
     
     has_spots = Column(Boolean, default=False)
     spot_count = Column(Integer, default=0)
     
     # Resource timeline tracking
-    vehicle_timeline = Column(JSON, default=[])  # [{"vehicle_id": "...", "start_date": "...", "end_date": "..."}]
-    driver_timeline = Column(JSON, default=[])   # [{"driver_id": "...", "start_date": "...", "end_date": "..."}]
+    vehicle_timeline = Column(JSONType, default=[])  # [{"vehicle_id": "...", "start_date": "...", "end_date": "..."}]
+    driver_timeline = Column(JSONType, default=[])   # [{"driver_id": "...", "start_date": "...", "end_date": "..."}]
     
-    is_archived = Column(Boolean, default=False)
+    is_archived = Column(Boolean, default=False, index=True)
     
     created_at = Column(DateTime, default=datetime.now)
-    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)  # Change feed cursor
     
     # Relationships
     spots = relationship("CampaignSpot", back_populates="campaign", cascade="all, delete-orphan")
     generated_reports = relationship("GeneratedReport", back_populates="campaign", cascade="all, delete-orphan")
     routes = relationship("CampaignRoute", back_populates="campaign", cascade="all, delete-orphan")
+    vehicle_assignments = relationship("CampaignVehicleAssignment", back_populates="campaign", cascade="all, delete-orphan")
+
+class CampaignVehicleAssignment(Base):
+    """Normalized (campaign, vehicle, driver, period) rows mirroring vehicle_id + additional_vehicles"""
+    __tablename__ = 'campaign_vehicle_assignments'
+    __table_args__ = (
+        Index('ix_cva_vehicle_end', 'vehicle_id', 'end_date'),
+        Index('ix_cva_driver_end', 'driver_id', 'end_date'),
+        {'extend_existing': True}
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=False, index=True)
+    vehicle_id = Column(String(36), nullable=True)
+    driver_id = Column(String(36), nullable=True)
+    role = Column(String(20), default='primary')  # 'primary', 'additional', 'timeline'
+    start_date = Column(Date)
+    end_date = Column(Date)
+
+    campaign = relationship("Campaign", back_populates="vehicle_assignments")
 
 class GeneratedReport(Base):
     __tablename__ = 'generated_reports'
     __table_args__ = {'extend_existing': True}
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=False)
+    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=False, index=True)
     report_type = Column(String(50), nullable=False)  # 'standard', 'dooh'
     file_path = Column(String(500))
     file_name = Column(String(255))
     
     # Store the exact metrics used at the time of generation
     # e.g., impressions, reach, hours, distance, ecpm
-    frozen_data = Column(JSON, default={})
+    frozen_data = Column(JSONType, default={})
     
     created_at = Column(DateTime, default=datetime.now)
     
@@ -190,7 +219,7 @@ class CampaignSpot(Base):
     __table_args__ = {'extend_existing': True}
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=False)
+    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=False, index=True)
     name = Column(String(200), nullable=False)
     file_path = Column(String(500))
     file_name = Column(String(255))
@@ -199,13 +228,13 @@ class CampaignSpot(Base):
     order_index = Column(Integer, default=0)
     
     # Targeting and Scheduling
-    target_cities = Column(JSON)  # List of city names
-    target_vehicles = Column(JSON) # List of vehicle IDs (new)
+    target_cities = Column(JSONType)  # List of city names
+    target_vehicles = Column(JSONType) # List of vehicle IDs (new)
     
     # Complex Scheduling (Parity with Campaign)
     spot_shared_mode = Column(Boolean, default=True) # True = same schedule for all selected entities
-    spot_periods = Column(JSON) # Map: [Entity] -> List[Period]
-    spot_schedules = Column(JSON) # Map: [Entity] -> Date -> Schedule
+    spot_periods = Column(JSONType) # Map: [Entity] -> List[Period]
+    spot_schedules = Column(JSONType) # Map: [Entity] -> Date -> Schedule
     
     start_date = Column(Date) # Legacy/Simple summary
     end_date = Column(Date)   # Legacy/Simple summary
@@ -225,7 +254,7 @@ class VehicleSchedule(Base):
     __table_args__ = {'extend_existing': True}
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    vehicle_id = Column(String(36), ForeignKey('vehicles.id'), nullable=False)
+    vehicle_id = Column(String(36), ForeignKey('vehicles.id'), nullable=False, index=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     event_type = Column(String(50), nullable=False)
@@ -233,7 +262,7 @@ class VehicleSchedule(Base):
     destination_city = Column(String(100))
     details = Column(String(200))
     created_at = Column(DateTime, default=datetime.now)
-    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)  # Change feed cursor
     
     vehicle = relationship(Vehicle, back_populates="schedules")
 
@@ -242,13 +271,13 @@ class DriverSchedule(Base):
     __table_args__ = {'extend_existing': True}
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    driver_id = Column(String(36), ForeignKey('drivers.id'), nullable=False)
+    driver_id = Column(String(36), ForeignKey('drivers.id'), nullable=False, index=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     event_type = Column(String(50), nullable=False)
     details = Column(String(200))
     created_at = Column(DateTime, default=datetime.now)
-    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)  # Change feed cursor
     driver = relationship(Driver, back_populates="schedules")
 
 class TrafficLocation(Base):
@@ -275,10 +304,10 @@ class CampaignRoute(Base):
     __table_args__ = {'extend_existing': True}
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=True) # templates can have null campaign
+    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=True, index=True) # templates can have null campaign
     name = Column(String(200), nullable=False)
-    geojson_data = Column(JSON)  # Store the actual path/route
-    waypoints = Column(JSON)      # Store the control points (markers) for editing
+    geojson_data = Column(JSONType)  # Store the actual path/route
+    waypoints = Column(JSONType)      # Store the control points (markers) for editing
     is_template = Column(Boolean, default=False)
     
     # Optional specific allocations
@@ -294,9 +323,75 @@ class CampaignRoute(Base):
     campaign = relationship("Campaign", back_populates="routes")
     vehicle = relationship("Vehicle", back_populates="routes")
 
+class GpsTrack(Base):
+    """Columnar GPS points of one audit import (kept out of Campaign.audited_data)"""
+    __tablename__ = 'gps_tracks'
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(String(36), primary_key=True)  # Same as the gps_imports entry id
+    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=False, index=True)
+    point_count = Column(Integer, default=0)
+
+    # zlib-compressed columns: float64 arrays for lat/lon, JSON lists for timestamps/addresses
+    lat_data = Column(LargeBinary)
+    lon_data = Column(LargeBinary)
+    timestamp_data = Column(LargeBinary)
+    address_data = Column(LargeBinary)
+
+    created_at = Column(DateTime, default=datetime.now)
+    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+class PlayHour(Base):
+    """Audited plays of one screen and media in one hour (see src/data/play_log_storage.py)"""
+    __tablename__ = 'play_hours'
+    __table_args__ = (
+        Index('ix_play_hours_campaign_date', 'campaign_id', 'play_date'),
+        # (screen, day, hour) lookups when merging overlapping imports
+        Index('ix_play_hours_screen_hour', 'campaign_id', 'screen', 'play_date', 'hour'),
+        {'extend_existing': True}
+    )
+
+    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), primary_key=True)
+    import_id = Column(String(36), primary_key=True)  # vnnox_imports entry id
+    screen = Column(String(100), primary_key=True)
+    media_name = Column(String(255), primary_key=True)
+    play_date = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True, autoincrement=False)  # 0-23, hour the plays started
+    plays = Column(Integer, nullable=False, default=0)
+    seconds = Column(Float, nullable=False, default=0.0)
+    # Seconds past the hour of the first / last play start (NULL: unknown, the whole hour)
+    first_second = Column(Integer)
+    last_second = Column(Integer)
+
+class ImportJob(Base):
+    """Queued audit upload parsed by the import worker (see src/services/import_job_service.py)"""
+    __tablename__ = 'import_jobs'
+    __table_args__ = (
+        Index('ix_import_jobs_status_created', 'status', 'created_at'),
+        {'extend_existing': True}
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    campaign_id = Column(String(36), ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=False, index=True)
+    kind = Column(String(20), nullable=False)  # 'gps', 'vnnox'
+    filename = Column(String(255))
+    file_path = Column(String(500))  # Spooled upload, removed once the job finishes
+    content_hash = Column(String(40))
+    status = Column(String(20), nullable=False, default='queued')  # 'queued', 'running', 'done', 'failed'
+    progress = Column(Float, nullable=False, default=0.0)  # 0-1
+    message = Column(Text)  # Current step, or the error of a failed job
+    result = Column(JSONType)  # Summary of the saved import
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.now)  # Worker heartbeat
+    finished_at = Column(DateTime)
+
 class Document(Base):
     __tablename__ = 'documents'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_documents_entity', 'entity_type', 'entity_id'),
+        {'extend_existing': True}
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     entity_type = Column(String(20), nullable=False)
@@ -310,7 +405,7 @@ class Document(Base):
     uploaded_at = Column(DateTime)
     notes = Column(Text)
     created_at = Column(DateTime, default=datetime.now)
-    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)  # Change feed cursor
 
 class MaintenanceRecord(Base):
     __tablename__ = 'maintenance_records'
@@ -335,5 +430,37 @@ class MaintenanceRecord(Base):
     last_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     # Simplified relationship only for vehicles for now
-    vehicle_id = Column(String(36), ForeignKey('vehicles.id', ondelete='CASCADE'), nullable=True)
+    vehicle_id = Column(String(36), ForeignKey('vehicles.id', ondelete='CASCADE'), nullable=True, index=True)
     vehicle = relationship("Vehicle", back_populates="maintenance_records")
+
+class SchemaMigration(Base):
+    """Applied schema migration steps (see src/data/migrations.py)"""
+    __tablename__ = 'schema_migrations'
+    __table_args__ = {'extend_existing': True}
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+    applied_at = Column(DateTime, default=datetime.now)
+    # Hash of the model definitions the database was last synced with
+    model_fingerprint = Column(String(40))
+
+class ChangeTombstone(Base):
+    """Deleted row of a change-feed table (see src/data/change_feed.py)"""
+    __tablename__ = 'change_tombstones'
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(50), nullable=False)  # Table name, e.g. 'campaigns'
+    entity_id = Column(String(36), nullable=False)
+    deleted_at = Column(DateTime, default=datetime.now, nullable=False, index=True)
+
+# Tables whose changes are published by change_feed.changes_since
+CHANGE_FEED_MODELS = (Campaign, Vehicle, Driver, VehicleSchedule, DriverSchedule, Document)
+
+def _record_tombstone(mapper, connection, target):
+    connection.execute(ChangeTombstone.__table__.insert().values(
+        entity_type=mapper.local_table.name, entity_id=target.id, deleted_at=datetime.now()
+    ))
+
+for _model in CHANGE_FEED_MODELS:
+    event.listen(_model, 'after_delete', _record_tombstone)
@@ -0,0 +1,323 @@
+"""
+Play Log Storage
+Audited plays of the VnNox Details imports, kept in the play_hours fact
+table at (campaign, import, screen, media, day, hour) grain: parse_vnnox_csv
+buckets the plays of a log into these rows ('hourly_plays'), so a monthly
+log becomes a few thousand rows instead of one per play.
+
+Campaign.audited_data['vnnox_imports'] keeps the summary of each import plus
+its 'hour_rows' count; reports query rollups (per day, screen, media, hour...)
+instead of reparsing the logs, and audited_audience() matches the played
+hours to the audience cube's hourly traffic.
+
+A new import overlapping stored ones is merged row by row on (screen, media,
+day, hour). Each bucket records the span of its play starts within the hour:
+when one bucket's span covers the other's they hold the same plays and only
+the more complete one (more plays) is kept; buckets of exports split inside
+the hour (disjoint spans) are both kept. The summaries of the imports that
+lost buckets are rebuilt from their rows.
+"""
+import datetime
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+
+from src.data.db_config import SessionLocal
+from src.data.models import PlayHour
+from src.utils.profiling import span
+
+logger = logging.getLogger(__name__)
+
+# Dimensions rollup() can group by
+ROLLUP_COLUMNS = ('import_id', 'screen', 'media_name', 'play_date', 'hour')
+
+
+class PlayLogStorage:
+    """Reads and writes the play_hours rows of VnNox imports"""
+
+    def __init__(self) -> None:
+        pass
+
+    # --- Writes ---
+
+    @staticmethod
+    def _to_rows(campaign_id: str, import_id: str, hourly_plays: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        rows = []
+        for bucket in hourly_plays or []:
+            try:
+                play_date = bucket['date']
+                if not isinstance(play_date, datetime.date):
+                    play_date = datetime.date.fromisoformat(str(play_date)[:10])
+                rows.append({
+                    'campaign_id': campaign_id,
+                    'import_id': import_id,
+                    'screen': bucket.get('screen') or '',
+                    'media_name': bucket.get('media_name') or 'Unknown',
+                    'play_date': play_date,
+                    'hour': int(bucket['hour']),
+                    'plays': int(bucket.get('plays', 0)),
+                    'seconds': float(bucket.get('seconds', 0.0)),
+                    'first_second': bucket.get('first_second'),
+                    'last_second': bucket.get('last_second'),
+                })
+            except (KeyError, TypeError, ValueError):
+                continue
+        return rows
+
+    @staticmethod
+    def _span(first: Optional[int], last: Optional[int]) -> tuple:
+        """Play start span of a bucket within its hour (the whole hour when unknown)"""
+        return (0 if first is None else first, 3599 if last is None else last)
+
+    @classmethod
+    def _merge_rows(cls, session, campaign_id: str, import_id: str, rows: List[Dict[str, Any]]):
+        """
+        Rows of a new import against the campaign's other imports. A stored
+        bucket whose play span covers the new one's (or is covered by it) holds
+        the same plays: the one with fewer plays is dropped (new) or deleted
+        (stored). Buckets with other spans are partial counts and all kept.
+        Returns (rows to write, ids of the imports that lost buckets).
+        """
+        if not rows:
+            return rows, set()
+        stored = session.query(PlayHour).filter(
+            PlayHour.campaign_id == campaign_id,
+            PlayHour.screen.in_({row['screen'] for row in rows}),
+            PlayHour.play_date.between(min(row['play_date'] for row in rows), max(row['play_date'] for row in rows)),
+            PlayHour.import_id != import_id,
+        )
+        index = {}
+        for r in stored:
+            index.setdefault((r.screen, r.media_name, r.play_date, r.hour), []).append(r)
+        if not index:
+            return rows, set()
+
+        def covers(a, b):
+            return a[0] <= b[0] and a[1] >= b[1]
+
+        kept, changed = [], set()
+        for row in rows:
+            span = cls._span(row['first_second'], row['last_second'])
+            duplicates = [old for old in index.get((row['screen'], row['media_name'], row['play_date'], row['hour']), [])
+                          if covers(span, cls._span(old.first_second, old.last_second))
+                          or covers(cls._span(old.first_second, old.last_second), span)]
+            if any(old.plays >= row['plays'] for old in duplicates):
+                changed.add(import_id)
+                continue
+            for old in duplicates:
+                changed.add(old.import_id)
+                session.delete(old)
+            kept.append(row)
+        return kept, changed
+
+    @staticmethod
+    def _summary(rows: List[PlayHour]) -> Dict[str, Any]:
+        """vnnox_imports summary fields (as parse_vnnox_csv reports them) rebuilt from play_hours rows"""
+        media = {}
+        for row in rows:
+            entry = media.setdefault(row.media_name, {'media_name': row.media_name, 'screen': row.screen, 'plays': 0,
+                                                      'total_seconds': 0.0, 'date_start': None, 'date_end': None})
+            entry['plays'] += row.plays
+            entry['total_seconds'] += row.seconds
+            day = row.play_date.isoformat()
+            entry['date_start'] = min(entry['date_start'] or day, day)
+            entry['date_end'] = max(entry['date_end'] or day, day)
+        spots_summary = sorted(media.values(), key=lambda x: x['date_start'] or '')
+        for entry in spots_summary:
+            entry['total_hours'] = round(entry['total_seconds'] / 3600, 4)
+            entry['total_seconds'] = round(entry['total_seconds'], 1)
+        total_seconds = float(sum(row.seconds for row in rows))
+        return {
+            'hours': round(total_seconds / 3600, 4),
+            'spots': int(sum(row.plays for row in rows)),
+            'total_seconds': total_seconds,
+            'spots_summary': spots_summary,
+            'date_start': min((s['date_start'] for s in spots_summary), default=None),
+            'date_end': max((s['date_end'] for s in spots_summary), default=None),
+            'hour_rows': len(rows),
+        }
+
+    def write_import(self, session, campaign_id: str, import_id: str, hourly_plays: Iterable[Dict[str, Any]],
+                     merge: bool = False):
+        """
+        Replace the rows of one import inside the caller's session (no commit).
+        Buckets without a valid date/hour are skipped. Returns the stored row
+        count; with merge, (row count, ids of imports that lost buckets).
+        """
+        rows = self._to_rows(campaign_id, import_id, hourly_plays)
+        changed = set()
+        if merge:
+            rows, changed = self._merge_rows(session, campaign_id, import_id, rows)
+        session.query(PlayHour).filter(
+            PlayHour.campaign_id == campaign_id, PlayHour.import_id == import_id
+        ).delete(synchronize_session=False)
+        session.add_all(PlayHour(**row) for row in rows)
+        return (len(rows), changed) if merge else len(rows)
+
+    def externalize_imports(self, session, campaign_id: str, audited_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Move inline 'hourly_plays' of vnnox_imports entries into play_hours,
+        merged with the overlapping buckets of the other imports, and drop the
+        rows of imports no longer in the campaign. Returns the slimmed
+        audited_data. Runs inside the caller's session (no commit).
+        """
+        if not isinstance(audited_data, dict):
+            return audited_data
+        vnnox_imports = audited_data.get('vnnox_imports') or []
+
+        slim_imports = []
+        written, changed = set(), set()
+        for v_imp in vnnox_imports:
+            if not isinstance(v_imp, dict):
+                slim_imports.append(v_imp)
+                continue
+            v_imp = dict(v_imp)
+            if 'hourly_plays' in v_imp:
+                hourly_plays = v_imp.pop('hourly_plays') or []
+                if v_imp.get('id'):
+                    v_imp['hour_rows'], lost = self.write_import(session, campaign_id, v_imp['id'], hourly_plays,
+                                                                 merge=True)
+                    written.add(v_imp['id'])
+                    changed |= lost
+            slim_imports.append(v_imp)
+
+        owned = set(session.scalars(
+            select(PlayHour.import_id).where(PlayHour.campaign_id == campaign_id).distinct()
+        )) | written  # Pending rows are not flushed under no_autoflush
+
+        # Cloned campaigns reference the source campaign's imports: give them their own rows
+        for v_imp in slim_imports:
+            if not isinstance(v_imp, dict) or not v_imp.get('hour_rows') or v_imp.get('id') in owned:
+                continue
+            source_id = session.scalars(select(PlayHour.campaign_id).where(
+                PlayHour.import_id == v_imp['id'], PlayHour.campaign_id != campaign_id
+            ).limit(1)).first()
+            if source_id:
+                columns = [c for c in PlayHour.__table__.c.keys() if c != 'campaign_id']
+                for source in session.execute(select(*[PlayHour.__table__.c[c] for c in columns]).where(
+                        PlayHour.campaign_id == source_id, PlayHour.import_id == v_imp['id'])).mappings():
+                    session.add(PlayHour(campaign_id=campaign_id, **source))
+                owned.add(v_imp['id'])
+
+        # Drop rows whose import was removed from the campaign
+        referenced = {v.get('id') for v in slim_imports if isinstance(v, dict) and v.get('id')}
+        stale_ids = [import_id for import_id in owned if import_id not in referenced]
+        if stale_ids:
+            session.query(PlayHour).filter(
+                PlayHour.campaign_id == campaign_id, PlayHour.import_id.in_(stale_ids)
+            ).delete(synchronize_session=False)
+
+        # Imports that lost buckets to a merge: summaries from their remaining rows
+        if changed:
+            session.flush()
+            for v_imp in slim_imports:
+                if isinstance(v_imp, dict) and v_imp.get('id') in changed:
+                    v_imp.update(self._summary(session.query(PlayHour).filter(
+                        PlayHour.campaign_id == campaign_id, PlayHour.import_id == v_imp['id']).all()))
+
+        if 'vnnox_imports' in audited_data:
+            audited_data = {**audited_data, 'vnnox_imports': slim_imports}
+        return audited_data
+
+    # --- Reads ---
+
+    @span('PlayLogStorage.rollup')
+    def rollup(self, campaign_id: str, by: Sequence[str] = ('play_date',),
+               start: Optional[datetime.date] = None, end: Optional[datetime.date] = None) -> List[Dict[str, Any]]:
+        """
+        Plays, seconds and hours of the campaign grouped by the `by` columns
+        (any of ROLLUP_COLUMNS, empty for the grand total), ordered by them.
+        start/end (inclusive) limit the play dates.
+        """
+        unknown = [name for name in by if name not in ROLLUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown rollup columns: {unknown}")
+        columns = [getattr(PlayHour, name) for name in by]
+
+        session = SessionLocal()
+        try:
+            query = session.query(*columns, func.sum(PlayHour.plays), func.sum(PlayHour.seconds)) \
+                .filter(PlayHour.campaign_id == campaign_id)
+            if start:
+                query = query.filter(PlayHour.play_date >= start)
+            if end:
+                query = query.filter(PlayHour.play_date <= end)
+            if columns:
+                query = query.group_by(*columns).order_by(*columns)
+            result = []
+            for row in query.all():
+                plays, seconds = row[-2], row[-1]
+                if plays is None:
+                    continue  # Grand total of a campaign without rows
+                result.append({**dict(zip(by, row[:-2])), 'plays': int(plays),
+                               'seconds': float(seconds), 'hours': float(seconds) / 3600})
+            return result
+        except Exception as e:
+            logger.error(f"Error reading play rollup of campaign {campaign_id}: {e}")
+            return []
+        finally:
+            session.close()
+
+    def played_hours(self, campaign_id: Optional[str], vnnox_imports: Sequence[Dict[str, Any]]) -> Optional[float]:
+        """
+        Confirmed broadcast hours: the play_hours rows of the Details imports
+        plus the summary hours of imports without rows (Overview logs).
+        None without imports.
+        """
+        imports = [x for x in vnnox_imports or [] if isinstance(x, dict)]
+        if not imports:
+            return None
+        hours = sum(float(x.get('hours') or 0) for x in imports if not x.get('hour_rows'))
+        if campaign_id and any(x.get('hour_rows') for x in imports):
+            hours += sum(row['hours'] for row in self.rollup(campaign_id, by=()))
+        return hours
+
+    def audited_audience(self, campaign_id: str, cities: Sequence[str], audience_cube,
+                         city_periods: Optional[Dict[str, Sequence[Any]]] = None) -> Optional[Dict[str, float]]:
+        """
+        Traffic and pedestrians passing the screens while they played: the
+        played hours of each day times that day's hourly audience (x event
+        multiplier) from the audience cube. The profile is flat within a day,
+        so days are enough.
+
+        city_periods ({city: [(start, end), ...]}, inclusive dates) places
+        the screens day by day: a day uses the cities scheduled on it. Days
+        outside every period, or every day without city_periods, average the
+        campaign's cities. Screens are not mapped to cities one by one, so a
+        day two vehicles spend in different cities averages those cities.
+        None without play_hours rows or cities.
+        """
+        days = self.rollup(campaign_id, by=('play_date',))
+        cities = list(dict.fromkeys(city for city in [*(cities or []), *(city_periods or {})] if city))
+        if not days or not cities:
+            return None
+        first = days[0]['play_date']
+        total_days = (days[-1]['play_date'] - first).days + 1
+
+        # weights[city, day]: share of the day's audience taken from each city
+        weights = np.ones((len(cities), total_days))
+        if city_periods:
+            scheduled = np.zeros((len(cities), total_days), dtype=bool)
+            for row, city in enumerate(cities):
+                for start, end in city_periods.get(city) or ():
+                    lo, hi = max((start - first).days, 0), min((end - first).days, total_days - 1)
+                    if lo <= hi:
+                        scheduled[row, lo:hi + 1] = True
+            weights = np.where(scheduled.any(axis=0), scheduled, weights)
+        weights /= weights.sum(axis=0)
+
+        traffic = np.zeros(total_days)
+        pedestrian = np.zeros(total_days)
+        for row, city in enumerate(cities):
+            city_traffic, city_pedestrian = audience_cube.daily_audience(city, first, total_days)
+            traffic += weights[row] * city_traffic
+            pedestrian += weights[row] * city_pedestrian
+        index = np.array([(day['play_date'] - first).days for day in days])
+        hours = np.array([day['hours'] for day in days])
+        return {
+            'played_hours': float(hours.sum()),
+            'traffic': float((hours * traffic[index]).sum()),
+            'pedestrian': float((hours * pedestrian[index]).sum()),
+        }
@@ -1,9 +1,11 @@
 import logging
 import json
+from datetime import datetime
 from typing import List, Dict, Any, Optional
-from sqlalchemy import desc
+from sqlalchemy import desc, insert
 from src.data.db_config import SessionLocal
-from src.data.models import GeneratedReport, Campaign
+from src.data.models import GeneratedReport, Campaign, generate_uuid
+from src.utils.profiling import span
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +13,7 @@ class ReportStorage:
     def __init__(self):
         pass
 
+    @span('ReportStorage.save_report_metadata')
     def save_report_metadata(self, campaign_id: str, report_type: str, file_path: str, file_name: str, frozen_data: Dict[str, Any]) -> str:
         """Save report metadata and frozen metrics to the database"""
         session = SessionLocal()
@@ -33,6 +36,35 @@ class ReportStorage:
         finally:
             session.close()
 
+    @span('ReportStorage.save_reports_metadata_bulk')
+    def save_reports_metadata_bulk(self, records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Save many reports' metadata (save_report_metadata fields per record) in
+        one transaction; all or nothing. Returns the new ids in record order.
+        """
+        if not records:
+            return []
+        session = SessionLocal()
+        try:
+            rows = [{
+                'id': generate_uuid(),
+                'campaign_id': r['campaign_id'],
+                'report_type': r['report_type'],
+                'file_path': r['file_path'],
+                'file_name': r['file_name'],
+                'frozen_data': r.get('frozen_data') or {},
+                'created_at': datetime.now()
+            } for r in records]
+            session.execute(insert(GeneratedReport), rows)
+            session.commit()
+            return [row['id'] for row in rows]
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving report metadata in bulk: {e}")
+            raise e
+        finally:
+            session.close()
+
     def get_reports_by_campaign(self, campaign_id: str) -> List[Dict[str, Any]]:
         """Get all generated reports for a specific campaign"""
         session = SessionLocal()
@@ -57,6 +89,19 @@ class ReportStorage:
         finally:
             session.close()
 
+    @span('ReportStorage.get_latest_report')
+    def get_latest_report(self, campaign_id: str, report_type: str = 'standard') -> Optional[Dict[str, Any]]:
+        """Get the metadata of the latest report of a specific type"""
+        session = SessionLocal()
+        try:
+            report = session.query(GeneratedReport)\
+                .filter(GeneratedReport.campaign_id == campaign_id, GeneratedReport.report_type == report_type)\
+                .order_by(desc(GeneratedReport.created_at))\
+                .first()
+            return self._to_dict(report) if report else None
+        finally:
+            session.close()
+
     def get_report(self, report_id: str) -> Optional[Dict[str, Any]]:
         """Get a single report's metadata"""
         session = SessionLocal()
@@ -83,6 +128,12 @@ class ReportStorage:
         finally:
             session.close()
 
+    @staticmethod
+    def report_files(report: Dict[str, Any]) -> List[str]:
+        """PDF paths of a report dict: every volume of a split PoP annex, else its file_path"""
+        volumes = (report.get('frozen_data') or {}).get('volumes')
+        return list(volumes) if volumes else [report['file_path']]
+
     def _to_dict(self, report: GeneratedReport) -> Dict[str, Any]:
         """Convert SQLAlchemy object to dictionary"""
         return {
@@ -2,8 +2,11 @@
 import logging
 import datetime
 from typing import Dict, Any, Optional, List
-from src.data.db_config import SessionLocal
+from sqlalchemy.orm import selectinload
+from src.data.db_config import SessionLocal, unit_of_work
+from src.data.entity_cache import entity_cache
 from src.data.models import Vehicle, VehicleStatusHistory
+from src.utils.profiling import span
 
 logger = logging.getLogger(__name__)
 
@@ -108,24 +111,46 @@ class VehicleManager:
         finally:
             session.close()
     
+    def _to_cached_dicts(self, vehicles: List[Vehicle]) -> List[Dict[str, Any]]:
+        """Convert a listing and warm the entity cache with it"""
+        result = []
+        for v in vehicles:
+            data = self._to_dict(v)
+            entity_cache.put('vehicle', v.id, data)
+            result.append(data)
+        return result
+    
+    def invalidate(self, vehicle_id: Optional[str] = None) -> None:
+        """Drop a vehicle (or all vehicles) from the entity cache after an external write"""
+        entity_cache.invalidate('vehicle', vehicle_id)
+    
+    @span('VehicleManager.get_vehicle')
     def get_vehicle(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
-        """Get a specific vehicle by ID"""
+        """Get a specific vehicle by ID (served from the entity cache when fresh)"""
+        cached = entity_cache.get('vehicle', vehicle_id)
+        if cached is not None:
+            return cached
         session = SessionLocal()
         try:
-            vehicle = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
-            return self._to_dict(vehicle) if vehicle else None
+            vehicle = session.query(Vehicle).options(selectinload(Vehicle.status_history)).filter(Vehicle.id == vehicle_id).first()
+            if not vehicle:
+                return None
+            data = self._to_dict(vehicle)
+            entity_cache.put('vehicle', vehicle_id, data)
+            return data
         finally:
             session.close()
     
+    @span('VehicleManager.get_all_vehicles')
     def get_all_vehicles(self, include_archived: bool = False) -> List[Dict[str, Any]]:
         """Get all vehicles"""
         session = SessionLocal()
         try:
-            query = session.query(Vehicle)
+            query = session.query(Vehicle).options(selectinload(Vehicle.status_history))
             if not include_archived:
                 query = query.filter(Vehicle.is_archived == False)
             vehicles = query.all()
-            return [self._to_dict(v) for v in vehicles]
+            return self._to_cached_dicts(vehicles)
         finally:
             session.close()
     
@@ -133,8 +158,8 @@ class VehicleManager:
         """Get only active vehicles"""
         session = SessionLocal()
         try:
-            vehicles = session.query(Vehicle).filter(Vehicle.status == self.STATUS_ACTIVE).all()
-            return [self._to_dict(v) for v in vehicles]
+            vehicles = session.query(Vehicle).options(selectinload(Vehicle.status_history)).filter(Vehicle.status == self.STATUS_ACTIVE).all()
+            return self._to_cached_dicts(vehicles)
         finally:
             session.close()
     
@@ -142,8 +167,8 @@ class VehicleManager:
         """Get vehicles that have assigned drivers"""
         session = SessionLocal()
         try:
-            vehicles = session.query(Vehicle).filter(Vehicle.driver_id.isnot(None)).all()
-            return [self._to_dict(v) for v in vehicles]
+            vehicles = session.query(Vehicle).options(selectinload(Vehicle.status_history)).filter(Vehicle.driver_id.isnot(None)).all()
+            return self._to_cached_dicts(vehicles)
         finally:
             session.close()
     
@@ -231,6 +256,7 @@ class VehicleManager:
                     vehicle.status = status
             
             session.commit()
+            entity_cache.invalidate('vehicle', vehicle_id)
             return True
         except Exception as e:
             session.rollback()
@@ -253,9 +279,14 @@ class VehicleManager:
                 logger.error(f"Vehicle not found: {vehicle_id}")
                 return False
             
+            previous_driver_id = vehicle.driver_id
             vehicle.driver_id = driver_id
             vehicle.driver_name = driver_name
             session.commit()
+            entity_cache.invalidate('vehicle', vehicle_id)
+            # Driver dicts expose their assigned vehicle
+            for d_id in {previous_driver_id, driver_id} - {None}:
+                entity_cache.invalidate('driver', d_id)
             return True
         except Exception as e:
             session.rollback()
@@ -294,6 +325,7 @@ class VehicleManager:
                 if vehicle.driver_id:
                     self.assign_driver(vehicle_id, None)
                 session.commit()
+                entity_cache.invalidate('vehicle', vehicle_id)
                 return True
             return False
         except Exception as e:
@@ -305,44 +337,45 @@ class VehicleManager:
 
     def delete_vehicle(self, vehicle_id: str, smart: bool = True) -> bool:
         """Delete a vehicle with optional smart cleanup of references"""
-        session = SessionLocal()
         try:
-            vehicle = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
-            if not vehicle:
-                return False
+            # The document cleanup shares this transaction: a failure part way
+            # leaves no reference cleared without the delete
+            with unit_of_work() as session:
+                vehicle = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+                if not vehicle:
+                    return False
             
-            if smart:
-                # 1. Unassign from ANY driver (sync both ways)
-                from src.data.models import Driver
-                drivers = session.query(Driver).filter(Driver.assigned_vehicle_id == vehicle_id).all()
-                for d in drivers:
-                    d.assigned_vehicle_id = None
+                if smart:
+                    # 1. Unassign from ANY driver (sync both ways)
+                    from src.data.models import Driver
+                    drivers = session.query(Driver).filter(Driver.assigned_vehicle_id == vehicle_id).all()
+                    for d in drivers:
+                        d.assigned_vehicle_id = None
                 
-                # 2. Cleanup Campaign references
-                from src.data.models import Campaign
-                campaigns = session.query(Campaign).filter(Campaign.vehicle_id == vehicle_id).all()
-                for c in campaigns:
-                    c.vehicle_id = None
+                    # 2. Cleanup Campaign references
+                    from src.data.models import Campaign
+                    campaigns = session.query(Campaign).filter(Campaign.vehicle_id == vehicle_id).all()
+                    from src.data.campaign_storage import CampaignStorage
+                    for c in campaigns:
+                        c.vehicle_id = None
+                        CampaignStorage.sync_vehicle_assignments(session, c)
                 
-                # 3. Cleanup Documents
-                from src.data.document_manager import DocumentManager
-                dm = DocumentManager()
-                dm.delete_all_entity_documents('vehicle', vehicle_id)
+                    # 3. Cleanup Documents
+                    from src.data.document_manager import DocumentManager
+                    dm = DocumentManager()
+                    dm.delete_all_entity_documents('vehicle', vehicle_id)
                 
-                # 4. Clear current driver ID on vehicle (redundant but safe)
-                vehicle.driver_id = None
+                    # 4. Clear current driver ID on vehicle (redundant but safe)
+                    vehicle.driver_id = None
             
-            session.delete(vehicle)
-            session.commit()
+                session.delete(vehicle)
+            entity_cache.invalidate('vehicle', vehicle_id)
+            entity_cache.invalidate('driver')
             return True
         except Exception as e:
-            session.rollback()
             logger.error(f"Error deleting vehicle: {e}")
             return False
-        finally:
-            session.close()
-    
-    
+
     def has_driver(self, vehicle_id: str) -> bool:
         """Check if vehicle has an assigned driver"""
         session = SessionLocal()
@@ -424,7 +457,10 @@ class VehicleManager:
         session = SessionLocal()
         try:
             from src.data.models import VehicleSchedule
-            session.query(VehicleSchedule).filter(VehicleSchedule.id == schedule_id).delete()
+            # ORM delete, so the change feed records a tombstone
+            schedule = session.get(VehicleSchedule, schedule_id)
+            if schedule:
+                session.delete(schedule)
             session.commit()
             return True
         except Exception as e:
@@ -7,11 +7,17 @@ import datetime
 import os
 import random
 from src.reporting.report_generator import ReportGenerator
+from src.reporting import impressions_engine
+from src.reporting.report_inputs import input_fingerprint, stale_sections
+from src.utils import spatial_index
+from src.utils.schedule import compile_hours
+from src.utils.profiling import profile_fields, span, trace
 from src.data.city_data_manager import CityDataManager
 from src.data.company_settings import CompanySettings
 from src.utils.map_service import MapService
 from src.utils.i18n import _, remove_diacritics
 from src.data.report_storage import ReportStorage
+from src.data.db_config import read_only_session
 from src.data.vehicle_manager import VehicleManager
 from src.data.driver_manager import DriverManager
 
@@ -58,33 +64,109 @@ class CampaignReportGenerator(ReportGenerator):
 
     def generate_campaign_report(self, campaign_data, output_path=None, output_dir=None):
         """Generate a comprehensive Mobile DOOH Campaign Report."""
-        self._prepare_data_internal(campaign_data)
-
-        if output_path is None:
-            client_clean = remove_diacritics(campaign_data['client_name']).replace(' ', '_')
-            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"campaign_report_{client_clean}_{timestamp}.pdf"
-            output_path = os.path.join(output_dir, filename) if output_dir and os.path.exists(output_dir) else self._get_report_path(filename)
-            
-        # Collect calculated metadata for persistence
-        metrics = self._generate_campaign_pdf(campaign_data, output_path)
-        self._open_report(output_path)
+        record = self.render_campaign_report(campaign_data, output_path, output_dir)
+        self._open_report(record['file_path'])
+        if record.get('reused'):
+            return record['file_path']
         
         # Save to database
         try:
-            self.report_storage.save_report_metadata(
-                campaign_id=campaign_data['id'],
-                report_type='standard',
-                file_path=output_path,
-                file_name=os.path.basename(output_path),
-                frozen_data=metrics
-            )
+            self.report_storage.save_report_metadata(**record)
         except Exception as e:
             # Don't fail the whole generation if storage fails, but log it
             import logging
             logging.getLogger(__name__).error(f"Failed to save report history: {e}")
 
-        return output_path
+        return record['file_path']
+
+    def render_campaign_report(self, campaign_data, output_path=None, output_dir=None, reuse=True):
+        """
+        Build the campaign report PDF without opening it or saving its history
+        row (batch runs save those in bulk). Returns the GeneratedReport fields.
+
+        With reuse, a campaign whose inputs match the latest standard report
+        gets that report back (marked 'reused'), and when only presentational
+        inputs changed its frozen impressions are used instead of recomputed.
+        """
+        with trace(f"standard report {campaign_data.get('id')}") as report_trace:
+            with read_only_session(), span('fingerprint'):
+                inputs = self.input_fingerprint(campaign_data)
+                latest = self.report_storage.get_latest_report(campaign_data['id'], 'standard') if reuse else None
+            reused = self._reusable_report(latest, inputs, output_path, output_dir)
+            if reused:
+                return reused
+
+            impressions = None
+            if latest and 'metrics' not in stale_sections(latest['frozen_data'], inputs):
+                impressions = self._frozen_impressions(latest['frozen_data'])
+
+            with read_only_session(), span('prepare_data'):
+                self._prepare_data_internal(campaign_data)
+
+            if output_path is None:
+                client_clean = remove_diacritics(campaign_data['client_name']).replace(' ', '_')
+                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f"campaign_report_{client_clean}_{timestamp}.pdf"
+                output_path = os.path.join(output_dir, filename) if output_dir and os.path.exists(output_dir) else self._get_report_path(filename)
+            
+            # Collect calculated metadata for persistence
+            with read_only_session():
+                metrics = self._generate_campaign_pdf(campaign_data, output_path, impressions)
+            metrics['inputs'] = inputs
+            record = {
+                'campaign_id': campaign_data['id'],
+                'report_type': 'standard',
+                'file_path': output_path,
+                'file_name': os.path.basename(output_path),
+                'frozen_data': metrics
+            }
+        record['frozen_data'].update(profile_fields(report_trace))
+        return record
+
+    def input_fingerprint(self, campaign_data):
+        """Fingerprint of the inputs a report of campaign_data is computed from (see report_inputs)"""
+        return input_fingerprint(campaign_data, self.city_manager, self.company_settings, self.vehicle_manager)
+
+    def frozen_metrics_stale(self, frozen_data, inputs):
+        """
+        True when frozen metrics were computed from inputs that changed since.
+        Reports saved before fingerprints existed cannot tell, and count as current.
+        """
+        if not (frozen_data or {}).get('inputs'):
+            return False
+        return 'metrics' in stale_sections(frozen_data, inputs)
+
+    def _reusable_report(self, latest, inputs, output_path=None, output_dir=None):
+        """The latest report's fields (with 'reused') when it was built from the same inputs and is still on disk"""
+        if not latest or output_path is not None:
+            return None
+        if latest['frozen_data'].get('inputs', {}).get('digest') != inputs['digest']:
+            return None
+        if not latest['file_path'] or not os.path.exists(latest['file_path']):
+            return None
+        if output_dir and os.path.dirname(os.path.abspath(latest['file_path'])) != os.path.abspath(output_dir):
+            return None
+        return {
+            'campaign_id': latest['campaign_id'],
+            'report_type': latest['report_type'],
+            'file_path': latest['file_path'],
+            'file_name': latest['file_name'],
+            'frozen_data': latest['frozen_data'],
+            'reused': True
+        }
+
+    @staticmethod
+    def _frozen_impressions(frozen_data):
+        """get_total_impressions_data() shape rebuilt from a report's frozen metrics (None if incomplete)"""
+        keys = ('total_impressions', 'auto_impressions', 'pedestrian_impressions')
+        if not all(k in frozen_data for k in keys):
+            return None
+        return {
+            'total': frozen_data['total_impressions'],
+            'auto': frozen_data['auto_impressions'],
+            'pedestrian': frozen_data['pedestrian_impressions'],
+            'events': []
+        }
 
     def _prepare_data_internal(self, campaign_data):
         """Unified data preparation for all reports"""
@@ -203,23 +285,9 @@ class CampaignReportGenerator(ReportGenerator):
         }
 
     def _parse_daily_hours(self, hours_str):
-        if not hours_str or not isinstance(hours_str, str): return {'hours': 8, 'peak_hours': 0}
-        total_hours, total_peak = 0, 0
-        for interval in [i.strip() for i in hours_str.split(',')]:
-            try:
-                if '-' not in interval: continue
-                start_time, end_time = interval.split('-')
-                start_h, start_m = int(start_time.split(':')[0]), int(start_time.split(':')[1]) if ':' in start_time else 0
-                end_h, end_m = int(end_time.split(':')[0]), int(end_time.split(':')[1]) if ':' in end_time else 0
-                hours = (end_h - start_h) + (end_m - start_m) / 60
-                if hours < 0: hours += 24
-                total_hours += hours
-                peak_morning, peak_evening = (7, 9), (17, 19)
-                c_start_h, c_end_h = start_h + start_m / 60, end_h + end_m / 60
-                if c_start_h < peak_morning[1] and c_end_h > peak_morning[0]: total_peak += max(0, min(c_end_h, peak_morning[1]) - max(c_start_h, peak_morning[0]))
-                if c_start_h < peak_evening[1] and c_end_h > peak_evening[0]: total_peak += max(0, min(c_end_h, peak_evening[1]) - max(c_start_h, peak_evening[0]))
-            except: continue
-        return {'hours': total_hours if total_hours > 0 else 8, 'peak_hours': total_peak}
+        """Net and peak hours of a day's hours string (8h when it has none)"""
+        compiled = compile_hours(hours_str)
+        return {'hours': compiled.hours if compiled.hours > 0 else 8, 'peak_hours': compiled.peak_hours}
 
     def _calculate_route_distance(self, speed_kmh, total_hours, stationing_min_per_hour, avg_commute_distance_km=8, known_distance_total=None, custom_daily_distances=None, total_days=1):
         if custom_daily_distances:
@@ -232,55 +300,43 @@ class CampaignReportGenerator(ReportGenerator):
         effective_driving_hours = total_km / speed_kmh if speed_kmh > 0 else 0
         return {'total_km': int(total_km), 'effective_driving_hours': round(effective_driving_hours, 1), 'route_loops': round(total_km / avg_commute_distance_km, 1) if avg_commute_distance_km > 0 else 0, 'used_known_distance': used_known_distance}
 
-    def _calculate_impressions_by_mode(self, modal_split, daily_traffic, daily_pedestrian, campaign_hours_per_day, total_days, start_date, city_name, spot_duration=10, loop_duration=60, is_exclusive=False, city_schedule=None, active_routes=None, city_locations=None):
+    def _calculate_impressions_by_mode(self, modal_split, campaign_hours_per_day, total_days, start_date, city_name, spot_duration=10, loop_duration=60, is_exclusive=False, city_schedule=None, active_routes=None, city_locations=None):
+        """
+        Impressions of one city period, from range sums over the city's audience cube (see impressions_engine).
+        modal_split applies to the start quarter; later quarters of the period use their own profile's split.
+        """
         share_of_voice = 1.0 if is_exclusive else (spot_duration / loop_duration if loop_duration > 0 else 0.16)
-        
-        # Base hourly estimate from city wide data
-        hourly_traffic_city_avg = daily_traffic / 24
-        hourly_pedestrian_city_avg = daily_pedestrian / 24
-        
-        total_campaign_traffic, total_campaign_pedestrian = 0, 0
-        current_date, events_encountered = start_date, []
-        
-        for i in range(total_days):
-            date_str = current_date.strftime('%Y-%m-%d')
-            hours_today = campaign_hours_per_day
-            if city_schedule and city_schedule.get(date_str):
-                day_data = city_schedule[date_str]
-                if not day_data.get('active', True): hours_today = 0
-                elif day_data.get('hours'): hours_today = self._parse_daily_hours(day_data['hours'])['hours']
-            
-            if hours_today > 0:
-                # ROUTE & TRAFFIC LOCATION BLENDING
-                # If we have routes for today, check intersection with BRAT locations
-                h_traffic, h_pedestrian = hourly_traffic_city_avg, hourly_pedestrian_city_avg
-                
-                if active_routes and city_locations:
-                    # Filter routes for today
-                    routes_today = [r for r in active_routes if self._is_route_active(r, current_date)]
-                    if routes_today:
-                        # Find intersections with audited locations
-                        intersected_locs = self._find_intersected_locations(routes_today, city_locations)
-                        if intersected_locs:
-                            # BLENDING LOGIC: (City Average + Audited Locations Average) / 2
-                            audited_traffic_avg = sum(l.daily_traffic for l in intersected_locs) / len(intersected_locs) / 24
-                            audited_pedestrian_avg = sum(l.pedestrian_traffic for l in intersected_locs) / len(intersected_locs) / 24
-                            
-                            h_traffic = (hourly_traffic_city_avg + audited_traffic_avg) / 2
-                            h_pedestrian = (hourly_pedestrian_city_avg + audited_pedestrian_avg) / 2
-
-                t_mult, p_mult, event_name = self.city_manager.get_event_multipliers(city_name, current_date)
-                if event_name and event_name not in events_encountered: events_encountered.append(event_name)
-                
-                total_campaign_traffic += h_traffic * hours_today * t_mult
-                total_campaign_pedestrian += h_pedestrian * hours_today * p_mult
-                
-            current_date += datetime.timedelta(days=1)
-            
-        auto_traffic = total_campaign_traffic * (modal_split.get('auto', 35) / 100)
-        cycling_traffic = total_campaign_traffic * (modal_split.get('cycling', 4) / 100)
-        walking_traffic = total_campaign_pedestrian * (modal_split.get('walking', 27) / 100)
-        
+        auto_traffic = cycling_traffic = walking_traffic = 0.0
+        events_encountered = []
+        for i, (q_start, q_days) in enumerate(impressions_engine.quarter_segments(start_date, total_days)):
+            traffic, pedestrian, events = impressions_engine.period_traffic(
+                self.city_manager, city_name, q_start, q_days,
+                campaign_hours_per_day, city_schedule, active_routes, city_locations, self._parse_daily_hours
+            )
+            q_split = (self.city_manager.audience_cube.modal_split(city_name, q_start) if i else None) or modal_split
+            q_auto, q_cycling, q_walking = self._traffic_by_mode(q_split, traffic, pedestrian)
+            auto_traffic += q_auto
+            cycling_traffic += q_cycling
+            walking_traffic += q_walking
+            for ev in events:
+                if ev not in events_encountered: events_encountered.append(ev)
+        return self._impressions_from_mode_traffic(auto_traffic, cycling_traffic, walking_traffic,
+                                                   events_encountered, is_exclusive, share_of_voice)
+
+    @staticmethod
+    def _traffic_by_mode(modal_split, total_campaign_traffic, total_campaign_pedestrian):
+        """(auto, cycling, walking) traffic of a modal split"""
+        return (total_campaign_traffic * (modal_split.get('auto', 35) / 100),
+                total_campaign_traffic * (modal_split.get('cycling', 4) / 100),
+                total_campaign_pedestrian * (modal_split.get('walking', 27) / 100))
+
+    def _impressions_from_traffic(self, modal_split, total_campaign_traffic, total_campaign_pedestrian, events_encountered, is_exclusive, share_of_voice):
+        auto_traffic, cycling_traffic, walking_traffic = self._traffic_by_mode(
+            modal_split, total_campaign_traffic, total_campaign_pedestrian)
+        return self._impressions_from_mode_traffic(auto_traffic, cycling_traffic, walking_traffic,
+                                                   events_encountered, is_exclusive, share_of_voice)
+
+    def _impressions_from_mode_traffic(self, auto_traffic, cycling_traffic, walking_traffic, events_encountered, is_exclusive, share_of_voice):
         visibility_factor = 1.0 if is_exclusive else 0.7
         auto_impressions = auto_traffic * 1.65 * visibility_factor * share_of_voice
         pedestrian_impressions = (walking_traffic + cycling_traffic) * visibility_factor * share_of_voice
@@ -303,56 +359,19 @@ class CampaignReportGenerator(ReportGenerator):
         return True
 
     def _find_intersected_locations(self, routes: list, locations: list) -> list:
-        """Identify which TrafficLocations are near the segments of the given routes"""
-        import math
-        intersected = []
-        
-        for loc in locations:
-            loc_lat, loc_lon = loc.latitude, loc.longitude
-            hit = False
-            for r in routes:
-                geojson = r.get('geojson_data')
-                if not geojson: continue
-                
-                # geojson is from st_folium 'all_drawings', usually a feature list or a single feature
-                # If it's a list, check each. If it's a polyline, check points.
-                geometry = geojson.get('geometry', {})
-                coords = geometry.get('coordinates', [])
-                
-                if geometry.get('type') == 'Point':
-                    # Distance between two points
-                    dist = self._haversine(loc_lat, loc_lon, coords[1], coords[0])
-                    if dist < 0.1: # 100 meters
-                        hit = True
-                elif geometry.get('type') == 'LineString':
-                    # Check each point in the line
-                    for pt in coords:
-                        dist = self._haversine(loc_lat, loc_lon, pt[1], pt[0])
-                        if dist < 0.1: # 100 meters
-                            hit = True
-                            break
-                
-                if hit: break
-            if hit: intersected.append(loc)
-        return intersected
-
-    def _haversine(self, lat1, lon1, lat2, lon2):
-        """Calculate distance between two GPS points in KM"""
-        import math
-        R = 6371 # Earth radius in KM
-        dLat = math.radians(lat2 - lat1)
-        dLon = math.radians(lon2 - lon1)
-        a = math.sin(dLat/2) * math.sin(dLat/2) + \
-            math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * \
-            math.sin(dLon/2) * math.sin(dLon/2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        return R * c
+        """Identify which TrafficLocations are within 100 m of the segments of the given routes"""
+        hit = set()
+        for r in routes:
+            # Precomputed once per route id + last_modified by the spatial index
+            hit.update(spatial_index.route_location_hits(r, locations))
+        return [loc for i, loc in enumerate(locations) if i in hit]
 
     def _calculate_ots_and_reach(self, total_impressions, route_loops, active_population):
         coverage_factor = min(route_loops / 10, 1.0)
         reach = int(active_population * 0.6 * coverage_factor)
         return {'reach': reach, 'ots': round(total_impressions / reach, 1) if reach > 0 else 1.0}
 
+    @span('impressions')
     def get_total_impressions_data(self, data, duration_metrics):
         """Standardized aggregation of impressions across all cities and vehicles"""
         total_impressions_data = {'auto': 0, 'pedestrian': 0, 'total': 0, 'events': []}
@@ -406,8 +425,6 @@ class CampaignReportGenerator(ReportGenerator):
                     
                     inc = self._calculate_impressions_by_mode(
                         city_profile.get('modal_split', default_modal_split), 
-                        city_profile.get('daily_traffic_total', 50000), 
-                        city_profile.get('daily_pedestrian_total', 50000), 
                         duration_metrics['hours_per_day'], 
                         (c_end - c_start).days+1, 
                         c_start, 
@@ -448,8 +465,6 @@ class CampaignReportGenerator(ReportGenerator):
                     
                     inc = self._calculate_impressions_by_mode(
                         city_profile.get('modal_split', default_modal_split), 
-                        city_profile.get('daily_traffic_total', 50000), 
-                        city_profile.get('daily_pedestrian_total', 50000), 
                         duration_metrics['hours_per_day'], 
                         (c_end - c_start).days+1, 
                         c_start, 
@@ -468,7 +483,7 @@ class CampaignReportGenerator(ReportGenerator):
                         if ev not in total_impressions_data['events']: total_impressions_data['events'].append(ev)
         return total_impressions_data
 
-    def _generate_campaign_pdf(self, data, output_path):
+    def _generate_campaign_pdf(self, data, output_path, impressions=None):
         from reportlab.lib import colors
         from reportlab.platypus import Table, TableStyle, Image, Paragraph, Spacer
         cities = data.get('cities', []) or ([data['city']] if data.get('city') else [])
@@ -507,7 +522,8 @@ class CampaignReportGenerator(ReportGenerator):
         city_display = remove_diacritics(data.get('display_cities', ", ".join(cities) if cities else 'Unknown'))
         
         # Get duration metrics early for the header
-        duration_metrics = self._calculate_multi_city_metrics(data) if ('city_periods' in data or 'city_schedules' in data) else self._calculate_campaign_duration(data['start_date'], data['end_date'], data['daily_hours'], data.get('custom_daily_schedule'))
+        with span('duration'):
+            duration_metrics = self._calculate_multi_city_metrics(data) if ('city_periods' in data or 'city_schedules' in data) else self._calculate_campaign_duration(data['start_date'], data['end_date'], data['daily_hours'], data.get('custom_daily_schedule'))
         
         # Determine Mode Label
         mode_key = data.get('campaign_mode', 'SINGLE_VEHICLE_CITY')
@@ -594,7 +610,8 @@ class CampaignReportGenerator(ReportGenerator):
         story.append(Paragraph("<b>2. " + remove_diacritics(_("Traffic Estimates (Campaign Interval)")) + "</b>", self.styles['Heading2']))
         story.append(Paragraph("<b>" + remove_diacritics(_("Global Metrics")) + "</b>", self.styles['Heading3']))
         
-        impressions = self.get_total_impressions_data(data, duration_metrics)
+        if impressions is None:
+            impressions = self.get_total_impressions_data(data, duration_metrics)
         avg_commute_distance = 8 # Default
         if cities:
             total_dist = 0
@@ -658,7 +675,8 @@ class CampaignReportGenerator(ReportGenerator):
         # Add Methodology Notes
         self._append_methodology_notes(story)
         
-        doc.build(story)
+        with span('doc.build'):
+            doc.build(story)
         
         return {
             'total_impressions': impressions['total'],
@@ -0,0 +1,50 @@
+"""
+Chart Cache
+Content-addressed store of rendered chart PNGs. A chart's key is a hash of
+its type, plotted data and style, so a report whose modal split (or
+audience split) matches an earlier one reuses the PNG instead of
+rendering it again.
+
+Entries are files named <key><suffix> in a DiskCache directory (.png for
+charts; the PoP annex keeps photo thumbnails the same way), evicted least
+recently used first once the cache exceeds its size budget.
+"""
+import hashlib
+import json
+import os
+from typing import Any
+
+import matplotlib
+
+from src.utils.disk_cache import DiskCache
+
+# Bump when the chart drawing code changes so old PNGs are not served
+CHART_STYLE_VERSION = 1
+
+CHART_CACHE_DIR = os.environ.get(
+    "CHART_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'reports', '.chart_cache')
+)
+# Disk budget; 0 disables the cache
+CHART_CACHE_MAX_BYTES = int(os.environ.get("CHART_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+
+def chart_key(chart_type: str, data: Any, style: Any) -> str:
+    """Hex digest identifying a chart's rendered bytes"""
+    payload = json.dumps(
+        [CHART_STYLE_VERSION, matplotlib.__version__, chart_type, data, style],
+        sort_keys=True, default=str
+    )
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+
+class ChartCache(DiskCache):
+    """On-disk LRU of rendered images (chart PNGs by default) keyed by chart_key()"""
+
+    def __init__(self, directory: str = CHART_CACHE_DIR, max_bytes: int = CHART_CACHE_MAX_BYTES,
+                 suffix: str = '.png') -> None:
+        super().__init__(directory, max_bytes, suffix)
+
+
+# Shared by the report generators
+chart_cache = ChartCache()
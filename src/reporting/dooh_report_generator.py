@@ -8,9 +8,13 @@ import os
 import random
 from src.reporting.report_generator import ReportGenerator
 from src.reporting.campaign_report_generator import CampaignReportGenerator, CAMPAIGN_MODES, ReportTemplates
+from src.reporting.report_inputs import extend_fingerprint
 from src.data.city_data_manager import CityDataManager
 from src.data.company_settings import CompanySettings
+from src.data.db_config import read_only_session
+from src.data.play_log_storage import PlayLogStorage
 from src.utils.map_service import MapService
+from src.utils.profiling import profile_fields, span, trace
 from src.utils.i18n import _, remove_diacritics
 
 class DoohReportGenerator(CampaignReportGenerator):
@@ -23,35 +27,74 @@ class DoohReportGenerator(CampaignReportGenerator):
 
     def generate_dooh_report(self, campaign_data, output_path=None, output_dir=None):
         """Main entry point for generating the DOOH/audited report."""
-        # Use unified preparation logic from parent
-        self._prepare_data_internal(campaign_data)
-
-        if output_path is None:
-            client_clean = remove_diacritics(campaign_data['client_name']).replace(' ', '_')
-            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"raport_dooh_{client_clean}_{timestamp}.pdf"
-            output_path = os.path.join(output_dir, filename) if output_dir and os.path.exists(output_dir) else self._get_report_path(filename)
-            
-        # Collect calculated metadata for persistence
-        metrics = self._generate_dooh_pdf(campaign_data, output_path)
-        self._open_report(output_path)
+        record = self.render_dooh_report(campaign_data, output_path, output_dir)
+        self._open_report(record['file_path'])
+        if record.get('reused'):
+            return record['file_path']
         
         # Save to database
         try:
-            self.report_storage.save_report_metadata(
-                campaign_id=campaign_data['id'],
-                report_type='dooh',
-                file_path=output_path,
-                file_name=os.path.basename(output_path),
-                frozen_data=metrics
-            )
+            self.report_storage.save_report_metadata(**record)
         except Exception as e:
             import logging
             logging.getLogger(__name__).error(f"Failed to save DOOH report history: {e}")
 
-        return output_path
+        return record['file_path']
+
+    def render_dooh_report(self, campaign_data, output_path=None, output_dir=None, baseline_metrics=None, reuse=True,
+                           recompute_stale_baseline=False):
+        """
+        Build the DOOH report PDF without opening it or saving its history row.
+        baseline_metrics replaces the latest saved standard report's metrics
+        (batch runs render both before saving). Returns the GeneratedReport fields.
+
+        Saved standard metrics whose inputs changed since are still used as the
+        baseline (the report keeps the frozen numbers) and flagged
+        'baseline_stale'; recompute_stale_baseline recomputes them instead.
+        With reuse, unchanged inputs (baseline included) return the latest DOOH
+        report, marked 'reused'.
+        """
+        with trace(f"dooh report {campaign_data.get('id')}") as report_trace:
+            with read_only_session(), span('fingerprint'):
+                inputs = self.input_fingerprint(campaign_data)
+                baseline_stale = False
+                if baseline_metrics is None:
+                    baseline_metrics = self.report_storage.get_latest_metrics(campaign_data['id'], report_type='standard')
+                    baseline_stale = self.frozen_metrics_stale(baseline_metrics, inputs)
+                    if baseline_stale and recompute_stale_baseline:
+                        baseline_metrics = None
+                inputs = extend_fingerprint(inputs, baseline=baseline_metrics)
+                latest = self.report_storage.get_latest_report(campaign_data['id'], 'dooh') if reuse else None
+            reused = self._reusable_report(latest, inputs, output_path, output_dir)
+            if reused:
+                return reused
+
+            # Use unified preparation logic from parent
+            with read_only_session(), span('prepare_data'):
+                self._prepare_data_internal(campaign_data)
 
-    def _generate_dooh_pdf(self, data, output_path):
+            if output_path is None:
+                client_clean = remove_diacritics(campaign_data['client_name']).replace(' ', '_')
+                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f"raport_dooh_{client_clean}_{timestamp}.pdf"
+                output_path = os.path.join(output_dir, filename) if output_dir and os.path.exists(output_dir) else self._get_report_path(filename)
+            
+            # Collect calculated metadata for persistence
+            with read_only_session():
+                metrics = self._generate_dooh_pdf(campaign_data, output_path, baseline_metrics)
+            metrics['inputs'] = inputs
+            metrics['baseline_stale'] = baseline_stale
+            record = {
+                'campaign_id': campaign_data['id'],
+                'report_type': 'dooh',
+                'file_path': output_path,
+                'file_name': os.path.basename(output_path),
+                'frozen_data': metrics
+            }
+        record['frozen_data'].update(profile_fields(report_trace))
+        return record
+
+    def _generate_dooh_pdf(self, data, output_path, baseline_metrics=None):
         doc = SimpleDocTemplate(output_path, pagesize=letter)
         story = []
         
@@ -94,7 +137,7 @@ class DoohReportGenerator(CampaignReportGenerator):
         # --- Section 2: Performance Indicators & Efficiency ---
         story.append(Paragraph("<b>2. " + remove_diacritics(_("Indicatori Performanta si Eficienta")) + "</b>", self.styles['Heading2']))
         
-        frozen_metrics = self.report_storage.get_latest_metrics(data['id'], report_type='standard')
+        frozen_metrics = baseline_metrics
         
         if frozen_metrics:
             base_impressions = frozen_metrics.get('total_impressions', 0)
@@ -112,7 +155,8 @@ class DoohReportGenerator(CampaignReportGenerator):
         vnnox_imports = aud_data.get('vnnox_imports', [])
         gps_imports = aud_data.get('gps_imports', [])
         
-        real_hours = sum(i.get('hours', 0) for i in vnnox_imports) if vnnox_imports else None
+        # Details imports from their play_hours rows, Overview imports from their summary
+        real_hours = PlayLogStorage().played_hours(data.get('id'), vnnox_imports)
         
         total_impressions = base_impressions
         if real_hours is not None and real_hours > 0 and total_campaign_hours_base > 0:
@@ -172,7 +216,11 @@ class DoohReportGenerator(CampaignReportGenerator):
         gps_stats = aud_data.get('gps_stats', {})
         vn_stats = aud_data.get('vnnox_stats', {})
         real_km = gps_stats.get('verified_km')
-        real_hours = vn_stats.get('confirmed_hours')
+        real_hours = vn_stats.get('confirmed_hours', real_hours)
+        # Played hours of the Details imports matched to the hourly audience of the city of each day
+        played_audience = PlayLogStorage().audited_audience(
+            data['id'], data.get('cities', []), self.city_manager.audience_cube,
+            self._city_date_ranges(data)) if data.get('id') else None
         
         tracking_data = [
             [Paragraph(f"<b>{remove_diacritics(_('Sistem Tracking'))}</b>", self.styles['Normal']), Paragraph(remove_diacritics(_("GPS Real-time Active") if real_km else _("GPS Estimativ")), self.styles['Normal'])],
@@ -180,6 +228,11 @@ class DoohReportGenerator(CampaignReportGenerator):
             [Paragraph(f"<b>{remove_diacritics(_('Timp Emisie Confirmat'))}</b>", self.styles['Normal']), Paragraph(f"{real_hours if real_hours is not None else total_campaign_hours_base:.1f} " + remove_diacritics(_("ore")), self.styles['Normal'])],
             [Paragraph(f"<b>{remove_diacritics(_('Distanta / Viteza Reala'))}</b>", self.styles['Normal']), Paragraph(f"{real_km:.1f} km" if real_km else f"{data.get('vehicle_speed_kmh', 25)} km/h", self.styles['Normal'])]
         ]
+        if played_audience:
+            tracking_data.append([
+                Paragraph(f"<b>{remove_diacritics(_('Audienta in Orele Difuzate'))}</b>", self.styles['Normal']),
+                Paragraph(f"{played_audience['traffic']:,.0f} " + remove_diacritics(_("vehicule")) + f" / {played_audience['pedestrian']:,.0f} " + remove_diacritics(_("pietoni")) + f" ({played_audience['played_hours']:.1f} " + remove_diacritics(_("ore")) + ")", self.styles['Normal'])
+            ])
         t_track = Table(tracking_data, colWidths=[2*inch, 4.5*inch])
         t_track.setStyle(TableStyle([
             ('LINEBELOW', (0,0), (-1,-1), 0.5, colors.lightgrey),
@@ -213,7 +266,8 @@ class DoohReportGenerator(CampaignReportGenerator):
         story.append(Paragraph(remove_diacritics(_("Generat la") + f": {datetime.datetime.now().strftime('%d.%m.%Y %H:%M')}"), disclaimer_style))
 
         self._append_dooh_methodology(story)
-        doc.build(story)
+        with span('doc.build'):
+            doc.build(story)
         
         return {
             'total_impressions_audited': total_impressions,
@@ -222,9 +276,41 @@ class DoohReportGenerator(CampaignReportGenerator):
             'ecpk': ecpk,
             'media_value': media_value,
             'real_hours': real_hours,
-            'real_km': real_km
+            'real_km': real_km,
+            'played_audience': played_audience
         }
 
+    @staticmethod
+    def _city_date_ranges(data):
+        """{city: [(start, end), ...]} of the campaign's itinerary, shared or per vehicle (dates, inclusive)"""
+        city_periods = data.get('city_periods') or {}
+        if not isinstance(city_periods, dict):
+            return {}
+        cities = set(data.get('cities') or [])
+        itineraries = []
+        for key, value in city_periods.items():
+            if key == '__meta__':
+                continue
+            # Shared itinerary: city -> periods; otherwise vehicle -> {city -> periods}
+            if key in cities or not isinstance(value, dict) or 'start' in value:
+                itineraries.append({key: value})
+            else:
+                itineraries.append(value)
+        ranges = {}
+        for itinerary in itineraries:
+            for city, periods in itinerary.items():
+                if city == '__meta__':
+                    continue
+                for period in (periods if isinstance(periods, list) else [periods]):
+                    if not isinstance(period, dict) or not period.get('start') or not period.get('end'):
+                        continue
+                    try:
+                        start, end = (datetime.date.fromisoformat(str(period[k])[:10]) for k in ('start', 'end'))
+                    except ValueError:
+                        continue
+                    ranges.setdefault(city, []).append((start, end))
+        return ranges
+
     def _append_dooh_methodology(self, story):
         """Adds a section explaining the DOOH calculation logic"""
         story.append(PageBreak())
@@ -0,0 +1,356 @@
+"""
+Fleet Analytics
+Interval index of everything that books a vehicle or driver, built in one
+pass over the campaigns and the vehicle/driver schedules:
+
+    campaign     city periods of each vehicle slot (primary, additional_vehicles,
+                 vehicle_timeline replacements; per-vehicle city_periods when
+                 the campaign is not in shared mode)
+    transit      the campaign's transit_periods
+    <event_type> VehicleSchedule / DriverSchedule rows (maintenance, leave, ...)
+
+Per resource the bookings are kept sorted by start, merged into disjoint
+busy segments with prefix sums of their lengths, and swept once for the
+segments booked more than once. Days used / utilization for any date
+window are then two binary searches; idle gaps and overlaps cost
+O(log n + k). The bookings touching a window come from a balanced tree
+over the start-sorted bookings augmented with each subtree's largest end,
+O((k + 1) log n) for k found whatever their lengths.
+
+Dates are inclusive and handled as date ordinals.
+"""
+import datetime
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.utils.profiling import span
+
+# Bookings that count as the resource working (utilization)
+WORK_KINDS = ('campaign', 'transit')
+# Campaign statuses that do not book resources
+EXCLUDED_STATUSES = ('draft', 'cancelled', 'canceled')
+
+
+class Booking(NamedTuple):
+    start: int  # date ordinal, inclusive
+    end: int
+    kind: str
+    source_id: Optional[str]  # Campaign / schedule id
+    label: str
+
+
+def _ordinal(value) -> Optional[int]:
+    if isinstance(value, datetime.datetime):
+        return value.date().toordinal()
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    if isinstance(value, str) and value:
+        try:
+            return datetime.date.fromisoformat(value[:10]).toordinal()
+        except ValueError:
+            return None
+    return None
+
+
+def _date(ordinal: int) -> datetime.date:
+    return datetime.date.fromordinal(ordinal)
+
+
+class Coverage:
+    """Disjoint, sorted day segments with O(log n) covered-day counts"""
+
+    def __init__(self, segments: Sequence[Tuple[int, int]]) -> None:
+        self.starts = [s for s, _ in segments]
+        self.ends = [e for _, e in segments]
+        # prefix[i] = days covered by segments[:i]
+        self.prefix = [0] + list(accumulate(e - s + 1 for s, e in segments))
+
+    def _span(self, lo: int, hi: int) -> Tuple[int, int]:
+        """Index range of the segments touching [lo, hi]"""
+        return bisect_left(self.ends, lo), bisect_right(self.starts, hi)
+
+    def days(self, lo: int, hi: int) -> int:
+        first, last = self._span(lo, hi)
+        if first >= last:
+            return 0
+        covered = self.prefix[last] - self.prefix[first]
+        covered -= max(0, lo - self.starts[first])
+        covered -= max(0, self.ends[last - 1] - hi)
+        return covered
+
+    def segments(self, lo: int, hi: int) -> List[Tuple[int, int]]:
+        """Segments clipped to [lo, hi]"""
+        first, last = self._span(lo, hi)
+        return [(max(self.starts[i], lo), min(self.ends[i], hi)) for i in range(first, last)]
+
+    def gaps(self, lo: int, hi: int) -> List[Tuple[int, int]]:
+        """Uncovered runs of [lo, hi]"""
+        gaps = []
+        cursor = lo
+        for start, end in self.segments(lo, hi):
+            if start > cursor:
+                gaps.append((cursor, start - 1))
+            cursor = end + 1
+        if cursor <= hi:
+            gaps.append((cursor, hi))
+        return gaps
+
+
+class IntervalIndex:
+    """Bookings of one resource"""
+
+    def __init__(self, bookings: Iterable[Booking]) -> None:
+        self.bookings = sorted(bookings)
+        # Implicit balanced tree: the node of bookings[l:r] is (l + r) // 2 and
+        # _subtree_end[node] the largest end in bookings[l:r]
+        self._subtree_end = [0] * len(self.bookings)
+        self._build(0, len(self.bookings))
+
+        merged: List[List[int]] = []
+        for b in self.bookings:
+            if merged and b.start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], b.end)
+            else:
+                merged.append([b.start, b.end])
+        self.busy = Coverage([tuple(m) for m in merged])
+
+        # Days covered by two or more bookings (sweep over per-day start/end deltas)
+        deltas: Dict[int, int] = {}
+        for b in self.bookings:
+            deltas[b.start] = deltas.get(b.start, 0) + 1
+            deltas[b.end + 1] = deltas.get(b.end + 1, 0) - 1
+        double, depth, opened = [], 0, None
+        for day in sorted(deltas):
+            depth += deltas[day]
+            if depth >= 2 and opened is None:
+                opened = day
+            elif depth < 2 and opened is not None:
+                double.append((opened, day - 1))
+                opened = None
+        self.double = Coverage(double)
+
+    def __len__(self) -> int:
+        return len(self.bookings)
+
+    def _build(self, l: int, r: int) -> int:
+        if l >= r:
+            return -1
+        node = (l + r) // 2
+        self._subtree_end[node] = max(self.bookings[node].end, self._build(l, node), self._build(node + 1, r))
+        return self._subtree_end[node]
+
+    def _collect(self, l: int, r: int, lo: int, hi: int, found: List[Booking]) -> None:
+        if l >= r:
+            return
+        node = (l + r) // 2
+        # Every booking below ends before the window
+        if self._subtree_end[node] < lo:
+            return
+        self._collect(l, node, lo, hi, found)
+        booking = self.bookings[node]
+        # This booking and everything after it start after the window
+        if booking.start > hi:
+            return
+        if booking.end >= lo:
+            found.append(booking)
+        self._collect(node + 1, r, lo, hi, found)
+
+    def overlapping(self, lo: int, hi: int) -> List[Booking]:
+        """Bookings touching [lo, hi], in start order"""
+        found: List[Booking] = []
+        self._collect(0, len(self.bookings), lo, hi, found)
+        return found
+
+
+def _campaign_bookings(campaign: Dict[str, Any]) -> Iterable[Tuple[str, str, Booking]]:
+    """(resource type, resource id, Booking) of every vehicle/driver a campaign books"""
+    c_start, c_end = _ordinal(campaign.get('start_date')), _ordinal(campaign.get('end_date'))
+    name = campaign.get('campaign_name') or campaign.get('id') or ''
+    city_periods = campaign.get('city_periods') or {}
+    if not isinstance(city_periods, dict):
+        city_periods = {}
+    shared_mode = (city_periods.get('__meta__') or {}).get('shared_mode', True)
+
+    def periods_of(vehicle_id):
+        """(start, end, city) of a vehicle slot; the campaign period without city periods"""
+        if shared_mode:
+            itinerary = {k: v for k, v in city_periods.items() if k != '__meta__'}
+        else:
+            itinerary = city_periods.get(vehicle_id) or {}
+        found = []
+        for city, periods in (itinerary.items() if isinstance(itinerary, dict) else ()):
+            for period in (periods if isinstance(periods, list) else [periods]):
+                if not isinstance(period, dict):
+                    continue
+                start, end = _ordinal(period.get('start')), _ordinal(period.get('end'))
+                if start is not None and end is not None and end >= start:
+                    found.append((start, end, city))
+        if not found and c_start is not None and c_end is not None and c_end >= c_start:
+            found.append((c_start, c_end, None))
+        return found
+
+    def booking(start, end, kind, label):
+        return Booking(start, end, kind, campaign.get('id'), label)
+
+    def label(city):
+        return f"{name} ({city})" if city else name
+
+    primary_vehicle = campaign.get('vehicle_id')
+    slots = [(primary_vehicle, campaign.get('driver_id'))]
+    for av in (campaign.get('additional_vehicles') or []):
+        if isinstance(av, dict):
+            slots.append((av.get('vehicle_id'), av.get('driver_id')))
+        elif isinstance(av, str):
+            slots.append((av, None))
+    driver_of = {vid: did for vid, did in slots if vid and did}
+
+    timeline = [e for e in (campaign.get('vehicle_timeline') or []) if isinstance(e, dict) and e.get('vehicle_id')]
+    for index, (vehicle_id, driver_id) in enumerate(slots):
+        periods = periods_of(vehicle_id)
+        for start, end, city in periods:
+            if driver_id:
+                yield 'driver', driver_id, booking(start, end, 'campaign', label(city))
+            if not vehicle_id or (index == 0 and timeline):
+                continue
+            yield 'vehicle', vehicle_id, booking(start, end, 'campaign', label(city))
+
+    # Replaced primary vehicle: each timeline vehicle books its own stretch of the primary slot
+    for entry in timeline:
+        t_start = _ordinal(entry.get('start_date'))
+        t_end = _ordinal(entry.get('end_date'))
+        t_start = c_start if t_start is None else t_start
+        t_end = c_end if t_end is None else t_end
+        if t_start is None or t_end is None:
+            continue
+        # Without an itinerary of its own, a replacement follows the primary vehicle's
+        own = shared_mode or entry['vehicle_id'] in city_periods
+        for start, end, city in periods_of(entry['vehicle_id'] if own else primary_vehicle):
+            start, end = max(start, t_start), min(end, t_end)
+            if start <= end:
+                yield 'vehicle', entry['vehicle_id'], booking(start, end, 'campaign', label(city))
+
+    for tp in (campaign.get('transit_periods') or []):
+        if not isinstance(tp, dict):
+            continue
+        start, end = _ordinal(tp.get('start')), _ordinal(tp.get('end'))
+        if start is None or end is None or end < start:
+            continue
+        transit_label = f"{tp.get('origin') or '?'} -> {tp.get('destination') or '?'} ({name})"
+        vehicle_id = tp.get('vehicle_id')
+        if vehicle_id:
+            yield 'vehicle', vehicle_id, booking(start, end, 'transit', transit_label)
+        if driver_of.get(vehicle_id):
+            yield 'driver', driver_of[vehicle_id], booking(start, end, 'transit', transit_label)
+
+
+class FleetAnalytics:
+    """Utilization, idle gaps and overlaps of vehicles and drivers over any date window"""
+
+    def __init__(self, bookings: Dict[Tuple[str, str], List[Booking]]) -> None:
+        self._bookings = bookings
+        self._indexes: Dict[Tuple[str, str, Optional[Tuple[str, ...]]], IntervalIndex] = {}
+
+    @classmethod
+    def build(cls, campaigns: Iterable[Dict[str, Any]], vehicle_schedules: Iterable[Dict[str, Any]] = (),
+              driver_schedules: Iterable[Dict[str, Any]] = (),
+              excluded_statuses: Sequence[str] = EXCLUDED_STATUSES) -> 'FleetAnalytics':
+        """
+        Index campaign dicts (get_campaign_summaries(include_schedule=True) or
+        full dicts), VehicleManager.get_vehicle_schedules() rows and
+        DriverManager.get_driver_schedules() rows.
+        """
+        bookings: Dict[Tuple[str, str], List[Booking]] = {}
+
+        def add(resource_type, resource_id, entry):
+            bookings.setdefault((resource_type, resource_id), []).append(entry)
+
+        for campaign in campaigns:
+            if (campaign.get('status') or '').lower() in excluded_statuses:
+                continue
+            for resource_type, resource_id, entry in _campaign_bookings(campaign):
+                add(resource_type, resource_id, entry)
+
+        for s in vehicle_schedules:
+            start, end = _ordinal(s.get('start')), _ordinal(s.get('end'))
+            if s.get('vehicle_id') and start is not None and end is not None and end >= start:
+                add('vehicle', s['vehicle_id'], Booking(start, end, s.get('type') or 'other', s.get('id'),
+                                                        s.get('details') or (s.get('type') or '').upper()))
+        for s in driver_schedules:
+            start, end = _ordinal(s.get('start_date')), _ordinal(s.get('end_date'))
+            if s.get('driver_id') and start is not None and end is not None and end >= start:
+                add('driver', s['driver_id'], Booking(start, end, s.get('event_type') or 'other', s.get('id'),
+                                                      s.get('details') or (s.get('event_type') or '').upper()))
+        return cls(bookings)
+
+    @classmethod
+    @span('FleetAnalytics.load')
+    def load(cls, storage=None, vehicle_manager=None, driver_manager=None,
+             include_archived: bool = False) -> 'FleetAnalytics':
+        """Build from the database: campaign schedules, vehicle schedules and driver schedules"""
+        from src.data.campaign_storage import CampaignStorage
+        from src.data.db_config import read_only_session
+        from src.data.driver_manager import DriverManager
+        from src.data.vehicle_manager import VehicleManager
+
+        storage = storage or CampaignStorage()
+        vehicle_manager = vehicle_manager or VehicleManager()
+        driver_manager = driver_manager or DriverManager()
+        with read_only_session():
+            campaigns = storage.get_campaign_summaries(include_archived=include_archived, include_schedule=True)
+            vehicle_schedules = vehicle_manager.get_vehicle_schedules()
+            driver_schedules = driver_manager.get_driver_schedules()
+        return cls.build(campaigns, vehicle_schedules, driver_schedules)
+
+    def resource_ids(self, resource_type: str) -> List[str]:
+        return sorted(rid for rtype, rid in self._bookings if rtype == resource_type)
+
+    def index(self, resource_type: str, resource_id: str, kinds: Optional[Sequence[str]] = None) -> IntervalIndex:
+        """IntervalIndex of a resource's bookings (only `kinds` when given); built once per kind set"""
+        kinds_key = tuple(sorted(kinds)) if kinds is not None else None
+        key = (resource_type, resource_id, kinds_key)
+        index = self._indexes.get(key)
+        if index is None:
+            entries = self._bookings.get((resource_type, resource_id), [])
+            if kinds_key is not None:
+                entries = [b for b in entries if b.kind in kinds_key]
+            index = self._indexes[key] = IntervalIndex(entries)
+        return index
+
+    def utilization(self, resource_type: str, resource_id: str, start_date: datetime.date,
+                    end_date: datetime.date, kinds: Sequence[str] = WORK_KINDS) -> Dict[str, Any]:
+        """
+        {'days_used', 'total_days', 'utilization' (%), 'campaigns'} of a
+        resource in [start_date, end_date]; days booked several times count once.
+        """
+        lo, hi = start_date.toordinal(), end_date.toordinal()
+        total_days = max(hi - lo + 1, 0)
+        index = self.index(resource_type, resource_id, kinds)
+        days_used = index.busy.days(lo, hi) if total_days else 0
+        campaigns = {b.source_id for b in self.index(resource_type, resource_id, ('campaign',)).overlapping(lo, hi)}
+        return {
+            'days_used': days_used,
+            'total_days': total_days,
+            'utilization': (days_used / total_days * 100) if total_days > 0 else 0,
+            'campaigns': len(campaigns)
+        }
+
+    def idle_gaps(self, resource_type: str, resource_id: str, start_date: datetime.date,
+                  end_date: datetime.date, min_days: int = 1,
+                  kinds: Optional[Sequence[str]] = None) -> List[Tuple[datetime.date, datetime.date]]:
+        """(first, last) day of each run of at least min_days without bookings (any kind by default)"""
+        gaps = self.index(resource_type, resource_id, kinds).busy.gaps(start_date.toordinal(), end_date.toordinal())
+        return [(_date(s), _date(e)) for s, e in gaps if e - s + 1 >= min_days]
+
+    def overlaps(self, resource_type: str, resource_id: str, start_date: datetime.date,
+                 end_date: datetime.date, kinds: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Double-booked stretches: {'start', 'end', 'bookings'} with the bookings involved"""
+        index = self.index(resource_type, resource_id, kinds)
+        found = []
+        for s, e in index.double.segments(start_date.toordinal(), end_date.toordinal()):
+            found.append({'start': _date(s), 'end': _date(e), 'bookings': index.overlapping(s, e)})
+        return found
+
+    def bookings(self, resource_type: str, resource_id: str, start_date: datetime.date,
+                 end_date: datetime.date, kinds: Optional[Sequence[str]] = None) -> List[Booking]:
+        return self.index(resource_type, resource_id, kinds).overlapping(start_date.toordinal(), end_date.toordinal())
@@ -1,6 +1,6 @@
 """
 Fleet Utilization Report Generator
-Generates reports on vehicle and driver utilization.
+Generates reports on vehicle and driver utilization (figures from FleetAnalytics).
 """
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
@@ -9,9 +9,11 @@ from reportlab.lib.units import inch
 from reportlab.lib.styles import ParagraphStyle
 import datetime
 from src.reporting.report_generator import ReportGenerator
+from src.reporting.fleet_analytics import FleetAnalytics, WORK_KINDS
 from src.data.campaign_storage import CampaignStorage
 from src.data.vehicle_manager import VehicleManager
 from src.data.driver_manager import DriverManager
+from src.data.db_config import read_only_session
 
 class FleetUtilizationReportGenerator(ReportGenerator):
     """Generate fleet utilization and performance reports"""
@@ -24,7 +26,8 @@ class FleetUtilizationReportGenerator(ReportGenerator):
         
     def generate_vehicle_utilization_report(self, start_date: datetime.date, 
                                             end_date: datetime.date, 
-                                            output_path: str = None):
+                                            output_path: str = None,
+                                            analytics: FleetAnalytics = None):
         """Generate vehicle utilization report for a date range"""
         if output_path is None:
             timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -42,14 +45,17 @@ class FleetUtilizationReportGenerator(ReportGenerator):
         story.append(Paragraph(period_text, self.styles['Heading2']))
         story.append(Spacer(1, 24))
         
-        # Get all vehicles and campaigns
-        vehicles = self.vehicle_manager.get_all_vehicles()
-        campaigns = self.storage.get_all_campaigns()
+        # Get all vehicles; bookings (campaigns, transits, schedules) come from one index
+        with read_only_session():
+            vehicles = self.vehicle_manager.get_all_vehicles()
+        if analytics is None:
+            analytics = FleetAnalytics.load(self.storage, self.vehicle_manager, self.driver_manager)
         
         # Calculate utilization for each vehicle
         total_days = (end_date - start_date).days + 1
         
         utilization_data = []
+        overlap_rows = []
         
         for vehicle in vehicles:
             vehicle_id = vehicle['id']
@@ -57,25 +63,23 @@ class FleetUtilizationReportGenerator(ReportGenerator):
             registration = vehicle.get('registration', '')
             driver_name = vehicle.get('driver_name', 'Neasignat')
             
-            # Find campaigns for this vehicle in date range
-            vehicle_campaigns = [
-                c for c in campaigns 
-                if c.get('vehicle_id') == vehicle_id and 
-                self._campaign_in_range(c, start_date, end_date)
-            ]
-            
-            # Calculate days used
-            days_used = self._calculate_days_used(vehicle_campaigns, start_date, end_date)
-            utilization_pct = (days_used / total_days * 100) if total_days > 0 else 0
+            usage = analytics.utilization('vehicle', vehicle_id, start_date, end_date)
             
             utilization_data.append({
                 'vehicle': f"{vehicle_name} ({registration})",
                 'driver': driver_name,
-                'campaigns': len(vehicle_campaigns),
-                'days_used': days_used,
-                'utilization': utilization_pct
+                'campaigns': usage['campaigns'],
+                'days_used': usage['days_used'],
+                'utilization': usage['utilization']
             })
             
+            for overlap in analytics.overlaps('vehicle', vehicle_id, start_date, end_date):
+                overlap_rows.append([
+                    f"{vehicle_name} ({registration})",
+                    f"{overlap['start'].strftime('%d.%m.%Y')} - {overlap['end'].strftime('%d.%m.%Y')}",
+                    Paragraph("<br/>".join(b.label for b in overlap['bookings']), self.styles['Normal'])
+                ])
+            
         # Sort by utilization descending
         utilization_data.sort(key=lambda x: x['utilization'], reverse=True)
         
@@ -132,6 +136,23 @@ class FleetUtilizationReportGenerator(ReportGenerator):
             
             story.append(summary_table)
             
+        # Double bookings (campaign vs campaign, transit or maintenance)
+        if overlap_rows:
+            story.append(Spacer(1, 24))
+            story.append(Paragraph("Suprapuneri (Rezervari Duble)", self.styles['Heading2']))
+            story.append(Spacer(1, 12))
+            t_overlaps = Table([['Vehicul', 'Perioada', 'Rezervari']] + overlap_rows,
+                               colWidths=[2*inch, 1.8*inch, 2.9*inch], repeatRows=1)
+            t_overlaps.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ]))
+            story.append(t_overlaps)
+            
         doc.build(story)
         self._open_report(output_path)
         return output_path
@@ -156,9 +177,12 @@ class FleetUtilizationReportGenerator(ReportGenerator):
         story.append(Paragraph(period_text, self.styles['Heading2']))
         story.append(Spacer(1, 24))
         
-        # Get all drivers and campaigns
-        drivers = self.driver_manager.get_all_drivers()
-        campaigns = self.storage.get_all_campaigns()
+        # Get all drivers and campaigns (full dicts: km and clients are not in the summaries)
+        with read_only_session():
+            drivers = self.driver_manager.get_all_drivers()
+            campaigns = self.storage.get_all_campaigns()
+            analytics = FleetAnalytics.build(campaigns, driver_schedules=self.driver_manager.get_driver_schedules())
+        campaigns_by_id = {c['id']: c for c in campaigns}
         
         performance_data = []
         
@@ -166,25 +190,25 @@ class FleetUtilizationReportGenerator(ReportGenerator):
             driver_id = driver['id']
             driver_name = driver['name']
             
-            # Find campaigns for this driver
-            driver_campaigns = [
-                c for c in campaigns 
-                if c.get('driver_id') == driver_id and 
-                self._campaign_in_range(c, start_date, end_date)
-            ]
+            # Campaigns this driver drives in (primary or additional vehicle)
+            campaign_ids = {b.source_id for b in analytics.bookings('driver', driver_id, start_date, end_date,
+                                                                    kinds=('campaign',))}
+            driver_campaigns = [campaigns_by_id[cid] for cid in campaign_ids if cid in campaigns_by_id]
             
             # Calculate metrics
             total_campaigns = len(driver_campaigns)
-            total_km = sum(c.get('known_distance_total', 0) for c in driver_campaigns)
+            total_km = sum(c.get('known_distance_total') or 0 for c in driver_campaigns)
             
             # Get unique clients
             clients = set(c.get('client_name') for c in driver_campaigns if c.get('client_name'))
+            usage = analytics.utilization('driver', driver_id, start_date, end_date, kinds=WORK_KINDS)
             
             performance_data.append({
                 'driver': driver_name,
                 'campaigns': total_campaigns,
                 'clients': len(clients),
-                'total_km': total_km
+                'total_km': total_km,
+                'days_used': usage['days_used']
             })
             
         # Sort by campaigns descending
@@ -192,7 +216,7 @@ class FleetUtilizationReportGenerator(ReportGenerator):
         
         # Create table
         table_data = [
-            ['Sofer', 'Campanii', 'Clienti Unici', 'Total KM']
+            ['Sofer', 'Campanii', 'Clienti Unici', 'Zile Lucrate', 'Total KM']
         ]
         
         for data in performance_data:
@@ -200,10 +224,11 @@ class FleetUtilizationReportGenerator(ReportGenerator):
                 data['driver'],
                 str(data['campaigns']),
                 str(data['clients']),
+                str(data['days_used']),
                 f"{data['total_km']:,} km"
             ])
             
-        t = Table(table_data, colWidths=[2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
+        t = Table(table_data, colWidths=[2*inch, 1.1*inch, 1.2*inch, 1.1*inch, 1.3*inch])
         t.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -219,37 +244,3 @@ class FleetUtilizationReportGenerator(ReportGenerator):
         doc.build(story)
         self._open_report(output_path)
         return output_path
-        
-    def _campaign_in_range(self, campaign: dict, start_date: datetime.date, 
-                           end_date: datetime.date) -> bool:
-        """Check if campaign overlaps with date range"""
-        try:
-            c_start = datetime.date.fromisoformat(str(campaign['start_date']))
-            c_end = datetime.date.fromisoformat(str(campaign['end_date']))
-            return c_start <= end_date and c_end >= start_date
-        except:
-            return False
-            
-    def _calculate_days_used(self, campaigns: list, start_date: datetime.date, 
-                            end_date: datetime.date) -> int:
-        """Calculate total unique days used by campaigns"""
-        used_days = set()
-        
-        for campaign in campaigns:
-            try:
-                c_start = datetime.date.fromisoformat(str(campaign['start_date']))
-                c_end = datetime.date.fromisoformat(str(campaign['end_date']))
-                
-                # Clip to analysis range
-                actual_start = max(c_start, start_date)
-                actual_end = min(c_end, end_date)
-                
-                # Add all days in range
-                current = actual_start
-                while current <= actual_end:
-                    used_days.add(current)
-                    current += datetime.timedelta(days=1)
-            except:
-                continue
-                
-        return len(used_days)
@@ -0,0 +1,144 @@
+"""
+NumPy impressions engine.
+
+Computes a city period's traffic exposure from the city's audience cube
+(src/data/audience_cube.py): the period total is a prefix-sum difference,
+and only the days that deviate from the default hours or blend in audited
+traffic locations are corrected from per-day arrays (hours, route-active
+masks, location hits). CampaignReportGenerator._calculate_impressions_by_mode
+uses it, one calendar quarter at a time; tests/test_impressions_engine.py
+checks it against the previous day-by-day loop (exactly, within a quarter).
+"""
+import datetime
+
+import numpy as np
+
+from src.utils import spatial_index
+
+
+def day_range(start_date, total_days):
+    """datetime64[D] array of the total_days days from start_date"""
+    start = np.datetime64(start_date, 'D')
+    return start + np.arange(max(total_days, 0))
+
+
+def quarter_segments(start_date, total_days):
+    """(start, days) of the calendar-quarter pieces of the total_days days from start_date"""
+    segments = []
+    day, end = start_date, start_date + datetime.timedelta(days=max(total_days, 0))
+    while day < end:
+        month = (day.month - 1) // 3 * 3 + 3
+        quarter_end = datetime.date(day.year + month // 12, month % 12 + 1, 1)
+        segments.append((day, (min(quarter_end, end) - day).days))
+        day = min(quarter_end, end)
+    return segments
+
+
+def daily_hours(dates, default_hours, city_schedule, parse_hours):
+    """
+    Campaign hours per day: default_hours, overridden by the city schedule
+    (inactive day -> 0, explicit 'hours' -> parse_hours(...)['hours']).
+    """
+    hours = np.full(len(dates), float(default_hours))
+    if not city_schedule or not len(dates):
+        return hours
+    index = {day: i for i, day in enumerate(np.datetime_as_string(dates, unit='D').tolist())}
+    parsed = {}
+    for date_str, day_data in city_schedule.items():
+        i = index.get(date_str)
+        if i is None or not day_data:
+            continue
+        if not day_data.get('active', True):
+            hours[i] = 0
+        elif day_data.get('hours'):
+            h_str = day_data['hours']
+            if h_str not in parsed:
+                parsed[h_str] = parse_hours(h_str)['hours']
+            hours[i] = parsed[h_str]
+    return hours
+
+
+def _as_date(value):
+    return datetime.date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def route_active_mask(routes, dates):
+    """(days x routes) bool array: route date_start <= day <= date_end (open ends allowed)"""
+    mask = np.ones((len(dates), len(routes)), dtype=bool)
+    for j, route in enumerate(routes):
+        r_start, r_end = _as_date(route.get('date_start')), _as_date(route.get('date_end'))
+        if r_start:
+            mask[:, j] &= dates >= np.datetime64(r_start, 'D')
+        if r_end:
+            mask[:, j] &= dates <= np.datetime64(r_end, 'D')
+    return mask
+
+
+def route_location_hits(routes, locations):
+    """(routes x locations) bool array: location within 100 m of a route segment"""
+    hits = np.zeros((len(routes), len(locations)), dtype=bool)
+    if not routes or not locations:
+        return hits
+    for j, route in enumerate(routes):
+        hits[j, spatial_index.route_location_hits(route, locations)] = True
+    return hits
+
+
+def crossed_location_hourly(dates, routes, locations, attribute):
+    """
+    (crossed, hourly) per day: whether the day's active routes cross audited
+    locations, and the average hourly `attribute` of the crossed locations
+    (0 where none is crossed).
+    """
+    crossed_days = np.zeros(len(dates), dtype=bool)
+    hourly = np.zeros(len(dates))
+    if not routes or not locations:
+        return crossed_days, hourly
+    crossed = route_active_mask(routes, dates).astype(np.int64) @ route_location_hits(routes, locations).astype(np.int64) > 0
+    counts = crossed.sum(axis=1)
+    values = np.array([getattr(loc, attribute) for loc in locations], dtype=np.int64)
+    sums = crossed.astype(np.int64) @ values
+    crossed_days = counts > 0
+    hourly[crossed_days] = sums[crossed_days] / counts[crossed_days] / 24
+    return crossed_days, hourly
+
+
+def period_traffic(city_manager, city_name, start_date, total_days, default_hours, city_schedule,
+                   routes, locations, parse_hours):
+    """
+    (traffic, pedestrian, event names) exposed during one city period.
+
+    The city's hourly audience x event multiplier summed over the period is
+    one range-sum lookup in its audience cube, times default_hours. Days that
+    differ from that baseline (own hours in the city schedule, or routes
+    crossing audited locations, where the hourly audience becomes
+    (city + locations average) / 2) are corrected one by one.
+    """
+    if not city_name or total_days <= 0:
+        return 0, 0, []
+    cube = city_manager.audience_cube
+    totals = cube.range_totals(city_name, start_date, start_date + datetime.timedelta(days=total_days - 1))
+    traffic = float(default_hours) * totals['traffic']
+    pedestrian = float(default_hours) * totals['pedestrian']
+
+    dates = day_range(start_date, total_days)
+    hours = daily_hours(dates, default_hours, city_schedule, parse_hours)
+    active = hours > 0
+    crossed_t, location_t = crossed_location_hourly(dates, routes, locations, 'daily_traffic')
+    crossed_p, location_p = crossed_location_hourly(dates, routes, locations, 'pedestrian_traffic')
+    t_mult, p_mult, event_index, event_names = cube.event_multiplier_series(city_name, start_date, total_days)
+
+    corrected = (hours != default_hours) | crossed_t
+    if corrected.any():
+        city_t, city_p = cube.daily_audience(city_name, start_date, total_days)
+        day_t = np.where(crossed_t, (city_t + location_t * t_mult) / 2, city_t)
+        day_p = np.where(crossed_p, (city_p + location_p * p_mult) / 2, city_p)
+        traffic += float(((hours * day_t - default_hours * city_t)[corrected]).sum())
+        pedestrian += float(((hours * day_p - default_hours * city_p)[corrected]).sum())
+
+    events = []
+    for i in event_index[active & (event_index >= 0)].tolist():
+        name = event_names[i]
+        if name and name not in events:
+            events.append(name)
+    return traffic, pedestrian, events
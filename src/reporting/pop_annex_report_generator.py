@@ -3,12 +3,14 @@ Proof of Play (PoP) Annex Report Generator
 ===========================================
 Generates a standalone PDF annex with:
   - Per-spot VnNox table (Media Name, Screen, Plays, Duration, Date Range)
+  - Per day / screen delivery, from the play_hours rollups
   - GPS Route Map (one per day, colored polylines)
 
 This is a third, independent report type (report_type='pop_annex').
 """
 
 import os
+import io
 import datetime
 import tempfile
 from reportlab.lib.pagesizes import letter
@@ -18,21 +20,47 @@ from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.lib.styles import ParagraphStyle
 from src.reporting.report_generator import ReportGenerator
+from src.reporting.chart_cache import ChartCache, chart_key
+from src.reporting.streaming_story import StreamingStory
 from src.data.company_settings import CompanySettings
 from src.data.report_storage import ReportStorage
+from src.data.db_config import read_only_session
 from src.utils.i18n import _, remove_diacritics
+from src.utils.profiling import profile_fields, span, trace
+
+
+# Downscaled gallery photos, shared across annexes (see _photo_thumbnail)
+THUMBNAIL_CACHE_DIR = os.environ.get(
+    "THUMBNAIL_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'reports', '.thumbnail_cache')
+)
+thumbnail_cache = ChartCache(THUMBNAIL_CACHE_DIR, int(os.environ.get("THUMBNAIL_CACHE_MAX_BYTES", 200 * 1024 * 1024)),
+                             suffix='.jpg')
+
+# Story marker: close the current volume PDF and continue in the next one
+VOLUME_BREAK = object()
 
 
 class PopAnnexReportGenerator(ReportGenerator):
     """Generates the optional Proof-of-Play Annex PDF."""
 
+    # Rows per spot Table flowable (keeps reportlab's table splitting cheap)
+    SPOT_ROWS_PER_TABLE = 200
+    # Volume budget when split_volumes is on
+    VOLUME_MAX_ROWS = 20000
+    VOLUME_MAX_PHOTOS = 200
+    # Gallery photos are drawn 3in wide: ~300 dpi
+    THUMBNAIL_MAX_PX = 900
+    THUMBNAIL_QUALITY = 80
+
     def __init__(self, data_manager):
         super().__init__(data_manager)
         self.company_settings = CompanySettings()
         self.report_storage = ReportStorage()
 
     def generate_pop_annex(self, campaign_data, include_map=True,
-                           include_spots=True, include_photos=True, output_dir=None) -> str:
+                           include_spots=True, include_photos=True, output_dir=None,
+                           split_volumes=True) -> str:
         """
         Generate the PoP Annex PDF.
 
@@ -41,11 +69,36 @@ class PopAnnexReportGenerator(ReportGenerator):
         campaign_data   : dict – full campaign dict including audited_data
         include_map     : bool – embed GPS route map
         include_spots   : bool – embed VnNox spot table
+        include_photos  : bool – embed the photo gallery
         output_dir      : str | None – target directory
+        split_volumes   : bool – continue in numbered volume PDFs past
+                          VOLUME_MAX_ROWS spot rows / VOLUME_MAX_PHOTOS photos
 
         Returns
         -------
-        str – absolute path to the generated PDF
+        str – absolute path to the generated PDF (the first volume)
+        """
+        record = self.render_pop_annex(campaign_data, include_map=include_map, include_spots=include_spots,
+                                       include_photos=include_photos, output_dir=output_dir,
+                                       split_volumes=split_volumes)
+        self._open_report(record['file_path'])
+
+        # Persist metadata
+        try:
+            self.report_storage.save_report_metadata(**record)
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).error(
+                f"Failed to save PoP annex history: {e}")
+
+        return record['file_path']
+
+    def render_pop_annex(self, campaign_data, include_map=True,
+                         include_spots=True, include_photos=True, output_dir=None,
+                         split_volumes=True) -> dict:
+        """
+        Build the PoP Annex PDF without opening it or saving its history row.
+        Returns the GeneratedReport fields.
         """
         client_clean = remove_diacritics(
             campaign_data.get('client_name', 'Client')).replace(' ', '_')
@@ -57,39 +110,89 @@ class PopAnnexReportGenerator(ReportGenerator):
             else self._get_report_path(filename)
         )
 
-        self._build_pdf(campaign_data, output_path,
-                        include_map=include_map, include_spots=include_spots,
-                        include_photos=include_photos)
-        self._open_report(output_path)
-
-        # Persist metadata
-        try:
-            self.report_storage.save_report_metadata(
-                campaign_id=campaign_data['id'],
-                report_type='pop_annex',
-                file_path=output_path,
-                file_name=filename,
-                frozen_data={
-                    'include_map': include_map,
-                    'include_spots': include_spots,
-                    'include_photos': include_photos,
-                }
-            )
-        except Exception as e:
-            import logging
-            logging.getLogger(__name__).error(
-                f"Failed to save PoP annex history: {e}")
-
-        return output_path
+        with trace(f"pop_annex report {campaign_data.get('id')}") as report_trace, read_only_session():
+            volumes = self._build_pdf(campaign_data, output_path,
+                                      include_map=include_map, include_spots=include_spots,
+                                      include_photos=include_photos, split_volumes=split_volumes)
+        frozen_data = {
+            'include_map': include_map,
+            'include_spots': include_spots,
+            'include_photos': include_photos,
+        }
+        if len(volumes) > 1:
+            frozen_data['volumes'] = volumes
+        frozen_data.update(profile_fields(report_trace))
+        return {
+            'campaign_id': campaign_data['id'],
+            'report_type': 'pop_annex',
+            'file_path': output_path,
+            'file_name': filename,
+            'frozen_data': frozen_data
+        }
 
     # ------------------------------------------------------------------
     # Internal PDF builder
     # ------------------------------------------------------------------
 
-    def _build_pdf(self, data, output_path, include_map, include_spots, include_photos):
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
-        story = []
+    def _build_pdf(self, data, output_path, include_map, include_spots, include_photos,
+                   split_volumes=True):
+        """
+        Stream the annex story into output_path one flowable at a time; when
+        the story asks for a new volume, continue in <name>_vol2.pdf,
+        <name>_vol3.pdf ... Returns the written paths.
+        """
+        source = iter(self._annex_story(data, include_map, include_spots, include_photos, split_volumes))
+        state = {'more': True}
+
+        def volume_flowables():
+            for flowable in source:
+                if flowable is VOLUME_BREAK:
+                    return
+                yield flowable
+            state['more'] = False
+
+        paths = []
+        while state['more']:
+            if paths:
+                base, ext = os.path.splitext(output_path)
+                path = f"{base}_vol{len(paths) + 1}{ext}"
+            else:
+                path = output_path
+            with span('doc.build'):
+                SimpleDocTemplate(path, pagesize=letter).build(StreamingStory(volume_flowables()))
+            paths.append(path)
+        return paths
+
+    def _annex_story(self, data, include_map, include_spots, include_photos, split_volumes=True):
+        """
+        Flowables of the annex, produced lazily. Spot tables come in
+        SPOT_ROWS_PER_TABLE row chunks and photos as downscaled thumbnails;
+        with split_volumes a VOLUME_BREAK (plus a continuation header) is
+        emitted each time VOLUME_MAX_ROWS rows or VOLUME_MAX_PHOTOS photos
+        have gone into the current volume.
+        """
         accent = colors.HexColor('#0d47a1')
+        budget = {'rows': 0, 'photos': 0, 'volume': 1}
+
+        def next_volume_if_full(rows=0, photos=0):
+            """VOLUME_BREAK + header flowables when adding rows/photos would overflow the volume"""
+            over = (budget['rows'] and budget['rows'] + rows > self.VOLUME_MAX_ROWS) or \
+                   (budget['photos'] and budget['photos'] + photos > self.VOLUME_MAX_PHOTOS)
+            budget['rows'] += rows
+            budget['photos'] += photos
+            if not split_volumes or not over:
+                return []
+            budget.update(rows=rows, photos=photos, volume=budget['volume'] + 1)
+            return [VOLUME_BREAK, Paragraph(
+                f"<b><font size=12 color={accent.hexval()}>"
+                + remove_diacritics(_("ANEXA – PROOF OF PLAY"))
+                + f" – {remove_diacritics(_('Volum'))} {budget['volume']}</font></b>",
+                self.styles['Title']
+            ), Paragraph(
+                f"<font size=9 color=grey>{remove_diacritics(data.get('client_name', '-'))} / "
+                f"{remove_diacritics(data.get('campaign_name', '-'))} ({remove_diacritics(_('continuare'))})</font>",
+                self.styles['Normal']
+            ), Spacer(1, 12)]
 
         # --- Header --------------------------------------------------
         settings = self.company_settings.get_settings() or {}
@@ -97,23 +200,23 @@ class PopAnnexReportGenerator(ReportGenerator):
         if logo_path and os.path.exists(logo_path):
             logo = Image(logo_path, width=1.8 * inch, height=0.9 * inch)
             logo.hAlign = 'LEFT'
-            story.append(logo)
+            yield logo
 
-        story.append(Spacer(1, 10))
-        story.append(Paragraph(
+        yield Spacer(1, 10)
+        yield Paragraph(
             f"<b><font size=16 color={accent.hexval()}>"
             + remove_diacritics(_("ANEXA – PROOF OF PLAY"))
             + "</font></b>",
             self.styles['Title']
-        ))
-        story.append(Paragraph(
+        )
+        yield Paragraph(
             f"<font size=9 color=grey>"
             + remove_diacritics(_(
                 "Validare executie campanie prin date GPS si VnNox Play Logs"))
             + "</font>",
             self.styles['Normal']
-        ))
-        story.append(Spacer(1, 16))
+        )
+        yield Spacer(1, 16)
 
         # --- Campaign identification ----------------------------------
         camp_rows = [
@@ -137,8 +240,8 @@ class PopAnnexReportGenerator(ReportGenerator):
             ('VALIGN', (0, 0), (-1, -1), 'TOP'),
             ('PADDING', (0, 0), (-1, -1), 6),
         ]))
-        story.append(t_camp)
-        story.append(Spacer(1, 20))
+        yield t_camp
+        yield Spacer(1, 20)
 
         aud_data = data.get('audited_data', {})
         vnnox_imports = aud_data.get('vnnox_imports', [])
@@ -148,76 +251,70 @@ class PopAnnexReportGenerator(ReportGenerator):
         # SECTION A: VnNox Spot Table
         # -----------------------------------------------------------------
         if include_spots and vnnox_imports:
-            story.append(Paragraph(
+            yield Paragraph(
                 "<b>A. " + remove_diacritics(_("Detalii Difuzare VnNox")) + "</b>",
                 self.styles['Heading2']
-            ))
-            story.append(Spacer(1, 6))
+            )
+            yield Spacer(1, 6)
 
             # Summary per import file
             for v_imp in vnnox_imports:
-                story.append(Paragraph(
+                yield Paragraph(
                     f"<b>{remove_diacritics(_('Fisier'))}: {v_imp.get('filename', 'N/A')}</b>"
                     f"  |  {v_imp.get('spots', 0):,} {remove_diacritics(_('spoturi'))}"
                     f"  |  {v_imp.get('hours', 0):.2f} h",
                     ParagraphStyle('FileHdr', parent=self.styles['Normal'],
                                    fontSize=9, textColor=colors.HexColor('#1565c0'))
-                ))
+                )
                 spots = v_imp.get('spots_summary', [])
-                if spots:
-                    spot_rows = [[
-                        Paragraph(f"<b>{remove_diacritics(_('Spot / Media'))}</b>", self.styles['Normal']),
-                        Paragraph(f"<b>{remove_diacritics(_('Ecran'))}</b>", self.styles['Normal']),
-                        Paragraph(f"<b>{remove_diacritics(_('Play-uri'))}</b>", self.styles['Normal']),
-                        Paragraph(f"<b>{remove_diacritics(_('Durata'))}</b>", self.styles['Normal']),
-                        Paragraph(f"<b>{remove_diacritics(_('Perioada'))}</b>", self.styles['Normal']),
-                    ]]
-                    for sp in spots:
-                        hrs = sp.get('total_hours', 0)
-                        dur_str = f"{int(sp.get('total_seconds', 0)//3600)}h {int((sp.get('total_seconds', 0)%3600)//60)}m"
-                        period = f"{sp.get('date_start', '-')} / {sp.get('date_end', '-')}"
-                        spot_rows.append([
-                            Paragraph(remove_diacritics(sp.get('media_name', '-')), self.styles['Normal']),
-                            Paragraph(remove_diacritics(sp.get('screen', '-')), self.styles['Normal']),
-                            Paragraph(f"{sp.get('plays', 0):,}", self.styles['Normal']),
-                            Paragraph(dur_str, self.styles['Normal']),
-                            Paragraph(period, self.styles['Normal']),
-                        ])
-                    t_spots = Table(spot_rows, colWidths=[2.2 * inch, 1.0 * inch, 0.7 * inch, 0.9 * inch, 1.7 * inch])
-                    t_spots.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), accent),
-                        ('GRID', (0, 0), (-1, -1), 0.4, colors.lightgrey),
-                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                        ('PADDING', (0, 0), (-1, -1), 5),
-                        ('ROWBACKGROUNDS', (0, 1), (-1, -1),
-                         [colors.white, colors.HexColor('#e8eaf6')]),
-                    ]))
-                    story.append(t_spots)
-                story.append(Spacer(1, 14))
+                for start in range(0, len(spots), self.SPOT_ROWS_PER_TABLE):
+                    chunk = spots[start:start + self.SPOT_ROWS_PER_TABLE]
+                    yield from next_volume_if_full(rows=len(chunk))
+                    yield self._spot_table(chunk, accent)
+                yield Spacer(1, 14)
+
+            # Delivery per day and screen, from the play_hours rollups (Details imports)
+            if data.get('id'):
+                from src.data.play_log_storage import PlayLogStorage
+                daily = PlayLogStorage().rollup(data['id'], by=('play_date', 'screen'))
+                if daily:
+                    yield Paragraph(
+                        f"<b>{remove_diacritics(_('Difuzare pe zile si ecrane'))}</b>",
+                        ParagraphStyle('DailyHdr', parent=self.styles['Normal'],
+                                       fontSize=9, textColor=colors.HexColor('#1565c0'))
+                    )
+                    for start in range(0, len(daily), self.SPOT_ROWS_PER_TABLE):
+                        chunk = daily[start:start + self.SPOT_ROWS_PER_TABLE]
+                        yield from next_volume_if_full(rows=len(chunk))
+                        yield self._daily_table(chunk, accent)
+                    yield Spacer(1, 14)
 
         # -----------------------------------------------------------------
         # SECTION B: GPS Route Map
         # -----------------------------------------------------------------
         if include_map and gps_imports:
-            story.append(PageBreak())
-            story.append(Paragraph(
+            yield PageBreak()
+            yield Paragraph(
                 "<b>B. " + remove_diacritics(_("Harta Traseului GPS")) + "</b>",
                 self.styles['Heading2']
-            ))
-            story.append(Spacer(1, 6))
-            story.append(Paragraph(
+            )
+            yield Spacer(1, 6)
+            yield Paragraph(
                 remove_diacritics(_(
                     "Traseele de mai jos sunt generate din punctele GPS colectate. "
                     "Fiecare culoare reprezinta o zi distincta de campanie."
                 )),
                 self.styles['Normal']
-            ))
-            story.append(Spacer(1, 10))
+            )
+            yield Spacer(1, 10)
 
             # Merge all GPS points from all imports, add a 'import_date' field
+            # Points are loaded lazily from the track store only when the map is rendered
+            from src.data.gps_track_storage import GpsTrackStorage
+            track_storage = GpsTrackStorage()
             all_points = []
             for g_imp in gps_imports:
-                pts = g_imp.get('gps_points', [])
+                pts = track_storage.get_import_points(g_imp)
                 date_label = g_imp.get('date_start', '')
                 for pt in pts:
                     if pt.get('timestamp'):
@@ -230,12 +327,13 @@ class PopAnnexReportGenerator(ReportGenerator):
                     from src.utils.map_generator import generate_route_map
                     map_png = generate_route_map(all_points)
                     if map_png and os.path.exists(map_png):
-                        story.append(Image(map_png, width=6.5 * inch, height=5.2 * inch))
+                        yield Image(map_png, width=6.5 * inch, height=5.2 * inch)
                 except Exception as e:
-                    story.append(Paragraph(
+                    yield Paragraph(
                         f"<i>{remove_diacritics(_('Harta nu a putut fi generata'))}: {e}</i>",
                         self.styles['Normal']
-                    ))
+                    )
+            del all_points
 
             # GPS summary table per import
             gps_rows = [[
@@ -254,7 +352,7 @@ class PopAnnexReportGenerator(ReportGenerator):
                         self.styles['Normal']
                     ),
                 ])
-            t_gps = Table(gps_rows, colWidths=[2.5 * inch, 1.0 * inch, 0.8 * inch, 2.2 * inch])
+            t_gps = Table(gps_rows, colWidths=[2.5 * inch, 1.0 * inch, 0.8 * inch, 2.2 * inch], repeatRows=1)
             t_gps.setStyle(TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), accent),
                 ('GRID', (0, 0), (-1, -1), 0.4, colors.lightgrey),
@@ -263,28 +361,87 @@ class PopAnnexReportGenerator(ReportGenerator):
                 ('ROWBACKGROUNDS', (0, 1), (-1, -1),
                  [colors.white, colors.HexColor('#e8eaf6')]),
             ]))
-            story.append(Spacer(1, 12))
-            story.append(t_gps)
+            yield Spacer(1, 12)
+            yield t_gps
 
         # --- Photo Gallery Section ---
         if include_photos:
-            self._embed_photo_gallery(story, data)
+            for flowable in self._photo_gallery(data):
+                if isinstance(flowable, Table):
+                    yield from next_volume_if_full(photos=2)
+                yield flowable
 
         # Disclaimer
-        story.append(Spacer(1, 30))
+        yield Spacer(1, 30)
         disc = ParagraphStyle('Disc', parent=self.styles['Normal'],
                               fontSize=7, textColor=colors.grey, alignment=1)
-        story.append(Paragraph(
+        yield Paragraph(
             remove_diacritics(_(
                 "Anexa generata automat pe baza datelor de audit importate. "
                 "Validat conform metodologiei DOOH Standard."
             )), disc
-        ))
-        
-        doc.build(story)
+        )
 
-    def _embed_photo_gallery(self, story, data):
-        """Find and embed photos from campaign_photos directory"""
+    def _spot_table(self, spots, accent):
+        """One chunk of the VnNox spot table (header row repeated on every page)"""
+        spot_rows = [[
+            Paragraph(f"<b>{remove_diacritics(_('Spot / Media'))}</b>", self.styles['Normal']),
+            Paragraph(f"<b>{remove_diacritics(_('Ecran'))}</b>", self.styles['Normal']),
+            Paragraph(f"<b>{remove_diacritics(_('Play-uri'))}</b>", self.styles['Normal']),
+            Paragraph(f"<b>{remove_diacritics(_('Durata'))}</b>", self.styles['Normal']),
+            Paragraph(f"<b>{remove_diacritics(_('Perioada'))}</b>", self.styles['Normal']),
+        ]]
+        for sp in spots:
+            dur_str = f"{int(sp.get('total_seconds', 0)//3600)}h {int((sp.get('total_seconds', 0)%3600)//60)}m"
+            period = f"{sp.get('date_start', '-')} / {sp.get('date_end', '-')}"
+            spot_rows.append([
+                Paragraph(remove_diacritics(sp.get('media_name', '-')), self.styles['Normal']),
+                Paragraph(remove_diacritics(sp.get('screen', '-')), self.styles['Normal']),
+                Paragraph(f"{sp.get('plays', 0):,}", self.styles['Normal']),
+                Paragraph(dur_str, self.styles['Normal']),
+                Paragraph(period, self.styles['Normal']),
+            ])
+        t_spots = Table(spot_rows, colWidths=[2.2 * inch, 1.0 * inch, 0.7 * inch, 0.9 * inch, 1.7 * inch],
+                        repeatRows=1)
+        t_spots.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), accent),
+            ('GRID', (0, 0), (-1, -1), 0.4, colors.lightgrey),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('PADDING', (0, 0), (-1, -1), 5),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1),
+             [colors.white, colors.HexColor('#e8eaf6')]),
+        ]))
+        return t_spots
+
+    def _daily_table(self, days, accent):
+        """One chunk of the per day / screen delivery table"""
+        day_rows = [[
+            Paragraph(f"<b>{remove_diacritics(_('Data'))}</b>", self.styles['Normal']),
+            Paragraph(f"<b>{remove_diacritics(_('Ecran'))}</b>", self.styles['Normal']),
+            Paragraph(f"<b>{remove_diacritics(_('Play-uri'))}</b>", self.styles['Normal']),
+            Paragraph(f"<b>{remove_diacritics(_('Durata'))}</b>", self.styles['Normal']),
+        ]]
+        for day in days:
+            dur_str = f"{int(day['seconds'] // 3600)}h {int((day['seconds'] % 3600) // 60)}m"
+            day_rows.append([
+                Paragraph(day['play_date'].strftime('%d.%m.%Y'), self.styles['Normal']),
+                Paragraph(remove_diacritics(day['screen'] or '-'), self.styles['Normal']),
+                Paragraph(f"{day['plays']:,}", self.styles['Normal']),
+                Paragraph(dur_str, self.styles['Normal']),
+            ])
+        t_days = Table(day_rows, colWidths=[1.4 * inch, 2.0 * inch, 1.2 * inch, 1.4 * inch], repeatRows=1)
+        t_days.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), accent),
+            ('GRID', (0, 0), (-1, -1), 0.4, colors.lightgrey),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('PADDING', (0, 0), (-1, -1), 5),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1),
+             [colors.white, colors.HexColor('#e8eaf6')]),
+        ]))
+        return t_days
+
+    def _photo_gallery(self, data):
+        """Section heading, then one two-photo row Table at a time (thumbnails)"""
         campaign_id = data.get('id')
         if not campaign_id:
             return
@@ -293,45 +450,69 @@ class PopAnnexReportGenerator(ReportGenerator):
         if not os.path.exists(photo_dir):
             return
 
-        photos = [os.path.join(photo_dir, f) for f in os.listdir(photo_dir) 
-                  if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+        photos = sorted(os.path.join(photo_dir, f) for f in os.listdir(photo_dir)
+                        if f.lower().endswith(('.png', '.jpg', '.jpeg')))
         
         if not photos:
             return
 
-        story.append(PageBreak())
-        story.append(Paragraph(
+        yield PageBreak()
+        yield Paragraph(
             "<b>C. " + remove_diacritics(_("Galerie Foto (Dovada Executie)")) + "</b>",
             self.styles['Heading2']
-        ))
-        story.append(Spacer(1, 10))
+        )
+        yield Spacer(1, 10)
         
-        # Display photos in a grid (2 per row)
-        rows = []
+        # Display photos in a grid (2 per row), one row per flowable
         current_row = []
-        for i, photo_path in enumerate(photos):
+        for photo_path in photos:
             try:
-                # Resize image to fit half page width
-                img = Image(photo_path, width=3.0 * inch, height=2.25 * inch)
+                # Downscaled to fit half page width
+                img = Image(self._photo_thumbnail(photo_path), width=3.0 * inch, height=2.25 * inch)
                 current_row.append(img)
-                
-                if len(current_row) == 2:
-                    rows.append(current_row)
-                    current_row = []
             except Exception as e:
                 import logging
                 logging.getLogger(__name__).error(f"Error loading photo {photo_path}: {e}")
+            if len(current_row) == 2:
+                yield self._photo_row(current_row)
+                current_row = []
 
         if current_row:
-            rows.append(current_row + ['']) # Pad last row if needed
-
-        if rows:
-            t_photos = Table(rows, colWidths=[3.2 * inch, 3.2 * inch])
-            t_photos.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
-            ]))
-            story.append(t_photos)
+            yield self._photo_row(current_row + [''])  # Pad last row if needed
+
+    @staticmethod
+    def _photo_row(cells):
+        t_photos = Table([cells], colWidths=[3.2 * inch, 3.2 * inch])
+        t_photos.setStyle(TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+        ]))
+        return t_photos
 
-        doc.build(story)
+    @span('photo_thumbnail')
+    def _photo_thumbnail(self, photo_path):
+        """
+        JPEG of the photo scaled to THUMBNAIL_MAX_PX (BytesIO), cached by path,
+        mtime and size. Falls back to the original file if it cannot be scaled.
+        """
+        stat = os.stat(photo_path)
+        key = chart_key('thumbnail', [os.path.abspath(photo_path), stat.st_mtime, stat.st_size],
+                        {'max_px': self.THUMBNAIL_MAX_PX, 'quality': self.THUMBNAIL_QUALITY})
+        thumb = thumbnail_cache.get(key)
+        if thumb is None:
+            try:
+                from PIL import Image as PILImage
+                with PILImage.open(photo_path) as im:
+                    im.draft('RGB', (self.THUMBNAIL_MAX_PX, self.THUMBNAIL_MAX_PX))  # Fast JPEG downscale on decode
+                    im = im.convert('RGB')
+                    im.thumbnail((self.THUMBNAIL_MAX_PX, self.THUMBNAIL_MAX_PX))
+                    buf = io.BytesIO()
+                    im.save(buf, format='JPEG', quality=self.THUMBNAIL_QUALITY, optimize=True)
+                thumb = buf.getvalue()
+            except Exception as e:
+                import logging
+                logging.getLogger(__name__).warning(f"Could not downscale photo {photo_path}: {e}")
+                return photo_path
+            thumbnail_cache.put(key, thumb)
+        return io.BytesIO(thumb)
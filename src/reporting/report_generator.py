@@ -9,10 +9,14 @@ import datetime
 import io
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import os
 import subprocess
 
+from src.reporting.chart_cache import chart_cache, chart_key
+from src.utils.profiling import span
+
 class ReportGenerator:
     def __init__(self, data_manager=None):
         # data_manager is optional in standalone mode
@@ -45,13 +49,32 @@ class ReportGenerator:
         except Exception as e:
             print(f"Could not open report: {e}")
         
+    @span('chart')
+    def _render_chart(self, chart_type, data, style, draw):
+        """
+        PNG (BytesIO) of a chart drawn by draw(ax) on a Figure of style['figsize'].
+        Uses the object-oriented Figure/Agg API (no pyplot state), so it is safe
+        in worker threads; identical charts are served from chart_cache.
+        """
+        key = chart_key(chart_type, data, style)
+        png = chart_cache.get(key)
+        if png is None:
+            with span('chart.render'):
+                fig = Figure(figsize=style['figsize'])
+                FigureCanvasAgg(fig)
+                draw(fig.subplots())
+                fig.tight_layout()
+                buf = io.BytesIO()
+                fig.savefig(buf, format='png', dpi=style['dpi'], bbox_inches='tight')
+                png = buf.getvalue()
+            chart_cache.put(key, png)
+        return io.BytesIO(png)
+
     def create_time_series_chart(self, hourly_data, title="Hourly Activity"):
         """Create a time series chart for hourly data"""
         if not hourly_data:
             return None
             
-        fig, ax = plt.subplots(figsize=(10, 4))
-        
         hours = sorted(hourly_data.keys())
         people_counts = [hourly_data[h].get('person', 0) for h in hours]
         car_counts = [
@@ -63,29 +86,27 @@ class ReportGenerator:
         ]
         
         hour_labels = [h.strftime('%H:%M') for h in hours]
-        
-        ax.plot(hour_labels, people_counts, marker='o', label='People', linewidth=2)
-        ax.plot(hour_labels, car_counts, marker='s', label='Vehicles', linewidth=2)
-        
-        ax.set_xlabel('Time')
-        ax.set_ylabel('Count')
-        ax.set_title(title)
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        # Rotate labels if too many
-        if len(hour_labels) > 12:
-            plt.xticks(rotation=45, ha='right')
-        
-        plt.tight_layout()
-        
-        # Save to bytes
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        return buf
+
+        def draw(ax):
+            ax.plot(hour_labels, people_counts, marker='o', label='People', linewidth=2)
+            ax.plot(hour_labels, car_counts, marker='s', label='Vehicles', linewidth=2)
+            
+            ax.set_xlabel('Time')
+            ax.set_ylabel('Count')
+            ax.set_title(title)
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+            
+            # Rotate labels if too many
+            if len(hour_labels) > 12:
+                for label in ax.get_xticklabels():
+                    label.set_rotation(45)
+                    label.set_ha('right')
+
+        return self._render_chart(
+            'time_series', [hour_labels, people_counts, car_counts],
+            {'figsize': (10, 4), 'dpi': 150, 'title': title}, draw
+        )
     
     def create_pie_chart(self, data, title="Distribution"):
         """Create a pie chart from dictionary data or list of tuples"""
@@ -100,54 +121,43 @@ class ReportGenerator:
         if sum(data_dict.values()) == 0:
             return None
             
-        fig, ax = plt.subplots(figsize=(6, 6))
-        
         labels = list(data_dict.keys())
         sizes = list(data_dict.values())
-        
-        colors_list = plt.cm.Set3(range(len(labels)))
-        
-        ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors_list)
-        ax.set_title(title)
-        
-        plt.tight_layout()
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        return buf
+
+        def draw(ax):
+            colors_list = matplotlib.colormaps['Set3'](range(len(labels)))
+            ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors_list)
+            ax.set_title(title)
+
+        return self._render_chart(
+            'pie', [labels, sizes],
+            {'figsize': (6, 6), 'dpi': 150, 'title': title, 'colormap': 'Set3'}, draw
+        )
     
     def create_bar_chart(self, data_dict, title="Comparison", xlabel="Category", ylabel="Count"):
         """Create a bar chart from dictionary data"""
         if not data_dict:
             return None
             
-        fig, ax = plt.subplots(figsize=(8, 5))
-        
         categories = list(data_dict.keys())
         values = list(data_dict.values())
-        
-        bars = ax.bar(categories, values, color='steelblue', alpha=0.7)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(height)}',
-                   ha='center', va='bottom')
-        
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        ax.set_title(title)
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        plt.tight_layout()
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        return buf
+
+        def draw(ax):
+            bars = ax.bar(categories, values, color='steelblue', alpha=0.7)
+            
+            # Add value labels on bars
+            for bar in bars:
+                height = bar.get_height()
+                ax.text(bar.get_x() + bar.get_width()/2., height,
+                       f'{int(height)}',
+                       ha='center', va='bottom')
+            
+            ax.set_xlabel(xlabel)
+            ax.set_ylabel(ylabel)
+            ax.set_title(title)
+            ax.grid(True, alpha=0.3, axis='y')
+
+        return self._render_chart(
+            'bar', [categories, values],
+            {'figsize': (8, 5), 'dpi': 150, 'title': title, 'xlabel': xlabel, 'ylabel': ylabel}, draw
+        )
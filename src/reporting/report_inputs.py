@@ -0,0 +1,159 @@
+"""
+Report Inputs
+Fingerprints of everything a campaign report is computed from, stored with
+the report (frozen_data['inputs']) so a regeneration can tell what changed
+since the last one:
+
+    campaign         campaign id + last_modified
+    city_profiles    the city profile of every quarter a city period runs through
+    events           special events of the campaign's cities
+    traffic_locations  audited locations of those cities
+    routes           campaign routes (id + last_modified)
+    vehicles         screens per vehicle (impression multiplier)
+    company          company settings and logo (page header only)
+
+Each report section depends on a subset of these parts (SECTION_INPUTS).
+"""
+import datetime
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from src.reporting import impressions_engine
+
+# Report section -> input parts it is computed from
+SECTION_INPUTS = {
+    'metrics': ('campaign', 'city_profiles', 'events', 'traffic_locations', 'routes', 'vehicles'),
+    'header': ('company',),
+}
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _as_date(value) -> Optional[datetime.date]:
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return value
+
+
+def city_period_ranges(data: Dict[str, Any]) -> List[tuple]:
+    """(city, start date, end date) of every city period a report computes audience for"""
+    start, end = _as_date(data.get('start_date')), _as_date(data.get('end_date'))
+    cities = data.get('cities') or ([data['city']] if data.get('city') else [])
+    ranges = [(city, start, end) for city in cities]
+
+    def add_periods(city, periods):
+        if isinstance(periods, dict):
+            periods = [periods]
+        for period in periods if isinstance(periods, list) else []:
+            if isinstance(period, dict) and period.get('start'):
+                ranges.append((city, _as_date(period['start']), _as_date(period.get('end')) or end))
+
+    for key, value in (data.get('city_periods') or {}).items():
+        if key == '__meta__':
+            continue
+        if isinstance(value, dict) and 'start' not in value:
+            # Per-vehicle itinerary: {city: periods}
+            for city, periods in value.items():
+                add_periods(city, periods)
+        else:
+            add_periods(key, value)
+    return [(city, day, last) for city, day, last in ranges if city and day]
+
+
+def city_period_starts(data: Dict[str, Any]) -> List[tuple]:
+    """(city, start date) of every city period a report looks up a profile for"""
+    return sorted({(city, day) for city, day, _ in city_period_ranges(data)},
+                  key=lambda p: (p[0], p[1].isoformat()))
+
+
+def city_profile_days(data: Dict[str, Any]) -> List[tuple]:
+    """
+    (city, day) of every profile a report's audience comes from: each city
+    period's start and the first day of every later quarter it runs into
+    """
+    pairs = set()
+    for city, start, end in city_period_ranges(data):
+        total_days = (end - start).days + 1 if end and end >= start else 1
+        pairs.update((city, day) for day, _ in impressions_engine.quarter_segments(start, total_days))
+    return sorted(pairs, key=lambda p: (p[0], p[1].isoformat()))
+
+
+def input_fingerprint(data: Dict[str, Any], city_manager, company_settings, vehicle_manager=None) -> Dict[str, Any]:
+    """{'digest': overall hex digest, 'parts': {part: hex digest}} of a campaign report's inputs"""
+    pairs = city_profile_days(data)
+    cities = sorted({city for city, _ in pairs})
+    lowered = {city.lower().strip() for city in cities}
+
+    if data.get('last_modified'):
+        campaign = [data.get('id'), str(data['last_modified'])]
+    else:
+        # Unsaved campaign dict: fall back to its content
+        campaign = [data.get('id'), _digest(data)]
+
+    profiles = [[city, day.isoformat(), city_manager.get_city_data_for_period(city, day)] for city, day in pairs]
+    events = sorted([name, city_events] for name, city_events in (city_manager.special_events or {}).items()
+                    if name.lower().strip() in lowered)
+
+    locations = []
+    for city in cities:
+        for loc in city_manager.get_all_traffic_locations(city):
+            locations.append([loc.id, str(loc.last_modified), loc.latitude, loc.longitude,
+                              loc.daily_traffic, loc.pedestrian_traffic])
+    locations.sort(key=lambda row: str(row[0]))
+
+    routes = sorted(
+        ([r.get('id'), str(r.get('last_modified'))] if r.get('id') else [None, _digest(r.get('geojson_data'))]
+         for r in data.get('routes', []) or []),
+        key=str
+    )
+
+    vehicle_ids = {data.get('vehicle_id')}
+    for av in data.get('additional_vehicles', []) or []:
+        vehicle_ids.add((av.get('vehicle_id') or av.get('id')) if isinstance(av, dict) else str(av))
+    vehicles = []
+    for vid in sorted(v for v in vehicle_ids if v):
+        vehicle = vehicle_manager.get_vehicle(vid) if vehicle_manager else None
+        vehicles.append([vid, vehicle.get('screens_count') if vehicle else None])
+
+    settings = company_settings.get_settings() if company_settings else {}
+    logo_path = settings.get('logo_path')
+    logo_mtime = os.path.getmtime(logo_path) if logo_path and os.path.exists(logo_path) else None
+
+    parts = {
+        'campaign': _digest(campaign),
+        'city_profiles': _digest(profiles),
+        'events': _digest(events),
+        'traffic_locations': _digest(locations),
+        'routes': _digest(routes),
+        'vehicles': _digest(vehicles),
+        'company': _digest([settings, logo_mtime]),
+    }
+    return {'digest': _digest(parts), 'parts': parts}
+
+
+def extend_fingerprint(fingerprint: Dict[str, Any], **values: Any) -> Dict[str, Any]:
+    """fingerprint with extra parts (e.g. a DOOH report's baseline metrics)"""
+    parts = dict(fingerprint['parts'], **{name: _digest(value) for name, value in values.items()})
+    return {'digest': _digest(parts), 'parts': parts}
+
+
+def changed_parts(frozen_data: Optional[Dict[str, Any]], fingerprint: Dict[str, Any]) -> Set[str]:
+    """Input parts that differ from the ones stored with a report (all of them when none were stored)"""
+    stored = ((frozen_data or {}).get('inputs') or {}).get('parts')
+    if not stored:
+        return set(fingerprint['parts'])
+    return {part for part, digest in fingerprint['parts'].items() if stored.get(part) != digest}
+
+
+def stale_sections(frozen_data: Optional[Dict[str, Any]], fingerprint: Dict[str, Any]) -> Set[str]:
+    """Report sections whose inputs changed since the report holding frozen_data"""
+    changed = changed_parts(frozen_data, fingerprint)
+    return {section for section, parts in SECTION_INPUTS.items() if changed.intersection(parts)}
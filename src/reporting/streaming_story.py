@@ -0,0 +1,51 @@
+"""
+Streaming Story
+A reportlab story that pulls its flowables from an iterator while the
+document is being built, instead of holding them all in a list.
+
+BaseDocTemplate.build only touches the front of the story (flowables[0],
+del flowables[0], insert/slice-assign at 0, and a short look-ahead for
+keepWithNext), so a list that refills itself from a generator keeps just
+LOOKAHEAD flowables in memory; drawn ones are released as pages complete.
+"""
+from typing import Iterable
+
+# Flowables kept ahead of the build; covers keepWithNext chains (heading + next)
+LOOKAHEAD = 8
+
+
+class StreamingStory(list):
+    """list-compatible story fed lazily from `flowables`"""
+
+    def __init__(self, flowables: Iterable) -> None:
+        super().__init__()
+        self._source = iter(flowables)
+        self.exhausted = False
+        self.pulled = 0
+
+    def _fill(self, size: int) -> None:
+        while not self.exhausted and list.__len__(self) < size:
+            try:
+                self.append(next(self._source))
+                self.pulled += 1
+            except StopIteration:
+                self.exhausted = True
+
+    def __len__(self) -> int:
+        self._fill(LOOKAHEAD)
+        return list.__len__(self)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.stop is None or index.stop < 0:
+                self._fill(float('inf'))
+            else:
+                self._fill(index.stop)
+        elif index >= 0:
+            self._fill(index + 1)
+        else:
+            self._fill(float('inf'))
+        return list.__getitem__(self, index)
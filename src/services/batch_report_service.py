@@ -0,0 +1,185 @@
+"""
+Batch Report Service
+Renders the standard, DOOH and PoP annex reports of many campaigns without
+the UI: campaigns are spread over a process pool, nothing is opened in a
+viewer, and the GeneratedReport rows are written together in one transaction
+once rendering is done.
+"""
+import concurrent.futures
+import datetime
+import logging
+import multiprocessing
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.data.campaign_storage import CampaignStorage
+from src.data.report_storage import ReportStorage
+
+logger = logging.getLogger(__name__)
+
+# Render order within a campaign: DOOH reuses the standard report's metrics
+REPORT_TYPES = ('standard', 'dooh', 'pop_annex')
+
+
+def _render_campaign(campaign_id: str, report_types: Sequence[str],
+                     output_dir: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Render the requested reports of one campaign (runs in a pool worker).
+    One result per report type: {'campaign_id', 'report_type', 'record',
+    'seconds', 'error'}; record holds the GeneratedReport fields or None.
+    """
+    # Imported here so pool workers load reportlab/matplotlib only once per process
+    from src.reporting.campaign_report_generator import CampaignReportGenerator
+    from src.reporting.dooh_report_generator import DoohReportGenerator
+    from src.reporting.pop_annex_report_generator import PopAnnexReportGenerator
+
+    storage = CampaignStorage()
+    campaign = storage.get_campaign(campaign_id)
+    generators = {
+        'standard': CampaignReportGenerator(storage),
+        'dooh': DoohReportGenerator(storage),
+        'pop_annex': PopAnnexReportGenerator(storage)
+    }
+    # File names only carry client + second, so campaigns rendered side by side get their own folder
+    campaign_dir = os.path.join(output_dir or generators['standard'].reports_dir, campaign_id)
+    results = []
+    baseline = None
+    for report_type in [t for t in REPORT_TYPES if t in report_types]:
+        started = time.perf_counter()
+        result = {'campaign_id': campaign_id, 'report_type': report_type, 'record': None, 'error': None}
+        try:
+            if campaign is None:
+                raise ValueError(f"Campaign {campaign_id} not found")
+            os.makedirs(campaign_dir, exist_ok=True)
+            generator = generators[report_type]
+            if report_type == 'standard':
+                record = generator.render_campaign_report(campaign, output_dir=campaign_dir)
+                baseline = record['frozen_data']
+            elif report_type == 'dooh':
+                record = generator.render_dooh_report(campaign, output_dir=campaign_dir, baseline_metrics=baseline)
+            else:
+                record = generator.render_pop_annex(campaign, output_dir=campaign_dir)
+            result['record'] = record
+        except Exception as e:
+            logger.error(f"Error rendering {report_type} report for campaign {campaign_id}: {e}")
+            result['error'] = str(e)
+        result['seconds'] = time.perf_counter() - started
+        results.append(result)
+    return results
+
+
+class BatchReportService:
+    """Headless batch generation of campaign reports"""
+
+    def __init__(self):
+        self.storage = CampaignStorage()
+        self.report_storage = ReportStorage()
+
+    def select_campaigns(self, campaign_ids: Optional[Sequence[str]] = None, status: Optional[str] = None,
+                         active_on: Optional[datetime.date] = None,
+                         include_archived: bool = False) -> List[str]:
+        """
+        Ids of the campaigns to report on: the given ids, or every campaign,
+        narrowed by status and by running on `active_on`.
+        """
+        if campaign_ids:
+            campaigns = self.storage.get_campaigns_by_ids(list(campaign_ids), include_archived=True)
+        else:
+            campaigns = self.storage.get_all_campaigns(include_archived=include_archived)
+        if status:
+            campaigns = [c for c in campaigns if c.get('status') == status]
+        if active_on:
+            day = active_on.isoformat()
+            campaigns = [c for c in campaigns
+                         if (c.get('start_date') or day) <= day <= (c.get('end_date') or day)]
+        return [c['id'] for c in campaigns]
+
+    def generate(self, campaign_ids: Sequence[str], report_types: Sequence[str] = REPORT_TYPES,
+                 output_dir: Optional[str] = None, workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Render report_types for every campaign and save the history rows in
+        bulk. workers=None uses one process per CPU, workers=0 renders in this
+        process. progress(done, total, result) is called after each report.
+
+        Returns {'results': [...], 'report_ids': [...], 'seconds': float}; a
+        failed report carries its 'error' and gets no history row, nor does a
+        report reused because its inputs did not change (record['reused']).
+        """
+        unknown = set(report_types) - set(REPORT_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown report types: {', '.join(sorted(unknown))}")
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        started = time.perf_counter()
+        total = len(campaign_ids) * len(set(report_types))
+        results: List[Dict[str, Any]] = []
+
+        def collect(campaign_results):
+            for result in campaign_results:
+                results.append(result)
+                if progress:
+                    progress(len(results), total, result)
+
+        if workers == 0:
+            for campaign_id in campaign_ids:
+                collect(_render_campaign(campaign_id, report_types, output_dir))
+        else:
+            # spawn: forked children would inherit the parent's pooled DB connections
+            context = multiprocessing.get_context('spawn')
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = {pool.submit(_render_campaign, campaign_id, tuple(report_types), output_dir): campaign_id
+                           for campaign_id in campaign_ids}
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        collect(future.result())
+                    except Exception as e:
+                        logger.error(f"Batch worker failed for campaign {futures[future]}: {e}")
+                        collect([{'campaign_id': futures[future], 'report_type': t, 'record': None,
+                                  'seconds': 0.0, 'error': str(e)} for t in REPORT_TYPES if t in report_types])
+
+        # Reused reports (inputs unchanged since the last run) already have their row
+        records = [r['record'] for r in results if r['record'] and not r['record'].get('reused')]
+        report_ids = self.report_storage.save_reports_metadata_bulk(records)
+        return {'results': results, 'report_ids': report_ids, 'seconds': time.perf_counter() - started}
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate campaign reports in batch (no viewer).")
+    parser.add_argument('campaign_ids', nargs='*', help="Campaign ids (default: all matching the filters)")
+    parser.add_argument('--status', help="Only campaigns with this status, e.g. confirmed")
+    parser.add_argument('--active-on', type=datetime.date.fromisoformat, help="Only campaigns running on YYYY-MM-DD")
+    parser.add_argument('--include-archived', action='store_true')
+    parser.add_argument('--types', default=','.join(REPORT_TYPES), help="Comma-separated: " + ','.join(REPORT_TYPES))
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (0 = render in-process)")
+    parser.add_argument('--output-dir', help="Directory for the PDFs, one folder per campaign (default: reports/)")
+    args = parser.parse_args(argv)
+
+    service = BatchReportService()
+    ids = service.select_campaigns(args.campaign_ids, status=args.status, active_on=args.active_on,
+                                   include_archived=args.include_archived)
+    if not ids:
+        print("No campaigns match.")
+        return 0
+
+    def show(done, total, result):
+        if result['record']:
+            outcome = result['record']['file_path'] + (" (unchanged)" if result['record'].get('reused') else "")
+        else:
+            outcome = f"FAILED: {result['error']}"
+        print(f"[{done}/{total}] {result['campaign_id']} {result['report_type']} "
+              f"{result['seconds']:.2f}s {outcome}")
+
+    summary = service.generate(ids, report_types=[t.strip() for t in args.types.split(',') if t.strip()],
+                               output_dir=args.output_dir, workers=args.workers, progress=show)
+    failed = sum(1 for r in summary['results'] if r['error'])
+    print(f"{len(summary['report_ids'])} reports saved, {failed} failed, {summary['seconds']:.1f}s total")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
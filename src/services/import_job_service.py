@@ -0,0 +1,473 @@
+"""
+Import Job Service
+Audit uploads (GPS logs, VnNox play logs) are parsed by a worker process
+instead of the Streamlit script run: the page spools the upload to disk and
+queues an import_jobs row, the worker claims queued jobs one at a time,
+parses the file (through the import cache), saves the import to the campaign
+and records status and progress on the row, which the page polls.
+
+The queue lives in the database, so a browser refresh or a restarted server
+loses no work: jobs left 'running' by a worker that died are queued again
+once their heartbeat is stale. A standalone worker can also be run with
+python -m src.services.import_job_service
+"""
+import datetime
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+
+from src.data.campaign_storage import CampaignStorage
+from src.data.db_config import SessionLocal
+from src.data.models import ImportJob
+from src.utils.import_cache import cached_parse, content_hash
+
+logger = logging.getLogger(__name__)
+
+IMPORT_SPOOL_DIR = os.environ.get(
+    "IMPORT_SPOOL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'reports', '.import_spool')
+)
+
+KINDS = ('gps', 'vnnox')
+ACTIVE_STATUSES = ('queued', 'running')
+
+# Seconds between queue polls of an idle worker
+POLL_INTERVAL = 1.0
+# A worker started by the app exits after this many idle seconds (restarted while jobs are queued)
+WORKER_IDLE_TIMEOUT = 300.0
+# 'running' jobs without a heartbeat for this long belonged to a worker that died
+STALE_AFTER = datetime.timedelta(minutes=15)
+# Seconds between heartbeats of a running job, and between stale job checks of a worker
+HEARTBEAT_INTERVAL = 60.0
+REQUEUE_INTERVAL = 60.0
+# Smallest progress change written to the job row while parsing
+PROGRESS_STEP = 0.05
+
+# Share of the progress bar covered by parsing; saving takes the rest
+PARSE_START, PARSE_END = 0.05, 0.8
+
+
+def gps_import_entry(result: Dict[str, Any], filename: str, digest: str,
+                     vehicle_id: Optional[str]) -> Dict[str, Any]:
+    """gps_imports entry of a parse_gps_log result (points are moved to gps_tracks on save)"""
+    return {
+        'id': str(uuid.uuid4()),
+        'filename': filename,
+        'content_hash': digest,
+        'vehicle_id': vehicle_id,
+        'distance': float(result['total_distance']),
+        'pings': int(result['pings']),
+        'format_detected': result['format'],
+        'gps_points': result.get('gps_points', []),
+        'date_start': result.get('date_start'),
+        'date_end': result.get('date_end'),
+        'imported_at': datetime.datetime.now().isoformat()
+    }
+
+
+def vnnox_import_entry(result: Dict[str, Any], filename: str, digest: str) -> Dict[str, Any]:
+    """vnnox_imports entry of a parse_vnnox_csv result (buckets are moved to play_hours on save)"""
+    return {
+        'id': str(uuid.uuid4()),
+        'filename': filename,
+        'content_hash': digest,
+        'hours': result['total_hours'],
+        'spots': result['total_spots'],
+        'format': result['format'],
+        'total_seconds': result['total_seconds'],
+        'spots_summary': result.get('spots_summary', []),
+        'hourly_plays': result.get('hourly_plays', []),
+        'date_start': result.get('date_start'),
+        'date_end': result.get('date_end'),
+        'imported_at': datetime.datetime.now().isoformat()
+    }
+
+
+def add_import(audited_data: Dict[str, Any], kind: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Append entry to audited_data's imports of `kind`. Overview VnNox logs
+    have no per-play rows to merge: they replace overlapping Overview imports.
+    Overlapping GPS and Details imports are merged row by row on save.
+    """
+    key = f'{kind}_imports'
+    imports = list(audited_data.get(key, []))
+    if kind == 'vnnox' and entry.get('format') == 'overview' and entry.get('date_start') and entry.get('date_end'):
+        imports = [
+            x for x in imports
+            if not (x.get('format') == 'overview' and x.get('date_start') and x.get('date_end')
+                    and not (entry['date_end'] < x['date_start'] or entry['date_start'] > x['date_end']))
+        ]
+    imports.append(entry)
+    audited_data[key] = imports
+    return audited_data
+
+
+class _ProgressReader:
+    """Read-only file wrapper reporting the share of its bytes read so far"""
+
+    def __init__(self, file_obj, total: int, report: Callable[[float], None]):
+        self.file_obj = file_obj
+        self.total = max(total, 1)
+        self.report = report
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.file_obj.read(size)
+        self.position += len(chunk)
+        self.report(min(self.position / self.total, 1.0))
+        return chunk
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        self.position = self.file_obj.seek(offset, whence)
+        return self.position
+
+    def tell(self) -> int:
+        return self.file_obj.tell()
+
+    def seekable(self) -> bool:
+        return True
+
+
+class ImportJobService:
+    """Queue of audit imports and the worker that runs them"""
+
+    def __init__(self, spool_dir: Optional[str] = None):
+        self.storage = CampaignStorage()
+        self.spool_dir = spool_dir or IMPORT_SPOOL_DIR
+
+    @staticmethod
+    def _to_dict(job: ImportJob) -> Dict[str, Any]:
+        return {
+            'id': job.id,
+            'campaign_id': job.campaign_id,
+            'kind': job.kind,
+            'filename': job.filename,
+            'file_path': job.file_path,
+            'content_hash': job.content_hash,
+            'status': job.status,
+            'progress': job.progress or 0.0,
+            'message': job.message,
+            'result': job.result or {},
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at
+        }
+
+    # --- Queue ---
+
+    def enqueue(self, campaign_id: str, kind: str, filename: str, content: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Spool an upload and queue its import. The same file already queued or
+        running for the campaign returns that job instead of a second one.
+        Returns the job, None on error.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown import kind: {kind}")
+        digest = content_hash(content)
+        session = SessionLocal()
+        path = None
+        try:
+            active = session.scalars(select(ImportJob).where(
+                ImportJob.campaign_id == campaign_id, ImportJob.kind == kind,
+                ImportJob.content_hash == digest, ImportJob.status.in_(ACTIVE_STATUSES)
+            )).first()
+            if active:
+                return self._to_dict(active)
+
+            job_id = str(uuid.uuid4())
+            os.makedirs(self.spool_dir, exist_ok=True)
+            path = os.path.join(self.spool_dir, job_id + os.path.splitext(filename or '')[1].lower())
+            # Written aside and renamed: the worker never sees a partial upload
+            with open(path + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+
+            now = datetime.datetime.now()
+            job = ImportJob(id=job_id, campaign_id=campaign_id, kind=kind, filename=filename, file_path=path,
+                            content_hash=digest, status='queued', progress=0.0, created_at=now, updated_at=now)
+            session.add(job)
+            session.commit()
+            return self._to_dict(job)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error queueing {kind} import for campaign {campaign_id}: {e}")
+            if path and os.path.exists(path):
+                os.remove(path)
+            return None
+        finally:
+            session.close()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        session = SessionLocal()
+        try:
+            job = session.get(ImportJob, job_id)
+            return self._to_dict(job) if job else None
+        finally:
+            session.close()
+
+    def jobs_for_campaign(self, campaign_id: str, active_only: bool = False, limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest jobs of a campaign first"""
+        session = SessionLocal()
+        try:
+            query = select(ImportJob).where(ImportJob.campaign_id == campaign_id)
+            if active_only:
+                query = query.where(ImportJob.status.in_(ACTIVE_STATUSES))
+            query = query.order_by(ImportJob.created_at.desc()).limit(limit)
+            return [self._to_dict(job) for job in session.scalars(query)]
+        finally:
+            session.close()
+
+    def has_active_jobs(self) -> bool:
+        """Whether any campaign has an import queued or running"""
+        session = SessionLocal()
+        try:
+            return session.scalars(select(ImportJob.id).where(ImportJob.status.in_(ACTIVE_STATUSES))
+                                   .limit(1)).first() is not None
+        finally:
+            session.close()
+
+    def claim_next(self) -> Optional[str]:
+        """
+        Mark the oldest queued job as running and return its id (None when the
+        queue is empty). The conditional update lets several workers share a queue.
+        """
+        session = SessionLocal()
+        try:
+            while True:
+                job_id = session.scalars(select(ImportJob.id).where(ImportJob.status == 'queued')
+                                         .order_by(ImportJob.created_at).limit(1)).first()
+                if job_id is None:
+                    return None
+                now = datetime.datetime.now()
+                claimed = session.execute(
+                    update(ImportJob).where(ImportJob.id == job_id, ImportJob.status == 'queued')
+                    .values(status='running', started_at=now, updated_at=now)
+                ).rowcount
+                session.commit()
+                if claimed:
+                    return job_id
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error claiming import job: {e}")
+            return None
+        finally:
+            session.close()
+
+    def requeue_stale(self, stale_after: datetime.timedelta = STALE_AFTER) -> int:
+        """Queue again the running jobs whose worker stopped sending heartbeats; returns how many"""
+        session = SessionLocal()
+        try:
+            count = session.execute(
+                update(ImportJob).where(ImportJob.status == 'running',
+                                        ImportJob.updated_at < datetime.datetime.now() - stale_after)
+                .values(status='queued', progress=0.0, message=None)
+            ).rowcount
+            session.commit()
+            return count
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error requeueing stale import jobs: {e}")
+            return 0
+        finally:
+            session.close()
+
+    def _update(self, job_id: str, **values) -> None:
+        session = SessionLocal()
+        try:
+            session.execute(update(ImportJob).where(ImportJob.id == job_id)
+                            .values(updated_at=datetime.datetime.now(), **values))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error updating import job {job_id}: {e}")
+        finally:
+            session.close()
+
+    # --- Worker ---
+
+    def _parse(self, job: Dict[str, Any], report: Callable[[float], None]) -> Dict[str, Any]:
+        path = job['file_path']
+        if not path or not os.path.exists(path):
+            raise FileNotFoundError(f"Spooled upload missing for job {job['id']}")
+        if job['kind'] == 'gps':
+            from src.utils.gps_parser import parse_gps_log
+
+            def parse():
+                with open(path, 'rb') as f:
+                    return parse_gps_log(f.read(), filename=job['filename'], columnar=True)
+            # The parser takes the whole file: no progress until it returns
+            result, _hit = cached_parse('gps', job['content_hash'], parse,
+                                        variant=os.path.splitext((job['filename'] or '').lower())[1])
+            if result['format'] in ('unknown', 'empty') or result['pings'] == 0:
+                raise ValueError("Formatul fisierului GPS nu este recunoscut sau fisierul este gol.")
+            return result
+
+        from src.utils.vnnox_parser import parse_vnnox_csv
+
+        def parse():
+            with open(path, 'rb') as f:
+                return parse_vnnox_csv(_ProgressReader(f, os.path.getsize(path), report))
+        result, _hit = cached_parse('vnnox', job['content_hash'], parse)
+        return result
+
+    def _summary(self, kind: str, result: Dict[str, Any], saved: Dict[str, Any]) -> Dict[str, Any]:
+        if kind == 'gps':
+            return {
+                'import_id': saved.get('id'),
+                'format': result['format'],
+                'distance': saved.get('distance', 0.0),
+                'pings': saved.get('pings', 0),
+                'point_count': saved.get('point_count', 0),
+                'merged_points': saved.get('merged_points', 0)
+            }
+        return {
+            'import_id': saved.get('id'),
+            'format': result['format'],
+            'hours': result['total_hours'],
+            'spots': result['total_spots'],
+            'errors': list(result.get('errors') or [])[:20]
+        }
+
+    def run_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a claimed job's upload and save the import to its campaign.
+        The job ends 'done' (result holds the import summary, or
+        {'duplicate': True} when the file was already imported) or 'failed'
+        (message holds the error). Returns the finished job.
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            return None
+        last = {'progress': PARSE_START}
+
+        def report(fraction: float):
+            progress = PARSE_START + (PARSE_END - PARSE_START) * fraction
+            if progress - last['progress'] >= PROGRESS_STEP:
+                last['progress'] = progress
+                self._update(job_id, progress=progress)
+
+        # Parsing a large GPS file reports no progress: the heartbeat keeps the job from looking stale
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, stop), daemon=True)
+        heartbeat.start()
+        try:
+            key = f"{job['kind']}_imports"
+            campaign = self.storage.get_campaign(job['campaign_id'])
+            if campaign is None:
+                raise ValueError(f"Campaign {job['campaign_id']} not found")
+            if any(x.get('content_hash') == job['content_hash']
+                   for x in (campaign.get('audited_data') or {}).get(key, [])):
+                self._update(job_id, status='done', progress=1.0, message=None, result={'duplicate': True},
+                             finished_at=datetime.datetime.now())
+                return self.get_job(job_id)
+
+            self._update(job_id, progress=PARSE_START, message='parsing')
+            result = self._parse(job, report)
+            self._update(job_id, progress=PARSE_END, message='saving')
+
+            # Reloaded: the campaign may have been edited while the file was parsed
+            campaign = self.storage.get_campaign(job['campaign_id'])
+            if campaign is None:
+                raise ValueError(f"Campaign {job['campaign_id']} not found")
+            if job['kind'] == 'gps':
+                entry = gps_import_entry(result, job['filename'], job['content_hash'], campaign.get('vehicle_id'))
+            else:
+                entry = vnnox_import_entry(result, job['filename'], job['content_hash'])
+            # Only audited_data is written, in one transaction: edits saved from the UI meanwhile are kept
+            if not self.storage.update_audited_data(job['campaign_id'],
+                                                    lambda audited: add_import(audited, job['kind'], entry)):
+                raise RuntimeError("The import could not be saved to the campaign")
+
+            saved = next((x for x in self.storage.get_campaign(job['campaign_id'])['audited_data'].get(key, [])
+                          if x.get('id') == entry['id']), entry)
+            self._update(job_id, status='done', progress=1.0, message=None,
+                         result=self._summary(job['kind'], result, saved), finished_at=datetime.datetime.now())
+        except Exception as e:
+            logger.error(f"Import job {job_id} ({job['kind']} {job['filename']}) failed: {e}")
+            self._update(job_id, status='failed', message=str(e), finished_at=datetime.datetime.now())
+        finally:
+            stop.set()
+            heartbeat.join()
+            if job['file_path'] and os.path.exists(job['file_path']):
+                os.remove(job['file_path'])
+        return self.get_job(job_id)
+
+    def _heartbeat(self, job_id: str, stop: threading.Event) -> None:
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            self._update(job_id)
+
+    def run_worker(self, poll_interval: float = POLL_INTERVAL, idle_timeout: Optional[float] = None,
+                   once: bool = False) -> int:
+        """
+        Run queued jobs one at a time, requeueing the jobs of dead workers
+        every REQUEUE_INTERVAL seconds. Returns the number of jobs run once
+        the queue stayed empty for idle_timeout seconds (None: never), or
+        right away when it is empty with once=True.
+        """
+        done = 0
+        idle_since = time.monotonic()
+        requeued_at = None
+        while True:
+            if requeued_at is None or time.monotonic() - requeued_at >= REQUEUE_INTERVAL:
+                self.requeue_stale()
+                requeued_at = time.monotonic()
+            job_id = self.claim_next()
+            if job_id:
+                self.run_job(job_id)
+                done += 1
+                idle_since = time.monotonic()
+                continue
+            # A job queued just as this worker exits is picked up by the worker
+            # the polling page starts again (ensure_worker)
+            if once or (idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout):
+                return done
+            time.sleep(poll_interval)
+
+
+def _worker_main() -> None:
+    ImportJobService().run_worker(idle_timeout=WORKER_IDLE_TIMEOUT)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def ensure_worker():
+    """
+    Start this server's import worker process unless it is already running.
+    Called on upload and by the pages while jobs are queued, so a worker that
+    exited (idle timeout, server restart) is started again.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            # spawn: a forked child would inherit the parent's pooled DB connections
+            context = multiprocessing.get_context('spawn')
+            _worker = context.Process(target=_worker_main, name='import-worker', daemon=True)
+            _worker.start()
+        return _worker
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run queued GPS / VnNox audit imports.")
+    parser.add_argument('--once', action='store_true', help="Exit when the queue is empty")
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL, help="Seconds between queue polls")
+    args = parser.parse_args(argv)
+
+    from src.data.db_config import init_db
+    init_db()
+    count = ImportJobService().run_worker(poll_interval=args.poll_interval, once=args.once)
+    print(f"{count} import jobs run")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
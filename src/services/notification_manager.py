@@ -1,7 +1,7 @@
 import datetime
 from typing import List, Dict, Any
 from src.data.db_config import SessionLocal
-from src.data.models import Vehicle, Driver, Campaign, Document, DriverSchedule, VehicleSchedule
+from src.data.models import Vehicle, Driver, Campaign, Document, DriverSchedule, VehicleSchedule, CampaignVehicleAssignment
 from src.data.company_settings import CompanySettings
 from src.services.email_service import EmailService
 
@@ -175,16 +175,17 @@ class NotificationManager:
         today = datetime.date.today()
         
         # 1. Defective Vehicles Impacting Campaigns (Current & Future)
-        from sqlalchemy import or_
         defective_vehicles = session.query(Vehicle).filter(Vehicle.status.in_(['defective', 'maintenance'])).all()
         for v in defective_vehicles:
+            # Main or additional vehicle, via the indexed assignments table
+            assigned = session.query(CampaignVehicleAssignment.campaign_id).filter(
+                CampaignVehicleAssignment.vehicle_id == v.id,
+                CampaignVehicleAssignment.end_date >= today
+            )
             impacted_campaigns = session.query(Campaign).filter(
+                Campaign.id.in_(assigned),
                 Campaign.end_date >= today,
-                Campaign.status != 'cancelled',
-                or_(
-                    Campaign.vehicle_id == v.id,
-                    Campaign.additional_vehicles.contains([{'vehicle_id': v.id}])
-                )
+                Campaign.status != 'cancelled'
             ).all()
             
             for c in impacted_campaigns:
@@ -3,8 +3,11 @@ import datetime
 import uuid
 from typing import List, Dict, Any, Optional
 
+from sqlalchemy.orm import load_only
+
 from src.data.db_config import SessionLocal
-from src.data.models import Campaign, Vehicle, Driver, DriverAssignmentHistory
+from src.data.entity_cache import entity_cache
+from src.data.models import Campaign, Vehicle, Driver, DriverAssignmentHistory, CampaignVehicleAssignment
 from src.data.campaign_storage import CampaignStorage
 from src.data.vehicle_manager import VehicleManager
 from src.data.driver_manager import DriverManager
@@ -36,21 +39,19 @@ class ResourceService:
             )
             
             if resource_type.lower() == 'vehicle':
-                # Check main vehicle AND additional vehicles
-                # We need to find campaigns where vehicle_id == resource_id
-                # OR campaigns that have resource_id in their additional_vehicles JSON list
-                from sqlalchemy import or_
-                query = query.filter(or_(
-                    Campaign.vehicle_id == resource_id,
-                    Campaign.additional_vehicles.contains([{'vehicle_id': resource_id}])
-                ))
+                # Main vehicle AND additional vehicles, via the indexed assignments table
+                assigned = session.query(CampaignVehicleAssignment.campaign_id).filter(
+                    CampaignVehicleAssignment.vehicle_id == resource_id,
+                    CampaignVehicleAssignment.end_date >= status_date
+                )
+                query = query.filter(Campaign.id.in_(assigned))
             elif resource_type.lower() == 'driver':
-                # Campaigns linked to this driver explicitly
-                from sqlalchemy import or_
-                query = query.filter(or_(
-                    Campaign.driver_id == resource_id,
-                    Campaign.additional_vehicles.contains([{'driver_id': resource_id}])
-                ))
+                # Campaigns linked to this driver explicitly (main or additional vehicle)
+                assigned = session.query(CampaignVehicleAssignment.campaign_id).filter(
+                    CampaignVehicleAssignment.driver_id == resource_id,
+                    CampaignVehicleAssignment.end_date >= status_date
+                )
+                query = query.filter(Campaign.id.in_(assigned))
             
             candidates = query.all()
             
@@ -80,6 +81,61 @@ class ResourceService:
         finally:
             session.close()
 
+    @staticmethod
+    def _replacement_timeline(campaign, new_vehicle_id: str, effective_date: datetime.datetime) -> List[Dict[str, Any]]:
+        """
+        vehicle_timeline of `campaign` with new_vehicle_id taking over from effective_date:
+        earlier entries are kept, the overlapping one truncated, later ones dropped.
+        """
+        eff_date_str = effective_date.date().isoformat()
+        campaign_start = campaign.start_date.isoformat() if campaign.start_date else eff_date_str
+        campaign_end = campaign.end_date.isoformat() if campaign.end_date else eff_date_str
+        
+        # Get current vehicle (from vehicle_id or timeline)
+        current_vehicle_id = campaign.vehicle_id
+        
+        # Build new timeline
+        new_timeline = []
+        
+        # If timeline is empty, create initial entry for old vehicle
+        if not campaign.vehicle_timeline:
+            # Old vehicle from start until effective_date - 1
+            prev_day = (effective_date.date() - datetime.timedelta(days=1)).isoformat()
+            if campaign_start < eff_date_str:
+                new_timeline.append({
+                    'vehicle_id': current_vehicle_id,
+                    'start_date': campaign_start,
+                    'end_date': prev_day
+                })
+        else:
+            # Process existing timeline
+            for entry in campaign.vehicle_timeline:
+                entry_start = entry.get('start_date', campaign_start)
+                entry_end = entry.get('end_date', campaign_end)
+                
+                # If entry ends before effective date, keep it
+                if entry_end < eff_date_str:
+                    new_timeline.append(entry)
+                # If entry starts after effective date, skip it (will be replaced)
+                elif entry_start >= eff_date_str:
+                    continue
+                # If entry overlaps effective date, truncate it
+                else:
+                    prev_day = (effective_date.date() - datetime.timedelta(days=1)).isoformat()
+                    new_timeline.append({
+                        'vehicle_id': entry['vehicle_id'],
+                        'start_date': entry_start,
+                        'end_date': prev_day
+                    })
+        
+        # Add new vehicle entry from effective_date to campaign end
+        new_timeline.append({
+            'vehicle_id': new_vehicle_id,
+            'start_date': eff_date_str,
+            'end_date': campaign_end
+        })
+        return new_timeline
+
     def replace_vehicle_in_campaign(self, campaign_id: str, new_vehicle_id: str, 
                                   effective_date: datetime.datetime) -> bool:
         """
@@ -94,61 +150,13 @@ class ResourceService:
             if not campaign:
                 return False
             
+            new_timeline = self._replacement_timeline(campaign, new_vehicle_id, effective_date)
             eff_date_str = effective_date.date().isoformat()
-            campaign_start = campaign.start_date.isoformat() if campaign.start_date else eff_date_str
-            campaign_end = campaign.end_date.isoformat() if campaign.end_date else eff_date_str
-            
-            # Initialize timeline if empty
-            if not campaign.vehicle_timeline:
-                campaign.vehicle_timeline = []
-            
-            # Get current vehicle (from vehicle_id or timeline)
-            current_vehicle_id = campaign.vehicle_id
-            
-            # Build new timeline
-            new_timeline = []
-            
-            # If timeline is empty, create initial entry for old vehicle
-            if not campaign.vehicle_timeline:
-                # Old vehicle from start until effective_date - 1
-                prev_day = (effective_date.date() - datetime.timedelta(days=1)).isoformat()
-                if campaign_start < eff_date_str:
-                    new_timeline.append({
-                        'vehicle_id': current_vehicle_id,
-                        'start_date': campaign_start,
-                        'end_date': prev_day
-                    })
-            else:
-                # Process existing timeline
-                for entry in campaign.vehicle_timeline:
-                    entry_start = entry.get('start_date', campaign_start)
-                    entry_end = entry.get('end_date', campaign_end)
-                    
-                    # If entry ends before effective date, keep it
-                    if entry_end < eff_date_str:
-                        new_timeline.append(entry)
-                    # If entry starts after effective date, skip it (will be replaced)
-                    elif entry_start >= eff_date_str:
-                        continue
-                    # If entry overlaps effective date, truncate it
-                    else:
-                        prev_day = (effective_date.date() - datetime.timedelta(days=1)).isoformat()
-                        new_timeline.append({
-                            'vehicle_id': entry['vehicle_id'],
-                            'start_date': entry_start,
-                            'end_date': prev_day
-                        })
-            
-            # Add new vehicle entry from effective_date to campaign end
-            new_timeline.append({
-                'vehicle_id': new_vehicle_id,
-                'start_date': eff_date_str,
-                'end_date': campaign_end
-            })
             
             # Update campaign
             campaign.vehicle_timeline = new_timeline
             campaign.vehicle_id = new_vehicle_id  # Keep this as "current" vehicle for compatibility
+            CampaignStorage.sync_vehicle_assignments(session, campaign)
             
             session.commit()
             logger.info(f"Updated vehicle timeline in campaign {campaign_id}: added {new_vehicle_id} from {eff_date_str}")
@@ -168,7 +176,6 @@ class ResourceService:
         Returns count of affected campaigns.
         """
         session = SessionLocal()
-        count = 0
         try:
             # Find campaigns using this vehicle starting >= effective_date OR overlapping
             # Note: We need campaigns where end_date >= effective_date
@@ -178,20 +185,21 @@ class ResourceService:
                 Campaign.status.in_(['active', 'confirmed', 'pending'])
             )
             
-            candidates = c_query.all()
-            session.close() # Close read session, individual updates use own sessions/logic
-            
-            for c in candidates:
-                # We reuse the logic in replace_vehicle_in_campaign which handles:
-                # - Full update if start >= effective
-                # - Split if overlaps
-                
-                # We need datetime for split logic
-                eff_dt = datetime.datetime.combine(effective_date, datetime.time.min)
-                if self.replace_vehicle_in_campaign(c.id, new_vehicle_id, eff_dt):
-                    count += 1
-                    
-            return count
+            # Only the columns the timeline split reads
+            candidates = c_query.options(load_only(
+                Campaign.id, Campaign.vehicle_id, Campaign.start_date, Campaign.end_date, Campaign.vehicle_timeline
+            )).all()
+
+            # Same split as replace_vehicle_in_campaign, applied to all campaigns in one batch
+            eff_dt = datetime.datetime.combine(effective_date, datetime.time.min)
+            changes = [{
+                'id': campaign.id,
+                'vehicle_id': new_vehicle_id,  # Keep this as "current" vehicle for compatibility
+                'vehicle_timeline': self._replacement_timeline(campaign, new_vehicle_id, eff_dt)
+            } for campaign in candidates]
+            session.close()
+
+            return self.storage.bulk_update_campaigns(changes)
         except Exception as e:
             logger.error(f"Error replacing vehicle globally: {e}")
             return 0
@@ -229,6 +237,7 @@ class ResourceService:
         try:
             # 1. Update Vehicle
             veh = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+            previous_driver_id = veh.driver_id if veh else None
             if veh:
                 veh.driver_id = new_driver_id
                 # Fetch Name
@@ -270,8 +279,12 @@ class ResourceService:
                     # Implementing split for active ones:
                     # self.replace_driver_in_campaign(c.id, new_driver_id, effective_date)
                     pass 
+                CampaignStorage.sync_vehicle_assignments(session, c)
 
             session.commit()
+            entity_cache.invalidate('vehicle', vehicle_id)
+            for d_id in {previous_driver_id, new_driver_id} - {None}:
+                entity_cache.invalidate('driver', d_id)
             return count
         except Exception as e:
             logger.error(f"Error replacing driver: {e}")
@@ -11,6 +11,7 @@ from PyQt6.QtCore import Qt, QDate, QRectF
 from PyQt6.QtGui import QColor, QBrush, QPen, QFont, QAction
 import datetime
 from src.data.campaign_storage import CampaignStorage
+from src.data.change_feed import changes_since
 from src.data.vehicle_manager import VehicleManager
 from src.data.distance_service import DistanceService
 
@@ -29,6 +30,10 @@ class CampaignCalendarView(QDialog):
         self.start_date = datetime.date.today()
         self.days_to_show = 30
         
+        # Datasets kept between redraws; refreshed from the change feed
+        self.feed_cursor = None
+        self.campaigns, self.vehicles, self.schedules = [], [], []
+        
         self.init_ui()
         self.load_data()
         
@@ -179,6 +184,22 @@ class CampaignCalendarView(QDialog):
         start2, end2 = range2
         return max(start1, start2) < min(end1, end2)
 
+    def refresh_data(self):
+        """Refetch only the datasets the change feed reports as modified"""
+        changes = changes_since(self.feed_cursor, kinds=('campaigns', 'vehicles', 'drivers', 'vehicle_schedules'))
+        self.feed_cursor = changes['cursor']
+
+        def touched(*kinds):
+            return changes['full_reload'] or any(changes['changed'][k] or changes['deleted'][k] for k in kinds)
+
+        # Campaign dicts carry vehicle and driver names
+        if touched('campaigns', 'vehicles', 'drivers'):
+            self.campaigns = self.storage.get_all_campaigns()
+        if touched('vehicles', 'drivers'):
+            self.vehicles = self.vehicle_manager.get_active_vehicles()
+        if touched('vehicle_schedules'):
+            self.schedules = self.vehicle_manager.get_vehicle_schedules()
+
     def load_data(self):
         self.scene.clear()
         
@@ -187,9 +208,8 @@ class CampaignCalendarView(QDialog):
         self.date_label.setText(f"{self.start_date.strftime('%d %b %Y')} - {end_date.strftime('%d %b %Y')}")
         
         # Get data
-        campaigns = self.storage.get_all_campaigns()
-        vehicles = self.vehicle_manager.get_active_vehicles()
-        all_schedules = self.vehicle_manager.get_vehicle_schedules()
+        self.refresh_data()
+        campaigns, vehicles, all_schedules = self.campaigns, self.vehicles, self.schedules
         
         # Constants
         ROW_HEIGHT = 60
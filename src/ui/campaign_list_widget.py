@@ -4,6 +4,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QColor, QBrush
 from src.data.campaign_storage import CampaignStorage
+from src.data.change_feed import apply_delta, changes_since, has_changes
 
 class CampaignListWidget(QWidget):
     """
@@ -15,6 +16,7 @@ class CampaignListWidget(QWidget):
         super().__init__(parent)
         self.storage = CampaignStorage()
         self.campaigns = []
+        self.feed_cursor = None
         self.init_ui()
         self.load_campaigns()
         
@@ -65,8 +67,21 @@ class CampaignListWidget(QWidget):
         layout.addWidget(self.count_label)
         
     def load_campaigns(self):
-        """Load all campaigns from storage"""
-        self.campaigns = self.storage.get_all_campaigns()
+        """Load all campaigns on the first call, then apply the change-feed delta"""
+        changes = changes_since(self.feed_cursor, kinds=('campaigns', 'vehicles', 'drivers'))
+        self.feed_cursor = changes['cursor']
+        if not has_changes(changes):
+            return
+        # Vehicle and driver names are copied into the rows: those changes need a full reload
+        if changes['full_reload'] or any(changes['changed'][k] or changes['deleted'][k] for k in ('vehicles', 'drivers')):
+            self.campaigns = self.storage.get_all_campaigns()
+        else:
+            changed_ids = changes['changed']['campaigns']
+            fetched = self.storage.get_campaigns_by_ids(changed_ids)
+            # Changed but not returned means archived
+            gone = set(changes['deleted']['campaigns']) | (set(changed_ids) - {c['id'] for c in fetched})
+            self.campaigns = apply_delta(self.campaigns, fetched, gone)
+            self.campaigns.sort(key=lambda c: c.get('last_modified') or '', reverse=True)
         self.populate_table(self.campaigns)
         
     def populate_table(self, campaigns):
@@ -30,7 +30,8 @@ class ConflictDetector:
             - blocking_conflicts: List of exclusive campaigns that block this campaign
             - warnings: List of non-exclusive campaigns that overlap
         """
-        all_campaigns = self.storage.get_all_campaigns()
+        # Only this vehicle's campaigns, without the heavy audit/route payloads
+        all_campaigns = self.storage.get_campaign_summaries(include_schedule=True, vehicle_id=vehicle_id)
         
         blocking_conflicts = []
         warnings = []
@@ -95,7 +96,7 @@ class ConflictDetector:
         Check for conflicts at city level (more granular).
         If campaigns are in different cities during overlapping dates, they don't conflict.
         """
-        all_campaigns = self.storage.get_all_campaigns()
+        all_campaigns = self.storage.get_campaign_summaries(include_schedule=True, vehicle_id=vehicle_id)
         
         blocking_conflicts = list(existing_blocks)
         warnings = list(existing_warnings)
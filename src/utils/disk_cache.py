@@ -0,0 +1,96 @@
+"""
+Disk Cache
+Directory of content-addressed files with a size budget, shared by the
+caches of the app (rendered charts, photo thumbnails, parsed imports).
+
+Entries are files named <key><suffix>. Reading one bumps its mtime and the
+least recently used files are removed once the cache exceeds its size
+budget. Writes go through a temp file + rename, so worker processes can
+share the directory.
+"""
+import os
+import threading
+from typing import Optional
+
+
+class DiskCache:
+    """On-disk LRU of byte strings keyed by hex digests"""
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = '') -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached bytes, or None"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError:
+            # A cache that cannot be written only costs recomputing the entry
+            pass
+
+    def _evict(self) -> None:
+        """Remove least recently used files until the directory fits max_bytes"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(self.suffix):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(self.suffix):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+        with self._lock:
+            self.hits = self.misses = 0
@@ -1,20 +1,36 @@
 import pandas as pd
+import numpy as np
+import csv
 import io
+import itertools
 import re
 import datetime
+from collections.abc import Sequence
 
 
-def parse_gps_log(file_content, filename=""):
+def parse_gps_log(file_content, filename="", columnar=False):
     """
     Parses various GPS log formats.
     Returns a dictionary with:
         'total_distance' : float  – km
         'pings'          : int
         'format'         : str
-        'gps_points'     : list[{'lat': float, 'lon': float, 'timestamp': str, 'address': str}]
+        'gps_points'     : list[{'lat': float, 'lon': float, 'timestamp': str, 'address': str,
+                                   'distance': float (only when the log has distances)}]
+                           (a GpsPoints of parallel arrays when columnar=True)
         'date_start'     : str | None  – ISO date "YYYY-MM-DD"
         'date_end'       : str | None
     """
+    result = _parse_gps_log(file_content, filename)
+    points = result['gps_points']
+    if columnar:
+        result['gps_points'] = points if isinstance(points, GpsPoints) else GpsPoints.empty()
+    elif isinstance(points, GpsPoints):
+        result['gps_points'] = points.to_dicts()
+    return result
+
+
+def _parse_gps_log(file_content, filename):
     empty = {'total_distance': 0.0, 'pings': 0, 'format': 'empty',
              'gps_points': [], 'date_start': None, 'date_end': None}
     if not file_content:
@@ -36,7 +52,8 @@ def parse_gps_log(file_content, filename=""):
     else:
         content_str = file_content
 
-    lines = [l.strip() for l in content_str.splitlines() if l.strip()]
+    # Only the first lines decide the format
+    lines = list(itertools.islice((l.strip() for l in io.StringIO(content_str) if l.strip()), 5))
 
     # Text-based EasyTrackMap (pasted TSV)
     if any("Timpul plec" in l for l in lines[:5]):
@@ -75,8 +92,80 @@ def parse_gps_log(file_content, filename=""):
 # GPS point helpers
 # ---------------------------------------------------------------------------
 
+class GpsPoints(Sequence):
+    """
+    Parsed GPS points as parallel arrays: lat / lon float64 arrays plus
+    timestamps and addresses (object arrays, or None when every point has
+    none / an empty address). Indexing and iterating give the point dicts
+    {'lat', 'lon', 'timestamp', 'address'} (+ 'distance' when distances is
+    set); to_dicts() builds the full list.
+
+    distances (km, or None) holds the log distance of the row each point
+    came from, on one point of the row (the departure of a trip), so
+    overlapping imports can be merged point by point without losing km.
+    """
+    __slots__ = ('lat', 'lon', 'timestamps', 'addresses', 'distances')
+
+    def __init__(self, lat, lon, timestamps=None, addresses=None, distances=None):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.timestamps = timestamps
+        self.addresses = addresses
+        self.distances = distances
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0), np.empty(0))
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _point(self, i):
+        point = {
+            'lat': float(self.lat[i]),
+            'lon': float(self.lon[i]),
+            'timestamp': self.timestamps[i] if self.timestamps is not None else None,
+            'address': self.addresses[i] if self.addresses is not None else ''
+        }
+        if self.distances is not None:
+            point['distance'] = float(self.distances[i])
+        return point
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.select(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._point(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._point(i)
+
+    def select(self, index):
+        """The points at a slice, boolean mask or index array"""
+        return GpsPoints(self.lat[index], self.lon[index],
+                         self.timestamps[index] if self.timestamps is not None else None,
+                         self.addresses[index] if self.addresses is not None else None,
+                         self.distances[index] if self.distances is not None else None)
+
+    def to_dicts(self):
+        """The legacy list of point dicts"""
+        lats, lons = self.lat.tolist(), self.lon.tolist()
+        timestamps = self.timestamps.tolist() if self.timestamps is not None else [None] * len(lats)
+        addresses = self.addresses.tolist() if self.addresses is not None else [''] * len(lats)
+        points = [{'lat': lat, 'lon': lon, 'timestamp': ts, 'address': addr}
+                  for lat, lon, ts, addr in zip(lats, lons, timestamps, addresses)]
+        if self.distances is not None:
+            for point, distance in zip(points, self.distances.tolist()):
+                point['distance'] = distance
+        return points
+
+
 def _parse_coord_string(s):
-    """Parse '44,410587; 26,054817' or '44.410587, 26.054817' into (lat, lon)."""
+    """Parse '44,410587; 26,054817' or '44.410587; 26.054817' into (lat, lon)."""
     if not s or not isinstance(s, str):
         return None, None
     s = s.strip().replace(',', '.')
@@ -89,6 +178,37 @@ def _parse_coord_string(s):
     return None, None
 
 
+# 'lat; lon' cell after the decimal commas became dots
+COORD_PAIR = r'^\s*([^;|]*?)\s*[;|]+\s*([^;|]*?)\s*$'
+
+
+def _parse_coord_column(series):
+    """
+    _parse_coord_string over a whole column: (lat, lon, valid) arrays, with
+    NaN coordinates where the cell is not a 'lat; lon' pair.
+    """
+    # Exactly two parts around one run of ';' / '|' separators. contains/replace
+    # (rather than extract) stay on the Arrow string kernels when available.
+    text = series.astype('str').str.replace(',', '.', regex=False)
+    pair = text.str.contains(r'^[^;|]*[;|]+[^;|]*$', regex=True, na=False).to_numpy(dtype=bool)
+    lat = pd.to_numeric(text.str.replace(COORD_PAIR, r'\1', regex=True), errors='coerce')
+    lon = pd.to_numeric(text.str.replace(COORD_PAIR, r'\2', regex=True), errors='coerce')
+    lat = lat.to_numpy(dtype=np.float64, na_value=np.nan)
+    lon = lon.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = pair & ~np.isnan(lat) & ~np.isnan(lon)
+    return lat, lon, valid
+
+
+def _parse_distance_column(series):
+    """
+    Distance cells to km: first token, decimal comma, anything but digits and
+    dots dropped; '-', '~', blanks and unparseable cells count as 0.
+    """
+    token = series.astype('str').str.replace(r'^\s*(\S*).*$', r'\1', regex=True) \
+        .str.replace(',', '.', regex=False).str.replace(r'[^0-9.]', '', regex=True)
+    return pd.to_numeric(token, errors='coerce').astype(np.float64).fillna(0.0)
+
+
 def _ts_to_str(ts):
     """Convert datetime / date / string to ISO string."""
     if ts is None:
@@ -98,23 +218,40 @@ def _ts_to_str(ts):
     return str(ts)
 
 
+_ts_to_str_array = np.frompyfunc(_ts_to_str, 1, 1)
+
+
+def _timestamp_column(series, mask):
+    """ISO strings (_ts_to_str) of the masked cells, as an object array"""
+    if pd.api.types.is_string_dtype(series.dtype) and not pd.api.types.is_object_dtype(series.dtype):
+        return _text_column(series, mask)
+    values = series.to_numpy(dtype=object)[mask]
+    if not len(values):
+        return np.empty(0, dtype=object)
+    return _ts_to_str_array(values).astype(object)
+
+
+def _text_column(series, mask):
+    """str() of the masked cells (NaN -> 'nan'), as an object array"""
+    return series.astype(object).where(series.notna(), 'nan').astype(str).to_numpy(dtype=object)[mask]
+
+
 def _extract_csv_points(df):
     lat_col = 'latitude' if 'latitude' in df.columns else ('lat' if 'lat' in df.columns else None)
     lon_col = 'longitude' if 'longitude' in df.columns else ('lon' if 'lon' in df.columns else None)
     ts_col = 'timestamp' if 'timestamp' in df.columns else None
-    pts = []
-    if lat_col and lon_col:
-        for _, row in df.iterrows():
-            try:
-                pts.append({
-                    'lat': float(row[lat_col]),
-                    'lon': float(row[lon_col]),
-                    'timestamp': str(row[ts_col]) if ts_col else None,
-                    'address': ''
-                })
-            except Exception:
-                pass
-    return pts
+    if not (lat_col and lon_col):
+        return GpsPoints.empty()
+    lat = pd.to_numeric(df[lat_col], errors='coerce').to_numpy(dtype=np.float64)
+    lon = pd.to_numeric(df[lon_col], errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(lat) & ~np.isnan(lon)
+    timestamps = _text_column(df[ts_col], valid) if ts_col else None
+    if 'distance' in df.columns:
+        distances = pd.to_numeric(df['distance'], errors='coerce').to_numpy(dtype=np.float64)
+        distances = np.nan_to_num(distances)[valid]
+    else:
+        distances = np.full(int(valid.sum()), 0.1)  # points_only_csv counts 0.1 km per ping
+    return GpsPoints(lat[valid], lon[valid], timestamps, distances=distances)
 
 
 def _extract_dates_csv(df):
@@ -177,21 +314,10 @@ def _parse_excel(file_bytes):
         df = df[df[target_col].notna()]
         df = df[df[target_col].astype(str).str.strip() != '-']
 
-        def clean_val(v):
-            v_str = str(v).strip()
-            if not v_str or v_str in ('-', '~'):
-                return 0.0
-            v_str = v_str.split()[0]
-            v_str = v_str.replace(',', '.')
-            try:
-                return float(re.sub(r'[^\d.]', '', v_str))
-            except Exception:
-                return 0.0
-
-        total_dist = df[target_col].apply(clean_val).sum()
+        row_dist = _parse_distance_column(df[target_col])
+        total_dist = row_dist.sum()
 
         # --- Extract GPS points ---
-        gps_points = []
         # Find coordinate and timestamp columns
         coord_start_col = next((c for c in df.columns if 'coordonata' in c and 'porn' in c), None)
         coord_end_col = next((c for c in df.columns if 'coordonata' in c and ('sosire' in c or 'final' in c)), None)
@@ -205,27 +331,8 @@ def _parse_excel(file_bytes):
                 coord_start_col = coord_cols[0]
                 coord_end_col = coord_cols[1] if len(coord_cols) > 1 else None
 
-        for _, row in df.iterrows():
-            # Departure point
-            if coord_start_col:
-                lat, lon = _parse_coord_string(str(row[coord_start_col]))
-                if lat is not None:
-                    gps_points.append({
-                        'lat': lat,
-                        'lon': lon,
-                        'timestamp': _ts_to_str(row.get(ts_start_col)) if ts_start_col else None,
-                        'address': str(row[addr_start_col]) if addr_start_col else ''
-                    })
-            # Arrival point
-            if coord_end_col:
-                lat, lon = _parse_coord_string(str(row[coord_end_col]))
-                if lat is not None:
-                    gps_points.append({
-                        'lat': lat,
-                        'lon': lon,
-                        'timestamp': None,
-                        'address': ''
-                    })
+        gps_points = _excel_points(df, coord_start_col, coord_end_col, ts_start_col, addr_start_col,
+                                   row_dist.to_numpy(dtype=np.float64))
 
         # --- Date range ---
         date_start, date_end = None, None
@@ -260,14 +367,62 @@ def _parse_excel(file_bytes):
             'gps_points': [], 'date_start': None, 'date_end': None}
 
 
+def _excel_points(df, coord_start_col, coord_end_col, ts_start_col, addr_start_col, row_dist=None):
+    """
+    Departure point (with its timestamp and address) then arrival point of
+    every trip row, skipping cells without valid coordinates. The trip's
+    distance goes on its departure point (arrival when that is missing).
+    """
+    n = len(df)
+    lat = np.full((n, 2), np.nan)
+    lon = np.full((n, 2), np.nan)
+    valid = np.zeros((n, 2), dtype=bool)
+    timestamps = np.full((n, 2), None, dtype=object)
+    addresses = np.full((n, 2), '', dtype=object)
+    if coord_start_col:
+        lat[:, 0], lon[:, 0], valid[:, 0] = _parse_coord_column(df[coord_start_col])
+        if ts_start_col:
+            timestamps[valid[:, 0], 0] = _timestamp_column(df[ts_start_col], valid[:, 0])
+        if addr_start_col:
+            addresses[valid[:, 0], 0] = _text_column(df[addr_start_col], valid[:, 0])
+    if coord_end_col:
+        lat[:, 1], lon[:, 1], valid[:, 1] = _parse_coord_column(df[coord_end_col])
+    distances = None
+    if row_dist is not None:
+        distances = np.zeros((n, 2))
+        distances[:, 0] = np.where(valid[:, 0], row_dist, 0.0)
+        distances[:, 1] = np.where(~valid[:, 0] & valid[:, 1], row_dist, 0.0)
+    # Row-major ravel keeps the departure / arrival order of the rows
+    keep = valid.ravel()
+    return GpsPoints(lat.ravel()[keep], lon.ravel()[keep],
+                     timestamps.ravel()[keep] if ts_start_col else None,
+                     addresses.ravel()[keep] if addr_start_col else None,
+                     distances.ravel()[keep] if distances is not None else None)
+
+
 # ---------------------------------------------------------------------------
 # EasyTrackMap text (TSV)
 # ---------------------------------------------------------------------------
 
+def _read_delimited(content_str):
+    """
+    DataFrame of pasted delimited text. The delimiter is sniffed from the
+    header line (as sep=None does) and the rows go through the C parser;
+    the python engine remains the fallback for text it rejects.
+    """
+    header = content_str.lstrip().split('\n', 1)[0]
+    try:
+        dialect = csv.Sniffer().sniff(header)
+        return pd.read_csv(io.StringIO(content_str), sep=dialect.delimiter, quotechar=dialect.quotechar,
+                           skipinitialspace=True)
+    except Exception:
+        return pd.read_csv(io.StringIO(content_str), sep=None, engine='python', skipinitialspace=True)
+
+
 def _parse_easytrack_text(content_str):
     from src.utils.i18n import remove_diacritics
     try:
-        df = pd.read_csv(io.StringIO(content_str), sep=None, engine='python', skipinitialspace=True)
+        df = _read_delimited(content_str)
         df.columns = [remove_diacritics(str(c)).strip() for c in df.columns]
 
         target_col = None
@@ -283,33 +438,18 @@ def _parse_easytrack_text(content_str):
                     break
 
         if target_col:
-            vals = df[target_col].astype(str)
-
-            def clean_val(v):
-                if v in ('-', '~'):
-                    return 0.0
-                v = v.split()[0]
-                v = v.replace(',', '.')
-                try:
-                    return float(re.sub(r'[^\d.]', '', v))
-                except Exception:
-                    return 0.0
-
-            total_dist = vals.apply(clean_val).sum()
+            row_dist = _parse_distance_column(df[target_col])
+            total_dist = row_dist.sum()
 
             # Try to extract GPS points from coord columns if present
-            gps_points = []
+            gps_points = GpsPoints.empty()
             coord_col = next((c for c in df.columns if 'Coordonata' in c), None)
             ts_col = next((c for c in df.columns if 'Timp' in c and 'plecar' in c.lower()), None)
             if coord_col:
-                for _, row in df.iterrows():
-                    lat, lon = _parse_coord_string(str(row[coord_col]))
-                    if lat is not None:
-                        gps_points.append({
-                            'lat': lat, 'lon': lon,
-                            'timestamp': _ts_to_str(row.get(ts_col)) if ts_col else None,
-                            'address': ''
-                        })
+                lat, lon, valid = _parse_coord_column(df[coord_col])
+                gps_points = GpsPoints(lat[valid], lon[valid],
+                                       _timestamp_column(df[ts_col], valid) if ts_col else None,
+                                       distances=row_dist.to_numpy(dtype=np.float64)[valid])
 
             # Date range
             date_start, date_end = None, None
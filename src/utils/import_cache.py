@@ -0,0 +1,119 @@
+"""
+Import Cache
+Audit uploads (GPS logs, VnNox play logs) are identified by a BLAKE2 hash
+of their raw bytes. Imports record it as 'content_hash', so uploading the
+same file to a campaign again is recognized without parsing it, and parse
+results are cached on disk under the hash: the same file imported into
+another campaign (or after its import was deleted) is not parsed again.
+
+Entries are parse results stored as JSON in a DiskCache directory (LRU,
+size budget, atomic writes); columnar GPS points are kept as tagged
+parallel lists. Unlike pickles, an entry written to the shared directory
+by someone else can at worst hold wrong data, never run code. Bump
+PARSER_VERSION when a parser's output changes.
+"""
+import hashlib
+import logging
+import json
+import os
+from typing import IO, Any, Callable, Dict, Tuple, Union
+
+import numpy as np
+
+from src.utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+PARSER_VERSION = 3
+
+# Key of the JSON object holding a GpsPoints' columns
+GPS_POINTS_TAG = '__gps_points__'
+
+IMPORT_CACHE_DIR = os.environ.get(
+    "IMPORT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'reports', '.import_cache')
+)
+# Disk budget; 0 disables the cache
+IMPORT_CACHE_MAX_BYTES = int(os.environ.get("IMPORT_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+
+# Bytes hashed per read of an upload
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(content: Union[bytes, IO[bytes]]) -> str:
+    """
+    BLAKE2b hex digest of an upload's bytes. File objects are read in chunks
+    from their current position, which is restored afterwards.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        digest.update(content)
+        return digest.hexdigest()
+    if isinstance(content, str):
+        digest.update(content.encode('utf-8'))
+        return digest.hexdigest()
+    start = content.tell()
+    try:
+        for chunk in iter(lambda: content.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    finally:
+        content.seek(start)
+    return digest.hexdigest()
+
+
+def _to_json(value: Any) -> Any:
+    """json.dumps default: GpsPoints as tagged column lists, numpy values as Python ones"""
+    from src.utils.gps_parser import GpsPoints
+    if isinstance(value, GpsPoints):
+        columns = {name: getattr(value, name) for name in GpsPoints.__slots__}
+        return {GPS_POINTS_TAG: {name: None if column is None else np.asarray(column).tolist()
+                                 for name, column in columns.items()}}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not cacheable")
+
+
+def _from_json(obj: Dict[str, Any]) -> Any:
+    """json.loads object_hook: rebuilds the GpsPoints written by _to_json"""
+    if GPS_POINTS_TAG not in obj:
+        return obj
+    from src.utils.gps_parser import GpsPoints
+    columns = obj[GPS_POINTS_TAG]
+
+    def objects(values):
+        return None if values is None else np.array(values, dtype=object)
+    distances = columns.get('distances')
+    return GpsPoints(columns['lat'], columns['lon'], objects(columns.get('timestamps')),
+                     objects(columns.get('addresses')),
+                     None if distances is None else np.asarray(distances, dtype=np.float64))
+
+
+def cached_parse(kind: str, digest: str, parse: Callable[[], Any], variant: str = '') -> Tuple[Any, bool]:
+    """
+    parse() result for the upload with content hash `digest`, from the cache
+    when the same kind / variant (e.g. the file extension a parser branches
+    on) was parsed before. Returns (result, cache hit). Parse errors propagate
+    and are not cached; neither are results JSON cannot hold.
+    """
+    key = hashlib.blake2b(f"{PARSER_VERSION}:{kind}:{variant}:{digest}".encode('utf-8'),
+                          digest_size=20).hexdigest()
+    data = import_cache.get(key)
+    if data is not None:
+        try:
+            return json.loads(data, object_hook=_from_json), True
+        except Exception as e:
+            logger.warning(f"Discarding unreadable import cache entry {key}: {e}")
+    result = parse()
+    try:
+        encoded = json.dumps(result, default=_to_json, separators=(',', ':')).encode('utf-8')
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Not caching {kind} parse result {digest}: {e}")
+        return result, False
+    import_cache.put(key, encoded)
+    return result, False
+
+
+# Shared by the audit import paths
+import_cache = DiskCache(IMPORT_CACHE_DIR, IMPORT_CACHE_MAX_BYTES, suffix='.json')
@@ -14,6 +14,8 @@ import hashlib
 import datetime
 from typing import List, Dict, Any
 
+from src.utils.profiling import span
+
 # Distinctive palette for up to 10 days
 _DAY_COLORS = [
     '#e74c3c', '#3498db', '#2ecc71', '#f39c12', '#9b59b6',
@@ -21,6 +23,7 @@ _DAY_COLORS = [
 ]
 
 
+@span('route_map')
 def generate_route_map(gps_points: List[Dict[str, Any]], output_path: str = None) -> str | None:
     """
     Generate a PNG route map from a list of GPS point dicts.
@@ -62,8 +65,10 @@ def generate_route_map(gps_points: List[Dict[str, Any]], output_path: str = None
     ms = MapService(google_key=settings.get('google_maps_api_key'), 
                     mapbox_key=settings.get('mapbox_api_key'))
     
-    api_map_url = ms.get_static_route_map_url(gps_points)
-    if api_map_url and ms.download_static_map(api_map_url, output_path or 'static_map.png'):
+    with span('route_map.static_api'):
+        api_map_url = ms.get_static_route_map_url(gps_points)
+        downloaded = api_map_url and ms.download_static_map(api_map_url, output_path or 'static_map.png')
+    if downloaded:
         return output_path or 'static_map.png'
 
     # 2. Fallback to OSM tiles with matplotlib
@@ -106,16 +111,17 @@ def generate_route_map(gps_points: List[Dict[str, Any]], output_path: str = None
     canvas = PIL.Image.new('RGB', (width, height))
     
     headers = {'User-Agent': 'AntigravityPoPReport/1.0'}
-    for x in range(xtile_min, xtile_max + 1):
-        for y in range(ytile_min, ytile_max + 1):
-            url = f"https://tile.openstreetmap.org/{zoom}/{x}/{y}.png"
-            try:
-                r = requests.get(url, headers=headers, timeout=5)
-                if r.status_code == 200:
-                    tile = PIL.Image.open(io.BytesIO(r.content))
-                    canvas.paste(tile, ((x - xtile_min) * 256, (y - ytile_min) * 256))
-            except:
-                pass
+    with span('route_map.tiles'):
+        for x in range(xtile_min, xtile_max + 1):
+            for y in range(ytile_min, ytile_max + 1):
+                url = f"https://tile.openstreetmap.org/{zoom}/{x}/{y}.png"
+                try:
+                    r = requests.get(url, headers=headers, timeout=5)
+                    if r.status_code == 200:
+                        tile = PIL.Image.open(io.BytesIO(r.content))
+                        canvas.paste(tile, ((x - xtile_min) * 256, (y - ytile_min) * 256))
+                except:
+                    pass
 
     # Map bounds in degrees for imshow
     nw_lat, nw_lon = num2deg(xtile_min, ytile_min, zoom)
@@ -0,0 +1,136 @@
+"""
+Profiling
+Lightweight timing spans for report generation. A trace() block collects
+every span() entered inside it (same thread / context), with wall time,
+call count and the SQL statements executed while the span was open:
+
+    with trace('standard c1') as t:
+        with span('impressions'):
+            ...
+    t.as_dict()  ->  {'seconds': 2.3, 'queries': 41, 'phases': {'impressions': {...}}}
+
+span() also works as a decorator. Outside a trace spans cost one context
+variable lookup, unless DEBUG logging is on for this module, in which case
+each span is logged on its own. Nested spans are included in their
+parent's time and query count.
+
+Set REPORT_PROFILE=1 to store the trace of each generated report in
+GeneratedReport.frozen_data['profile'].
+"""
+import contextvars
+import logging
+import os
+import time
+from contextlib import ContextDecorator, contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Store traces with the report metadata
+PROFILE_IN_REPORTS = os.environ.get("REPORT_PROFILE", "") == "1"
+
+_current_trace = contextvars.ContextVar('profiling_trace', default=None)
+_query_count = contextvars.ContextVar('profiling_queries', default=None)
+
+
+class Trace:
+    """Per-phase timings collected by span() inside a trace() block"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.seconds = 0.0
+        self.queries = [0]  # Shared with _query_count (mutable so spans read it in place)
+
+    def add(self, phase: str, seconds: float, queries: int) -> None:
+        entry = self.phases.get(phase)
+        if entry is None:
+            entry = self.phases[phase] = {'seconds': 0.0, 'calls': 0, 'queries': 0}
+        entry['seconds'] += seconds
+        entry['calls'] += 1
+        entry['queries'] += queries
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'seconds': round(self.seconds, 4),
+            'queries': self.queries[0],
+            'phases': {name: dict(p, seconds=round(p['seconds'], 4)) for name, p in self.phases.items()}
+        }
+
+    def summary(self) -> str:
+        phases = sorted(self.phases.items(), key=lambda item: -item[1]['seconds'])
+        parts = [f"{name} {p['seconds']:.3f}s/{p['calls']}x/{p['queries']}q" for name, p in phases]
+        return f"{self.name}: {self.seconds:.3f}s, {self.queries[0]} queries | " + ", ".join(parts)
+
+
+class span(ContextDecorator):
+    """Time a phase of the current trace; use as `with span('x'):` or `@span('x')`"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._stack = []
+
+    def _recreate_cm(self):
+        # Each decorated call gets its own span (thread-safe, re-entrant)
+        return span(self.name)
+
+    def __enter__(self):
+        trace = _current_trace.get()
+        if trace is None and not logger.isEnabledFor(logging.DEBUG):
+            self._stack.append(None)
+            return self
+        counter = _query_count.get()
+        self._stack.append((trace, time.perf_counter(), counter[0] if counter else 0))
+        return self
+
+    def __exit__(self, *exc):
+        entry = self._stack.pop()
+        if entry is None:
+            return False
+        trace, started, queries_before = entry
+        seconds = time.perf_counter() - started
+        counter = _query_count.get()
+        queries = (counter[0] if counter else 0) - queries_before
+        if trace is not None:
+            trace.add(self.name, seconds, queries)
+        else:
+            logger.debug(f"{self.name}: {seconds:.3f}s, {queries} queries")
+        return False
+
+
+@contextmanager
+def trace(name: str, log: bool = True) -> Iterator[Trace]:
+    """Collect the spans of the block; logs the summary on exit when `log`"""
+    current = Trace(name)
+    trace_token = _current_trace.set(current)
+    count_token = _query_count.set(current.queries)
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - started
+        _current_trace.reset(trace_token)
+        _query_count.reset(count_token)
+        if log:
+            logger.info(current.summary())
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def profile_fields(current: Optional[Trace]) -> Dict[str, Any]:
+    """{'profile': ...} for a report's frozen_data when REPORT_PROFILE is on, else {}"""
+    if not PROFILE_IN_REPORTS or current is None:
+        return {}
+    return {'profile': current.as_dict()}
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
@@ -0,0 +1,103 @@
+"""
+Schedule Compilation
+Parses daily hour strings such as "09:00-17:00" or "08:00-12:00, 14:00-18:00"
+once into an immutable CompiledHours (minutes-of-day intervals with the
+totals, rush-hour overlap and span precomputed). compile_hours() is cached
+per string, so the same schedule text always yields the same object.
+
+Used by the report duration/impressions calculations, the Gantt interval
+expansion (web_app.utils.get_granular_intervals) and the Timesheet page.
+"""
+import datetime
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+
+# Rush-hour windows (hours of day) counted as peak exposure
+PEAK_WINDOWS = ((7, 9), (17, 19))
+
+
+class CompiledHours(NamedTuple):
+    text: str
+    # (start, end) minutes of day as written; an overnight end is smaller than its start
+    intervals: Tuple[Tuple[int, int], ...]
+    hours: float        # Net hours, overnight intervals wrapped past midnight
+    peak_hours: float   # Overlap with PEAK_WINDOWS
+    span_start: Optional[float]  # First start / last (wrapped) end, in hours
+    span_end: Optional[float]
+    # Gantt segments as offsets from midnight (see day_segments)
+    day_offsets: Tuple[Tuple[datetime.timedelta, datetime.timedelta], ...]
+
+    @property
+    def span_hours(self) -> float:
+        """First start to last end ('Pontaj' worked hours); 0 without intervals"""
+        return self.span_end - self.span_start if self.intervals else 0.0
+
+    def day_segments(self, day: datetime.date):
+        """
+        (start, end) datetimes of the intervals on `day`. An end of 00:00 or
+        24:00 closes the day; other intervals ending before they start are dropped.
+        """
+        base = datetime.datetime(day.year, day.month, day.day)
+        return [(base + start, base + end) for start, end in self.day_offsets]
+
+
+EMPTY_HOURS = CompiledHours('', (), 0.0, 0.0, None, None, ())
+
+
+def _parse_time(value: str) -> Tuple[int, int]:
+    parts = value.split(':')
+    return int(parts[0]), int(parts[1]) if ':' in value else 0
+
+
+@lru_cache(maxsize=4096)
+def _compile(text: str) -> CompiledHours:
+    intervals = []
+    hours, peak = 0.0, 0.0
+    times = []
+    for interval in [i.strip() for i in text.split(',')]:
+        try:
+            if '-' not in interval:
+                continue
+            start_time, end_time = interval.split('-')
+            start_h, start_m = _parse_time(start_time)
+            end_h, end_m = _parse_time(end_time)
+        except ValueError:
+            continue
+        interval_hours = (end_h - start_h) + (end_m - start_m) / 60
+        if interval_hours < 0:
+            interval_hours += 24
+        hours += interval_hours
+
+        c_start_h, c_end_h = start_h + start_m / 60, end_h + end_m / 60
+        for window_start, window_end in PEAK_WINDOWS:
+            if c_start_h < window_end and c_end_h > window_start:
+                peak += max(0, min(c_end_h, window_end) - max(c_start_h, window_start))
+
+        times.append(c_start_h)
+        times.append(c_end_h + 24.0 if c_end_h < c_start_h else c_end_h)
+        intervals.append((start_h * 60 + start_m, end_h * 60 + end_m))
+
+    day_offsets = []
+    for start, end in intervals:
+        if end == 0:
+            end = MINUTES_PER_DAY
+        if end > start:
+            day_offsets.append((datetime.timedelta(minutes=start), datetime.timedelta(minutes=end)))
+
+    return CompiledHours(
+        text, tuple(intervals), hours, peak,
+        min(times) if times else None, max(times) if times else None, tuple(day_offsets)
+    )
+
+
+def compile_hours(text) -> CompiledHours:
+    """Cached CompiledHours of an hours string (EMPTY_HOURS for anything else)"""
+    if not text or not isinstance(text, str):
+        return EMPTY_HOURS
+    return _compile(text)
+
+
+def cache_info():
+    return _compile.cache_info()
@@ -0,0 +1,177 @@
+"""
+Spatial Index
+Finds the traffic locations lying within a radius of a route, using a grid of
+location buckets and exact point-to-segment distances.
+
+Coordinates are projected to a local equirectangular plane (km) centred on
+the locations, which is accurate to well under a metre at the 100 m radius
+used for routes within a city.
+"""
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+DEFAULT_RADIUS_KM = 0.1  # 100 meters
+
+# Route hit results (route id + last_modified + locations) and location grids
+ROUTE_CACHE_SIZE = 512
+INDEX_CACHE_SIZE = 32
+
+
+class LocationIndex:
+    """Grid buckets of projected locations; cells are `radius_km` wide"""
+
+    def __init__(self, locations: Sequence[Any], radius_km: float = DEFAULT_RADIUS_KM) -> None:
+        self.radius_km = radius_km
+        lat = np.array([loc.latitude for loc in locations], dtype=float)
+        lon = np.array([loc.longitude for loc in locations], dtype=float)
+        self.ref_lat = math.radians(float(lat.mean())) if len(lat) else 0.0
+        self.points = self.project(lon, lat)
+
+        self.buckets: Dict[tuple, np.ndarray] = {}
+        if len(self.points):
+            cells = np.floor(self.points / radius_km).astype(np.int64)
+            order = np.lexsort((cells[:, 1], cells[:, 0]))
+            keys, starts = np.unique(cells[order], axis=0, return_index=True)
+            for key, chunk in zip(keys, np.split(order, starts[1:])):
+                self.buckets[(int(key[0]), int(key[1]))] = chunk
+
+    def project(self, lon, lat) -> np.ndarray:
+        """(n x 2) km coordinates of lon/lat arrays"""
+        x = EARTH_RADIUS_KM * np.radians(np.asarray(lon, dtype=float)) * math.cos(self.ref_lat)
+        y = EARTH_RADIUS_KM * np.radians(np.asarray(lat, dtype=float))
+        return np.column_stack((x, y))
+
+    def _candidates(self, path: np.ndarray) -> np.ndarray:
+        """Indices of locations in the grid cells around the path"""
+        cell = self.radius_km
+        a, b = path[:-1], path[1:]
+        if len(path) == 1:
+            samples = path
+        else:
+            # Sample every segment at least once per cell so long segments cover their cells
+            pieces = np.maximum(np.ceil(np.linalg.norm(b - a, axis=1) / cell), 1).astype(np.int64)
+            seg = np.repeat(np.arange(len(a)), pieces)
+            t = (np.arange(len(seg)) - np.repeat(np.cumsum(pieces) - pieces, pieces)) / np.repeat(pieces, pieces)
+            samples = np.vstack((a[seg] + (b[seg] - a[seg]) * t[:, None], path[-1:]))
+        cells = np.unique(np.floor(samples / cell).astype(np.int64), axis=0)
+        # A point within one cell of a sample lies in the 5x5 block around it
+        offsets = np.array([(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3)])
+        around = np.unique((cells[:, None, :] + offsets[None, :, :]).reshape(-1, 2), axis=0)
+        found = [self.buckets[key] for key in map(tuple, around.tolist()) if key in self.buckets]
+        return np.unique(np.concatenate(found)) if found else np.array([], dtype=np.int64)
+
+    def near_path(self, coords: Sequence[Sequence[float]]) -> List[int]:
+        """
+        Indices (ascending) of the locations within radius_km of a path given
+        as GeoJSON [lon, lat] pairs: distance to the segments, not just the
+        vertices. A single pair is a point.
+        """
+        if not len(self.points) or not len(coords):
+            return []
+        coords = np.asarray(coords, dtype=float)[:, :2]
+        path = self.project(coords[:, 0], coords[:, 1])
+        candidates = self._candidates(path)
+        if not len(candidates):
+            return []
+
+        pts = self.points[candidates]
+        a = path[:-1] if len(path) > 1 else path
+        b = path[1:] if len(path) > 1 else path
+        ab = b - a
+        length_sq = (ab ** 2).sum(axis=1)
+        hit = np.zeros(len(pts), dtype=bool)
+        # Candidates x segments, in chunks to bound memory on long routes
+        step = max(1, 200000 // max(len(a), 1))
+        for i in range(0, len(pts), step):
+            p = pts[i:i + step, None, :]
+            t = np.where(length_sq > 0, ((p - a) * ab).sum(axis=2) / np.where(length_sq > 0, length_sq, 1), 0)
+            closest = a + np.clip(t, 0, 1)[:, :, None] * ab
+            dist = np.sqrt(((p - closest) ** 2).sum(axis=2)).min(axis=1)
+            hit[i:i + step] = dist < self.radius_km
+        return sorted(candidates[hit].tolist())
+
+
+_lock = threading.Lock()
+_route_cache: "OrderedDict[tuple, List[int]]" = OrderedDict()
+_index_cache: "OrderedDict[int, LocationIndex]" = OrderedDict()
+
+
+def _remember(cache: OrderedDict, key, value, size: int) -> None:
+    with _lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
+
+
+def _lookup(cache: OrderedDict, key):
+    with _lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def route_path(route: Dict[str, Any]) -> Optional[list]:
+    """[lon, lat] pairs of a route's GeoJSON Point or LineString (None otherwise)"""
+    geojson = route.get('geojson_data')
+    if not geojson:
+        return None
+    geometry = geojson.get('geometry', {})
+    coords = geometry.get('coordinates', [])
+    if geometry.get('type') == 'Point' and coords:
+        return [coords]
+    if geometry.get('type') == 'LineString' and coords:
+        return coords
+    return None
+
+
+def _route_key(route: Dict[str, Any], path: list) -> tuple:
+    if route.get('id'):
+        return (route['id'], str(route.get('last_modified')))
+    # Unsaved route: key on its geometry
+    return ('geometry', hashlib.sha1(json.dumps(path).encode('utf-8')).hexdigest())
+
+
+def _locations_key(locations: Sequence[Any], radius_km: float) -> int:
+    return hash((radius_km, tuple((getattr(loc, 'id', None), loc.latitude, loc.longitude) for loc in locations)))
+
+
+def location_index(locations: Sequence[Any], radius_km: float = DEFAULT_RADIUS_KM) -> LocationIndex:
+    """Cached LocationIndex of a location list (keyed by ids and coordinates)"""
+    key = _locations_key(locations, radius_km)
+    index = _lookup(_index_cache, key)
+    if index is None:
+        index = LocationIndex(locations, radius_km)
+        _remember(_index_cache, key, index, INDEX_CACHE_SIZE)
+    return index
+
+
+def route_location_hits(route: Dict[str, Any], locations: Sequence[Any],
+                        radius_km: float = DEFAULT_RADIUS_KM) -> List[int]:
+    """
+    Indices into `locations` within radius_km of the route. Computed once per
+    route id + last_modified (and location set), then served from cache.
+    """
+    path = route_path(route)
+    if not path or not locations:
+        return []
+    key = _route_key(route, path) + (_locations_key(locations, radius_km),)
+    hits = _lookup(_route_cache, key)
+    if hits is None:
+        hits = location_index(locations, radius_km).near_path(path)
+        _remember(_route_cache, key, hits, ROUTE_CACHE_SIZE)
+    return hits
+
+
+def clear_cache() -> None:
+    with _lock:
+        _route_cache.clear()
+        _index_cache.clear()
@@ -15,13 +15,25 @@ Format 2 – Play Logs(Overview):
 Both formats wrap every cell with VnNox's Excel-injection prefix:
     =(""value"")
 This parser strips that wrapper before processing.
+
+The file is streamed: bytes are decoded chunk by chunk, the header is
+looked for in the first HEADER_SCAN_LINES lines, and totals, per-media
+summaries and date ranges are accumulated row by row, so monthly exports
+of hundreds of MB are parsed in constant memory. Cleaned rows are only
+kept on request, in memory (keep_rows) or spilled to a gzip CSV (rows_path,
+read back with iter_spilled_rows).
+
+Details plays are also bucketed per (screen, media, day, start hour) into
+'hourly_plays', the rows of the play_hours fact table (play_log_storage).
 """
 
 import re
 import io
 import csv
+import codecs
+import gzip
 import logging
-from typing import IO, Dict, Any
+from typing import IO, Dict, Any, Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +52,8 @@ def _clean(value: str) -> str:
       =("value")         ← when the outer quotes are still present
     """
     value = value.strip()
+    if len(value) >= 5 and value.startswith('=("') and value.endswith('")'):
+        return value[3:-2].strip()  # Common case, without the regex
     m = _VNNOX_CELL_RE.match(value)
     if m:
         return m.group(1).strip()
@@ -55,47 +69,69 @@ def _normalize_header(h: str) -> str:
     return ' '.join(h.lower().split())
 
 
-# ------------------------------------------------------------------
-# Public API
-# ------------------------------------------------------------------
-
-def parse_vnnox_csv(file_obj: IO[bytes]) -> Dict[str, Any]:
-    """
-    Parse a VnNox Play Logs CSV (Details OR Overview) file.
-
-    Parameters
-    ----------
-    file_obj : file-like object with .read() returning bytes
-
-    Returns
-    -------
-    dict with keys:
-        format        : 'details' | 'overview'
-        total_seconds : float  – total playback time in seconds
-        total_hours   : float  – total_seconds / 3600
-        total_spots   : int    – number of play events
-        rows          : list[dict] – cleaned row data
-        errors        : list[str]  – any non-fatal parse warnings
-    """
-    raw = file_obj.read()
-
-    # Detect encoding (VnNox often exports with UTF-8 BOM)
-    try:
-        text = raw.decode('utf-8-sig')
-    except UnicodeDecodeError:
-        text = raw.decode('latin-1')
-
-    reader = csv.reader(io.StringIO(text))
-    all_rows = list(reader)
-
-    if not all_rows:
-        raise ValueError("Fisierul este gol sau nu poate fi citit ca CSV.")
+# Lines searched for the header row before giving up
+HEADER_SCAN_LINES = 50
+# Bytes read from the upload per chunk
+CHUNK_SIZE = 1024 * 1024
+# Row warnings kept in 'errors' (the rest are only counted)
+MAX_ERRORS = 200
+
+
+def _iter_lines(file_obj: IO[bytes], encoding: str, chunk_size: int) -> Iterator[str]:
+    """Decoded lines (line endings kept, for csv.reader) read chunk_size bytes at a time"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if isinstance(chunk, str):
+            chunk = chunk.encode(encoding)
+        text = pending + decoder.decode(chunk or b'', final=not chunk)
+        if not chunk:
+            if text:
+                yield from io.StringIO(text, newline='')
+            return
+        cut = text.rfind('\n') + 1
+        pending = text[cut:]
+        if cut:
+            yield from io.StringIO(text[:cut], newline='')
+
+
+class _SpotTotals:
+    """Per-media running totals of one import"""
+    __slots__ = ('plays', 'total_seconds', 'date_start', 'date_end', 'screen')
+
+    def __init__(self):
+        self.plays = 0
+        self.total_seconds = 0.0
+        self.date_start = None
+        self.date_end = None
+        self.screen = ''
+
+    def add(self, plays, seconds, screen, start, end):
+        self.plays += plays
+        self.total_seconds += seconds
+        self.screen = screen
+        if start:
+            day = start[:10]
+            if self.date_start is None or day < self.date_start:
+                self.date_start = day
+        if end:
+            day = end[:10]
+            if self.date_end is None or day > self.date_end:
+                self.date_end = day
+
+
+def _parse_stream(file_obj: IO[bytes], encoding: str, keep_rows: bool, rows_path: Optional[str],
+                  chunk_size: int) -> Dict[str, Any]:
+    reader = csv.reader(_iter_lines(file_obj, encoding, chunk_size))
 
     # --- Detect header row ------------------------------------------
     # The header row is the first row that contains recognisable column names.
     header_idx = None
     headers_raw = []
-    for i, row in enumerate(all_rows):
+    seen_any = False
+    for i, row in enumerate(reader):
+        seen_any = True
         cleaned = [_normalize_header(c) for c in row]
         if 'media name' in cleaned and ('duration (s)' in cleaned
                                          or 'total duration (s)' in cleaned
@@ -103,15 +139,17 @@ def parse_vnnox_csv(file_obj: IO[bytes]) -> Dict[str, Any]:
             header_idx = i
             headers_raw = cleaned
             break
+        if i + 1 >= HEADER_SCAN_LINES:
+            break
 
+    if not seen_any:
+        raise ValueError("Fisierul este gol sau nu poate fi citit ca CSV.")
     if header_idx is None:
         raise ValueError(
             "Nu s-a gasit randul de antet. Asigurati-va ca fisierul este "
             "exportat din VnNox (Play Logs - Details sau Overview)."
         )
 
-    data_rows = all_rows[header_idx + 1:]
-
     # --- Detect format ----------------------------------------------
     # Overview has 'total duration (s)' or 'times' column
     is_overview = ('total duration (s)' in headers_raw
@@ -127,106 +165,119 @@ def parse_vnnox_csv(file_obj: IO[bytes]) -> Dict[str, Any]:
                     return i
         return None
 
-    errors = []
-    rows = []
-    total_seconds = 0.0
-    total_spots = 0
+    def exact_idx(*names):
+        return next((headers_raw.index(n) for n in names if n in headers_raw), None)
 
     if fmt == 'overview':
         dur_col = col_idx(['total duration (s)', 'duration (s)', 'duration s'])
         times_col = col_idx(['times'])
         if dur_col is None:
             raise ValueError("Nu s-a gasit coloana 'Total Duration (s)' in fisierul Overview.")
-
-        for i, row in enumerate(data_rows):
-            if len(row) <= max(filter(None, [dur_col, times_col or 0])):
-                continue
-            try:
-                dur_str = _clean(row[dur_col]).replace(',', '').replace(' ', '')
-                if not dur_str:
-                    continue
-                dur = float(dur_str)
-                spots = int(_clean(row[times_col])) if times_col is not None and times_col < len(row) else 1
-                total_seconds += dur
-                total_spots += spots
-                rows.append({c: _clean(row[j]) for j, c in enumerate(headers_raw) if j < len(row)})
-            except (ValueError, IndexError) as e:
-                errors.append(f"Rand {header_idx + 2 + i}: {e}")
-
+        min_len = max(filter(None, [dur_col, times_col or 0])) + 1
     else:  # details
         dur_col = col_idx(['duration', 'duration s'])
+        times_col = None
         if dur_col is None:
             raise ValueError("Nu s-a gasit coloana 'Duration (s)' in fisierul Details.")
+        min_len = dur_col + 1
+
+    media_col = exact_idx('media name')
+    screen_col = exact_idx('screen name', 'screen')
+    start_col = exact_idx('start date', 'start')
+    end_col = exact_idx('end date', 'end')
+
+    def cell(row, j):
+        return _clean(row[j]) if j is not None and j < len(row) else ''
 
-        for i, row in enumerate(data_rows):
-            if not row or all(c.strip() in ('', '=""') for c in row):
+    rows: List[Dict[str, str]] = []
+    spill = spill_writer = None
+    if rows_path:
+        spill = gzip.open(rows_path, 'wt', encoding='utf-8', newline='')
+        spill_writer = csv.writer(spill)
+        spill_writer.writerow(headers_raw)
+
+    errors = []
+    error_count = 0
+    total_seconds = 0.0
+    total_spots = 0
+    row_count = 0
+    spots: Dict[str, _SpotTotals] = {}
+    # (screen, media, day, hour) -> [plays, seconds, first, last]; a play counts in the hour it
+    # started, first / last are the seconds past the hour of its earliest / latest play start
+    hourly: Dict[tuple, List[float]] = {}
+    try:
+        for i, row in enumerate(reader):
+            if fmt == 'details' and (not row or all(c.strip() in ('', '=""') for c in row)):
                 continue
-            if dur_col >= len(row):
+            if len(row) < min_len:
                 continue
             try:
                 dur_str = _clean(row[dur_col]).replace(',', '').replace(' ', '')
                 if not dur_str:
                     continue
                 dur = float(dur_str)
-                total_seconds += dur
-                total_spots += 1
-                rows.append({c: _clean(row[j]) for j, c in enumerate(headers_raw) if j < len(row)})
+                plays = 1
+                if times_col is not None:
+                    plays = int(_clean(row[times_col])) if times_col < len(row) else 1
             except (ValueError, IndexError) as e:
-                errors.append(f"Rand {header_idx + 2 + i}: {e}")
+                error_count += 1
+                if len(errors) < MAX_ERRORS:
+                    errors.append(f"Rand {header_idx + 2 + i}: {e}")
+                continue
 
-    if not rows:
+            total_seconds += dur
+            total_spots += plays
+            row_count += 1
+
+            media = cell(row, media_col) or 'Unknown'
+            entry = spots.get(media)
+            if entry is None:
+                entry = spots[media] = _SpotTotals()
+            screen, start = cell(row, screen_col), cell(row, start_col)
+            entry.add(plays, dur, screen, start, cell(row, end_col))
+
+            if fmt == 'details' and len(start) >= 13 and start[11:13].isdigit():
+                key = (screen, media, start[:10], start[11:13])
+                offset = (int(start[14:16]) * 60 + int(start[17:19])
+                          if len(start) >= 19 and start[14:16].isdigit() and start[17:19].isdigit() else None)
+                bucket = hourly.get(key)
+                if bucket is None:
+                    hourly[key] = [plays, dur, offset, offset]
+                else:
+                    bucket[0] += plays
+                    bucket[1] += dur
+                    if offset is not None:
+                        bucket[2] = offset if bucket[2] is None else min(bucket[2], offset)
+                        bucket[3] = offset if bucket[3] is None else max(bucket[3], offset)
+
+            if keep_rows or spill_writer:
+                values = [_clean(v) for v in row[:len(headers_raw)]]
+                if keep_rows:
+                    rows.append(dict(zip(headers_raw, values)))
+                if spill_writer:
+                    spill_writer.writerow(values)
+    finally:
+        if spill:
+            spill.close()
+
+    if not row_count:
         raise ValueError(
             "Niciun rand valid nu a putut fi procesat. "
             "Verificati ca fisierul contine date de tip 'Play Log'."
         )
-
-    total_hours = total_seconds / 3600.0
-
-    # --- Build per-spot summary (media name level) ---
-    from collections import defaultdict
-    spot_map = defaultdict(lambda: {'plays': 0, 'total_seconds': 0.0,
-                                     'date_start': None, 'date_end': None, 'screen': ''})
-
-    start_col = col_idx(['start date', 'start'])
-    end_col_name = col_idx(['end date', 'end'])
-    media_col = col_idx(['media name'])
-    screen_col = col_idx(['screen name', 'screen'])
-
-    for row in rows:
-        # Identify spot key
-        m_name = row.get('media name', 'Unknown')
-        if not m_name:
-            m_name = 'Unknown'
-        entry = spot_map[m_name]
-        entry['screen'] = row.get('screen name', row.get('screen', ''))
-        if fmt == 'overview':
-            entry['plays'] += int(row.get('times', 0) or 0)
-            entry['total_seconds'] += float(row.get('total duration (s)', 0) or 0)
-        else:
-            entry['plays'] += 1
-            dur_key = next((k for k in row if 'duration' in k), None)
-            entry['total_seconds'] += float(row.get(dur_key, 0) or 0) if dur_key else 0
-
-        # Date range per spot
-        s_val = row.get('start date', row.get('start', ''))
-        e_val = row.get('end date', row.get('end', ''))
-        if s_val:
-            if entry['date_start'] is None or s_val < entry['date_start']:
-                entry['date_start'] = s_val[:10]
-        if e_val:
-            if entry['date_end'] is None or e_val > entry['date_end']:
-                entry['date_end'] = e_val[:10]
+    if error_count > len(errors):
+        errors.append(f"... {error_count - len(errors)} alte randuri ignorate")
 
     spots_summary = []
-    for m_name, s in spot_map.items():
+    for m_name, s in spots.items():
         spots_summary.append({
             'media_name': m_name,
-            'screen': s['screen'],
-            'plays': s['plays'],
-            'total_seconds': round(s['total_seconds'], 1),
-            'total_hours': round(s['total_seconds'] / 3600, 4),
-            'date_start': s['date_start'],
-            'date_end': s['date_end'],
+            'screen': s.screen,
+            'plays': s.plays,
+            'total_seconds': round(s.total_seconds, 1),
+            'total_hours': round(s.total_seconds / 3600, 4),
+            'date_start': s.date_start,
+            'date_end': s.date_end,
         })
     # Sort by date_start
     spots_summary.sort(key=lambda x: (x['date_start'] or ''))
@@ -234,22 +285,86 @@ def parse_vnnox_csv(file_obj: IO[bytes]) -> Dict[str, Any]:
     # --- Overall date range ---
     all_starts = [s['date_start'] for s in spots_summary if s['date_start']]
     all_ends = [s['date_end'] for s in spots_summary if s['date_end']]
-    date_start = min(all_starts) if all_starts else None
-    date_end = max(all_ends) if all_ends else None
 
+    total_hours = total_seconds / 3600.0
     logger.info(
         "VnNox parse OK | format=%s | spots=%d | duration=%.2f h | errors=%d",
-        fmt, total_spots, total_hours, len(errors)
+        fmt, total_spots, total_hours, error_count
     )
 
-    return {
+    result = {
         'format': fmt,
         'total_seconds': total_seconds,
         'total_hours': round(total_hours, 4),
         'total_spots': total_spots,
+        'row_count': row_count,
         'rows': rows,
         'errors': errors,
         'spots_summary': spots_summary,
-        'date_start': date_start,
-        'date_end': date_end,
+        'date_start': min(all_starts) if all_starts else None,
+        'date_end': max(all_ends) if all_ends else None,
+        'hourly_plays': [
+            {'screen': screen, 'media_name': media, 'date': day, 'hour': int(hour),
+             'plays': plays, 'seconds': seconds, 'first_second': first, 'last_second': last}
+            for (screen, media, day, hour), (plays, seconds, first, last) in sorted(hourly.items())
+        ],
     }
+    if rows_path:
+        result['rows_path'] = rows_path
+    return result
+
+
+# ------------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------------
+
+def parse_vnnox_csv(file_obj: IO[bytes], keep_rows: bool = False, rows_path: Optional[str] = None,
+                    chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Parse a VnNox Play Logs CSV (Details OR Overview) file.
+
+    Parameters
+    ----------
+    file_obj   : file-like object with .read() returning bytes; read in chunks
+    keep_rows  : also return the cleaned rows as dicts (holds them all in memory)
+    rows_path  : write the cleaned rows to this gzip CSV instead (see iter_spilled_rows)
+    chunk_size : bytes per read
+
+    Returns
+    -------
+    dict with keys:
+        format        : 'details' | 'overview'
+        total_seconds : float  – total playback time in seconds
+        total_hours   : float  – total_seconds / 3600
+        total_spots   : int    – number of play events
+        row_count     : int    – valid rows read
+        rows          : list[dict] – cleaned row data (empty unless keep_rows)
+        rows_path     : str    – only with rows_path
+        errors        : list[str]  – any non-fatal parse warnings
+        spots_summary : list[dict] – per media name: plays, duration, screen, dates
+        hourly_plays  : list[dict] – Details only: plays and seconds per
+                        screen, media_name, date and hour (of the play start),
+                        first_second / last_second: seconds past the hour of
+                        the earliest / latest play start
+        date_start / date_end : 'YYYY-MM-DD' | None
+    """
+    start = file_obj.tell() if hasattr(file_obj, 'seekable') and file_obj.seekable() else None
+    try:
+        # VnNox often exports with UTF-8 BOM
+        return _parse_stream(file_obj, 'utf-8-sig', keep_rows, rows_path, chunk_size)
+    except UnicodeDecodeError:
+        if start is None:
+            raise ValueError("Fisierul nu este UTF-8 si nu poate fi recitit pentru alta codificare.")
+        file_obj.seek(start)
+        return _parse_stream(file_obj, 'latin-1', keep_rows, rows_path, chunk_size)
+
+
+def iter_spilled_rows(rows_path: str) -> Iterator[Dict[str, str]]:
+    """Rows written by parse_vnnox_csv(rows_path=...), as header -> value dicts"""
+    with gzip.open(rows_path, 'rt', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        headers = next(reader, None)
+        if headers is None:
+            return
+        for row in reader:
+            yield dict(zip(headers, row))
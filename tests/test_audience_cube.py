@@ -0,0 +1,77 @@
+import copy
+import datetime
+
+import numpy as np
+import pytest
+
+from src.data.city_data_manager import CityDataManager
+
+PROFILES = {
+    'Cluj-Napoca': {
+        '2024-Q4': {'daily_traffic_total': 96000, 'daily_pedestrian_total': 24000, 'modal_split': {'auto': 40}},
+        '2025-Q2': {'daily_traffic_total': 120000, 'daily_pedestrian_total': 48000, 'modal_split': {'auto': 35}},
+        'current': {'ref': '2025-Q2'},
+    }
+}
+EVENTS = {
+    'Cluj-Napoca': {
+        '2025-01-01': {'name': 'Anul Nou', 'traffic_multiplier': 0.5, 'pedestrian_multiplier': 1.5},
+        'fair': {'name': 'Targ', 'start_date': '2024-12-20', 'end_date': '2025-01-05',
+                 'traffic_multiplier': 0.8, 'pedestrian_multiplier': 2},
+    }
+}
+
+
+@pytest.fixture
+def manager():
+    manager = CityDataManager()
+    manager.profiles = copy.deepcopy(PROFILES)
+    manager.special_events = copy.deepcopy(EVENTS)
+    manager.audience_cube.invalidate()
+    return manager
+
+
+class TestAudienceCube:
+    def test_series_matches_event_lookup(self, manager):
+        start = datetime.date(2024, 12, 15)
+        dates = np.datetime64(start, 'D') + np.arange(40)
+        expected_t, expected_p, expected_index, expected_names = manager.get_event_multiplier_series('cluj-napoca', dates)
+        t_mult, p_mult, event_index, names = manager.audience_cube.event_multiplier_series('cluj-napoca', start, 40)
+        assert t_mult.tolist() == expected_t.tolist()
+        assert p_mult.tolist() == expected_p.tolist()
+        assert [names[i] if i >= 0 else None for i in event_index] == \
+            [expected_names[i] if i >= 0 else None for i in expected_index]
+
+        # In-place edits are picked up once the cube is invalidated
+        manager.special_events['Cluj-Napoca']['fair']['traffic_multiplier'] = 0.25
+        manager.audience_cube.invalidate('Cluj-Napoca')
+        t_mult, _, _, _ = manager.audience_cube.event_multiplier_series('Cluj-Napoca', start, 40)
+        assert t_mult[10] == 0.25
+
+    def test_range_totals_use_quarter_profiles(self, manager):
+        cube = manager.audience_cube
+        block = cube.year('Cluj-Napoca', 2025)
+        assert block.hourly_traffic[0] == 96000 / 24     # Q1 falls back to 2024-Q4
+        assert block.hourly_traffic[120] == 120000 / 24  # May -> 2025-Q2
+        assert block.modal_splits[block.quarter[0]] == {'auto': 40}
+
+        start, end = datetime.date(2024, 12, 1), datetime.date(2025, 6, 30)
+        totals = cube.range_totals('Cluj-Napoca', start, end)
+        days = (end - start).days + 1
+        dates = np.datetime64(start, 'D') + np.arange(days)
+        t_mult, p_mult, _, _ = manager.get_event_multiplier_series('Cluj-Napoca', dates)
+        hourly = np.array([manager.get_city_data_for_period('Cluj-Napoca', day.astype(datetime.date))['daily_traffic_total'] / 24
+                           for day in dates])
+        assert totals['days'] == days
+        assert totals['traffic'] == pytest.approx(float((hourly * t_mult).sum()))
+        assert cube.range_totals('Cluj-Napoca', end, start) == {'days': 0, 'traffic': 0.0, 'pedestrian': 0.0}
+
+    def test_save_invalidates(self, manager, monkeypatch, tmp_path):
+        monkeypatch.setattr(manager, 'events_path', str(tmp_path / 'special_events.json'))
+        cube = manager.audience_cube
+        assert cube.year('Cluj-Napoca', 2025).event_index[40] == -1  # Feb 10
+        manager.special_events['Cluj-Napoca']['2025-02-10'] = {'name': 'Meci', 'traffic_multiplier': 3,
+                                                              'pedestrian_multiplier': 1}
+        assert manager._save_special_events()
+        block = cube.year('Cluj-Napoca', 2025)
+        assert block.event_names[block.event_index[40]] == 'Meci' and block.traffic_mult[40] == 3
@@ -0,0 +1,65 @@
+import datetime
+
+from src.data.db_config import SessionLocal
+from src.data.models import Campaign, GeneratedReport, Vehicle
+from src.reporting import report_generator
+from src.reporting.chart_cache import ChartCache
+from src.reporting.report_generator import ReportGenerator
+from src.services.batch_report_service import BatchReportService
+
+
+def _seed():
+    session = SessionLocal()
+    try:
+        session.add(Vehicle(id='v1', name='Truck 1', registration='B-01-AAA'))
+        for i, status in enumerate(['confirmed', 'confirmed', 'draft']):
+            session.add(Campaign(
+                id=f'c{i}', campaign_name=f'Campaign {i}', client_name=f'Client {i}',
+                start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 1, 10),
+                vehicle_id='v1', status=status, cities=['Bucuresti'],
+                daily_hours='09:00-17:00', campaign_mode='SINGLE_VEHICLE_CITY'
+            ))
+        session.commit()
+    finally:
+        session.close()
+
+
+class TestBatchReports:
+    def test_select_campaigns(self, db_engine):
+        _seed()
+        service = BatchReportService()
+        assert sorted(service.select_campaigns(status='confirmed')) == ['c0', 'c1']
+        assert service.select_campaigns(['c2', 'missing']) == ['c2']
+        assert service.select_campaigns(active_on=datetime.date(2025, 2, 1)) == []
+
+    def test_generate_saves_rows_in_bulk(self, db_engine, tmp_path, monkeypatch):
+        _seed()
+        opened = []
+        monkeypatch.setattr(ReportGenerator, '_open_report', lambda self, path: opened.append(path))
+        monkeypatch.setattr(report_generator, 'chart_cache', ChartCache(str(tmp_path / 'charts')))
+        progress = []
+
+        summary = BatchReportService().generate(
+            ['c0', 'c1'], output_dir=str(tmp_path), workers=0,
+            progress=lambda done, total, result: progress.append((done, total, result['report_type'])))
+
+        assert [r['error'] for r in summary['results']] == [None] * 6
+        assert [p[:2] for p in progress] == [(i, 6) for i in range(1, 7)]
+        assert all(r['seconds'] > 0 for r in summary['results'])
+        assert opened == []
+
+        session = SessionLocal()
+        rows = session.query(GeneratedReport).all()
+        session.close()
+        assert sorted(r.id for r in rows) == sorted(summary['report_ids'])
+        assert sorted((r.campaign_id, r.report_type) for r in rows) == [
+            ('c0', 'dooh'), ('c0', 'pop_annex'), ('c0', 'standard'),
+            ('c1', 'dooh'), ('c1', 'pop_annex'), ('c1', 'standard')]
+        assert all(r.file_path.startswith(str(tmp_path / r.campaign_id)) for r in rows)
+
+    def test_failed_report_gets_no_row(self, db_engine, tmp_path):
+        _seed()
+        summary = BatchReportService().generate(['gone'], report_types=('standard',),
+                                                output_dir=str(tmp_path), workers=0)
+        assert 'not found' in summary['results'][0]['error']
+        assert summary['report_ids'] == []
@@ -0,0 +1,392 @@
+import datetime
+import pytest
+from sqlalchemy import event
+
+from src.data.db_config import SessionLocal
+from src.data.models import Campaign, CampaignRoute, Driver, Vehicle
+from src.data.campaign_storage import CampaignStorage
+
+
+def _seed(n_campaigns):
+    session = SessionLocal()
+    try:
+        driver = Driver(id='d1', name='Ion Popescu')
+        spare_driver = Driver(id='d2', name='Maria Ionescu')
+        main = Vehicle(id='v1', name='Truck 1', registration='B-01-AAA', driver_id='d1')
+        extra = Vehicle(id='v2', name='Truck 2', registration='B-02-BBB')
+        session.add_all([driver, spare_driver, main, extra])
+        for i in range(n_campaigns):
+            session.add(Campaign(
+                id=f'c{i}',
+                campaign_name=f'Campaign {i}',
+                start_date=datetime.date(2025, 1, 1),
+                end_date=datetime.date(2025, 1, 31),
+                vehicle_id='v1',
+                additional_vehicles=[{'vehicle_id': 'v2', 'driver_id': 'd2'}]
+            ))
+            session.add(CampaignRoute(campaign_id=f'c{i}', name=f'Route {i}'))
+        session.commit()
+    finally:
+        session.close()
+
+
+class TestCampaignStorageHydration:
+    def test_hydrated_shape(self, db_engine):
+        _seed(3)
+        campaign = CampaignStorage().get_campaign('c1')
+
+        # Vehicle has no driver_name, so the name is resolved from its driver_id
+        assert campaign['vehicle_name'] == 'Truck 1'
+        assert campaign['driver_name'] == 'Ion Popescu'
+
+        extra = campaign['additional_vehicles'][0]
+        assert extra['vehicle_name'] == 'Truck 2'
+        assert extra['vehicle_registration'] == 'B-02-BBB'
+        assert extra['driver_name'] == 'Maria Ionescu'
+
+        assert [r['name'] for r in campaign['routes']] == ['Route 1']
+
+    def test_missing_references_fall_back(self, db_engine):
+        session = SessionLocal()
+        session.add(Campaign(id='orphan', campaign_name='Orphan', vehicle_id='gone',
+                             additional_vehicles=[{'vehicle_id': 'gone-too'}]))
+        session.commit()
+        session.close()
+
+        campaign = CampaignStorage().get_campaign('orphan')
+        assert campaign['vehicle_name'] == 'N/A'
+        assert campaign['driver_name'] == 'N/A'
+        assert campaign['additional_vehicles'] == [{'vehicle_id': 'gone-too'}]
+        assert campaign['routes'] == []
+
+    @pytest.mark.parametrize("n_campaigns", [5, 50])
+    def test_query_count_is_constant(self, db_engine, query_counter, n_campaigns):
+        _seed(n_campaigns)
+        query_counter['count'] = 0
+
+        campaigns = CampaignStorage().get_all_campaigns()
+
+        assert len(campaigns) == n_campaigns
+        # campaigns + vehicles + drivers + routes
+        assert query_counter['count'] == 4
+
+
+class TestCampaignSummaries:
+    def test_summary_skips_heavy_columns(self, db_engine):
+        _seed(3)
+        statements = []
+
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", _capture)
+        try:
+            summaries = CampaignStorage().get_campaign_summaries(include_schedule=True)
+        finally:
+            event.remove(db_engine, "before_cursor_execute", _capture)
+
+        assert len(summaries) == 3
+        assert 'audited_data' not in summaries[0]
+        assert 'routes' not in summaries[0]
+        assert summaries[0]['vehicle_name'] == 'Truck 1'
+        assert summaries[0]['additional_vehicles'][0]['vehicle_name'] == 'Truck 2'
+        for heavy in ('audited_data', 'hourly_data', 'route_data', 'campaign_routes'):
+            assert not any(heavy in s for s in statements)
+
+    def test_count_and_pages(self, db_engine):
+        _seed(7)
+        storage = CampaignStorage()
+        storage.archive_campaign('c0')
+
+        assert storage.count_campaigns() == 6
+        assert storage.count_campaigns(include_archived=True) == 7
+
+        first, total = storage.get_campaign_summaries_page(1, 4)
+        second, _ = storage.get_campaign_summaries_page(2, 4)
+        assert total == 6
+        assert len(first) == 4 and len(second) == 2
+        assert not {c['id'] for c in first} & {c['id'] for c in second}
+
+    def test_vehicle_filter(self, db_engine):
+        _seed(2)
+        storage = CampaignStorage()
+        assert len(storage.get_campaign_summaries(vehicle_id='v1')) == 2
+        assert storage.get_campaign_summaries(vehicle_id='v2') == []
+
+
+class TestGpsTrackStore:
+    def _audit(self, points):
+        return {'gps_imports': [{'id': 'imp1', 'filename': 'log.csv', 'distance': 1.5, 'gps_points': points}]}
+
+    def test_points_moved_out_of_audited_data(self, db_engine):
+        from src.data.gps_track_storage import GpsTrackStorage
+
+        points = [
+            {'lat': 44.43, 'lon': 26.10, 'timestamp': '2025-01-01 09:00:00', 'address': ''},
+            {'lat': 44.44, 'lon': 26.11, 'timestamp': None, 'address': ''},
+        ]
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'GPS', 'audited_data': self._audit(points)})
+
+        g_imp = storage.get_campaign(cid)['audited_data']['gps_imports'][0]
+        assert 'gps_points' not in g_imp
+        assert g_imp['track_id'] == 'imp1'
+        assert g_imp['point_count'] == 2
+        assert GpsTrackStorage().get_import_points(g_imp) == points
+
+    def test_removed_import_drops_track(self, db_engine):
+        from src.data.gps_track_storage import GpsTrackStorage
+
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'GPS', 'audited_data': self._audit([{'lat': 1, 'lon': 2}])})
+        campaign = storage.get_campaign(cid)
+        campaign['audited_data']['gps_imports'] = []
+        storage.save_campaign(campaign, cid)
+
+        assert GpsTrackStorage().get_track_points('imp1') == []
+
+    def test_clone_gets_own_track(self, db_engine):
+        from src.data.gps_track_storage import GpsTrackStorage
+
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'GPS', 'audited_data': self._audit([{'lat': 1, 'lon': 2}])})
+        clone_id = storage.clone_campaign(cid)
+        storage.delete_campaign(cid)
+
+        g_imp = storage.get_campaign(clone_id)['audited_data']['gps_imports'][0]
+        assert g_imp['track_id'] != 'imp1'
+        assert len(GpsTrackStorage().get_import_points(g_imp)) == 1
+
+    def test_overlapping_import_merged_by_point(self, db_engine):
+        import numpy as np
+        from src.data.gps_track_storage import GpsTrackStorage
+        from src.utils.gps_parser import GpsPoints
+
+        def trips(*hours):
+            # Departure (timed, trip km) + arrival per trip
+            return GpsPoints(np.repeat(np.arange(len(hours)) + 44.0, 2), np.full(2 * len(hours), 26.0),
+                             np.array([t for h in hours for t in (f'2025-01-01T{h:02d}:00:00', None)], dtype=object),
+                             distances=np.array([d for h in hours for d in (float(h), 0.0)]))
+
+        storage = CampaignStorage()
+        first = {'id': 'imp1', 'vehicle_id': 'v1', 'distance': 19.0, 'date_start': '2025-01-01',
+                 'date_end': '2025-01-01', 'gps_points': trips(9, 10)}
+        cid = storage.save_campaign({'campaign_name': 'GPS', 'audited_data': {'gps_imports': [first]}})
+
+        campaign = storage.get_campaign(cid)
+        campaign['audited_data']['gps_imports'].append(
+            {'id': 'imp2', 'vehicle_id': 'v1', 'distance': 21.0 + 2.5, 'date_start': '2025-01-01',
+             'date_end': '2025-01-01', 'gps_points': trips(10, 11)})
+        storage.save_campaign(campaign, cid)
+
+        first, second = storage.get_campaign(cid)['audited_data']['gps_imports']
+        assert first['point_count'] == 4
+        assert (second['point_count'], second['merged_points'], second['distance']) == (2, 2, 13.5)
+        assert GpsTrackStorage().get_import_points(second)[0]['timestamp'] == '2025-01-01T11:00:00'
+
+        # Another vehicle's points are not duplicates
+        campaign = storage.get_campaign(cid)
+        campaign['audited_data']['gps_imports'].append(
+            {'id': 'imp3', 'vehicle_id': 'v2', 'distance': 9.0, 'gps_points': trips(9)})
+        storage.save_campaign(campaign, cid)
+        third = storage.get_campaign(cid)['audited_data']['gps_imports'][2]
+        assert third['point_count'] == 2 and 'merged_points' not in third
+
+        # Point dicts carry their km too
+        campaign = storage.get_campaign(cid)
+        campaign['audited_data']['gps_imports'].append(
+            {'id': 'imp4', 'vehicle_id': 'v1', 'distance': 11.0 + 12.0, 'gps_points': trips(11, 12).to_dicts()})
+        storage.save_campaign(campaign, cid)
+        fourth = storage.get_campaign(cid)['audited_data']['gps_imports'][3]
+        assert (fourth['point_count'], fourth['merged_points'], fourth['distance']) == (2, 2, 12.0)
+
+    def test_migrate_inline_points(self, db_engine):
+        from src.data.gps_track_storage import GpsTrackStorage
+
+        session = SessionLocal()
+        session.add(Campaign(id='legacy', campaign_name='Legacy', audited_data=self._audit([{'lat': 1, 'lon': 2}])))
+        session.commit()
+        session.close()
+
+        assert GpsTrackStorage().migrate_inline_points() == 1
+        assert GpsTrackStorage().migrate_inline_points() == 0
+        g_imp = CampaignStorage().get_campaign('legacy')['audited_data']['gps_imports'][0]
+        assert 'gps_points' not in g_imp
+        assert GpsTrackStorage().get_track_points(g_imp['track_id'])[0]['lat'] == 1.0
+
+
+class TestVehicleAssignments:
+    def test_assignments_follow_save(self, db_engine):
+        from src.data.models import CampaignVehicleAssignment
+
+        storage = CampaignStorage()
+        cid = storage.save_campaign({
+            'campaign_name': 'Multi', 'start_date': '2025-03-01', 'end_date': '2025-03-31',
+            'vehicle_id': 'v1', 'driver_id': 'd1', 'additional_vehicles': [{'vehicle_id': 'v2', 'driver_id': 'd2'}]
+        })
+        session = SessionLocal()
+        rows = session.query(CampaignVehicleAssignment).filter_by(campaign_id=cid).all()
+        assert sorted((r.vehicle_id, r.driver_id, r.role) for r in rows) == [
+            ('v1', 'd1', 'primary'), ('v2', 'd2', 'additional')
+        ]
+        session.close()
+
+        campaign = storage.get_campaign(cid)
+        campaign['additional_vehicles'] = []
+        storage.save_campaign(campaign, cid)
+        session = SessionLocal()
+        assert session.query(CampaignVehicleAssignment).filter_by(campaign_id=cid).count() == 1
+        session.close()
+
+    def test_impacted_campaigns_uses_assignments(self, db_engine):
+        from src.services.resource_service import ResourceService
+
+        storage = CampaignStorage()
+        storage.save_campaign({
+            'campaign_name': 'Extra', 'status': 'confirmed', 'start_date': '2025-03-01', 'end_date': '2025-03-31',
+            'vehicle_id': 'v1', 'additional_vehicles': [{'vehicle_id': 'v2', 'driver_id': 'd2'}]
+        })
+        storage.save_campaign({
+            'campaign_name': 'Past', 'status': 'confirmed', 'start_date': '2025-01-01', 'end_date': '2025-01-31',
+            'vehicle_id': 'v2'
+        })
+        service = ResourceService()
+        on_date = datetime.date(2025, 3, 10)
+
+        assert [c['name'] for c in service.get_impacted_campaigns('vehicle', 'v2', on_date)] == ['Extra']
+        assert [c['name'] for c in service.get_impacted_campaigns('driver', 'd2', on_date)] == ['Extra']
+        assert service.get_impacted_campaigns('vehicle', 'v3', on_date) == []
+
+    def test_deleted_driver_leaves_no_assignments(self, db_engine):
+        from src.data.driver_manager import DriverManager
+        from src.data.models import CampaignVehicleAssignment
+        from src.services.resource_service import ResourceService
+
+        d_id = DriverManager().add_driver('Ion Popescu')
+        storage = CampaignStorage()
+        primary = storage.save_campaign({
+            'campaign_name': 'Primary', 'status': 'confirmed', 'start_date': '2025-03-01', 'end_date': '2025-03-31',
+            'vehicle_id': 'v1', 'driver_id': d_id
+        })
+        extra = storage.save_campaign({
+            'campaign_name': 'Extra', 'status': 'confirmed', 'start_date': '2025-03-01', 'end_date': '2025-03-31',
+            'vehicle_id': 'v1', 'additional_vehicles': [{'vehicle_id': 'v2', 'driver_id': d_id}]
+        })
+        on_date = datetime.date(2025, 3, 10)
+        assert len(ResourceService().get_impacted_campaigns('driver', d_id, on_date)) == 2
+
+        assert DriverManager().delete_driver(d_id)
+        assert ResourceService().get_impacted_campaigns('driver', d_id, on_date) == []
+        session = SessionLocal()
+        assert session.query(CampaignVehicleAssignment).filter_by(driver_id=d_id).count() == 0
+        # The vehicles stay assigned
+        assert session.query(CampaignVehicleAssignment).filter_by(campaign_id=primary, vehicle_id='v1').count() == 1
+        assert session.query(CampaignVehicleAssignment).filter_by(campaign_id=extra, vehicle_id='v2').count() == 1
+        session.close()
+        assert storage.get_campaign(extra)['additional_vehicles'][0]['vehicle_id'] == 'v2'
+
+    def test_backfill_and_indexes_are_idempotent(self, db_engine):
+        from sqlalchemy import inspect
+        from src.data.db_config import ensure_indexes
+
+        session = SessionLocal()
+        session.add(Campaign(id='old', campaign_name='Old', vehicle_id='v1'))
+        session.commit()
+        session.close()
+
+        storage = CampaignStorage()
+        assert storage.rebuild_vehicle_assignments() == 1
+        assert storage.rebuild_vehicle_assignments() == 0
+
+        ensure_indexes(bind=db_engine)
+        ensure_indexes(bind=db_engine)
+        index_names = {ix['name'] for ix in inspect(db_engine).get_indexes('campaigns')}
+        assert {'ix_campaigns_vehicle_id', 'ix_campaigns_end_date', 'ix_campaigns_is_archived'} <= index_names
+
+
+class TestBulkUpsert:
+    def test_bulk_save_campaigns_inserts_and_updates(self, db_engine, query_counter):
+        from src.data.models import CampaignVehicleAssignment
+
+        storage = CampaignStorage()
+        existing = storage.save_campaign({'campaign_name': 'Old name', 'vehicle_id': 'v1'})
+        rows = [{'id': existing, 'campaign_name': 'New name', 'vehicle_id': 'v2', 'start_date': '2025-03-01'}]
+        rows += [{'campaign_name': f'Bulk {i}', 'vehicle_id': 'v1', 'budget_eur': i} for i in range(50)]
+
+        before = query_counter['count']
+        ids = storage.bulk_save_campaigns(rows)
+        assert len(ids) == 51
+        assert query_counter['count'] - before < 15  # Not one round trip per campaign
+
+        updated = storage.get_campaign(existing)
+        assert updated['campaign_name'] == 'New name' and updated['start_date'] == '2025-03-01'
+        assert storage.count_campaigns() == 51
+        session = SessionLocal()
+        assert session.query(CampaignVehicleAssignment).filter_by(vehicle_id='v2').one().campaign_id == existing
+        assert session.query(CampaignVehicleAssignment).count() == 51
+        session.close()
+
+    def test_replace_vehicle_globally_in_one_batch(self, db_engine):
+        from src.data.models import CampaignVehicleAssignment
+        from src.services.resource_service import ResourceService
+
+        _seed(3)
+        session = SessionLocal()
+        session.query(Campaign).update({Campaign.status: 'confirmed'})
+        session.commit()
+        session.close()
+        CampaignStorage().rebuild_vehicle_assignments()
+
+        assert ResourceService().replace_vehicle_globally('v1', 'v2', datetime.date(2025, 1, 15)) == 3
+        session = SessionLocal()
+        campaign = session.get(Campaign, 'c0')
+        assert campaign.vehicle_id == 'v2'
+        assert campaign.vehicle_timeline == [
+            {'vehicle_id': 'v1', 'start_date': '2025-01-01', 'end_date': '2025-01-14'},
+            {'vehicle_id': 'v2', 'start_date': '2025-01-15', 'end_date': '2025-01-31'},
+        ]
+        timeline = session.query(CampaignVehicleAssignment).filter_by(campaign_id='c0', role='timeline').one()
+        assert (timeline.vehicle_id, timeline.end_date) == ('v1', datetime.date(2025, 1, 14))
+        session.close()
+
+    def test_bulk_update_counts_campaigns_updated(self, db_engine):
+        _seed(2)
+        storage = CampaignStorage()
+        # The same campaign twice and an unknown id: two campaigns updated
+        assert storage.bulk_update_campaigns([
+            {'id': 'c0', 'status': 'confirmed'}, {'id': 'c0', 'client_name': 'Acme'},
+            {'id': 'c1', 'status': 'confirmed'}, {'id': 'missing', 'status': 'confirmed'},
+        ]) == 2
+        assert storage.get_campaign('c0')['client_name'] == 'Acme'
+        assert storage.bulk_update_campaigns([{'id': 'missing', 'status': 'draft'}]) == 0
+
+    def test_bulk_save_spots_keeps_omitted_fields(self, db_engine):
+        _seed(1)
+        storage = CampaignStorage()
+        first, second = storage.bulk_save_spots([
+            {'campaign_id': 'c0', 'name': 'Spot A', 'duration': 15},
+            {'campaign_id': 'c0', 'name': 'Spot B', 'start_date': '2025-01-05'},
+        ])
+        storage.bulk_save_spots([{'id': first, 'name': 'Spot A2'}])
+
+        spots = {s['id']: s for s in storage.get_campaign_spots('c0')}
+        assert spots[first]['name'] == 'Spot A2' and spots[first]['duration'] == 15
+        assert [spots[first]['order_index'], spots[second]['order_index']] == [1, 2]
+
+    def test_traffic_location_import_upserts_by_name(self, db_engine):
+        from src.data.city_data_manager import CityDataManager
+
+        manager = CityDataManager()
+        rows = [{'name': 'Piata Victoriei', 'latitude': 44.45, 'longitude': 26.08,
+                 'daily_traffic': 65000, 'pedestrian_traffic': 18000}]
+        assert manager.bulk_upsert_traffic_locations('Bucuresti', rows) == 1
+        rows[0]['daily_traffic'] = 70000
+        rows.append({'name': 'Unirii', 'latitude': 44.42, 'longitude': 26.10,
+                     'daily_traffic': 50000, 'pedestrian_traffic': 9000})
+        assert manager.bulk_upsert_traffic_locations('Bucuresti', rows) == 2
+
+        session = SessionLocal()
+        from src.data.models import TrafficLocation
+        stored = {loc.name: loc.daily_traffic for loc in session.query(TrafficLocation).all()}
+        session.close()
+        assert stored == {'Piata Victoriei': 70000, 'Unirii': 50000}
@@ -0,0 +1,62 @@
+import datetime
+
+from sqlalchemy import inspect
+
+from src.data import change_feed
+from src.data.change_feed import apply_delta, changes_since, has_changes
+from src.data.driver_manager import DriverManager
+from src.data.vehicle_manager import VehicleManager
+
+
+class TestChangeFeed:
+    def test_changes_and_tombstones(self, db_engine, monkeypatch):
+        monkeypatch.setattr(change_feed, 'CURSOR_OVERLAP', datetime.timedelta(0))
+        first = changes_since(None)
+        assert first['full_reload']
+
+        vm = VehicleManager()
+        v_id = vm.add_vehicle('Truck 1')
+        assert vm.add_schedule(v_id, datetime.date(2025, 1, 1), datetime.date(2025, 1, 2), 'Maintenance')
+
+        delta = changes_since(first['cursor'])
+        assert not delta['full_reload']
+        assert delta['changed']['vehicles'] == [v_id]
+        s_id, = delta['changed']['vehicle_schedules']
+        assert delta['changed']['campaigns'] == []
+
+        vm.delete_schedule(s_id)
+        latest = changes_since(delta['cursor'])
+        assert latest['deleted']['vehicle_schedules'] == [s_id]
+        assert latest['changed']['vehicle_schedules'] == []
+        assert not has_changes(changes_since(latest['cursor']))
+
+    def test_status_change_tombstones_driver_schedules(self, db_engine, monkeypatch):
+        monkeypatch.setattr(change_feed, 'CURSOR_OVERLAP', datetime.timedelta(0))
+        dm = DriverManager()
+        d_id = dm.add_driver('Ion')
+        assert dm.update_driver(d_id, status='vacation')
+        s_id, = [s['id'] for s in dm.get_driver_schedules(d_id)]
+
+        cursor = changes_since(None)['cursor']
+        # Back to active: the open vacation event is removed
+        assert dm.update_driver(d_id, status='active')
+        delta = changes_since(cursor)
+        assert delta['deleted']['driver_schedules'] == [s_id]
+        assert dm.get_driver_schedules(d_id) == []
+
+    def test_overlap_repeats_recent_changes(self, db_engine):
+        vm = VehicleManager()
+        v_id = vm.add_vehicle('Truck 1')
+        cursor = changes_since(datetime.datetime.now() - datetime.timedelta(minutes=1))['cursor']
+        # The cursor trails the clock: the write is reported again
+        assert changes_since(cursor)['changed']['vehicles'] == [v_id]
+
+    def test_last_modified_indexes(self, db_engine):
+        inspector = inspect(db_engine)
+        for table in change_feed.FEED_MODELS:
+            assert f'ix_{table}_last_modified' in {ix['name'] for ix in inspector.get_indexes(table)}
+
+    def test_apply_delta(self):
+        items = [{'id': 'a', 'v': 1}, {'id': 'b', 'v': 1}, {'id': 'c', 'v': 1}]
+        merged = apply_delta(items, [{'id': 'b', 'v': 2}, {'id': 'd', 'v': 1}], ['c'])
+        assert merged == [{'id': 'a', 'v': 1}, {'id': 'b', 'v': 2}, {'id': 'd', 'v': 1}]
@@ -0,0 +1,69 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.reporting import report_generator
+from src.reporting.chart_cache import ChartCache, chart_key
+from src.reporting.report_generator import ReportGenerator
+
+MODAL_SPLIT = {'Auto': 62.5, 'Pietoni': 25.0, 'Transport public': 12.5}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ChartCache(str(tmp_path / 'charts'))
+    monkeypatch.setattr(report_generator, 'chart_cache', cache)
+    return cache
+
+
+class TestChartCache:
+    def test_key_covers_type_data_and_style(self):
+        key = chart_key('pie', [['a'], [1]], {'title': 'T'})
+        assert key == chart_key('pie', [['a'], [1]], {'title': 'T'})
+        assert key != chart_key('bar', [['a'], [1]], {'title': 'T'})
+        assert key != chart_key('pie', [['a'], [2]], {'title': 'T'})
+        assert key != chart_key('pie', [['a'], [1]], {'title': 'U'})
+
+    def test_repeated_chart_reuses_png(self, cache):
+        gen = ReportGenerator()
+        first = gen.create_pie_chart(MODAL_SPLIT, "Modal Split").getvalue()
+        second = gen.create_pie_chart(dict(MODAL_SPLIT), "Modal Split").getvalue()
+
+        assert first.startswith(b'\x89PNG')
+        assert first == second
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        gen.create_pie_chart(MODAL_SPLIT, "Other title")
+        assert cache.misses == 2
+        assert len(os.listdir(cache.directory)) == 2
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ChartCache(str(tmp_path), max_bytes=250)
+        for i, key in enumerate(['a', 'b', 'c']):
+            cache.put(key, b'x' * 100)
+            # Distinct mtimes; reading 'a' makes it the most recently used
+            os.utime(os.path.join(str(tmp_path), f'{key}.png'), (time.time() - 10 + i,) * 2)
+            if key == 'b':
+                assert cache.get('a') is not None
+        cache.put('d', b'x' * 100)
+
+        assert sorted(os.listdir(str(tmp_path))) == ['a.png', 'd.png']
+        assert cache.get('b') is None
+
+    def test_disabled_cache_still_renders(self, tmp_path, monkeypatch):
+        cache = ChartCache(str(tmp_path / 'charts'), max_bytes=0)
+        monkeypatch.setattr(report_generator, 'chart_cache', cache)
+        png = ReportGenerator().create_bar_chart({'Luni': 3, 'Marti': 5}, "Spots")
+        assert png.getvalue().startswith(b'\x89PNG')
+        assert not os.path.exists(cache.directory)
+
+    def test_renders_in_threads(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(report_generator, 'chart_cache', ChartCache(str(tmp_path), max_bytes=0))
+        gen = ReportGenerator()
+        splits = [{'Auto': 50 + i, 'Pietoni': 50 - i} for i in range(8)]
+        serial = [gen.create_pie_chart(s, "Split").getvalue() for s in splits]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            threaded = list(pool.map(lambda s: gen.create_pie_chart(s, "Split").getvalue(), splits))
+        assert threaded == serial
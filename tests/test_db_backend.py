@@ -0,0 +1,29 @@
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from src.data.db_config import engine_args
+from src.data.models import Campaign
+
+
+class TestDialects:
+    def test_postgres_uses_jsonb_and_gin(self):
+        dialect = postgresql.dialect()
+        ddl = str(CreateTable(Campaign.__table__).compile(dialect=dialect))
+        assert 'additional_vehicles JSONB' in ddl
+
+        gin = [ix for ix in Campaign.__table__.indexes if ix.name == 'ix_campaigns_additional_vehicles_gin'][0]
+        assert 'USING gin' in str(CreateIndex(gin).compile(dialect=dialect))
+
+    def test_sqlite_skips_gin_indexes(self, db_engine):
+        if db_engine.dialect.name != 'sqlite':
+            return
+        names = {ix['name'] for ix in inspect(db_engine).get_indexes('campaigns')}
+        assert 'ix_campaigns_vehicle_id' in names
+        assert not any(name.endswith('_gin') for name in names)
+
+    def test_engine_args_per_backend(self):
+        assert engine_args("postgresql://dooh@localhost/dooh")["pool_pre_ping"]
+        assert "connect_args" not in engine_args("postgresql://dooh@localhost/dooh")
+        assert "pool_size" not in engine_args("sqlite://")
+        assert engine_args("sqlite:////tmp/dooh.db")["connect_args"]["check_same_thread"] is False
@@ -0,0 +1,61 @@
+from src.data.entity_cache import EntityCache, entity_cache
+from src.data.driver_manager import DriverManager
+from src.data.vehicle_manager import VehicleManager
+
+
+class TestEntityCache:
+    def test_ttl_and_copies(self, monkeypatch):
+        import src.data.entity_cache as module
+
+        now = [100.0]
+        monkeypatch.setattr(module.time, 'monotonic', lambda: now[0])
+        cache = EntityCache(ttl=10)
+        cache.put('vehicle', 'v1', {'name': 'Truck 1'})
+
+        got = cache.get('vehicle', 'v1')
+        got['name'] = 'changed'
+        assert cache.get('vehicle', 'v1') == {'name': 'Truck 1'}
+
+        now[0] += 11
+        assert cache.get('vehicle', 'v1') is None
+        assert cache.stats() == {'vehicle': {'hits': 2, 'misses': 1, 'size': 0}}
+
+    def test_writes_invalidate(self, db_engine):
+        vm, dm = VehicleManager(), DriverManager()
+        v_id = vm.add_vehicle('Truck 1', 'B-01-AAA')
+        d_id = dm.add_driver('Ion Popescu')
+
+        assert vm.get_vehicle(v_id)['name'] == 'Truck 1'
+        assert dm.get_driver(d_id)['assigned_vehicle'] is None
+
+        vm.update_vehicle(v_id, name='Truck 1b')
+        assert vm.get_vehicle(v_id)['name'] == 'Truck 1b'
+
+        # Assigning a driver on the vehicle side refreshes the driver's dict too
+        vm.assign_driver(v_id, d_id, 'Ion Popescu')
+        assert dm.get_driver(d_id)['assigned_vehicle'] == v_id
+
+        vm.archive_vehicle(v_id)
+        assert vm.get_vehicle(v_id)['is_archived']
+
+        dm.delete_driver(d_id)
+        assert dm.get_driver(d_id) is None
+        assert vm.get_vehicle(v_id)['driver_id'] is None
+
+    def test_report_fetches_each_vehicle_once(self, db_engine):
+        from src.reporting.campaign_report_generator import CampaignReportGenerator
+
+        vm = VehicleManager()
+        v1 = vm.add_vehicle('Truck 1', screens_count=2)
+        v2 = vm.add_vehicle('Truck 2', screens_count=4)
+        entity_cache.clear()
+        entity_cache.reset_stats()
+
+        generator = CampaignReportGenerator(None)
+        data = {'vehicle_id': v1, 'additional_vehicles': [{'vehicle_id': v2}], 'cities': []}
+        generator.get_total_impressions_data(data, {'hours_per_day': 8})
+        generator.get_total_impressions_data(data, {'hours_per_day': 8})
+
+        stats = entity_cache.stats()['vehicle']
+        assert stats['misses'] == 2
+        assert stats['hits'] > 0
@@ -0,0 +1,119 @@
+import datetime
+import random
+
+from src.data.db_config import SessionLocal
+from src.data.models import Campaign, Driver, DriverSchedule, Vehicle, VehicleSchedule
+from src.reporting.fleet_analytics import Booking, FleetAnalytics, IntervalIndex
+from src.reporting.fleet_utilization_report import FleetUtilizationReportGenerator
+from src.reporting.report_generator import ReportGenerator
+
+D = datetime.date
+
+
+def _campaign(cid, start, end, **extra):
+    return dict({'id': cid, 'campaign_name': cid, 'status': 'confirmed',
+                 'start_date': start.isoformat(), 'end_date': end.isoformat()}, **extra)
+
+
+class TestIntervalIndex:
+    def test_matches_day_by_day_counts(self):
+        rng = random.Random(7)
+        bookings = []
+        for i in range(300):
+            start = rng.randint(0, 2000)
+            bookings.append(Booking(start, start + rng.randint(0, 40), 'campaign', f'c{i}', ''))
+        index = IntervalIndex(bookings)
+
+        for _ in range(200):
+            lo = rng.randint(-50, 2050)
+            hi = lo + rng.randint(0, 120)
+            per_day = {day: sum(1 for b in bookings if b.start <= day <= b.end) for day in range(lo, hi + 1)}
+            assert index.busy.days(lo, hi) == sum(1 for n in per_day.values() if n)
+            assert index.double.days(lo, hi) == sum(1 for n in per_day.values() if n >= 2)
+            assert sum(e - s + 1 for s, e in index.busy.gaps(lo, hi)) == sum(1 for n in per_day.values() if not n)
+            expected = sorted(b for b in bookings if b.start <= hi and b.end >= lo)
+            assert index.overlapping(lo, hi) == expected
+
+
+    def test_long_booking_does_not_scan_every_booking(self):
+        # A season-long booking near the start overlaps every later window
+        bookings = [Booking(0, 100000, 'maintenance', 'long', '')]
+        bookings += [Booking(10 * i, 10 * i + 1, 'campaign', f'c{i}', '') for i in range(1, 10000)]
+        index = IntervalIndex(bookings)
+        calls = []
+        collect = index._collect
+
+        def counting(*args):
+            calls.append(args)
+            collect(*args)
+        index._collect = counting
+
+        assert [b.source_id for b in index.overlapping(90000, 90000)] == ['long', 'c9000']
+        assert len(calls) < 100
+        assert len(index.overlapping(50000, 50100)) == 12
+
+class TestFleetAnalytics:
+    def test_vehicle_slots_timeline_and_transit(self):
+        analytics = FleetAnalytics.build([
+            # v1 replaced by v3 from the 11th; v2 rides along as an additional vehicle
+            _campaign('c1', D(2025, 1, 1), D(2025, 1, 20), vehicle_id='v1', driver_id='d1',
+                      additional_vehicles=[{'vehicle_id': 'v2', 'driver_id': 'd2'}],
+                      vehicle_timeline=[{'vehicle_id': 'v1', 'start_date': '2025-01-01', 'end_date': '2025-01-10'},
+                                        {'vehicle_id': 'v3', 'start_date': '2025-01-11', 'end_date': '2025-01-20'}],
+                      transit_periods=[{'vehicle_id': 'v2', 'start': '2025-01-21', 'end': '2025-01-22',
+                                        'origin': 'Cluj', 'destination': 'Iasi'}]),
+            # Per-vehicle itinerary
+            _campaign('c2', D(2025, 2, 1), D(2025, 2, 28), vehicle_id='v1',
+                      city_periods={'__meta__': {'shared_mode': False},
+                                    'v1': {'Cluj': [{'start': '2025-02-01', 'end': '2025-02-05'}],
+                                           'Iasi': {'start': '2025-02-10', 'end': '2025-02-12'}}}),
+            _campaign('c3', D(2025, 1, 1), D(2025, 1, 31), vehicle_id='v1', status='draft'),
+        ], vehicle_schedules=[
+            {'id': 's1', 'vehicle_id': 'v1', 'start': D(2025, 1, 8), 'end': D(2025, 1, 9), 'type': 'maintenance'},
+        ], driver_schedules=[
+            {'id': 'l1', 'driver_id': 'd2', 'start_date': '2025-01-15', 'end_date': '2025-01-25', 'event_type': 'leave'},
+        ])
+
+        january = (D(2025, 1, 1), D(2025, 1, 31))
+        assert analytics.utilization('vehicle', 'v1', *january)['days_used'] == 10
+        assert analytics.utilization('vehicle', 'v3', *january)['days_used'] == 10
+        assert analytics.utilization('vehicle', 'v2', *january)['days_used'] == 22
+        assert analytics.utilization('driver', 'd2', *january)['campaigns'] == 1
+
+        assert analytics.utilization('vehicle', 'v1', D(2025, 2, 1), D(2025, 2, 28))['days_used'] == 8
+        assert analytics.idle_gaps('vehicle', 'v1', D(2025, 2, 1), D(2025, 2, 14), min_days=3) == [
+            (D(2025, 2, 6), D(2025, 2, 9))]
+
+        overlaps = analytics.overlaps('vehicle', 'v1', *january)
+        assert [(o['start'], o['end']) for o in overlaps] == [(D(2025, 1, 8), D(2025, 1, 9))]
+        assert {b.kind for b in overlaps[0]['bookings']} == {'campaign', 'maintenance'}
+        assert [(o['start'], o['end']) for o in analytics.overlaps('driver', 'd2', *january)] == [
+            (D(2025, 1, 15), D(2025, 1, 22))]
+
+    def test_load_and_reports(self, db_engine, tmp_path, monkeypatch):
+        session = SessionLocal()
+        session.add_all([
+            Vehicle(id='v1', name='Truck 1', registration='B-01-AAA'),
+            Vehicle(id='v2', name='Truck 2', registration='B-02-AAA'),
+            Driver(id='d1', name='Ion'),
+            Campaign(id='c1', campaign_name='C1', client_name='Client', status='confirmed',
+                     start_date=D(2025, 1, 1), end_date=D(2025, 1, 10), vehicle_id='v1', driver_id='d1',
+                     additional_vehicles=[{'vehicle_id': 'v2'}], known_distance_total=120),
+            VehicleSchedule(vehicle_id='v1', start_date=D(2025, 1, 10), end_date=D(2025, 1, 12),
+                            event_type='maintenance'),
+            DriverSchedule(driver_id='d1', start_date=D(2025, 2, 1), end_date=D(2025, 2, 3), event_type='leave'),
+        ])
+        session.commit()
+        session.close()
+
+        analytics = FleetAnalytics.load()
+        assert analytics.resource_ids('vehicle') == ['v1', 'v2']
+        assert analytics.utilization('vehicle', 'v2', D(2025, 1, 1), D(2025, 1, 31))['days_used'] == 10
+        assert len(analytics.overlaps('vehicle', 'v1', D(2025, 1, 1), D(2025, 1, 31))) == 1
+        assert analytics.bookings('driver', 'd1', D(2025, 2, 1), D(2025, 2, 28))[0].kind == 'leave'
+
+        monkeypatch.setattr(ReportGenerator, '_open_report', lambda self, path: None)
+        gen = FleetUtilizationReportGenerator()
+        for path in (gen.generate_vehicle_utilization_report(D(2025, 1, 1), D(2025, 1, 31), str(tmp_path / 'v.pdf')),
+                     gen.generate_driver_performance_report(D(2025, 1, 1), D(2025, 1, 31), str(tmp_path / 'd.pdf'))):
+            assert (tmp_path / path).stat().st_size > 0
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.utils.gps_parser import GpsPoints, parse_gps_log
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'samples')
+XLS_SAMPLE = 'FoaieDeParcursDetaliata-7ABB-BC_59-20260304-20260304_5b95c648.xls'
+
+EASYTRACK_TEXT = (
+    "Timpul plecării\tCoordonata pornire\tDistanţa parcursă\n"
+    "2026-03-04 08:06:47\t44,410587; 26,054817\t1,25 km\n"
+    "2026-03-04 08:09:22\t44.412793|26.055917\t~\n"
+    "2026-03-04 08:11:21\t44,41; 26,05; 1\t-\n"
+    "2026-03-04 08:12:00\tn/a\t2,5\n"
+    "2026-03-04 08:15:00\t;26,05\tabc\n"
+)
+
+
+class TestGpsParser:
+    def test_easytrack_xls_sample(self):
+        with open(os.path.join(SAMPLES_DIR, XLS_SAMPLE), 'rb') as f:
+            content = f.read()
+        result = parse_gps_log(content, filename=XLS_SAMPLE)
+        assert result['format'] == 'easytrackmap_xls'
+        assert result['pings'] == 82
+        assert result['total_distance'] == pytest.approx(95.46)
+        assert (result['date_start'], result['date_end']) == ('2026-03-04', '2026-03-04')
+        # Departure (with time and address) then arrival point per trip
+        points = result['gps_points']
+        assert len(points) == 164
+        assert points[0]['lat'] == 44.410587 and points[0]['lon'] == 26.054817
+        assert points[0]['timestamp'] == '2026-03-04T08:06:47'
+        assert points[0]['address'].startswith('67B')
+        assert points[1] == {'lat': 44.4126, 'lon': 26.055817, 'timestamp': None, 'address': '', 'distance': 0.0}
+
+        columnar = parse_gps_log(content, filename=XLS_SAMPLE, columnar=True)['gps_points']
+        assert isinstance(columnar, GpsPoints)
+        assert columnar.to_dicts() == points
+        assert list(columnar) == points
+        assert columnar[-1] == points[-1]
+
+    def test_easytrack_text(self):
+        result = parse_gps_log(EASYTRACK_TEXT.encode('utf-8'), filename='paste.txt')
+        assert result['format'] == 'easytrackmap_text'
+        assert result['pings'] == 5
+        assert result['total_distance'] == pytest.approx(3.75)
+        assert result['gps_points'] == [
+            {'lat': 44.410587, 'lon': 26.054817, 'timestamp': '2026-03-04 08:06:47', 'address': '', 'distance': 1.25},
+            {'lat': 44.412793, 'lon': 26.055917, 'timestamp': '2026-03-04 08:09:22', 'address': '', 'distance': 0.0},
+        ]
+
+    def test_csv_points(self):
+        content = (
+            "timestamp,latitude,longitude,distance\n"
+            "2026-03-05 09:00:00,46.7712,23.5916,0.1\n"
+            "2026-03-05 09:00:15,bad,23.5920,0.15\n"
+            "2026-03-06 09:00:30,46.7718,23.5925,0.25\n"
+        )
+        result = parse_gps_log(content, filename='log.csv', columnar=True)
+        assert result['format'] == 'standard_csv'
+        assert result['total_distance'] == pytest.approx(0.5)
+        assert (result['date_start'], result['date_end']) == ('2026-03-05', '2026-03-06')
+        points = result['gps_points']
+        assert points.lat.tolist() == [46.7712, 46.7718]
+        assert points.timestamps.tolist() == ['2026-03-05 09:00:00', '2026-03-06 09:00:30']
+        assert points.addresses is None
+
+        assert parse_gps_log("", filename='log.csv', columnar=True)['gps_points'].lat.size == 0
+
+    def test_columnar_points_stored(self, db_engine):
+        from src.data.campaign_storage import CampaignStorage
+        from src.data.gps_track_storage import GpsTrackStorage
+
+        points = GpsPoints(np.array([44.43, 44.44]), np.array([26.10, 26.11]),
+                           np.array(['2025-01-01 09:00:00', None], dtype=object))
+        storage = CampaignStorage()
+        audit = {'gps_imports': [{'id': 'imp1', 'filename': 'log.csv', 'gps_points': points}]}
+        cid = storage.save_campaign({'campaign_name': 'GPS', 'audited_data': audit})
+        g_imp = storage.get_campaign(cid)['audited_data']['gps_imports'][0]
+        assert g_imp['point_count'] == 2
+        assert GpsTrackStorage().get_import_points(g_imp) == points.to_dicts()
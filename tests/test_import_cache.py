@@ -0,0 +1,82 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+from src.utils import import_cache
+from src.utils.disk_cache import DiskCache
+from src.utils.import_cache import cached_parse, content_hash
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / 'imports'), import_cache.IMPORT_CACHE_MAX_BYTES, suffix='.json')
+    monkeypatch.setattr(import_cache, 'import_cache', cache)
+    return cache
+
+
+class TestImportCache:
+    def test_content_hash_of_bytes_and_files(self, monkeypatch):
+        monkeypatch.setattr(import_cache, 'HASH_CHUNK_SIZE', 3)
+        content = b'timestamp,latitude\n2026-03-05,46.77\n'
+        upload = io.BytesIO(b'xx' + content)
+        upload.seek(2)
+        assert content_hash(upload) == content_hash(content)
+        assert upload.tell() == 2
+        assert content_hash(content) != content_hash(content + b'\n')
+
+    def test_identical_upload_served_from_cache(self, cache):
+        calls = []
+
+        def parse():
+            calls.append(1)
+            return {'total_distance': 1.5, 'gps_points': [{'lat': 1.0, 'lon': 2.0}]}
+
+        digest = content_hash(b'log')
+        first, hit = cached_parse('gps', digest, parse, variant='.csv')
+        assert not hit
+        second, hit = cached_parse('gps', digest, parse, variant='.csv')
+        assert hit and second == first and second is not first
+        assert len(calls) == 1
+
+        # Other parser inputs are other entries
+        cached_parse('gps', digest, parse, variant='.xls')
+        cached_parse('vnnox', digest, parse)
+        assert len(calls) == 3
+
+    def test_gps_points_round_trip_as_json(self, cache):
+        from src.utils.gps_parser import parse_gps_log
+        samples = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'samples')
+        name = 'FoaieDeParcursDetaliata-7ABB-BC_59-20260304-20260304_5b95c648.xls'
+        with open(os.path.join(samples, name), 'rb') as f:
+            content = f.read()
+
+        digest = content_hash(content)
+        parsed, _ = cached_parse('gps', digest, lambda: parse_gps_log(content, filename=name, columnar=True), '.xls')
+        cached, hit = cached_parse('gps', digest, lambda: None, '.xls')
+        assert hit and cached['total_distance'] == parsed['total_distance']
+        points, original = cached['gps_points'], parsed['gps_points']
+        assert np.array_equal(points.lat, original.lat) and np.array_equal(points.distances, original.distances)
+        assert points.to_dicts() == original.to_dicts()
+        # Entries are plain JSON, never unpickled
+        for entry in os.listdir(cache.directory):
+            with open(os.path.join(cache.directory, entry), 'rb') as f:
+                assert f.read(1) == b'{'
+
+    def test_unreadable_entry_is_reparsed(self, cache):
+        digest = content_hash(b'log')
+        cached_parse('vnnox', digest, lambda: {'rows': 1})
+        for name in os.listdir(cache.directory):
+            with open(os.path.join(cache.directory, name), 'wb') as f:
+                f.write(b'{not json')
+        assert cached_parse('vnnox', digest, lambda: {'rows': 2}) == ({'rows': 2}, False)
+
+    def test_parse_errors_not_cached(self, cache):
+        def fail():
+            raise ValueError('antet')
+
+        digest = content_hash(b'bad')
+        with pytest.raises(ValueError):
+            cached_parse('vnnox', digest, fail)
+        assert cached_parse('vnnox', digest, lambda: {'rows': 3}) == ({'rows': 3}, False)
@@ -0,0 +1,140 @@
+import datetime
+import os
+
+import pytest
+
+from src.data.campaign_storage import CampaignStorage
+from src.data.db_config import SessionLocal
+from src.data.models import ImportJob
+from src.data.play_log_storage import PlayLogStorage
+from src.services import import_job_service
+from src.services.import_job_service import ImportJobService
+from src.utils import import_cache
+from src.utils.disk_cache import DiskCache
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'samples')
+
+
+def _sample(name):
+    with open(os.path.join(SAMPLES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def service(db_engine, tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / 'imports'), import_cache.IMPORT_CACHE_MAX_BYTES, suffix='.json')
+    monkeypatch.setattr(import_cache, 'import_cache', cache)
+    return ImportJobService(spool_dir=str(tmp_path / 'spool'))
+
+
+class TestImportJobs:
+    def test_queued_vnnox_job_saved_to_campaign(self, service, monkeypatch):
+        monkeypatch.setattr(import_job_service, 'PROGRESS_STEP', 0.0)
+        progress = []
+        update = ImportJobService._update
+
+        def record(self, job_id, **values):
+            if 'progress' in values:
+                progress.append(values['progress'])
+            update(self, job_id, **values)
+        monkeypatch.setattr(ImportJobService, '_update', record)
+        cid = CampaignStorage().save_campaign({'campaign_name': 'PoP'})
+
+        job = service.enqueue(cid, 'vnnox', 'Play Logs(Details).csv', _sample('Play Logs(Details).csv'))
+        assert job['status'] == 'queued' and os.path.exists(job['file_path'])
+        # Double click: the same upload is not queued twice
+        assert service.enqueue(cid, 'vnnox', 'copy.csv', _sample('Play Logs(Details).csv'))['id'] == job['id']
+
+        assert service.run_worker(once=True) == 1
+        done = service.get_job(job['id'])
+        assert done['status'] == 'done' and done['progress'] == 1.0
+        assert progress == sorted(progress) and len(progress) > 3
+        assert not os.path.exists(job['file_path'])
+
+        v_imp = CampaignStorage().get_campaign(cid)['audited_data']['vnnox_imports'][0]
+        assert done['result']['import_id'] == v_imp['id'] and v_imp['content_hash'] == job['content_hash']
+        assert done['result']['spots'] == v_imp['spots'] == PlayLogStorage().rollup(cid, by=())[0]['plays']
+
+        # Already imported: finished without a second import
+        again = service.run_job(service.enqueue(cid, 'vnnox', 'again.csv', _sample('Play Logs(Details).csv'))['id'])
+        assert again['status'] == 'done' and again['result'] == {'duplicate': True}
+        assert len(CampaignStorage().get_campaign(cid)['audited_data']['vnnox_imports']) == 1
+        assert [j['id'] for j in service.jobs_for_campaign(cid)] == [again['id'], job['id']]
+
+    def test_gps_job_and_failures(self, service):
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'GPS'})
+        job = service.enqueue(cid, 'gps', 'sample_gps.csv', _sample('sample_gps.csv'))
+        assert service.run_job(service.claim_next())['status'] == 'done'
+        g_imp = storage.get_campaign(cid)['audited_data']['gps_imports'][0]
+        assert service.get_job(job['id'])['result']['distance'] == pytest.approx(g_imp['distance'])
+
+        failed = service.run_job(service.enqueue(cid, 'gps', 'empty.csv', b'nothing,here\n')['id'])
+        assert failed['status'] == 'failed' and 'GPS' in failed['message']
+        assert len(storage.get_campaign(cid)['audited_data']['gps_imports']) == 1
+
+        with pytest.raises(ValueError):
+            service.enqueue(cid, 'kml', 'route.kml', b'')
+
+    def test_claim_and_stale_requeue(self, service):
+        cid = CampaignStorage().save_campaign({'campaign_name': 'Queue'})
+        first = service.enqueue(cid, 'vnnox', 'a.csv', b'a')
+        second = service.enqueue(cid, 'vnnox', 'b.csv', b'b')
+        assert service.claim_next() == first['id']
+        assert service.claim_next() == second['id']
+        assert service.claim_next() is None
+
+        session = SessionLocal()
+        session.get(ImportJob, first['id']).updated_at = datetime.datetime.now() - datetime.timedelta(hours=1)
+        session.commit()
+        session.close()
+        assert service.requeue_stale() == 1
+        assert service.get_job(first['id'])['status'] == 'queued'
+        assert service.get_job(second['id'])['status'] == 'running'
+
+    def test_worker_runs_jobs_of_dead_workers(self, service):
+        cid = CampaignStorage().save_campaign({'campaign_name': 'Restart'})
+        assert not service.has_active_jobs()
+        job = service.enqueue(cid, 'vnnox', 'Play Logs(Details).csv', _sample('Play Logs(Details).csv'))
+        assert service.has_active_jobs()
+        # Claimed by a worker that died before finishing it
+        assert service.claim_next() == job['id']
+        session = SessionLocal()
+        session.get(ImportJob, job['id']).updated_at = datetime.datetime.now() - datetime.timedelta(hours=1)
+        session.commit()
+        session.close()
+
+        assert service.run_worker(once=True) == 1
+        assert service.get_job(job['id'])['status'] == 'done'
+        assert not service.has_active_jobs()
+
+    def test_edit_saved_during_job_is_kept(self, service, monkeypatch):
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'Before', 'client_name': 'Client'})
+        entry = import_job_service.vnnox_import_entry
+
+        def entry_while_editing(*args):
+            # The campaign page saves an edit after the worker read the campaign
+            campaign = storage.get_campaign(cid)
+            campaign['campaign_name'] = 'After'
+            storage.save_campaign(campaign, cid)
+            return entry(*args)
+        monkeypatch.setattr(import_job_service, 'vnnox_import_entry', entry_while_editing)
+
+        job = service.enqueue(cid, 'vnnox', 'Play Logs(Details).csv', _sample('Play Logs(Details).csv'))
+        assert service.run_job(job['id'])['status'] == 'done'
+        campaign = storage.get_campaign(cid)
+        assert (campaign['campaign_name'], campaign['client_name']) == ('After', 'Client')
+        assert len(campaign['audited_data']['vnnox_imports']) == 1
+
+    def test_deleted_campaign_drops_its_jobs(self, service):
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'Gone'})
+        keep = storage.save_campaign({'campaign_name': 'Kept'})
+        queued = service.enqueue(cid, 'vnnox', 'a.csv', b'a')
+        other = service.enqueue(keep, 'vnnox', 'b.csv', b'b')
+
+        assert storage.delete_campaign(cid)
+        assert service.get_job(queued['id']) is None and not os.path.exists(queued['file_path'])
+        assert service.get_job(other['id'])['status'] == 'queued' and os.path.exists(other['file_path'])
+        assert service.claim_next() == other['id']
@@ -0,0 +1,265 @@
+import datetime
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from src.reporting.campaign_report_generator import CampaignReportGenerator
+
+START = datetime.date(2025, 1, 1)
+MODAL_SPLIT = {'auto': 35, 'walking': 27, 'cycling': 4, 'public_transport': 34}
+
+
+def _assert_matches(result, expected):
+    """Prefix-sum totals differ from the day loop's running sum by float rounding only"""
+    for key in ('auto', 'pedestrian', 'total'):
+        assert abs(result[key] - expected[key]) <= 1
+    assert (result['events'], result['share_of_voice']) == (expected['events'], expected['share_of_voice'])
+
+
+def _baseline(generator, modal_split, daily_traffic, daily_pedestrian, campaign_hours_per_day, total_days, start_date,
+              city_name, spot_duration=10, loop_duration=60, is_exclusive=False, city_schedule=None, active_routes=None,
+              city_locations=None):
+    """
+    _calculate_impressions_by_mode before the audience cube, verbatim: the
+    period-start profile's daily_traffic / daily_pedestrian for every day.
+    Within one quarter the engine must give exactly its results.
+    """
+    share_of_voice = 1.0 if is_exclusive else (spot_duration / loop_duration if loop_duration > 0 else 0.16)
+
+    # Base hourly estimate from city wide data
+    hourly_traffic_city_avg = daily_traffic / 24
+    hourly_pedestrian_city_avg = daily_pedestrian / 24
+
+    total_campaign_traffic, total_campaign_pedestrian = 0, 0
+    current_date, events_encountered = start_date, []
+
+    for _ in range(total_days):
+        date_str = current_date.strftime('%Y-%m-%d')
+        hours_today = campaign_hours_per_day
+        if city_schedule and city_schedule.get(date_str):
+            day_data = city_schedule[date_str]
+            if not day_data.get('active', True): hours_today = 0
+            elif day_data.get('hours'): hours_today = generator._parse_daily_hours(day_data['hours'])['hours']
+
+        if hours_today > 0:
+            # ROUTE & TRAFFIC LOCATION BLENDING
+            # If we have routes for today, check intersection with BRAT locations
+            h_traffic, h_pedestrian = hourly_traffic_city_avg, hourly_pedestrian_city_avg
+
+            if active_routes and city_locations:
+                # Filter routes for today
+                routes_today = [r for r in active_routes if generator._is_route_active(r, current_date)]
+                if routes_today:
+                    # Find intersections with audited locations
+                    intersected_locs = generator._find_intersected_locations(routes_today, city_locations)
+                    if intersected_locs:
+                        # BLENDING LOGIC: (City Average + Audited Locations Average) / 2
+                        audited_traffic_avg = sum(l.daily_traffic for l in intersected_locs) / len(intersected_locs) / 24
+                        audited_pedestrian_avg = sum(l.pedestrian_traffic for l in intersected_locs) / len(intersected_locs) / 24
+
+                        h_traffic = (hourly_traffic_city_avg + audited_traffic_avg) / 2
+                        h_pedestrian = (hourly_pedestrian_city_avg + audited_pedestrian_avg) / 2
+
+            t_mult, p_mult, event_name = generator.city_manager.get_event_multipliers(city_name, current_date)
+            if event_name and event_name not in events_encountered: events_encountered.append(event_name)
+
+            total_campaign_traffic += h_traffic * hours_today * t_mult
+            total_campaign_pedestrian += h_pedestrian * hours_today * p_mult
+
+        current_date += datetime.timedelta(days=1)
+
+    auto_traffic = total_campaign_traffic * (modal_split.get('auto', 35) / 100)
+    cycling_traffic = total_campaign_traffic * (modal_split.get('cycling', 4) / 100)
+    walking_traffic = total_campaign_pedestrian * (modal_split.get('walking', 27) / 100)
+
+    visibility_factor = 1.0 if is_exclusive else 0.7
+    auto_impressions = auto_traffic * 1.65 * visibility_factor * share_of_voice
+    pedestrian_impressions = (walking_traffic + cycling_traffic) * visibility_factor * share_of_voice
+
+    return {
+        'auto': int(auto_impressions),
+        'pedestrian': int(pedestrian_impressions),
+        'total': int(auto_impressions + pedestrian_impressions),
+        'events': events_encountered,
+        'share_of_voice': share_of_voice
+    }
+
+
+def _day_loop(generator, modal_split, campaign_hours_per_day, total_days, start_date, city_name, spot_duration=10,
+              loop_duration=60, is_exclusive=False, city_schedule=None, active_routes=None, city_locations=None):
+    """_baseline with each day's own quarter profile: the reference for periods crossing quarters"""
+    share_of_voice = 1.0 if is_exclusive else (spot_duration / loop_duration if loop_duration > 0 else 0.16)
+
+    total_campaign_traffic, total_campaign_pedestrian = 0, 0
+    current_date, events_encountered = start_date, []
+
+    for _ in range(total_days):
+        date_str = current_date.strftime('%Y-%m-%d')
+        hours_today = campaign_hours_per_day
+        if city_schedule and city_schedule.get(date_str):
+            day_data = city_schedule[date_str]
+            if not day_data.get('active', True): hours_today = 0
+            elif day_data.get('hours'): hours_today = generator._parse_daily_hours(day_data['hours'])['hours']
+
+        if hours_today > 0:
+            # Base hourly estimate from the city profile of the day's quarter
+            profile = generator.city_manager.get_city_data_for_period(city_name, current_date)
+            hourly_traffic_city_avg = profile.get('daily_traffic_total', 50000) / 24 if profile else 0
+            hourly_pedestrian_city_avg = profile.get('daily_pedestrian_total', 50000) / 24 if profile else 0
+
+            # ROUTE & TRAFFIC LOCATION BLENDING
+            # If we have routes for today, check intersection with BRAT locations
+            h_traffic, h_pedestrian = hourly_traffic_city_avg, hourly_pedestrian_city_avg
+
+            if active_routes and city_locations:
+                # Filter routes for today
+                routes_today = [r for r in active_routes if generator._is_route_active(r, current_date)]
+                if routes_today:
+                    # Find intersections with audited locations
+                    intersected_locs = generator._find_intersected_locations(routes_today, city_locations)
+                    if intersected_locs:
+                        # BLENDING LOGIC: (City Average + Audited Locations Average) / 2
+                        audited_traffic_avg = sum(l.daily_traffic for l in intersected_locs) / len(intersected_locs) / 24
+                        audited_pedestrian_avg = sum(l.pedestrian_traffic for l in intersected_locs) / len(intersected_locs) / 24
+
+                        h_traffic = (hourly_traffic_city_avg + audited_traffic_avg) / 2
+                        h_pedestrian = (hourly_pedestrian_city_avg + audited_pedestrian_avg) / 2
+
+            t_mult, p_mult, event_name = generator.city_manager.get_event_multipliers(city_name, current_date)
+            if event_name and event_name not in events_encountered: events_encountered.append(event_name)
+
+            total_campaign_traffic += h_traffic * hours_today * t_mult
+            total_campaign_pedestrian += h_pedestrian * hours_today * p_mult
+
+        current_date += datetime.timedelta(days=1)
+
+    return generator._impressions_from_traffic(modal_split, total_campaign_traffic, total_campaign_pedestrian,
+                                               events_encountered, is_exclusive, share_of_voice)
+
+
+@pytest.fixture
+def generator():
+    gen = CampaignReportGenerator(None)
+    # The year crosses a profile change (Q1 falls back to 2024-Q4)
+    gen.city_manager.profiles = {
+        'Cluj-Napoca': {
+            '2024-Q4': {'daily_traffic_total': 96000, 'daily_pedestrian_total': 24000},
+            '2025-Q2': {'daily_traffic_total': 120000, 'daily_pedestrian_total': 45000},
+            'current': {'ref': '2025-Q2'},
+        }
+    }
+    gen.city_manager.special_events = {
+        'Cluj-Napoca': {
+            '2025-03-01': {'name': 'Martisor', 'traffic_multiplier': 0.9, 'pedestrian_multiplier': 1.4},
+            'fair': {'name': 'Targ', 'start_date': '2025-02-25', 'end_date': '2025-03-10',
+                     'traffic_multiplier': 0.5, 'pedestrian_multiplier': 2},
+            'late': {'name': 'Targ', 'start_date': '2025-03-05', 'end_date': '2025-03-20',
+                     'traffic_multiplier': 0.7, 'pedestrian_multiplier': 1.1},
+            'bad-key': {'name': 'Ignored', 'traffic_multiplier': 3.0},
+        }
+    }
+    gen.city_manager.audience_cube.invalidate()
+    return gen
+
+
+def _scenario(seed, total_days=365):
+    rng = random.Random(seed)
+    locations = [SimpleNamespace(latitude=46.77 + rng.uniform(-0.02, 0.02), longitude=23.59 + rng.uniform(-0.02, 0.02),
+                                 daily_traffic=rng.randint(5000, 80000), pedestrian_traffic=rng.randint(500, 20000))
+                 for _ in range(40)]
+    routes = []
+    for i in range(6):
+        start = START + datetime.timedelta(days=rng.randint(0, 200))
+        coords = [[23.59 + rng.uniform(-0.02, 0.02), 46.77 + rng.uniform(-0.02, 0.02)] for _ in range(10)]
+        routes.append({
+            'date_start': start.isoformat() if i % 3 else None,
+            'date_end': (start + datetime.timedelta(days=rng.randint(5, 120))).isoformat() if i % 2 else None,
+            'geojson_data': {'geometry': {'type': 'LineString', 'coordinates': coords}},
+        })
+    lat, lon = locations[0].latitude, locations[0].longitude
+    routes.append({'date_start': '2025-06-01', 'geojson_data': {'geometry': {'type': 'Point', 'coordinates': [lon, lat]}}})
+    routes.append({'geojson_data': None})
+    schedule = {}
+    for _ in range(60):
+        day = (START + datetime.timedelta(days=rng.randint(0, total_days + 10))).isoformat()
+        schedule[day] = rng.choice([{'active': False}, {'hours': '07:00-19:30'}, {'hours': '10:00-14:00, 16:00-22:00'}, {}])
+    return locations, routes, schedule
+
+
+class TestImpressionsEngine:
+    @pytest.mark.parametrize("seed", range(3))
+    @pytest.mark.parametrize("start, total_days", [
+        (datetime.date(2025, 1, 1), 90),    # Q1: falls back to the 2024-Q4 profile, events
+        (datetime.date(2025, 4, 1), 91),    # Q2
+        (datetime.date(2025, 8, 10), 30),   # Q3, mid-quarter start
+    ])
+    def test_single_quarter_matches_baseline_exactly(self, generator, seed, start, total_days):
+        locations, routes, schedule = _scenario(seed)
+        profile = generator.city_manager.get_city_data_for_period('Cluj-Napoca', start)
+        for kwargs in (
+            {},
+            {'city_schedule': schedule},
+            {'city_schedule': schedule, 'active_routes': routes, 'city_locations': locations},
+            {'active_routes': routes, 'city_locations': locations, 'is_exclusive': True},
+        ):
+            assert generator._calculate_impressions_by_mode(MODAL_SPLIT, 10.5, total_days, start, 'Cluj-Napoca',
+                                                            **kwargs) == \
+                _baseline(generator, MODAL_SPLIT, profile['daily_traffic_total'], profile['daily_pedestrian_total'],
+                          10.5, total_days, start, 'Cluj-Napoca', **kwargs)
+
+    def test_cross_quarter_period_uses_each_quarter_profile(self, generator):
+        start, total_days = datetime.date(2025, 3, 1), 61
+        q1 = generator.city_manager.get_city_data_for_period('Cluj-Napoca', start)
+        q2 = generator.city_manager.get_city_data_for_period('Cluj-Napoca', datetime.date(2025, 4, 1))
+        result = generator._calculate_impressions_by_mode(MODAL_SPLIT, 8, total_days, start, 'Cluj-Napoca')
+
+        # March at the Q1 profile, April at the Q2 one, not the start profile throughout
+        march = _baseline(generator, MODAL_SPLIT, q1['daily_traffic_total'], q1['daily_pedestrian_total'],
+                          8, 31, start, 'Cluj-Napoca')
+        april = _baseline(generator, MODAL_SPLIT, q2['daily_traffic_total'], q2['daily_pedestrian_total'],
+                          8, 30, datetime.date(2025, 4, 1), 'Cluj-Napoca')
+        for key in ('auto', 'pedestrian', 'total'):
+            assert abs(result[key] - (march[key] + april[key])) <= 2
+        start_profile = _baseline(generator, MODAL_SPLIT, q1['daily_traffic_total'], q1['daily_pedestrian_total'],
+                                  8, total_days, start, 'Cluj-Napoca')
+        assert result['total'] > start_profile['total']
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_day_loop(self, generator, seed):
+        locations, routes, schedule = _scenario(seed)
+        for kwargs in (
+            {},
+            {'city_schedule': schedule},
+            {'city_schedule': schedule, 'active_routes': routes, 'city_locations': locations},
+            {'active_routes': routes, 'city_locations': locations, 'is_exclusive': True},
+        ):
+            args = (MODAL_SPLIT, 10.5, 365, START, 'Cluj-Napoca')
+            _assert_matches(generator._calculate_impressions_by_mode(*args, **kwargs),
+                            _day_loop(generator, *args, **kwargs))
+
+    def test_events_and_empty_period(self, generator):
+        args = (MODAL_SPLIT, 8, 30, datetime.date(2025, 2, 20), 'cluj-napoca')
+        result = generator._calculate_impressions_by_mode(*args)
+        _assert_matches(result, _day_loop(generator, *args))
+        assert result['events'] == ['Targ', 'Martisor']  # First matching event wins
+
+        # Without own hours or routes the period is a single range sum over the cube
+        cube = generator.city_manager.audience_cube
+        totals = cube.range_totals('Cluj-Napoca', datetime.date(2025, 2, 20), datetime.date(2025, 3, 21))
+        assert result['auto'] == int(8 * totals['traffic'] * 0.35 * 1.65 * 0.7 * 10 / 60)
+
+        empty = (MODAL_SPLIT, 8, 0, START, 'Cluj-Napoca')
+        assert generator._calculate_impressions_by_mode(*empty) == _day_loop(generator, *empty)
+
+    def test_later_quarters_use_their_modal_split(self, generator):
+        q2_split = {'auto': 50, 'walking': 20, 'cycling': 10, 'public_transport': 20}
+        generator.city_manager.profiles['Cluj-Napoca']['2025-Q2']['modal_split'] = q2_split
+        generator.city_manager.audience_cube.invalidate()
+
+        result = generator._calculate_impressions_by_mode(MODAL_SPLIT, 8, 61, datetime.date(2025, 3, 1), 'Cluj-Napoca')
+        march = _day_loop(generator, MODAL_SPLIT, 8, 31, datetime.date(2025, 3, 1), 'Cluj-Napoca')
+        april = _day_loop(generator, q2_split, 8, 30, datetime.date(2025, 4, 1), 'Cluj-Napoca')
+        for key in ('auto', 'pedestrian', 'total'):
+            assert abs(result[key] - (march[key] + april[key])) <= 2
+        assert result['events'] == march['events'] + [ev for ev in april['events'] if ev not in march['events']]
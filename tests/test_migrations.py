@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.pool import StaticPool
+
+from src.data import migrations
+from src.data.migrations import MIGRATIONS, add_missing_columns, current_state, model_fingerprint, run_migrations
+
+
+def _engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+def _legacy_engine():
+    """Database with tables predating several model columns and constraints"""
+    engine = _engine()
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE vehicles (id VARCHAR(36) PRIMARY KEY, name VARCHAR(100) NOT NULL)"))
+        conn.execute(text("CREATE TABLE campaigns (id VARCHAR(36) PRIMARY KEY, campaign_name VARCHAR(200) NOT NULL, vehicle_id VARCHAR(36))"))
+        conn.execute(text(
+            "CREATE TABLE campaign_routes (id VARCHAR(36) PRIMARY KEY, campaign_id VARCHAR(36) NOT NULL, name VARCHAR(100))"
+        ))
+        conn.execute(text(
+            "CREATE TABLE campaign_spots (id VARCHAR(36) PRIMARY KEY, campaign_id VARCHAR(36) NOT NULL, "
+            "name VARCHAR(200) NOT NULL, target_cities TEXT, FOREIGN KEY (campaign_id) REFERENCES campaigns(id))"
+        ))
+        conn.execute(text("INSERT INTO vehicles (id, name) VALUES ('v1', 'Truck 1')"))
+        conn.execute(text("INSERT INTO campaigns (id, campaign_name, vehicle_id) VALUES ('c1', 'Old', 'v1')"))
+        conn.execute(text("INSERT INTO campaign_routes (id, campaign_id, name) VALUES ('r1', 'c1', 'Route')"))
+        conn.execute(text("INSERT INTO campaign_spots (id, campaign_id, name, target_cities) VALUES ('s1', 'c1', 'Spot', '')"))
+    return engine
+
+
+class TestMigrationRunner:
+    def test_fresh_database_then_constant_startup(self):
+        engine = _engine()
+        applied = run_migrations(bind=engine)
+        assert applied == [name for _, name, _ in MIGRATIONS]
+        assert current_state(engine) == (MIGRATIONS[-1][0], model_fingerprint())
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        assert run_migrations(bind=engine) == []
+        assert len(statements) == 1
+
+    def test_legacy_database_upgraded(self):
+        engine = _legacy_engine()
+        run_migrations(bind=engine)
+
+        with engine.connect() as conn:
+            row = conn.execute(text("SELECT is_archived FROM vehicles WHERE id = 'v1'")).one()
+            assert row.is_archived == 0
+            row = conn.execute(text("SELECT budget_eur, audited_data, created_at FROM campaigns WHERE id = 'c1'")).one()
+            assert row.budget_eur == 0.0 and row.audited_data == '{}' and row.created_at is not None
+            assert conn.execute(text("SELECT name FROM campaign_routes")).scalar() == 'Route'
+            assert conn.execute(text("SELECT target_cities FROM campaign_spots")).scalar() is None
+            # Backfilled by the assignments step, through CampaignStorage
+            assert conn.execute(text("SELECT vehicle_id FROM campaign_vehicle_assignments")).scalar() == 'v1'
+
+        inspector = inspect(engine)
+        routes = {col['name']: col for col in inspector.get_columns('campaign_routes')}
+        assert routes['campaign_id']['nullable']
+        assert inspector.get_foreign_keys('campaign_spots')[0]['options']['ondelete'] == 'CASCADE'
+        assert 'ix_campaign_spots_campaign_id' in {ix['name'] for ix in inspector.get_indexes('campaign_spots')}
+        assert add_missing_columns(engine.connect()) == []
+
+    def test_failed_step_is_rolled_back(self, monkeypatch):
+        engine = _engine()
+        run_migrations(bind=engine)
+
+        def _broken(conn):
+            conn.execute(text("ALTER TABLE vehicles ADD COLUMN half_done INTEGER"))
+            raise RuntimeError("boom")
+
+        head = MIGRATIONS[-1][0]
+        monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS + [(head + 1, 'broken', _broken)])
+        with pytest.raises(RuntimeError):
+            run_migrations(bind=engine)
+
+        assert 'half_done' not in {col['name'] for col in inspect(engine).get_columns('vehicles')}
+        assert current_state(engine)[0] == head
+
+    def test_model_change_triggers_sync(self):
+        engine = _engine()
+        run_migrations(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE schema_migrations SET model_fingerprint = 'old'"))
+            conn.execute(text("DROP INDEX ix_campaigns_end_date"))
+
+        assert run_migrations(bind=engine) == ['sync_models']
+        assert 'ix_campaigns_end_date' in {ix['name'] for ix in inspect(engine).get_indexes('campaigns')}
+        assert run_migrations(bind=engine) == []
@@ -0,0 +1,170 @@
+import datetime
+import os
+
+import pytest
+
+from src.data.campaign_storage import CampaignStorage
+from src.data.city_data_manager import CityDataManager
+from src.data.play_log_storage import PlayLogStorage
+from src.utils.vnnox_parser import parse_vnnox_csv
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'samples')
+
+HOURLY = [
+    {'screen': 'BC59', 'media_name': 'A.mp4', 'date': '2026-03-03', 'hour': 9, 'plays': 10, 'seconds': 100.0},
+    {'screen': 'BC59', 'media_name': 'A.mp4', 'date': '2026-03-03', 'hour': 10, 'plays': 20, 'seconds': 200.0},
+    {'screen': 'BC60', 'media_name': 'B.mp4', 'date': '2026-03-04', 'hour': 9, 'plays': 5, 'seconds': 3600.0},
+    {'screen': 'BC60', 'media_name': 'B.mp4', 'date': 'bad', 'hour': 9, 'plays': 1, 'seconds': 1.0},
+]
+
+
+def _audit(hourly):
+    return {'vnnox_imports': [{'id': 'vn1', 'filename': 'log.csv', 'hours': 1.1, 'hourly_plays': hourly}]}
+
+
+class TestPlayLogStorage:
+    def test_sample_buckets_add_up(self):
+        with open(os.path.join(SAMPLES_DIR, 'Play Logs(Details).csv'), 'rb') as f:
+            result = parse_vnnox_csv(f)
+        hourly = result['hourly_plays']
+        assert sum(b['plays'] for b in hourly) == result['total_spots']
+        assert sum(b['seconds'] for b in hourly) == pytest.approx(result['total_seconds'])
+        assert {b['date'] for b in hourly} == {'2026-03-03', '2026-03-04', '2026-03-05'}
+        assert all(0 <= b['hour'] <= 23 for b in hourly)
+        assert all(0 <= b['first_second'] <= b['last_second'] < 3600 for b in hourly)
+
+        with open(os.path.join(SAMPLES_DIR, 'Play Logs(Overview).csv'), 'rb') as f:
+            assert parse_vnnox_csv(f)['hourly_plays'] == []
+
+    def test_buckets_moved_to_rollups(self, db_engine):
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'PoP', 'audited_data': _audit(HOURLY)})
+        v_imp = storage.get_campaign(cid)['audited_data']['vnnox_imports'][0]
+        assert 'hourly_plays' not in v_imp and v_imp['hour_rows'] == 3
+
+        plays = PlayLogStorage()
+        assert [(d['play_date'], d['plays'], d['seconds']) for d in plays.rollup(cid)] == [
+            (datetime.date(2026, 3, 3), 30, 300.0), (datetime.date(2026, 3, 4), 5, 3600.0)]
+        assert [(d['hour'], d['plays']) for d in plays.rollup(cid, by=('hour',))] == [(9, 15), (10, 20)]
+        assert plays.rollup(cid, by=('screen', 'media_name'), start=datetime.date(2026, 3, 4)) == [
+            {'screen': 'BC60', 'media_name': 'B.mp4', 'plays': 5, 'seconds': 3600.0, 'hours': 1.0}]
+        assert plays.rollup(cid, by=())[0]['plays'] == 35
+        assert plays.rollup('missing', by=()) == []
+        with pytest.raises(ValueError):
+            plays.rollup(cid, by=('campaign_id',))
+
+    def test_clone_and_removed_import(self, db_engine):
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'PoP', 'audited_data': _audit(HOURLY)})
+        clone_id = storage.clone_campaign(cid)
+        assert PlayLogStorage().rollup(clone_id, by=())[0]['plays'] == 35
+
+        campaign = storage.get_campaign(cid)
+        campaign['audited_data']['vnnox_imports'] = []
+        storage.save_campaign(campaign, cid)
+        assert PlayLogStorage().rollup(cid) == []
+        assert PlayLogStorage().rollup(clone_id, by=())[0]['plays'] == 35
+
+        # Bulk saves move buckets too
+        ids = storage.bulk_save_campaigns([{'campaign_name': 'Bulk', 'audited_data': _audit(HOURLY[:1])}])
+        assert PlayLogStorage().rollup(ids[0], by=())[0]['plays'] == 10
+
+    def test_deleted_campaign_drops_its_rows(self, db_engine):
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'PoP', 'audited_data': _audit(HOURLY)})
+        keep = storage.save_campaign({'campaign_name': 'Other', 'audited_data': _audit(HOURLY[:1])})
+        assert storage.delete_campaign(cid)
+        assert PlayLogStorage().rollup(cid) == []
+        assert PlayLogStorage().rollup(keep, by=())[0]['plays'] == 10
+
+    def test_audited_audience(self, db_engine):
+        manager = CityDataManager()
+        manager.profiles = {'Cluj-Napoca': {'2026-Q1': {'daily_traffic_total': 24000, 'daily_pedestrian_total': 4800},
+                                            'current': {'ref': '2026-Q1'}}}
+        manager.special_events = {'Cluj-Napoca': {'2026-03-04': {'name': 'Targ', 'traffic_multiplier': 2,
+                                                                 'pedestrian_multiplier': 1}}}
+        manager.audience_cube.invalidate()
+
+        cid = CampaignStorage().save_campaign({'campaign_name': 'PoP', 'audited_data': _audit(HOURLY)})
+        audience = PlayLogStorage().audited_audience(cid, ['Cluj-Napoca'], manager.audience_cube)
+        # 300 s on 03-03 at 1000 vehicles/h, 1 h on 03-04 at 2 x 1000
+        assert audience['played_hours'] == pytest.approx(3900 / 3600)
+        assert audience['traffic'] == pytest.approx(1000 * 300 / 3600 + 2000)
+        assert audience['pedestrian'] == pytest.approx(200 * 3900 / 3600)
+        assert PlayLogStorage().audited_audience(cid, [], manager.audience_cube) is None
+
+    def test_audited_audience_follows_itinerary(self, db_engine):
+        manager = CityDataManager()
+        manager.profiles = {
+            'Cluj-Napoca': {'2026-Q1': {'daily_traffic_total': 24000, 'daily_pedestrian_total': 4800},
+                            'current': {'ref': '2026-Q1'}},
+            'Bucuresti': {'2026-Q1': {'daily_traffic_total': 72000, 'daily_pedestrian_total': 4800},
+                          'current': {'ref': '2026-Q1'}},
+        }
+        manager.special_events = {}
+        manager.audience_cube.invalidate()
+        cid = CampaignStorage().save_campaign({'campaign_name': 'Tour', 'audited_data': _audit(HOURLY)})
+        cities = ['Cluj-Napoca', 'Bucuresti']
+
+        # Without an itinerary every day averages the cities: 2000 vehicles/h
+        averaged = PlayLogStorage().audited_audience(cid, cities, manager.audience_cube)
+        assert averaged['traffic'] == pytest.approx(2000 * 3900 / 3600)
+        # 03-03 in Cluj (1000/h), 03-04 in Bucuresti (3000/h)
+        periods = {'Cluj-Napoca': [(datetime.date(2026, 3, 1), datetime.date(2026, 3, 3))],
+                   'Bucuresti': [(datetime.date(2026, 3, 4), datetime.date(2026, 3, 10))]}
+        placed = PlayLogStorage().audited_audience(cid, cities, manager.audience_cube, periods)
+        assert placed['traffic'] == pytest.approx(1000 * 300 / 3600 + 3000)
+        assert placed['pedestrian'] == pytest.approx(200 * 3900 / 3600)
+
+    def test_played_hours_from_rows_and_overview_summaries(self, db_engine):
+        storage = CampaignStorage()
+        audited = _audit(HOURLY)
+        audited['vnnox_imports'].append({'id': 'ov1', 'filename': 'overview.csv', 'format': 'overview', 'hours': 5.0})
+        cid = storage.save_campaign({'campaign_name': 'Hours', 'audited_data': audited})
+        imports = storage.get_campaign(cid)['audited_data']['vnnox_imports']
+        # Details rows (3900 s, the bad row dropped) rather than the 1.1 h summary, plus the Overview log
+        assert PlayLogStorage().played_hours(cid, imports) == pytest.approx(3900 / 3600 + 5.0)
+        assert PlayLogStorage().played_hours(cid, []) is None
+
+    def test_overlapping_import_merged_by_bucket(self, db_engine):
+        storage = CampaignStorage()
+        cid = storage.save_campaign({'campaign_name': 'PoP', 'audited_data': _audit(HOURLY)})
+        campaign = storage.get_campaign(cid)
+        campaign['audited_data']['vnnox_imports'].append({'id': 'vn2', 'filename': 'log2.csv', 'hourly_plays': [
+            # Partial 09:00 of 03-03 (dropped), complete 10:00 (replaces vn1's), new 11:00
+            {'screen': 'BC59', 'media_name': 'A.mp4', 'date': '2026-03-03', 'hour': 9, 'plays': 4, 'seconds': 40.0},
+            {'screen': 'BC59', 'media_name': 'A.mp4', 'date': '2026-03-03', 'hour': 10, 'plays': 25, 'seconds': 250.0},
+            {'screen': 'BC59', 'media_name': 'A.mp4', 'date': '2026-03-03', 'hour': 11, 'plays': 6, 'seconds': 60.0},
+        ]})
+        storage.save_campaign(campaign, cid)
+
+        first, second = storage.get_campaign(cid)['audited_data']['vnnox_imports']
+        assert (first['spots'], first['total_seconds'], first['hour_rows']) == (15, 3700.0, 2)
+        assert [(s['media_name'], s['plays']) for s in first['spots_summary']] == [('A.mp4', 10), ('B.mp4', 5)]
+        assert (second['spots'], second['total_seconds'], second['hour_rows']) == (31, 310.0, 2)
+        assert second['date_start'] == second['date_end'] == '2026-03-03'
+        by_hour = PlayLogStorage().rollup(cid, by=('import_id', 'hour'), end=datetime.date(2026, 3, 3))
+        assert [(r['import_id'], r['hour'], r['plays']) for r in by_hour] == [
+            ('vn1', 9, 10), ('vn2', 10, 25), ('vn2', 11, 6)]
+
+    def test_exports_split_inside_an_hour_add_up(self, db_engine):
+        storage = CampaignStorage()
+
+        def bucket(plays, first, last):
+            return {'screen': 'BC59', 'media_name': 'A.mp4', 'date': '2026-03-03', 'hour': 10,
+                    'plays': plays, 'seconds': plays * 10.0, 'first_second': first, 'last_second': last}
+        # One export ends at 10:20, the next one starts there
+        cid = storage.save_campaign({'campaign_name': 'PoP', 'audited_data': _audit([bucket(20, 0, 1190)])})
+        campaign = storage.get_campaign(cid)
+        campaign['audited_data']['vnnox_imports'].append(
+            {'id': 'vn2', 'filename': 'log2.csv', 'hourly_plays': [bucket(15, 1200, 3540)]})
+        storage.save_campaign(campaign, cid)
+        assert PlayLogStorage().rollup(cid, by=())[0]['plays'] == 35
+
+        # A re-export of the whole hour covers both halves
+        campaign = storage.get_campaign(cid)
+        campaign['audited_data']['vnnox_imports'].append(
+            {'id': 'vn3', 'filename': 'log3.csv', 'hourly_plays': [bucket(35, 0, 3540)]})
+        storage.save_campaign(campaign, cid)
+        by_import = PlayLogStorage().rollup(cid, by=('import_id',))
+        assert [(r['import_id'], r['plays']) for r in by_import] == [('vn3', 35)]
@@ -0,0 +1,113 @@
+import datetime
+import os
+
+import pytest
+from PIL import Image as PILImage
+from reportlab.platypus import Paragraph
+
+from src.data.report_storage import ReportStorage
+from src.reporting import pop_annex_report_generator
+from src.reporting.chart_cache import ChartCache
+from src.reporting.pop_annex_report_generator import PopAnnexReportGenerator
+from src.reporting.streaming_story import LOOKAHEAD, StreamingStory
+
+
+def _campaign(spot_count=0):
+    spots = [{'media_name': f'Spot {i}', 'screen': 'S1', 'plays': i, 'total_seconds': 3600 + i,
+              'date_start': '2025-01-01', 'date_end': '2025-01-10'} for i in range(spot_count)]
+    return {
+        'id': 'c1', 'client_name': 'Client', 'campaign_name': 'Campaign',
+        'start_date': datetime.date(2025, 1, 1), 'end_date': datetime.date(2025, 1, 10),
+        'audited_data': {'vnnox_imports': [
+            {'filename': 'plays.csv', 'spots': spot_count, 'hours': 1.0, 'spots_summary': spots}
+        ]}
+    }
+
+
+@pytest.fixture
+def gen(db_engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(pop_annex_report_generator, 'thumbnail_cache', ChartCache(str(tmp_path / 'thumbs'), suffix='.jpg'))
+    gen = PopAnnexReportGenerator(None)
+    gen.company_settings.storage_path = str(tmp_path / 'company_settings.json')
+    return gen
+
+
+class TestStreamingStory:
+    def test_pulls_only_lookahead(self):
+        story = StreamingStory(Paragraph(str(i)) for i in range(1000))
+        assert len(story) == LOOKAHEAD
+        del story[0]
+        assert story.pulled == LOOKAHEAD
+        assert len(story) == LOOKAHEAD
+        assert story.pulled == LOOKAHEAD + 1
+        assert not story.exhausted
+
+    def test_drains_to_empty(self):
+        story = StreamingStory(range(3))
+        assert story[0] == 0
+        while story:
+            del story[0]
+        assert story.exhausted and story.pulled == 3
+
+
+class TestPopAnnex:
+    def test_spot_table_chunks(self, gen, tmp_path, monkeypatch):
+        monkeypatch.setattr(PopAnnexReportGenerator, 'SPOT_ROWS_PER_TABLE', 50)
+        output_path = str(tmp_path / 'annex.pdf')
+        volumes = gen._build_pdf(_campaign(120), output_path, include_map=False,
+                                 include_spots=True, include_photos=False)
+        assert volumes == [output_path]
+        tables = [f for f in gen._annex_story(_campaign(120), False, True, False)
+                  if type(f).__name__ == 'Table' and len(f._cellvalues[0]) == 5]
+        assert [len(t._cellvalues) for t in tables] == [51, 51, 21]
+
+    def test_daily_table_from_rollups(self, gen, tmp_path):
+        from src.data.campaign_storage import CampaignStorage
+
+        campaign = _campaign(1)
+        campaign['audited_data']['vnnox_imports'][0].update(id='vn1', hourly_plays=[
+            {'screen': 'S1', 'media_name': 'Spot 0', 'date': '2025-01-02', 'hour': h, 'plays': 10, 'seconds': 300.0}
+            for h in (9, 10)])
+        campaign['id'] = CampaignStorage().save_campaign(campaign)
+        gen._build_pdf(campaign, str(tmp_path / 'annex.pdf'), include_map=False,
+                       include_spots=True, include_photos=False)
+        tables = [f for f in gen._annex_story(campaign, False, True, False)
+                  if type(f).__name__ == 'Table' and len(f._cellvalues[0]) == 4]
+        assert len(tables) == 1 and len(tables[0]._cellvalues) == 2
+        assert tables[0]._cellvalues[1][2].text == '20'
+
+    def test_splits_into_volumes(self, gen, tmp_path, monkeypatch):
+        monkeypatch.setattr(PopAnnexReportGenerator, 'SPOT_ROWS_PER_TABLE', 100)
+        monkeypatch.setattr(PopAnnexReportGenerator, 'VOLUME_MAX_ROWS', 1000)
+        record = gen.render_pop_annex(_campaign(2500), include_map=False, include_photos=False,
+                                      output_dir=str(tmp_path))
+
+        volumes = record['frozen_data']['volumes']
+        base, ext = os.path.splitext(record['file_path'])
+        assert volumes == [record['file_path'], f"{base}_vol2{ext}", f"{base}_vol3{ext}"]
+        assert all(os.path.getsize(path) > 0 for path in volumes)
+        # History downloads and deletes cover every volume
+        assert ReportStorage.report_files(record) == volumes
+
+        (tmp_path / 'single').mkdir()
+        single = gen.render_pop_annex(_campaign(2500), include_map=False, include_photos=False,
+                                      output_dir=str(tmp_path / 'single'), split_volumes=False)
+        assert 'volumes' not in single['frozen_data']
+        assert ReportStorage.report_files(single) == [single['file_path']]
+
+    def test_photo_gallery_uses_cached_thumbnails(self, gen, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        photo_dir = tmp_path / 'data' / 'campaign_photos' / 'c1'
+        photo_dir.mkdir(parents=True)
+        for i in range(3):
+            PILImage.new('RGB', (2400, 1800), (i * 80, 100, 150)).save(photo_dir / f'p{i}.jpg')
+
+        gen.render_pop_annex(_campaign(), include_map=False, output_dir=str(tmp_path))
+        cache = pop_annex_report_generator.thumbnail_cache
+        assert (cache.hits, cache.misses) == (0, 3)
+        with PILImage.open(cache._path(os.listdir(cache.directory)[0][:-4])) as thumb:
+            assert max(thumb.size) == PopAnnexReportGenerator.THUMBNAIL_MAX_PX
+
+        (tmp_path / 'again').mkdir()
+        gen.render_pop_annex(_campaign(), include_map=False, output_dir=str(tmp_path / 'again'))
+        assert cache.hits == 3
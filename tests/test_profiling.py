@@ -0,0 +1,78 @@
+import datetime
+import logging
+import time
+
+from src.data.campaign_storage import CampaignStorage
+from src.data.db_config import SessionLocal
+from src.data.models import Campaign, Vehicle
+from src.reporting import report_generator
+from src.reporting.campaign_report_generator import CampaignReportGenerator
+from src.reporting.chart_cache import ChartCache
+from src.utils import profiling
+from src.utils.profiling import current_trace, span, trace
+
+
+class TestProfiling:
+    def test_spans_collect_time_calls_and_queries(self, db_engine):
+        @span('lookup')
+        def lookup():
+            session = SessionLocal()
+            session.query(Vehicle).all()
+            session.close()
+
+        with trace('test', log=False) as t:
+            assert current_trace() is t
+            with span('outer'):
+                time.sleep(0.01)
+                lookup()
+                lookup()
+
+        assert current_trace() is None
+        profile = t.as_dict()
+        assert profile['queries'] == 2
+        assert profile['phases']['lookup']['calls'] == 2
+        assert profile['phases']['lookup']['queries'] == 2
+        assert (profile['phases']['outer']['calls'], profile['phases']['outer']['queries']) == (1, 2)
+        assert profile['phases']['outer']['seconds'] >= 0.01
+        assert profile['seconds'] >= profile['phases']['outer']['seconds']
+
+    def test_span_outside_trace_is_noop(self, caplog):
+        with span('idle'):
+            pass
+        with caplog.at_level(logging.DEBUG, logger='src.utils.profiling'):
+            with span('debugged'):
+                pass
+        assert 'debugged' in caplog.text and 'idle' not in caplog.text
+
+    def test_trace_logs_summary(self, caplog):
+        with caplog.at_level(logging.INFO, logger='src.utils.profiling'):
+            with trace('report x'):
+                with span('doc.build'):
+                    pass
+        assert 'report x' in caplog.text and 'doc.build' in caplog.text
+
+    def test_report_stores_profile_when_enabled(self, db_engine, tmp_path, monkeypatch):
+        session = SessionLocal()
+        session.add(Vehicle(id='v1', name='Truck 1', registration='B-01-AAA'))
+        session.add(Campaign(
+            id='c1', campaign_name='Campaign', client_name='Client',
+            start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 1, 10),
+            vehicle_id='v1', cities=['Bucuresti'], daily_hours='09:00-17:00',
+            campaign_mode='SINGLE_VEHICLE_CITY'
+        ))
+        session.commit()
+        session.close()
+        monkeypatch.setattr(report_generator, 'chart_cache', ChartCache(str(tmp_path / 'charts')))
+        gen = CampaignReportGenerator(CampaignStorage())
+        gen.company_settings.storage_path = str(tmp_path / 'company_settings.json')
+
+        record = gen.render_campaign_report(CampaignStorage().get_campaign('c1'), output_dir=str(tmp_path), reuse=False)
+        assert 'profile' not in record['frozen_data']
+
+        monkeypatch.setattr(profiling, 'PROFILE_IN_REPORTS', True)
+        record = gen.render_campaign_report(CampaignStorage().get_campaign('c1'), output_dir=str(tmp_path), reuse=False)
+        phases = record['frozen_data']['profile']['phases']
+        assert {'fingerprint', 'prepare_data', 'impressions', 'chart', 'doc.build',
+                'CityDataManager.get_city_data_for_period',
+                'CityDataManager.get_all_traffic_locations'} <= set(phases)
+        assert phases['CityDataManager.get_all_traffic_locations']['queries'] >= 1
@@ -0,0 +1,151 @@
+import datetime
+import json
+
+import pytest
+
+from src.data.campaign_storage import CampaignStorage
+from src.data.city_data_manager import CityDataManager
+from src.data.db_config import SessionLocal
+from src.data.models import Campaign, TrafficLocation, Vehicle
+from src.data.report_storage import ReportStorage
+from src.reporting import report_generator
+from src.reporting.campaign_report_generator import CampaignReportGenerator
+from src.reporting.chart_cache import ChartCache
+from src.reporting.dooh_report_generator import DoohReportGenerator
+from src.reporting.report_inputs import city_period_starts, input_fingerprint, stale_sections
+
+
+@pytest.fixture
+def env(db_engine, tmp_path, monkeypatch):
+    session = SessionLocal()
+    session.add(Vehicle(id='v1', name='Truck 1', registration='B-01-AAA'))
+    session.add(Campaign(
+        id='c1', campaign_name='Campaign', client_name='Client',
+        start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 1, 10),
+        vehicle_id='v1', cities=['Bucuresti'], daily_hours='09:00-17:00',
+        campaign_mode='SINGLE_VEHICLE_CITY'
+    ))
+    session.add(TrafficLocation(id='l1', city_name='Bucuresti', name='Piata Unirii',
+                                latitude=44.4268, longitude=26.1025, daily_traffic=80000, pedestrian_traffic=20000))
+    session.commit()
+    session.close()
+
+    settings_path = tmp_path / 'company_settings.json'
+    settings_path.write_text(json.dumps({'company_name': 'Acme'}))
+    monkeypatch.setattr(report_generator, 'chart_cache', ChartCache(str(tmp_path / 'charts')))
+    return tmp_path
+
+
+def _generator(cls, env):
+    gen = cls(CampaignStorage())
+    gen.company_settings.storage_path = str(env / 'company_settings.json')
+    return gen
+
+
+def _render_standard(env, save=True):
+    record = _generator(CampaignReportGenerator, env).render_campaign_report(
+        CampaignStorage().get_campaign('c1'), output_dir=str(env))
+    if save and not record.get('reused'):
+        ReportStorage().save_report_metadata(**{k: v for k, v in record.items() if k != 'reused'})
+    return record
+
+
+def _touch_location(**values):
+    session = SessionLocal()
+    location = session.get(TrafficLocation, 'l1')
+    for key, value in values.items():
+        setattr(location, key, value)
+    session.commit()
+    session.close()
+
+
+class TestReportInputs:
+    def test_city_period_starts(self):
+        data = {
+            'start_date': '2025-01-01', 'cities': ['Cluj'],
+            'city_periods': {
+                '__meta__': {'shared_mode': False},
+                'Cluj': [{'start': '2025-02-01', 'end': '2025-02-10'}],
+                'v1': {'Iasi': {'start': '2025-03-01', 'end': '2025-03-05'}}
+            }
+        }
+        assert city_period_starts(data) == [
+            ('Cluj', datetime.date(2025, 1, 1)), ('Cluj', datetime.date(2025, 2, 1)),
+            ('Iasi', datetime.date(2025, 3, 1))
+        ]
+
+    def test_later_quarter_profile_changes_fingerprint(self, db_engine):
+        manager = CityDataManager()
+        manager.profiles = {'Cluj': {
+            '2025-Q1': {'daily_traffic_total': 100000, 'daily_pedestrian_total': 20000},
+            '2025-Q2': {'daily_traffic_total': 100000, 'daily_pedestrian_total': 20000},
+        }}
+        manager.special_events = {}
+        manager.audience_cube.invalidate()
+        data = {'id': 'c9', 'start_date': '2025-03-01', 'end_date': '2025-04-30', 'cities': ['Cluj'],
+                'last_modified': '2025-02-01 10:00:00'}
+        before = input_fingerprint(data, manager, None)
+
+        manager.profiles['Cluj']['2025-Q2']['daily_traffic_total'] = 900000
+        after = input_fingerprint(data, manager, None)
+        assert {p for p in before['parts'] if before['parts'][p] != after['parts'][p]} == {'city_profiles'}
+
+    def test_parts_track_their_inputs(self, env):
+        gen = _generator(CampaignReportGenerator, env)
+        before = gen.input_fingerprint(CampaignStorage().get_campaign('c1'))
+        assert gen.input_fingerprint(CampaignStorage().get_campaign('c1')) == before
+
+        _touch_location(daily_traffic=90000)
+        after = gen.input_fingerprint(CampaignStorage().get_campaign('c1'))
+        changed = {p for p in before['parts'] if before['parts'][p] != after['parts'][p]}
+        assert changed == {'traffic_locations'}
+        assert stale_sections({'inputs': before}, after) == {'metrics'}
+        assert stale_sections({}, after) == {'metrics', 'header'}
+
+
+class TestIncrementalRegeneration:
+    def test_unchanged_inputs_reuse_file(self, env):
+        first = _render_standard(env)
+        second = _render_standard(env)
+        assert second['reused'] is True
+        assert second['file_path'] == first['file_path']
+        assert len(ReportStorage().get_reports_by_campaign('c1')) == 1
+
+    def test_header_change_keeps_frozen_impressions(self, env, monkeypatch):
+        first = _render_standard(env)
+        (env / 'company_settings.json').write_text(json.dumps({'company_name': 'Acme 2'}))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("impressions recomputed")
+        monkeypatch.setattr(CampaignReportGenerator, 'get_total_impressions_data', fail)
+        second = _render_standard(env)
+
+        assert not second.get('reused')
+        assert second['frozen_data']['total_impressions'] == first['frozen_data']['total_impressions']
+
+    def test_campaign_change_recomputes(self, env):
+        _render_standard(env)
+        session = SessionLocal()
+        session.get(Campaign, 'c1').last_modified = datetime.datetime(2030, 1, 1)
+        session.commit()
+        session.close()
+        assert not _render_standard(env).get('reused')
+
+    def test_dooh_detects_stale_baseline(self, env, monkeypatch):
+        _render_standard(env)
+        gen = _generator(DoohReportGenerator, env)
+        fresh = gen.render_dooh_report(CampaignStorage().get_campaign('c1'), output_dir=str(env))
+        assert fresh['frozen_data']['baseline_stale'] is False
+
+        _touch_location(pedestrian_traffic=99999)
+        latest = ReportStorage().get_latest_metrics('c1', 'standard')
+        assert gen.frozen_metrics_stale(latest, gen.input_fingerprint(CampaignStorage().get_campaign('c1')))
+        stale = gen.render_dooh_report(CampaignStorage().get_campaign('c1'), output_dir=str(env))
+        assert stale['frozen_data']['baseline_stale'] is True
+        # The frozen standard numbers stay the baseline unless a recompute is asked for
+        assert stale['frozen_data']['base_impressions'] == latest['total_impressions']
+
+        monkeypatch.setattr(DoohReportGenerator, 'get_total_impressions_data', lambda self, data, duration: {'total': 12345})
+        recomputed = gen.render_dooh_report(CampaignStorage().get_campaign('c1'), output_dir=str(env),
+                                            reuse=False, recompute_stale_baseline=True)
+        assert recomputed['frozen_data']['base_impressions'] == 12345
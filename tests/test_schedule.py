@@ -0,0 +1,60 @@
+import datetime
+
+import pytest
+
+from src.utils.schedule import EMPTY_HOURS, compile_hours
+
+
+def _legacy_parse(hours_str):
+    """The inline parser CampaignReportGenerator._parse_daily_hours used to carry"""
+    total_hours, total_peak = 0, 0
+    for interval in [i.strip() for i in hours_str.split(',')]:
+        try:
+            if '-' not in interval: continue
+            start_time, end_time = interval.split('-')
+            start_h, start_m = int(start_time.split(':')[0]), int(start_time.split(':')[1]) if ':' in start_time else 0
+            end_h, end_m = int(end_time.split(':')[0]), int(end_time.split(':')[1]) if ':' in end_time else 0
+            hours = (end_h - start_h) + (end_m - start_m) / 60
+            if hours < 0: hours += 24
+            total_hours += hours
+            c_start_h, c_end_h = start_h + start_m / 60, end_h + end_m / 60
+            for p_start, p_end in ((7, 9), (17, 19)):
+                if c_start_h < p_end and c_end_h > p_start: total_peak += max(0, min(c_end_h, p_end) - max(c_start_h, p_start))
+        except: continue
+    return total_hours, total_peak
+
+
+SAMPLES = [
+    "09:00-17:00", "08:00-12:00, 14:00-18:30", "07:15-09:45,16:50-19:10", "22:00-02:00",
+    "10-14", "09:00-17:00-18:00", "abc", "", "06:00-24:00", " 08:30 - 20:00 "
+]
+
+
+class TestCompileHours:
+    @pytest.mark.parametrize("text", SAMPLES)
+    def test_matches_legacy_parser(self, text):
+        compiled = compile_hours(text)
+        assert (compiled.hours, compiled.peak_hours) == _legacy_parse(text)
+
+    def test_cached_per_string(self):
+        assert compile_hours("09:00-17:00") is compile_hours("09:00-17:00")
+        assert compile_hours(None) is EMPTY_HOURS
+        assert compile_hours(42) is EMPTY_HOURS
+
+    def test_minutes_and_span(self):
+        compiled = compile_hours("08:00-12:00, 14:00-18:30")
+        assert compiled.intervals == ((480, 720), (840, 1110))
+        assert compiled.span_hours == 10.5
+
+        overnight = compile_hours("22:00-02:00")
+        assert (overnight.span_start, overnight.span_end) == (22.0, 26.0)
+        assert compile_hours("abc").span_hours == 0.0
+
+    def test_day_segments(self):
+        day = datetime.date(2025, 3, 1)
+        at = lambda d, h, m=0: datetime.datetime.combine(d, datetime.time(h, m))
+        assert compile_hours("09:00-11:00, 14:00-24:00").day_segments(day) == [
+            (at(day, 9), at(day, 11)), (at(day, 14), at(day + datetime.timedelta(days=1), 0))
+        ]
+        # Overnight intervals are not drawn on the Gantt day
+        assert compile_hours("22:00-02:00").day_segments(day) == []
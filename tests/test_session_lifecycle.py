@@ -0,0 +1,114 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.data.db_config import (
+    Base, SessionLocal, UnitOfWorkError, get_read_only_engine, read_only_session, unit_of_work
+)
+from src.data.models import Vehicle
+from src.data.vehicle_manager import VehicleManager
+
+
+def _vehicle_names():
+    session = SessionLocal()
+    try:
+        return sorted(v.name for v in session.query(Vehicle).all())
+    finally:
+        session.close()
+
+
+class TestUnitOfWork:
+    def test_managers_share_one_transaction(self, db_engine):
+        with unit_of_work() as outer:
+            SessionLocal().add(Vehicle(id='v1', name='Truck 1'))
+            session = SessionLocal()
+            session.add(Vehicle(id='v2', name='Truck 2'))
+            session.commit()  # Deferred to the block: only flushes
+            session.close()   # No-op inside the block
+            assert session is outer
+            assert outer.in_transaction()
+
+        assert not outer.in_transaction()
+        assert _vehicle_names() == ['Truck 1', 'Truck 2']
+
+    def test_block_error_rolls_everything_back(self, db_engine):
+        with pytest.raises(ValueError):
+            with unit_of_work() as session:
+                session.add(Vehicle(id='v1', name='Truck 1'))
+                session.commit()
+                raise ValueError("boom")
+
+        assert _vehicle_names() == []
+
+    def test_nested_rollback_discards_unit(self, db_engine):
+        with pytest.raises(UnitOfWorkError):
+            with unit_of_work() as session:
+                session.add(Vehicle(id='v1', name='Truck 1'))
+                session.commit()
+                session.rollback()  # What a manager does on error
+                session.add(Vehicle(id='v2', name='Truck 2'))
+
+        assert _vehicle_names() == []
+
+    def test_failed_delete_keeps_references(self, db_engine, monkeypatch):
+        from src.data.campaign_storage import CampaignStorage
+        from src.data.document_manager import DocumentManager
+
+        v_id = VehicleManager().add_vehicle('Truck 1', 'CJ-01-ABC')
+        cid = CampaignStorage().save_campaign({'campaign_name': 'C', 'vehicle_id': v_id})
+        cleanup = DocumentManager.delete_all_entity_documents
+
+        def fail_after_commit(self, entity_type, entity_id):
+            cleanup(self, entity_type, entity_id)  # Commits and closes: deferred to the unit
+            raise OSError("disk")
+        monkeypatch.setattr(DocumentManager, 'delete_all_entity_documents', fail_after_commit)
+
+        assert VehicleManager().delete_vehicle(v_id) is False
+        assert _vehicle_names() == ['Truck 1']
+        assert CampaignStorage().get_campaign(cid)['vehicle_id'] == v_id
+
+        monkeypatch.setattr(DocumentManager, 'delete_all_entity_documents', cleanup)
+        assert VehicleManager().delete_vehicle(v_id) is True
+        assert _vehicle_names() == []
+        assert CampaignStorage().get_campaign(cid)['vehicle_id'] is None
+
+
+class TestReadOnlySession:
+    @pytest.fixture
+    def file_engine(self, tmp_path):
+        import src.data.models  # Register models with Base
+
+        file_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        Base.metadata.create_all(bind=file_engine)
+        SessionLocal.remove()
+        SessionLocal.configure(bind=file_engine)
+        try:
+            yield file_engine
+        finally:
+            SessionLocal.remove()
+            from src.data.db_config import engine as default_engine
+            SessionLocal.configure(bind=default_engine)
+            get_read_only_engine(file_engine).dispose()
+            file_engine.dispose()
+
+    def test_reads_work_and_writes_are_refused(self, file_engine):
+        session = SessionLocal()
+        session.add(Vehicle(id='v1', name='Truck 1'))
+        session.commit()
+        session.close()
+
+        with read_only_session():
+            assert VehicleManager().get_vehicle('v1')['name'] == 'Truck 1'
+            assert VehicleManager().add_vehicle('Truck 2') == ""
+
+        assert _vehicle_names() == ['Truck 1']
+        # The thread's regular session is back in place
+        assert SessionLocal().get_bind() is file_engine
+
+    def test_read_only_engine_applies_profile(self, file_engine):
+        ro_engine = get_read_only_engine(file_engine)
+        assert ro_engine is not file_engine
+        with ro_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 0  # mode=ro, not a pragma
+            with pytest.raises(Exception):
+                conn.execute(text("CREATE TABLE t (x INTEGER)"))
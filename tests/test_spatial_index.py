@@ -0,0 +1,70 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.utils import spatial_index
+from src.utils.spatial_index import LocationIndex, route_location_hits
+
+# ~1 km of longitude at 44.43N, ~1 km of latitude
+LON_KM, LAT_KM = 1 / 79.5, 1 / 111.2
+
+
+def _loc(lon, lat, loc_id=None):
+    return SimpleNamespace(id=loc_id, latitude=lat, longitude=lon)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    spatial_index.clear_cache()
+    yield
+    spatial_index.clear_cache()
+
+
+class TestSpatialIndex:
+    def test_segment_distance_not_just_vertices(self):
+        lon0, lat0 = 26.10, 44.43
+        line = [[lon0, lat0], [lon0 + 2 * LON_KM, lat0]]  # 2 km east-west segment
+        locations = [
+            _loc(lon0 + LON_KM, lat0 + 0.05 * LAT_KM),  # 50 m off the middle of the segment
+            _loc(lon0 + LON_KM, lat0 + 0.15 * LAT_KM),  # 150 m off
+            _loc(lon0 - 0.08 * LON_KM, lat0),           # 80 m before the first vertex
+        ]
+        assert LocationIndex(locations).near_path(line) == [0, 2]
+        assert LocationIndex(locations).near_path([line[0]]) == [2]
+
+    def test_grid_matches_brute_force(self):
+        rng = random.Random(7)
+        locations = [_loc(26.10 + rng.uniform(-0.05, 0.05), 44.43 + rng.uniform(-0.05, 0.05)) for _ in range(500)]
+        path = [[26.10 + rng.uniform(-0.05, 0.05), 44.43 + rng.uniform(-0.05, 0.05)] for _ in range(40)]
+        index = LocationIndex(locations)
+
+        pts = index.points
+        proj = index.project([p[0] for p in path], [p[1] for p in path])
+        expected = []
+        for i, p in enumerate(pts):
+            best = min(
+                np.linalg.norm(p - (a + np.clip(np.dot(p - a, b - a) / np.dot(b - a, b - a), 0, 1) * (b - a)))
+                for a, b in zip(proj[:-1], proj[1:])
+            )
+            if best < 0.1:
+                expected.append(i)
+        assert expected and index.near_path(path) == expected
+
+    def test_cached_by_route_id_and_last_modified(self, monkeypatch):
+        calls = []
+        original = LocationIndex.near_path
+        monkeypatch.setattr(LocationIndex, 'near_path', lambda self, coords: calls.append(1) or original(self, coords))
+
+        locations = [_loc(26.10, 44.43, 'l1')]
+        route = {'id': 'r1', 'last_modified': '2025-01-01T10:00:00',
+                 'geojson_data': {'geometry': {'type': 'LineString', 'coordinates': [[26.10, 44.43], [26.11, 44.43]]}}}
+        assert route_location_hits(route, locations) == [0]
+        assert route_location_hits(route, locations) == [0]
+        assert len(calls) == 1
+
+        route = dict(route, last_modified='2025-01-02T10:00:00',
+                     geojson_data={'geometry': {'type': 'LineString', 'coordinates': [[26.20, 44.50], [26.21, 44.50]]}})
+        assert route_location_hits(route, locations) == []
+        assert len(calls) == 2
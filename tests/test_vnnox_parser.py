@@ -0,0 +1,69 @@
+import io
+import os
+
+import pytest
+
+from src.utils.vnnox_parser import iter_spilled_rows, parse_vnnox_csv
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'samples')
+
+
+def _cell(value):
+    return '"=(""%s"")"' % value
+
+
+def _details(rows, preamble=''):
+    lines = [preamble + ','.join(_cell(h) for h in ('Media Name', 'Screen Name', 'Start Date', 'End Date', 'Duration（s）'))]
+    lines += [','.join(_cell(v) for v in row) for row in rows]
+    return ('﻿' + '\r\n'.join(lines) + '\r\n').encode('utf-8')
+
+
+class TestVnnoxParser:
+    def test_details_sample_in_small_chunks(self):
+        with open(os.path.join(SAMPLES_DIR, 'Play Logs(Details).csv'), 'rb') as f:
+            whole = parse_vnnox_csv(f)
+        with open(os.path.join(SAMPLES_DIR, 'Play Logs(Details).csv'), 'rb') as f:
+            chunked = parse_vnnox_csv(f, chunk_size=7)  # Splits BOM, cells and CRLFs
+        assert whole == chunked
+        assert whole['format'] == 'details'
+        assert (whole['total_spots'], whole['total_seconds'], whole['rows']) == (5533, 82664.0, [])
+        assert (whole['date_start'], whole['date_end']) == ('2026-03-03', '2026-03-05')
+        assert [(s['media_name'], s['plays'], s['total_seconds']) for s in whole['spots_summary']] == \
+            [('Atac.mp4', 5026, 55286.0), ('ATAC Drumul Taberei.mp4', 507, 27378.0)]
+
+    def test_overview_sample(self):
+        with open(os.path.join(SAMPLES_DIR, 'Play Logs(Overview).csv'), 'rb') as f:
+            result = parse_vnnox_csv(f, keep_rows=True)
+        assert result['format'] == 'overview'
+        assert (result['total_spots'], result['total_seconds']) == (5533, 85850.0)
+        assert result['rows'][0]['times'] == '507'
+        assert result['spots_summary'][0]['total_hours'] == round(58422 / 3600, 4)
+
+    def test_rows_spill_and_errors(self, tmp_path):
+        content = _details([
+            ('A.mp4', 'BC59', '2026-03-02 10:00:00', '2026-03-02 10:00:10', '10'),
+            ('A.mp4', 'BC59', '2026-03-01 23:59:55', '2026-03-02 00:00:05', '1,000'),
+            ('B.mp4', 'BC60', '2026-03-03 08:00:00', '2026-03-03 08:00:10', 'x'),
+            ('', 'BC60', '', '', '5'),
+        ])
+        rows_path = str(tmp_path / 'rows.csv.gz')
+        result = parse_vnnox_csv(io.BytesIO(content), rows_path=rows_path)
+        assert (result['total_spots'], result['total_seconds'], result['row_count']) == (3, 1015.0, 3)
+        assert len(result['errors']) == 1 and result['errors'][0].startswith('Rand 4:')
+        assert result['spots_summary'][0] == {
+            'media_name': 'Unknown', 'screen': 'BC60', 'plays': 1, 'total_seconds': 5.0,
+            'total_hours': round(5 / 3600, 4), 'date_start': None, 'date_end': None}
+        assert (result['spots_summary'][1]['date_start'], result['spots_summary'][1]['date_end']) == \
+            ('2026-03-01', '2026-03-02')
+        spilled = list(iter_spilled_rows(rows_path))
+        assert [r['media name'] for r in spilled] == ['A.mp4', 'A.mp4', '']
+        assert spilled[1]['duration s'] == '1,000'
+
+    def test_latin1_and_missing_header(self):
+        content = 'Export Caf\xe9\n'.encode('latin-1') + _details([('A.mp4', 'S', '2026-03-01', '2026-03-01', '4')])[3:]
+        assert parse_vnnox_csv(io.BytesIO(content))['total_seconds'] == 4.0
+
+        with pytest.raises(ValueError, match='antet'):
+            parse_vnnox_csv(io.BytesIO(b'a,b\n1,2\n' * 100))
+        with pytest.raises(ValueError, match='gol'):
+            parse_vnnox_csv(io.BytesIO(b''))
@@ -43,7 +43,7 @@ def main():
     driver_manager = DriverManager()
 
     # Fetch Stats
-    total_campaigns = len(campaign_storage.get_all_campaigns())
+    total_campaigns = campaign_storage.count_campaigns()
     total_vehicles = len(vehicle_manager.get_all_vehicles())
     active_vehicles = len(vehicle_manager.get_active_vehicles())
     total_drivers = len(driver_manager.get_all_drivers())
@@ -233,7 +233,9 @@ def main():
             })
 
     # A. Campaigns & Transit Specifics (Granular per City/Period/Driver)
-    all_campaigns = campaign_storage.get_all_campaigns()
+    # Reloaded only when the change feed reports campaign, vehicle or driver writes
+    all_campaigns = utils.feed_cached('home_timeline', ('campaigns', 'vehicles', 'drivers'),
+                                      lambda: campaign_storage.get_campaign_summaries(include_schedule=True))
     for c in all_campaigns:
         c_status = (c.get('status') or 'confirmed').capitalize()
         c_start_glob = utils.ensure_date(c['start_date'])
@@ -494,7 +496,7 @@ def main():
 
     # Recent Campaigns Minimal Table
     st.write("### 📋 " + _("Recent Campaigns"))
-    recent_campaigns = campaign_storage.get_all_campaigns()[:5]
+    recent_campaigns = campaign_storage.get_campaign_summaries(limit=5)
     if recent_campaigns:
         # Prepare table data
         table_data = []
@@ -32,9 +32,14 @@ from src.reporting.dooh_report_generator import DoohReportGenerator
 from src.reporting.fleet_utilization_report import FleetUtilizationReportGenerator
 from src.data.report_storage import ReportStorage
 from src.data.campaign_route_manager import CampaignRouteManager
+from src.services.import_job_service import ImportJobService, ensure_worker
 
 rep_storage = ReportStorage()
 route_manager = CampaignRouteManager()
+import_jobs = ImportJobService()
+# Jobs queued before a server restart have no worker until one is started
+if import_jobs.has_active_jobs():
+    ensure_worker()
 
 CAMPAIGN_MODES = {
     'NEARBY_TOUR': {
@@ -65,6 +70,76 @@ dist_service = DistanceService()
 city_manager = CityDataManager()
 settings_mgr = CompanySettings()
 
+IMPORT_STEP_LABELS = {'queued': "In asteptare", 'parsing': "Procesare fisier", 'saving': "Salvare in campanie"}
+
+@st.fragment(run_every=2)
+def render_import_progress(campaign_id):
+    """Polls the campaign's queued audit imports; reruns the page once they are all finished"""
+    jobs = import_jobs.jobs_for_campaign(campaign_id, active_only=True)
+    if not jobs:
+        st.rerun()
+    # Restarts a worker that exited idle just as a job was queued
+    ensure_worker()
+    for job in jobs:
+        step = 'queued' if job['status'] == 'queued' else (job['message'] or 'parsing')
+        st.progress(min(job['progress'], 1.0),
+                    text=f"{job['kind'].upper()} | {job['filename']} | {remove_diacritics(_(IMPORT_STEP_LABELS.get(step, step)))}")
+
+def render_import_outcomes(campaign_id):
+    """Result of the imports queued in this browser session, shown once when they finish"""
+    pending = st.session_state.get('import_job_ids', [])
+    for job_id in list(pending):
+        job = import_jobs.get_job(job_id)
+        if job is None:
+            pending.remove(job_id)
+            continue
+        if job['campaign_id'] != campaign_id or job['status'] not in ('done', 'failed'):
+            continue
+        pending.remove(job_id)
+        res = job['result']
+        if job['status'] == 'failed':
+            label = "GPS" if job['kind'] == 'gps' else "VnNox"
+            st.error(f"Eroare procesare {label} ({job['filename']}): {job['message']}")
+        elif res.get('duplicate'):
+            if job['kind'] == 'gps':
+                st.info(remove_diacritics(_("Acest fisier GPS a fost deja importat.")))
+            else:
+                st.info(remove_diacritics(_("Acest fisier VnNox a fost deja importat.")))
+        elif job['kind'] == 'gps':
+            st.success(
+                remove_diacritics(_("Date GPS adaugate la istoric!")) +
+                f" | {res.get('format')} | {res.get('distance', 0.0):.2f} km" +
+                (f" | {res['point_count']} pct GPS" if res.get('point_count') else "") +
+                (f" | {res['merged_points']} pct deja existente" if res.get('merged_points') else "")
+            )
+        else:
+            fmt_label = "Details (per play)" if res.get('format') == 'details' else "Overview (centralizat)"
+            msg = (
+                f"Format: **{fmt_label}** | "
+                f"Spoturi: **{res.get('spots', 0):,}** | "
+                f"Durata: **{res.get('hours', 0.0):.2f} h**"
+            )
+            if res.get('errors'):
+                st.warning(remove_diacritics(_("Import OK cu avertismente: ")) + msg)
+            else:
+                st.success(remove_diacritics(_("VnNox importat cu succes! ")) + msg)
+
+def render_report_downloads(container, report, key, label, **kwargs):
+    """One download button per PDF of a report (a split PoP annex has several volumes); False when none is on disk"""
+    paths = ReportStorage.report_files(report)
+    found = False
+    for i, path in enumerate(paths):
+        if not os.path.exists(path):
+            continue
+        found = True
+        with open(path, "rb") as f:
+            container.download_button(
+                label=label + (f" ({i + 1}/{len(paths)})" if len(paths) > 1 else ""),
+                data=f, file_name=report['file_name'] if i == 0 else os.path.basename(path),
+                mime="application/pdf", key=f"{key}_{i}", width="stretch", **kwargs
+            )
+    return found
+
 def render_campaign_timeline():
     st.subheader("📊 " + _("Resource Allocation Timeline"))
     
@@ -75,7 +150,9 @@ def render_campaign_timeline():
     end_filter = t_col2.date_input(_("To"), (today + datetime.timedelta(days=60)), key="camp_tl_end")
 
     # --- Data Aggregation ---
-    all_campaigns = storage.get_all_campaigns()
+    # Reloaded only when the change feed reports campaign, vehicle or driver writes
+    all_campaigns = utils.feed_cached('campaign_timeline', ('campaigns', 'vehicles', 'drivers'),
+                                      lambda: storage.get_campaign_summaries(include_schedule=True))
     all_vehicles = vm.get_all_vehicles()
     v_map = {v['id']: v['registration'] for v in all_vehicles}
     
@@ -228,14 +305,10 @@ def list_campaigns():
 
 
 
-        campaigns = storage.get_all_campaigns(include_archived=show_archived_c)
-        if not campaigns:
+        total_items = storage.count_campaigns(include_archived=show_archived_c)
+        if not total_items:
             st.info(_("No campaigns found."))
         else:
-            # convert to list for consistency
-            campaigns_list = sorted(campaigns, key=lambda x: x.get('start_date', ''), reverse=True)
-            total_items = len(campaigns_list)
-            
             # Pagination Settings
             col_p1, col_p2 = st.columns([2, 1])
             page_size = col_p2.selectbox(_("Rows per page"), [10, 20, 50, 100], index=0)
@@ -249,7 +322,11 @@ def list_campaigns():
             start_idx = (current_page - 1) * page_size
             end_idx = min(start_idx + page_size, total_items)
             
-            page_campaigns = campaigns_list[start_idx:end_idx]
+            # Only the visible page is loaded, as lightweight summaries
+            page_campaigns, _total = storage.get_campaign_summaries_page(
+                current_page, page_size, include_archived=show_archived_c,
+                include_schedule=True, order_by='start_date'
+            )
             
             st.write(_("Showing") + f" {start_idx+1}-{end_idx} " + _("of") + f" {total_items} " + _("campaigns"))
             
@@ -306,7 +383,8 @@ def list_campaigns():
 
                 if cols[7].button("📋", key=f"copy_{c['id']}", help=_("Duplicate Campaign")):
                     try:
-                        new_camp = c.copy()
+                        # Summaries omit heavy fields; duplicate from the full record
+                        new_camp = storage.get_campaign(c['id']).copy()
                         new_camp['id'] = None # Let storage generate new ID
                         new_camp['campaign_name'] = f"C_COPIE: {c['campaign_name']}"
                         new_camp['status'] = 'draft' # Default to draft
@@ -356,7 +434,7 @@ def list_campaigns():
         st.subheader(_("🔍 Gestiune Date Auditate (GPS & VnNox)"))
         
         # 1. Select Campaign
-        campaigns_for_audit = storage.get_all_campaigns()
+        campaigns_for_audit = storage.get_campaign_summaries()
         if not campaigns_for_audit:
             st.info(_("Nu există campanii pentru care să importați date."))
         else:
@@ -380,6 +458,11 @@ def list_campaigns():
                 if current_hours == 0.0 and 'vnnox_stats' in aud_data:
                     current_hours = aud_data['vnnox_stats'].get('confirmed_hours', 0.0)
 
+                # Uploads are parsed by the import worker: poll while any is queued or running
+                if import_jobs.jobs_for_campaign(selected_audit_id, active_only=True, limit=1):
+                    render_import_progress(selected_audit_id)
+                render_import_outcomes(selected_audit_id)
+
                 col_a1, col_a2 = st.columns(2)
                 
                 # --- GPS Section ---
@@ -391,68 +474,14 @@ def list_campaigns():
                     
                     if gps_file:
                         if st.button(remove_diacritics(_("Procesează GPS")), key=f"proc_gps_{selected_audit_id}"):
-                            try:
-                                from src.utils.gps_parser import parse_gps_log
-                                file_bytes = gps_file.getvalue()
-                                res = parse_gps_log(file_bytes, filename=gps_file.name)
-                                
-                                if res['format'] in ('unknown', 'empty') or res['pings'] == 0:
-                                    st.warning(remove_diacritics(_("Formatul fisierului GPS nu este recunoscut sau fisierul este gol.")))
-                                else:
-                                    # Duplicate detection
-                                    new_start = res.get('date_start')
-                                    new_end = res.get('date_end')
-                                    dup_ids = []
-                                    if new_start and new_end:
-                                        for existing in gps_imports:
-                                            es = existing.get('date_start')
-                                            ee = existing.get('date_end')
-                                            # If dates exist -> compare ranges
-                                            if es and ee:
-                                                if not (new_end < es or new_start > ee):
-                                                    dup_ids.append(existing['id'])
-                                            else:
-                                                # Old import without dates: match by filename
-                                                if existing.get('filename') == gps_file.name:
-                                                    dup_ids.append(existing['id'])
-                                    
-                                    dup_key = f"gps_dup_confirmed_{selected_audit_id}"
-                                    if dup_ids and not st.session_state.get(dup_key):
-                                        st.warning(
-                                            f"⚠️ {remove_diacritics(_('Exista deja date GPS pentru perioada'))} "
-                                            f"**{new_start} – {new_end}**. "
-                                            f"{remove_diacritics(_('Apasa din nou pentru a inlocui datele existente sau sterge manual din istoric.'))}"
-                                        )
-                                        st.session_state[dup_key] = True
-                                    else:
-                                        # Remove duplicates if confirmed
-                                        if dup_ids:
-                                            gps_imports = [x for x in gps_imports if x['id'] not in dup_ids]
-                                        st.session_state.pop(dup_key, None)
-                                        
-                                        new_import = {
-                                            'id': str(uuid.uuid4()),
-                                            'filename': gps_file.name,
-                                            'distance': float(res['total_distance']),
-                                            'pings': int(res['pings']),
-                                            'format_detected': res['format'],
-                                            'gps_points': res.get('gps_points', []),
-                                            'date_start': res.get('date_start'),
-                                            'date_end': res.get('date_end'),
-                                            'imported_at': datetime.datetime.now().isoformat()
-                                        }
-                                        gps_imports.append(new_import)
-                                        aud_data['gps_imports'] = gps_imports
-                                        audit_camp['audited_data'] = aud_data
-                                        storage.save_campaign(audit_camp, selected_audit_id)
-                                        st.success(
-                                            remove_diacritics(_("Date GPS adaugate la istoric!")) +
-                                            f" | {res['format']} | {res['total_distance']:.2f} km" +
-                                            (f" | {len(res.get('gps_points',[]))} pct GPS" if res.get('gps_points') else "")
-                                        )
-                                        st.rerun()
-                            except Exception as e:
-                                st.error(f"Eroare procesare GPS: {e}")
+                            # Parsed and saved by the import worker; progress is polled below
+                            job = import_jobs.enqueue(selected_audit_id, 'gps', gps_file.name, gps_file.getvalue())
+                            if job:
+                                ensure_worker()
+                                st.session_state.setdefault('import_job_ids', []).append(job['id'])
+                                st.rerun()
+                            else:
+                                st.error(remove_diacritics(_("Fisierul GPS nu a putut fi pus in coada de import.")))
                                 
                     if gps_imports:
                         with st.expander(remove_diacritics(_("Istoric Importuri GPS"))):
@@ -478,68 +507,13 @@ def list_campaigns():
                     
                     if vnnox_file:
                         if st.button(_("Procesează PoP"), key=f"proc_pop_{selected_audit_id}"):
-                            try:
-                                from src.utils.vnnox_parser import parse_vnnox_csv
-                                result = parse_vnnox_csv(vnnox_file)
-                                fmt_label = "Details (per play)" if result['format'] == 'details' else "Overview (centralizat)"
-                                
-                                # Duplicate detection
-                                new_start = result.get('date_start')
-                                new_end = result.get('date_end')
-                                dup_ids = []
-                                if new_start and new_end:
-                                    for existing in vnnox_imports:
-                                        es = existing.get('date_start')
-                                        ee = existing.get('date_end')
-                                        if es and ee:
-                                            if not (new_end < es or new_start > ee):
-                                                dup_ids.append(existing['id'])
-                                        else:
-                                            # Fallback for old imports
-                                            if existing.get('filename') == vnnox_file.name:
-                                                dup_ids.append(existing['id'])
-                                
-                                dup_key = f"vn_dup_confirmed_{selected_audit_id}"
-                                if dup_ids and not st.session_state.get(dup_key):
-                                    st.warning(
-                                        f"⚠️ {remove_diacritics(_('Exista deja date VnNox pentru perioada'))} "
-                                        f"**{new_start} – {new_end}**. "
-                                        f"{remove_diacritics(_('Apasa din nou pentru a inlocui datele existente.'))}"
-                                    )
-                                    st.session_state[dup_key] = True
-                                else:
-                                    if dup_ids:
-                                        vnnox_imports = [x for x in vnnox_imports if x['id'] not in dup_ids]
-                                    st.session_state.pop(dup_key, None)
-                                    
-                                    new_vn_import = {
-                                        'id': str(uuid.uuid4()),
-                                        'filename': vnnox_file.name,
-                                        'hours': result['total_hours'],
-                                        'spots': result['total_spots'],
-                                        'format': result['format'],
-                                        'total_seconds': result['total_seconds'],
-                                        'spots_summary': result.get('spots_summary', []),
-                                        'date_start': result.get('date_start'),
-                                        'date_end': result.get('date_end'),
-                                        'imported_at': datetime.datetime.now().isoformat()
-                                    }
-                                    vnnox_imports.append(new_vn_import)
-                                    aud_data['vnnox_imports'] = vnnox_imports
-                                    audit_camp['audited_data'] = aud_data
-                                    storage.save_campaign(audit_camp, selected_audit_id)
-                                    msg = (
-                                        f"Format: **{fmt_label}** | "
-                                        f"Spoturi: **{result['total_spots']:,}** | "
-                                        f"Durata: **{result['total_hours']:.2f} h**"
-                                    )
-                                    if result['errors']:
-                                        st.warning(remove_diacritics(_("Import OK cu avertismente: ")) + msg)
-                                    else:
-                                        st.success(remove_diacritics(_("VnNox importat cu succes! ")) + msg)
-                                    st.rerun()
-                            except Exception as e:
-                                st.error(f"Eroare procesare VnNox: {e}")
+                            job = import_jobs.enqueue(selected_audit_id, 'vnnox', vnnox_file.name, vnnox_file.getvalue())
+                            if job:
+                                ensure_worker()
+                                st.session_state.setdefault('import_job_ids', []).append(job['id'])
+                                st.rerun()
+                            else:
+                                st.error(remove_diacritics(_("Fisierul VnNox nu a putut fi pus in coada de import.")))
                                 
                     if vnnox_imports:
                         with st.expander(remove_diacritics(_("Istoric Importuri VnNox"))):
@@ -2586,6 +2560,8 @@ def render_reporting_interface(campaign_id):
     # Get history
     history = rep_storage.get_reports_by_campaign(campaign_id)
     latest_standard = rep_storage.get_latest_metrics(campaign_id, 'standard')
+    std_gen = CampaignReportGenerator(storage)
+    standard_stale = bool(latest_standard) and std_gen.frozen_metrics_stale(latest_standard, std_gen.input_fingerprint(c))
     
     col1, col2, col3 = st.columns(3)
 
@@ -2593,11 +2569,12 @@ def render_reporting_interface(campaign_id):
     with col1:
         st.markdown(f"### 📋 " + _("Standard Campaign Report"))
         st.info(_("Contains basic metrics like impressions, reach, and OTS based on city data."))
+        if standard_stale:
+            st.warning("⚠️ " + _("Campaign, city or route data changed since the latest Standard Report. Regenerate it to refresh the DOOH baseline."))
         
         if st.button("🚀 " + _("Generate New Standard Report"), key="gen_std", type="primary", width="stretch"):
             with st.spinner(_("Generating...")):
-                gen = CampaignReportGenerator(storage)
-                path = gen.generate_campaign_report(c)
+                path = std_gen.generate_campaign_report(c)
                 if path:
                     st.success(_("Success!"))
                     st.rerun()
@@ -2671,14 +2648,8 @@ def render_reporting_interface(campaign_id):
             latest = pop_reports[0]
             fd = latest.get('frozen_data', {})
             st.caption(f"⚙️ {'🗺️' if fd.get('include_map') else ''} {'📋' if fd.get('include_spots') else ''}")
-            if os.path.exists(latest['file_path']):
-                with open(latest['file_path'], "rb") as f:
-                    st.download_button(
-                        label="📥 " + _("Download Latest") + f" ({latest['created_at'][:10]})",
-                        data=f, file_name=latest['file_name'],
-                        mime="application/pdf", key="dl_pop_latest", width="stretch"
-                    )
-            else:
+            if not render_report_downloads(st, latest, "dl_pop_latest",
+                                           "📥 " + _("Download Latest") + f" ({latest['created_at'][:10]})"):
                 st.warning(_("PDF file not found on disk."))
 
     st.divider()
@@ -2699,31 +2670,21 @@ def render_reporting_interface(campaign_id):
             else:
                 h_type = "🗃️ Anexă PoP"
             h_date = h['created_at'].replace('T', ' ')[:19]
-            file_exists = os.path.exists(h['file_path'])
             
             hc1, hc2, hc3, hc4 = st.columns([1, 3, 1, 1])
             hc1.write(h_type)
             hc2.write(f"**{h_date}**  \n`{h['file_name']}`")
             
-            if file_exists:
-                with open(h['file_path'], "rb") as f:
-                    hc3.download_button(
-                        label="📥",
-                        data=f,
-                        file_name=h['file_name'],
-                        mime="application/pdf",
-                        key=f"dl_hist_{h['id']}",
-                        help=_("Descarca raport"),
-                        width="stretch"
-                    )
-            else:
+            if not render_report_downloads(hc3, h, f"dl_hist_{h['id']}", "📥", help=_("Descarca raport")):
                 hc3.caption(_("Fisier lipsa"))
             
             if hc4.button("🗑️", key=f"del_rep_{h['id']}", help=_("Sterge raport"), width="stretch"):
                 rep_storage.delete_report(h['id'])
-                if file_exists:
+                # Split PoP annexes: every volume goes with the report
+                for path in ReportStorage.report_files(h):
                     try:
-                        os.remove(h['file_path'])
+                        if os.path.exists(path):
+                            os.remove(path)
                     except Exception:
                         pass
                 st.toast(_("Raport sters!"))
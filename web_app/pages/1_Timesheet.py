@@ -10,6 +10,7 @@ from src.data.campaign_storage import CampaignStorage
 # Initialize
 root_dir = utils.init_path()
 from src.utils.i18n import _
+from src.utils.schedule import compile_hours
 utils.set_page_config(_("Condică (Timesheet)"), "📒")
 utils.inject_custom_css()
 
@@ -117,28 +118,11 @@ def get_timesheet_data(start_date, end_date, selected_driver_ids):
                                     if day_data.get('checked', True):
                                         h_str = day_data.get('hours', "09:00-17:00")
                                         # Handle split intervals (e.g. 08:00-12:00, 14:00-18:00)
-                                        intervals = [i.strip() for i in h_str.split(',')]
-                                        net_h = 0.0
-                                        times = []
-                                        for interval in intervals:
-                                            try:
-                                                if '-' not in interval: continue
-                                                t1_s, t2_s = interval.split('-')
-                                                H1, M1 = map(int, t1_s.split(':')) if ':' in t1_s else (int(t1_s), 0)
-                                                H2, M2 = map(int, t2_s.split(':')) if ':' in t2_s else (int(t2_s), 0)
-                                                start_num = H1 + M1/60.0
-                                                end_num = H2 + M2/60.0
-                                                if end_num < start_num: end_num += 24.0
-                                                net_h += (end_num - start_num)
-                                                times.append(start_num)
-                                                times.append(end_num)
-                                            except: continue
-                                        
-                                        if times:
-                                            total_hours += net_h
+                                        compiled = compile_hours(h_str)
+                                        if compiled.intervals:
+                                            total_hours += compiled.hours
                                             # Calculation of span
-                                            day_span = max(times) - min(times)
-                                            total_span_hours += day_span
+                                            total_span_hours += compiled.span_hours
                                         else:
                                             total_hours += 8
                                             total_span_hours += 8
@@ -472,27 +456,12 @@ def main():
                                                 raw_h = city_sched_data[day_str].get('hours', "09:00-17:00")
                                                 h_str = raw_h if isinstance(raw_h, str) else "09:00-17:00"
                                                 # For Pontaj (Worked Hours), use SPAN as requested: first to last
-                                                intervals = [i.strip() for i in h_str.split(',')]
-                                                times = []
-                                                for interval in intervals:
-                                                    try:
-                                                        if '-' not in interval: continue
-                                                        t1_s, t2_s = interval.split('-')
-                                                        H1, M1 = map(int, t1_s.split(':')) if ':' in t1_s else (int(t1_s), 0)
-                                                        H2, M2 = map(int, t2_s.split(':')) if ':' in t2_s else (int(t2_s), 0)
-                                                        start_num = H1 + M1/60.0
-                                                        end_num = H2 + M2/60.0
-                                                        if end_num < start_num: end_num += 24.0
-                                                        times.append(start_num)
-                                                        times.append(end_num)
-                                                    except: continue
-                                                
-                                                if times:
-                                                    day_span = max(times) - min(times)
-                                                    day_hours += day_span
+                                                compiled = compile_hours(h_str)
+                                                if compiled.intervals:
+                                                    day_hours += compiled.span_hours
                                                     # Format span string for activity display
-                                                    s_min = f"{int(min(times)):02d}:{int((min(times)%1)*60):02d}"
-                                                    e_max = f"{int(max(times)%24):02d}:{int((max(times)%1)*60):02d}"
+                                                    s_min = f"{int(compiled.span_start):02d}:{int((compiled.span_start%1)*60):02d}"
+                                                    e_max = f"{int(compiled.span_end%24):02d}:{int((compiled.span_end%1)*60):02d}"
                                                     day_activities.append(f"📍 {city} ({c['campaign_name']}) [{s_min}-{e_max}]")
                                                 else:
                                                     day_hours += 12
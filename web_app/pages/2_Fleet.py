@@ -323,6 +323,7 @@ def vehicle_tab():
                                             vehicle.status = 'active'
                                         
                                         session.commit()
+                                    vehicle_manager.invalidate(veh_id)
                                     
                                     st.success(_("History entry deleted! Vehicle status updated."))
                                     st.rerun()
@@ -373,6 +374,7 @@ def vehicle_tab():
                                         entry_to_update.date = datetime.datetime.combine(eh_date_input, eh_time_input)
                                         entry_to_update.note = eh_note
                                         session.commit()
+                                        vehicle_manager.invalidate(entry_to_update.vehicle_id)
                                         st.success(_("History updated!"))
                                         del st.session_state.editing_vehicle_history
                                         st.rerun()
@@ -697,6 +699,7 @@ def driver_tab():
                                     else:
                                         driver.status = 'active'
                                     session.commit()
+                                driver_manager.invalidate(dr_id)
                                 st.success(_("History entry deleted!"))
                                 st.rerun()
                             except Exception as e:
@@ -746,6 +749,7 @@ def driver_tab():
                                         entry_to_update.date = datetime.datetime.combine(eh_date_input, eh_time_input)
                                         entry_to_update.note = eh_note
                                         session.commit()
+                                        driver_manager.invalidate(entry_to_update.driver_id)
                                         st.success(_("History updated!"))
                                         del st.session_state.editing_driver_history
                                         st.rerun()
@@ -1064,20 +1068,21 @@ def schedule_tab():
     # 3. Driver Schedules (Leave, etc)
     all_drivers = driver_manager.get_all_drivers()
     drv_map = {d['id']: d['name'] for d in all_drivers}
-    for d_id in drv_map:
-        d_schs = driver_manager.get_driver_schedules(d_id)
-        for ds in d_schs:
-            all_schedules.append({
-                'source': f"Driver: {drv_map[d_id]}",
-                'id': ds['id'],
-                'resource_id': d_id,
-                'resource_name': drv_map[d_id],
-                'start': ds['start_date'],
-                'end': ds['end_date'],
-                'type': ds['event_type'],
-                'label': ds['event_type'].upper(),
-                'is_driver': True
-            })
+    for ds in driver_manager.get_driver_schedules():
+        d_id = ds['driver_id']
+        if d_id not in drv_map:
+            continue
+        all_schedules.append({
+            'source': f"Driver: {drv_map[d_id]}",
+            'id': ds['id'],
+            'resource_id': d_id,
+            'resource_name': drv_map[d_id],
+            'start': ds['start_date'],
+            'end': ds['end_date'],
+            'type': ds['event_type'],
+            'label': ds['event_type'].upper(),
+            'is_driver': True
+        })
 
     # Sort all by start date
     all_schedules.sort(key=lambda x: str(x['start']), reverse=True)
@@ -1118,10 +1123,61 @@ def schedule_tab():
     else:
         st.info("No schedule events found.")
 
+def utilization_tab():
+    st.subheader("📈 " + _("Fleet Utilization"))
+    from src.reporting.fleet_analytics import FleetAnalytics
+
+    u_col1, u_col2, u_col3 = st.columns([1, 1, 1])
+    today = datetime.date.today()
+    u_start = u_col1.date_input(_("From"), today.replace(day=1), key="util_start")
+    u_end = u_col2.date_input(_("To"), today + datetime.timedelta(days=30), key="util_end")
+    min_gap = u_col3.number_input(_("Min. idle days"), min_value=1, value=3, key="util_min_gap")
+    if u_end < u_start:
+        st.warning(_("End date must be after start date."))
+        return
+
+    # One index over campaigns, transits and schedules; every row below is a lookup
+    analytics = FleetAnalytics.load()
+
+    rows = []
+    for v in vehicle_manager.get_all_vehicles():
+        usage = analytics.utilization('vehicle', v['id'], u_start, u_end)
+        gaps = analytics.idle_gaps('vehicle', v['id'], u_start, u_end, min_days=min_gap)
+        overlaps = analytics.overlaps('vehicle', v['id'], u_start, u_end)
+        rows.append({
+            _("Vehicle"): f"{v['name']} ({v.get('registration', '')})",
+            _("Campaigns"): usage['campaigns'],
+            _("Days Used"): f"{usage['days_used']} / {usage['total_days']}",
+            _("Utilization (%)"): round(usage['utilization'], 1),
+            _("Idle Gaps"): ", ".join(f"{s.strftime('%d.%m')}-{e.strftime('%d.%m')}" for s, e in gaps) or "-",
+            _("Overlaps"): ", ".join(f"{o['start'].strftime('%d.%m')}-{o['end'].strftime('%d.%m')}" for o in overlaps) or "-",
+        })
+    if rows:
+        df_util = pd.DataFrame(rows).sort_values(_("Utilization (%)"), ascending=False)
+        st.dataframe(df_util, width="stretch", hide_index=True)
+    else:
+        st.info(_("No vehicles found."))
+
+    driver_rows = []
+    for d in driver_manager.get_all_drivers():
+        usage = analytics.utilization('driver', d['id'], u_start, u_end)
+        overlaps = analytics.overlaps('driver', d['id'], u_start, u_end)
+        driver_rows.append({
+            _("Driver"): d['name'],
+            _("Campaigns"): usage['campaigns'],
+            _("Days Worked"): f"{usage['days_used']} / {usage['total_days']}",
+            _("Utilization (%)"): round(usage['utilization'], 1),
+            _("Overlaps"): ", ".join(f"{o['start'].strftime('%d.%m')}-{o['end'].strftime('%d.%m')}" for o in overlaps) or "-",
+        })
+    if driver_rows:
+        st.write("**" + _("Drivers") + "**")
+        df_drivers = pd.DataFrame(driver_rows).sort_values(_("Utilization (%)"), ascending=False)
+        st.dataframe(df_drivers, width="stretch", hide_index=True)
+
 def main():
     st.title("🚛 " + _("Fleet Management"))
     
-    tab1, tab2, tab3 = st.tabs([_("Vehicles"), _("Drivers"), _("Transit & Schedules")])
+    tab1, tab2, tab3, tab4 = st.tabs([_("Vehicles"), _("Drivers"), _("Transit & Schedules"), _("Utilization")])
     
     with tab1:
         vehicle_tab()
@@ -1129,6 +1185,8 @@ def main():
         driver_tab()
     with tab3:
         schedule_tab()
+    with tab4:
+        utilization_tab()
 
 if __name__ == "__main__":
     main()
@@ -414,7 +414,7 @@ def main():
                                 if all(col in df_import.columns for col in required_cols):
                                     if st.button(_("Procesează Import") + f" ({len(df_import)} " + _("linii") + ")", type="primary", width="stretch"):
                                         locs_list = df_import.to_dict('records')
-                                        added = city_manager.batch_add_traffic_locations(selected_city, locs_list)
+                                        added = city_manager.bulk_upsert_traffic_locations(selected_city, locs_list)
                                         st.success(f"{added} " + _("locații au fost importate cu succes!"))
                                         st.rerun()
                                 else:
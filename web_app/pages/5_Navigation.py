@@ -62,7 +62,7 @@ def main():
                 st.rerun()
     
     # 2. Campaign & Route Selection
-    campaigns = storage.get_all_campaigns()
+    campaigns = storage.get_campaign_summaries()
     active_campaigns = [c for c in campaigns if c.get('status', 'Active') != 'Completed']
     
     col_sel1, col_sel2 = st.columns(2)
@@ -9,6 +9,7 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 from src.utils.i18n import _
+from src.utils.schedule import compile_hours
 
 def init_path():
     """Add project root to sys.path to allow imports from src/"""
@@ -53,6 +54,22 @@ def set_page_config(title="Rapoarte DOOH", icon="📊"):
             CompanySettings().save_settings(language=new_lang)
             st.rerun()
 
+def feed_cached(key, kinds, load):
+    """
+    load() result kept in the browser session and reused on reruns until the
+    change feed reports a write or delete in one of `kinds` (feed tables,
+    e.g. 'campaigns'); then it is loaded again.
+    """
+    from src.data.change_feed import changes_since, has_changes
+    state_key = f"_feed_{key}"
+    cached = st.session_state.get(state_key)
+    changes = changes_since(cached['cursor'] if cached else None, kinds=kinds)
+    if cached is None or has_changes(changes):
+        cached = {'data': load()}
+    cached['cursor'] = changes['cursor']
+    st.session_state[state_key] = cached
+    return cached['data']
+
 def inject_custom_css():
     """Global CSS tweaks for a premium look with theme support"""
     from src.data.company_settings import CompanySettings
@@ -191,23 +208,8 @@ def get_granular_intervals(start, end, hours_info=None, default_hours="09:00-17:
              # If hours_info exists but is not a string/dict, use default
              h_ranges_str = default_hours
 
-        # Process the hours string
-        day_intervals = [i.strip() for i in h_ranges_str.split(',') if '-' in i]
-        for interval in day_intervals:
-            try:
-                t1, t2 = interval.split('-')
-                seg_start = ensure_datetime(curr, t1)
-                
-                # Handle 24:00/00:00 end of day logic
-                if t2.strip() in ["00:00", "24:00"]:
-                    seg_end = ensure_datetime(curr + datetime.timedelta(days=1), "00:00")
-                else:
-                    seg_end = ensure_datetime(curr, t2)
-                
-                if seg_end > seg_start:
-                    intervals_out.append((seg_start, seg_end))
-            except:
-                continue
+        # Process the hours string (parsed once per distinct string)
+        intervals_out.extend(compile_hours(h_ranges_str).day_segments(curr))
         
         curr += datetime.timedelta(days=1)
     